@@ -1,32 +1,168 @@
 import logging
+import time
+from functools import partial
+from typing import Any, Hashable, Mapping, Optional
 
+from elastic_transport import ApiResponse
 from elasticsearch import AsyncElasticsearch
 
 from elastic.config import ES_PASS, ES_USER, ES_URL, ES_PROTOCOL
+from elastic.index_redirects import get_index_redirects, redirect_request
+from elastic.serializer import ELASTIC_SERIALIZERS
+from elastic.single_flight import (
+    COALESCED_ENDPOINTS,
+    get_request_key,
+    single_flight,
+)
+from elastic.slow_queries import (
+    add_profile_to_sampled_body,
+    record_slow_query,
+)
+from metrics.collectors import ES_REQUEST_DURATION
 
 logging.getLogger("elastic_transport.transport").setLevel(logging.WARNING)
 logging.getLogger("elasticsearch").setLevel(logging.WARNING)
 logging.getLogger("elastic_transport").setLevel(logging.WARNING)
 
 
-async def get_async_client():
-    """Generator of elastic async session"""
+class InstrumentedAsyncElasticsearch(AsyncElasticsearch):
+    """AsyncElasticsearch that measures the duration of each request to Elasticsearch
+    and adds slow requests to the slow query log. Requests to aliases are redirected
+    to other indexes inside redirect_indexes()"""
+
+    async def perform_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        body: Optional[Any] = None,
+        endpoint_id: Optional[str] = None,
+        path_parts: Optional[Mapping[str, Any]] = None,
+    ) -> ApiResponse[Any]:
+        index_by_alias = get_index_redirects()
+        if index_by_alias:
+            path, body, path_parts = redirect_request(
+                path=path,
+                body=body,
+                path_parts=path_parts,
+                index_by_alias=index_by_alias,
+            )
+        status = "error"
+        response = None
+        request_body, is_profiled = add_profile_to_sampled_body(
+            endpoint_id, body
+        )
+        start = time.perf_counter()
+        try:
+            response = await super().perform_request(
+                method,
+                path,
+                params=params,
+                headers=headers,
+                body=request_body,
+                endpoint_id=endpoint_id,
+                path_parts=path_parts,
+            )
+            status = "success"
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            ES_REQUEST_DURATION.labels(
+                endpoint=endpoint_id or method, status=status
+            ).observe(duration)
+            response_body = response.body if response is not None else None
+            profile = None
+            if is_profiled and isinstance(response_body, dict):
+                # profile is only for the slow query log, not for the caller
+                profile = response_body.pop("profile", None)
+            record_slow_query(
+                endpoint_id=endpoint_id,
+                method=method,
+                path_parts=path_parts,
+                body=body,
+                duration=duration,
+                response_body=response_body,
+                profile=profile,
+                is_error=response is None,
+            )
+
+
+class SingleFlightAsyncElasticsearch(InstrumentedAsyncElasticsearch):
+    """InstrumentedAsyncElasticsearch whose reads share one in-flight request with identical
+    concurrent reads of clients with the same single_flight_scope"""
+
+    single_flight_scope: Hashable = None
+
+    def options(self, **kwargs) -> "SingleFlightAsyncElasticsearch":
+        client = super().options(**kwargs)
+        client.single_flight_scope = self.single_flight_scope
+        return client
+
+    async def perform_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        body: Optional[Any] = None,
+        endpoint_id: Optional[str] = None,
+        path_parts: Optional[Mapping[str, Any]] = None,
+    ) -> ApiResponse[Any]:
+        request = partial(
+            super().perform_request,
+            method,
+            path,
+            params=params,
+            headers=headers,
+            body=body,
+            endpoint_id=endpoint_id,
+            path_parts=path_parts,
+        )
+        if endpoint_id not in COALESCED_ENDPOINTS or get_index_redirects():
+            # redirected reads do not read the indexes of the same reads of other requests
+            return await request()
+        key = get_request_key(
+            # statuses which are not raised change the result of request
+            scope=(self.single_flight_scope, self._ignore_status),
+            method=method,
+            path=path,
+            params=params,
+            headers=headers,
+            body=body,
+        )
+        return await single_flight.do(
+            key=key, endpoint_id=endpoint_id, request=request
+        )
+
+
+def create_async_client(
+    client_class: type[
+        InstrumentedAsyncElasticsearch
+    ] = InstrumentedAsyncElasticsearch,
+) -> InstrumentedAsyncElasticsearch:
     if ES_PROTOCOL == "https":
-        async_client = AsyncElasticsearch(
+        return client_class(
             ES_URL,
             ca_certs="./elastic/ca.crt",
             http_auth=(ES_USER, ES_PASS),
             request_timeout=10000,
+            serializers=ELASTIC_SERIALIZERS,
             retry_on_status=(500, 502, 503, 504),
             max_retries=5,
         )
-    else:
-        async_client = AsyncElasticsearch(
-            ES_URL,
-            request_timeout=10000,
-        )
+    return client_class(
+        ES_URL,
+        request_timeout=10000,
+        serializers=ELASTIC_SERIALIZERS,
+    )
+
 
-    async with async_client as elastic_client:
+async def get_async_client():
+    """Generator of elastic async session"""
+    async with create_async_client() as elastic_client:
         yield elastic_client
 
 
@@ -42,18 +178,20 @@ class ElasticsearchManager:
     def get_client(self):
         if self._client is None:
             if ES_PROTOCOL == "https":
-                self._client = AsyncElasticsearch(
+                self._client = InstrumentedAsyncElasticsearch(
                     ES_URL,
                     ca_certs="./elastic/ca.crt",
                     http_auth=(ES_USER, ES_PASS),
                     request_timeout=10000,
+                    serializers=ELASTIC_SERIALIZERS,
                     retry_on_status=(500, 502, 503, 504),
                     max_retries=5,
                 )
             else:
-                self._client = AsyncElasticsearch(
+                self._client = InstrumentedAsyncElasticsearch(
                     ES_URL,
                     request_timeout=10000,
+                    serializers=ELASTIC_SERIALIZERS,
                 )
 
         return self._client
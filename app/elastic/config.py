@@ -11,6 +11,23 @@ ES_URL = f"{ES_PROTOCOL}://{ES_HOST}"
 if ES_PORT:
     ES_URL += f":{ES_PORT}"
 
+# Slow query log: the slowest query shapes of the process, 0 disables it
+ES_SLOW_QUERY_LOG_SIZE = int(os.environ.get("ES_SLOW_QUERY_LOG_SIZE", 50))
+# Requests faster than this are not fingerprinted
+ES_SLOW_QUERY_MIN_MS = float(os.environ.get("ES_SLOW_QUERY_MIN_MS", 100))
+# Share of search requests sent with "profile": true, from 0 to 1
+ES_PROFILE_SAMPLE_RATE = float(os.environ.get("ES_PROFILE_SAMPLE_RATE", 0))
+# Sliced point in time scans: number of slices read concurrently
+ES_SLICED_SCAN_SLICES = int(os.environ.get("ES_SLICED_SCAN_SLICES", 4))
+# Pages which are read by slices but not consumed yet
+ES_SLICED_SCAN_MAX_PAGES_IN_FLIGHT = int(
+    os.environ.get("ES_SLICED_SCAN_MAX_PAGES_IN_FLIGHT", 8)
+)
+# Batched searches: searches sent in one _msearch request
+ES_MSEARCH_MAX_SEARCHES = int(os.environ.get("ES_MSEARCH_MAX_SEARCHES", 8))
+# Batched searches: _msearch requests and other independent searches running at a time
+ES_MSEARCH_CONCURRENCY = int(os.environ.get("ES_MSEARCH_CONCURRENCY", 4))
+
 # v1
 INVENTORY_INDEX = "inventory_index"
 PARAMS_INDEX = "params"
@@ -0,0 +1,73 @@
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Iterator, Mapping, Optional
+
+import orjson
+
+"""
+Redirects of requests to Elasticsearch from aliases to other indexes in the current context.
+Code which writes to aliases, e.g. kafka handlers, writes into indexes which are not yet behind
+their aliases when it runs inside redirect_indexes(). Tasks created inside the context inherit it
+"""
+
+_index_by_alias: ContextVar[Mapping[str, str]] = ContextVar(
+    "index_by_alias", default={}
+)
+
+BULK_OPERATIONS_WITHOUT_SOURCE = {"delete"}
+
+
+@contextlib.contextmanager
+def redirect_indexes(index_by_alias: Mapping[str, str]) -> Iterator[None]:
+    token = _index_by_alias.set(index_by_alias)
+    try:
+        yield
+    finally:
+        _index_by_alias.reset(token)
+
+
+def get_index_redirects() -> Mapping[str, str]:
+    return _index_by_alias.get()
+
+
+def _redirect_names(names: str, index_by_alias: Mapping[str, str]) -> str:
+    return ",".join(index_by_alias.get(name, name) for name in names.split(","))
+
+
+def _redirect_bulk_body(body: list, index_by_alias: Mapping[str, str]) -> list:
+    """Redirects _index of action lines of bulk body, lines are dicts or serialized by bulk helpers"""
+    redirected_body = list()
+    is_action = True
+    for line in body:
+        if not is_action:
+            redirected_body.append(line)
+            is_action = True
+            continue
+        action = orjson.loads(line) if isinstance(line, (bytes, str)) else line
+        operation, params = next(iter(action.items()))
+        if params.get("_index") in index_by_alias:
+            params = {**params, "_index": index_by_alias[params["_index"]]}
+            line = {operation: params}
+        redirected_body.append(line)
+        is_action = operation in BULK_OPERATIONS_WITHOUT_SOURCE
+    return redirected_body
+
+
+def redirect_request(
+    path: str,
+    body: Optional[Any],
+    path_parts: Optional[Mapping[str, Any]],
+    index_by_alias: Mapping[str, str],
+) -> tuple[str, Optional[Any], Optional[Mapping[str, Any]]]:
+    """Returns path, body and path parts of the request to the redirected indexes"""
+    target, separator, rest = path.lstrip("/").partition("/")
+    if target and not target.startswith("_"):
+        path = f"/{_redirect_names(target, index_by_alias)}{separator}{rest}"
+    if path_parts and isinstance(path_parts.get("index"), str):
+        path_parts = {
+            **path_parts,
+            "index": _redirect_names(path_parts["index"], index_by_alias),
+        }
+    if path.endswith("/_bulk") and isinstance(body, list):
+        body = _redirect_bulk_body(body, index_by_alias)
+    return path, body, path_parts
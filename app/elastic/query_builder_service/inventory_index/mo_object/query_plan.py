@@ -0,0 +1,315 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, List
+
+from fastapi import HTTPException
+
+from elastic.enum_models import LogicalOperator, SearchOperator
+from elastic.pydantic_models import FilterColumn
+from elastic.query_builder_service.inventory_index.search_query_builder import (
+    InventoryIndexQueryBuilder,
+)
+from elastic.query_builder_service.inventory_index.utils.parameter_search_utils import (
+    get_where_condition_function_for_parameter_fields_by_inventory_val_type,
+)
+from elastic.query_builder_service.inventory_index.utils.search_utils import (
+    get_field_name_for_tprm_id,
+)
+from elastic.query_builder_service.search_operators.first_depth_fields.utils import (
+    get_where_condition_function_for_first_depth_fields,
+)
+from services.inventory_services.converters.val_type_converter import (
+    get_convert_function_by_val_type,
+    get_convert_function_by_val_type_for_multiple_values,
+)
+from settings.config import FILTER_QUERY_PLANS_CACHE_SIZE
+
+"""
+Query plans of filter columns. Dashboards send the same filter columns (names, rules and operators) with
+different values, so everything which does not depend on values is resolved once per shape of filter
+columns and types of their columns: types, field names, functions of operators and converters of values.
+Binding of values only converts them and calls the functions of operators. Plans build the same query
+as InventoryIndexQueryBuilder, clauses of operators depend on values (lists of values are expanded),
+so a plan keeps functions of operators instead of a query with placeholders
+"""
+
+OPERATORS_WITH_EMPTY_VALUES = {
+    SearchOperator.IS_EMPTY.value,
+    SearchOperator.IS_NOT_EMPTY.value,
+}
+# operators of parameters whose list of values is passed to the function of operator as one value
+OPERATORS_WITH_LIST_VALUE = {
+    SearchOperator.IS_NOT_ANY_OF.value,
+    SearchOperator.IS_ANY_OF.value,
+}
+
+
+class ColumnPlan:
+    """Resolved column of filter: field name, converters of values and functions of its operators"""
+
+    def __init__(
+        self,
+        filter_column: FilterColumn,
+        val_type: str,
+        multiple: bool,
+    ):
+        self.column_name = filter_column.column_name
+        self.rule = filter_column.rule
+        self.val_type = val_type
+        self.multiple = multiple
+        self.is_parameter = self.column_name.isdigit()
+        if self.is_parameter:
+            self.field_name = get_field_name_for_tprm_id(self.column_name)
+            get_function = get_where_condition_function_for_parameter_fields_by_inventory_val_type
+        else:
+            self.field_name = self.column_name
+            get_function = get_where_condition_function_for_first_depth_fields
+        self.operator_functions: dict[str, Callable] = dict()
+        # operators which are not implemented for the type, the error is raised when values
+        # are bound, after their conversion, as InventoryIndexQueryBuilder raises it
+        self.operator_errors: dict[str, str] = dict()
+        for filter_item in filter_column.filters:
+            try:
+                self.operator_functions[filter_item.operator] = get_function(
+                    operator_name=filter_item.operator, val_type=val_type
+                )
+            except NotImplementedError as e:
+                self.operator_errors[filter_item.operator] = str(e)
+        self.convert_value = get_convert_function_by_val_type(val_type)
+        self.convert_values = (
+            get_convert_function_by_val_type_for_multiple_values(val_type)
+        )
+
+    def convert(self, operator: str, value):
+        """Returns value converted as value of SearchModel"""
+        if operator in OPERATORS_WITH_EMPTY_VALUES:
+            return None
+        if hasattr(value, "__iter__") and not isinstance(value, str):
+            convert_function = self.convert_values
+        else:
+            convert_function = self.convert_value
+        try:
+            return convert_function(value)
+        except Exception:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Cant convert value - {value} as val_type - {self.val_type}"
+                f", multiple - {self.multiple},"
+                f" for column - {self.column_name}",
+            )
+
+    def get_queries(self, operator: str, value) -> dict[str, list]:
+        """Returns lists of clauses by bool occurrence for one filter item,
+        the same as InventoryIndexQueryBuilder returns for SearchModel of the item"""
+        query_former = self.operator_functions.get(operator)
+        if query_former is None:
+            raise HTTPException(
+                status_code=422, detail=self.operator_errors[operator]
+            )
+        result = {"must": list(), "must_not": list()}
+        if not self.is_parameter:
+            query = query_former(column_name=self.field_name, value=value)
+            if query:
+                if operator in InventoryIndexQueryBuilder.must_not_operators:
+                    result["must_not"].append(query)
+                else:
+                    result["must"].append(query)
+            return result
+
+        list_of_values = [value]
+        if (
+            hasattr(value, "__iter__")
+            and not isinstance(value, str)
+            and operator not in OPERATORS_WITH_LIST_VALUE
+        ):
+            list_of_values = value
+        for field_value in list_of_values:
+            query = query_former(column_name=self.field_name, value=field_value)
+            if not query:
+                continue
+            if operator in InventoryIndexQueryBuilder.must_not_operators:
+                if operator == SearchOperator.IS_NOT_ANY_OF.value:
+                    for q in query:
+                        if q.get("exists", None):
+                            result["must"].append([q])
+                        else:
+                            result["must_not"].append([q])
+                else:
+                    result["must_not"].append(query)
+            else:
+                result["must"].append(query)
+        return result
+
+
+class FilterQueryPlan:
+    """Plan of search query for filter columns of one shape"""
+
+    def __init__(self, filter_columns: List[FilterColumn], dict_of_types: dict):
+        self.columns = list()
+        for filter_column in filter_columns:
+            filter_column_data = dict_of_types.get(filter_column.column_name)
+            if filter_column_data is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Can`t create search query for column named "
+                    f"{filter_column.column_name}",
+                )
+            self.columns.append(
+                ColumnPlan(
+                    filter_column=filter_column,
+                    val_type=filter_column_data["val_type"],
+                    multiple=filter_column_data["multiple"],
+                )
+            )
+
+    @staticmethod
+    def __combine(
+        items: List[tuple[ColumnPlan, dict[str, list]]], logical_operator: str
+    ) -> dict:
+        """Returns query of clauses of items joined as InventoryIndexQueryBuilder joins them"""
+        first_depth_queries = {"must": list(), "must_not": list()}
+        parameter_queries = {"must": list(), "must_not": list()}
+        for column, queries in items:
+            target = (
+                parameter_queries
+                if column.is_parameter
+                else first_depth_queries
+            )
+            for k, v in queries.items():
+                target[k].extend(v)
+
+        query = {"must": list(), "must_not": list()}
+        if logical_operator == LogicalOperator.AND.value:
+            for queries in (first_depth_queries, parameter_queries):
+                for k, v in queries.items():
+                    for query_list in v:
+                        query[k].extend(query_list)
+            return {"bool": {k: v for k, v in query.items() if v}}
+
+        for queries in (parameter_queries, first_depth_queries):
+            for k, v in queries.items():
+                query[k].extend(v)
+        should_query_list = [
+            {"bool": {k: query_list}}
+            for k, list_of_queries in query.items()
+            for query_list in list_of_queries
+            if query_list
+        ]
+        return {
+            "bool": {
+                "must": [
+                    {
+                        "bool": {
+                            "should": should_query_list,
+                            "minimum_should_match": 1,
+                        }
+                    }
+                ]
+            }
+        }
+
+    def bind(self, filter_columns: List[FilterColumn]) -> dict:
+        """Returns search query for values of filter_columns of the shape of plan"""
+        single_items = list()
+        join_queries = list()
+        for column, filter_column in zip(self.columns, filter_columns):
+            items = [
+                (
+                    column,
+                    column.get_queries(
+                        operator=filter_item.operator,
+                        value=column.convert(
+                            operator=filter_item.operator,
+                            value=filter_item.value,
+                        ),
+                    ),
+                )
+                for filter_item in filter_column.filters
+            ]
+            if len(items) == 1:
+                single_items.extend(items)
+            elif items:
+                join_queries.append(
+                    self.__combine(items, logical_operator=column.rule)
+                )
+
+        main_query = dict()
+        if single_items:
+            main_query = self.__combine(
+                single_items, logical_operator=LogicalOperator.AND.value
+            )
+
+        if join_queries:
+            inner_dict = main_query.setdefault("bool", dict())
+            for query_as_dict in join_queries:
+                for k, v in query_as_dict["bool"].items():
+                    values_for_elastic_q_operator = inner_dict.get(k)
+                    if values_for_elastic_q_operator is None:
+                        inner_dict[k] = v
+                    else:
+                        values_for_elastic_q_operator.extend(v)
+        return main_query
+
+
+def get_filter_shape(filter_columns: Iterable[FilterColumn]) -> tuple:
+    """Returns key of filter columns without values"""
+    return tuple(
+        (
+            filter_column.column_name,
+            filter_column.rule,
+            tuple(sorted(item.operator for item in filter_column.filters)),
+        )
+        for filter_column in filter_columns
+    )
+
+
+class FilterQueryPlans:
+    """LRU cache of query plans by shape of filter columns and types of their columns.
+    Types are part of the key, so a plan is not used after the types of its TPRMs are changed;
+    plans with changed TPRMs are also removed by the TPRM events"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._plans: OrderedDict[tuple, FilterQueryPlan] = OrderedDict()
+
+    def get_plan(
+        self, filter_columns: List[FilterColumn], dict_of_types: dict
+    ) -> FilterQueryPlan:
+        columns_types = [
+            dict_of_types.get(filter_column.column_name)
+            for filter_column in filter_columns
+        ]
+        key = (
+            get_filter_shape(filter_columns),
+            tuple(
+                (types["val_type"], types["multiple"]) if types else None
+                for types in columns_types
+            ),
+        )
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+
+        plan = FilterQueryPlan(filter_columns, dict_of_types)
+        if self.maxsize > 0:
+            self._plans[key] = plan
+            if len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, tprm_ids: Iterable[int | str]):
+        """Removes plans which filter by any of tprm_ids"""
+        tprm_ids = {str(tprm_id) for tprm_id in tprm_ids}
+        keys = [
+            key
+            for key in self._plans
+            if any(column[0] in tprm_ids for column in key[0])
+        ]
+        for key in keys:
+            self._plans.pop(key, None)
+
+    def clear(self):
+        self._plans.clear()
+
+
+filter_query_plans = FilterQueryPlans(maxsize=FILTER_QUERY_PLANS_CACHE_SIZE)
@@ -3,38 +3,28 @@ from fastapi import HTTPException
 from elasticsearch import AsyncElasticsearch
 
 from elastic.config import INVENTORY_TPRM_INDEX_V2
-from elastic.enum_models import LogicalOperator
 from elastic.pydantic_models import (
     SortColumn,
     FilterColumn,
     SortModel,
-    SearchModel,
 )
-from elastic.query_builder_service.inventory_index.search_query_builder import (
-    InventoryIndexQueryBuilder,
+from elastic.query_builder_service.inventory_index.mo_object.query_plan import (
+    filter_query_plans,
 )
 from elastic.query_builder_service.inventory_index.sort_query_builder import (
     InventorySortQueryBuilder,
 )
 from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
+from services.cache_services.caches import tprm_types_cache
 from services.inventory_services.converters.val_type_converter import (
     get_corresponding_python_val_type_for_elastic_val_type,
 )
 
 
-async def get_dict_of_inventory_attr_and_params_types(
-    array_of_attr_and_params_names: Iterable, elastic_client: AsyncElasticsearch
-) -> dict:
-    """Returns dict of MO attrs and params ids and their val_type and multiple configs"""
-    ids_of_parameters_in_filters = [
-        column_name
-        for column_name in array_of_attr_and_params_names
-        if column_name.isdigit()
-    ]
-
+def __get_mo_attrs_types() -> dict:
+    """Returns val_type and multiple of MO attrs by their names"""
     exclude_types = {"object", "flattened"}
-    # dict mo attrs and parameters and their configs (val_type, multiple)
-    field_value_dict = dict()
+    attrs_types = dict()
     for attr_name, data in INVENTORY_OBJ_INDEX_MAPPING["properties"].items():
         if data["type"] not in exclude_types:
             corresp_type = (
@@ -42,16 +32,46 @@ async def get_dict_of_inventory_attr_and_params_types(
                     data["type"]
                 )
             )
-            field_value_dict[attr_name] = {
+            attrs_types[attr_name] = {
                 "val_type": corresp_type,
                 "multiple": False,
             }
+    return attrs_types
 
-    if ids_of_parameters_in_filters:
-        query = {
-            "bool": {"must": [{"terms": {"id": ids_of_parameters_in_filters}}]}
-        }
-        size = len(ids_of_parameters_in_filters)
+
+# types of MO attrs are defined by the mapping, so they are resolved once
+MO_ATTRS_TYPES = __get_mo_attrs_types()
+
+
+async def get_dict_of_inventory_attr_and_params_types(
+    array_of_attr_and_params_names: Iterable, elastic_client: AsyncElasticsearch
+) -> dict:
+    """Returns dict of MO attrs and params ids and their val_type and multiple configs"""
+    ids_of_parameters_in_filters = [
+        column_name
+        for column_name in array_of_attr_and_params_names
+        if column_name.isdigit()
+    ]
+
+    # dict mo attrs and parameters and their configs (val_type, multiple)
+    field_value_dict = {
+        attr_name: dict(attr_types)
+        for attr_name, attr_types in MO_ATTRS_TYPES.items()
+    }
+
+    # types of TPRMs are changed only by TPRM events, which invalidate the cache
+    cached_types = await tprm_types_cache.get_many(ids_of_parameters_in_filters)
+    for tprm_id, tprm_types in cached_types.items():
+        field_value_dict[tprm_id] = dict(tprm_types)
+    not_cached_ids = [
+        tprm_id
+        for tprm_id in ids_of_parameters_in_filters
+        if tprm_id not in cached_types
+    ]
+
+    if not_cached_ids:
+        query = {"bool": {"must": [{"terms": {"id": not_cached_ids}}]}}
+        size = len(not_cached_ids)
 
         res = await elastic_client.search(
             index=INVENTORY_TPRM_INDEX_V2,
@@ -60,12 +80,17 @@ async def get_dict_of_inventory_attr_and_params_types(
             source_includes=["id", "multiple", "val_type"],
         )
 
+        loaded_types = dict()
         for item in res["hits"]["hits"]:
             item = item["_source"]
-            field_value_dict[str(item["id"])] = {
+            loaded_types[str(item["id"])] = {
                 "val_type": item["val_type"],
                 "multiple": item["multiple"],
             }
+            field_value_dict[str(item["id"])] = dict(
+                loaded_types[str(item["id"])]
+            )
+        await tprm_types_cache.set_many(loaded_types)
 
     return field_value_dict
 
@@ -100,69 +125,7 @@ def get_search_query_for_inventory_obj_index(
     filter_columns: list[FilterColumn], dict_of_types: dict
 ) -> dict:
     """Returns search query for elasticsearch client as dict."""
-
-    join_queries = []
-    search_models = []
-
-    for filter_column in filter_columns:
-        filter_column_data = dict_of_types.get(filter_column.column_name)
-        if filter_column_data is None:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Can`t create search query for column named "
-                f"{filter_column.column_name}",
-            )
-
-        if len(filter_column.filters) == 1:
-            for filter_item in filter_column.filters:
-                search_model = SearchModel(
-                    column_name=filter_column.column_name,
-                    operator=filter_item.operator,
-                    value=filter_item.value,
-                    column_type=filter_column_data["val_type"],
-                    multiple=filter_column_data["multiple"],
-                )
-                search_models.append(search_model)
-
-        elif len(filter_column.filters) > 1:
-            inner_search_models = list()
-            for filter_item in filter_column.filters:
-                search_model = SearchModel(
-                    column_name=filter_column.column_name,
-                    operator=filter_item.operator,
-                    value=filter_item.value,
-                    column_type=filter_column_data["val_type"],
-                    multiple=filter_column_data["multiple"],
-                )
-                inner_search_models.append(search_model)
-
-            inner_query = InventoryIndexQueryBuilder(
-                logical_operator=filter_column.rule,
-                search_list_order=inner_search_models,
-            )
-
-            join_queries.append(inner_query.create_query_as_dict())
-
-    main_query = dict()
-    if search_models:
-        main_query = InventoryIndexQueryBuilder(
-            logical_operator=LogicalOperator.AND.value,
-            search_list_order=search_models,
-        )
-        main_query = main_query.create_query_as_dict()
-
-    if join_queries:
-        inner_dict = main_query.get("bool")
-        if inner_dict is None:
-            main_query["bool"] = dict()
-            inner_dict = main_query.get("bool")
-
-        for query_as_dict in join_queries:
-            for k, v in query_as_dict["bool"].items():
-                values_for_elastic_q_operator = inner_dict.get(k)
-                if values_for_elastic_q_operator is None:
-                    inner_dict[k] = v
-                else:
-                    values_for_elastic_q_operator.extend(v)
-
-    return main_query
+    plan = filter_query_plans.get_plan(
+        filter_columns=filter_columns, dict_of_types=dict_of_types
+    )
+    return plan.bind(filter_columns)
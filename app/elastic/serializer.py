@@ -0,0 +1,36 @@
+from typing import Any
+
+import orjson
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
+
+"""
+orjson serializers of requests and responses of Elasticsearch.
+Unlike orjson defaults, dicts with not str keys (e.g. parameters by tprm id) are serialized as the stdlib json does
+"""
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class OrjsonSerializer(JsonSerializer):
+    def json_dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+
+    def json_loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class OrjsonNdjsonSerializer(NdjsonSerializer):
+    """Serializer of bulk and msearch bodies"""
+
+    def json_dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+
+    def json_loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+# compatibility mode mimetypes use the same serializers
+ELASTIC_SERIALIZERS = {
+    OrjsonSerializer.mimetype: OrjsonSerializer(),
+    OrjsonNdjsonSerializer.mimetype: OrjsonNdjsonSerializer(),
+}
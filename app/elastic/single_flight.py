@@ -0,0 +1,119 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable, Mapping, Optional
+
+import orjson
+from elastic_transport import ApiResponse
+from elasticsearch import ApiError
+
+from metrics.collectors import ES_COALESCED_REQUESTS
+
+"""
+Single flight of Elasticsearch reads. When many users open the same dashboard, identical requests reach
+Elasticsearch at the same time. Clients of endpoints which opt in share one in-flight request between
+identical concurrent reads: the key of a request is its normalized body and parameters with the permission
+scope of the user, so users with other permissions never get each other's responses. Callers of a shared
+request get their own copies of the response body, because endpoints change the bodies of responses.
+The request runs on the client of the first caller, when it fails not with an error of Elasticsearch,
+e.g. the first caller disconnected and its client was closed, other callers repeat it with their own clients
+"""
+
+# API endpoints of Elasticsearch which only read data
+COALESCED_ENDPOINTS = {
+    "search",
+    "msearch",
+    "count",
+    "get",
+    "mget",
+    "search_mvt",
+    "indices.exists",
+}
+
+
+def get_request_key(
+    scope: Hashable,
+    method: str,
+    path: str,
+    params: Optional[Mapping[str, Any]],
+    headers: Optional[Mapping[str, str]],
+    body: Any,
+) -> Hashable:
+    """Returns key of request which does not depend on the order of keys of body and parameters"""
+    normalized_request = orjson.dumps(
+        {
+            "params": dict(params or {}),
+            "headers": dict(headers or {}),
+            "body": body,
+        },
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=repr,
+    )
+    return scope, method, path, normalized_request
+
+
+def copy_response(response: ApiResponse) -> ApiResponse:
+    """Returns response with copy of body, responses with immutable bodies are returned as they are"""
+    if not isinstance(response.body, (dict, list)):
+        return response
+    return type(response)(body=copy.deepcopy(response.body), meta=response.meta)
+
+
+class Flight:
+    """In-flight request and the number of its callers"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.callers = 1
+
+
+class SingleFlight:
+    """In-flight requests by key. The request is a task, so a cancelled caller does not cancel
+    the request of other callers"""
+
+    def __init__(self):
+        self._flights: dict[Hashable, Flight] = dict()
+
+    def __on_done(self, key: Hashable, task: asyncio.Task):
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        # the exception is raised to the callers, it is retrieved if all of them are cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(
+        self,
+        key: Hashable,
+        endpoint_id: str,
+        request: Callable[[], Awaitable[ApiResponse]],
+    ) -> ApiResponse:
+        flight = self._flights.get(key)
+        is_first_caller = flight is None
+        if is_first_caller:
+            flight = Flight(task=asyncio.create_task(request()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda done: self.__on_done(key, done)
+            )
+        else:
+            flight.callers += 1
+            ES_COALESCED_REQUESTS.labels(endpoint=endpoint_id).inc()
+        try:
+            response = await asyncio.shield(flight.task)
+        except ApiError:
+            raise
+        except (Exception, asyncio.CancelledError):
+            # the caller is cancelled itself or the request failed on the client of the first caller
+            if is_first_caller or not flight.task.done():
+                raise
+            return await request()
+        # callers join the flight while it is in flight, so the number of callers is final here
+        if flight.callers == 1:
+            return response
+        return copy_response(response)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Mapping, Optional
+
+from elastic.config import (
+    ES_PROFILE_SAMPLE_RATE,
+    ES_SLOW_QUERY_LOG_SIZE,
+    ES_SLOW_QUERY_MIN_MS,
+)
+
+"""
+Fingerprints of Elasticsearch requests and the log of the slowest of them.
+A fingerprint is a hash of the request body structure without literal values, so all requests
+built by the same code path (e.g. search by value for different values and TMOs) have the same fingerprint.
+"""
+
+LITERAL_PLACEHOLDER = "?"
+NUMBER_IN_KEY_PATTERN = re.compile(r"\d+")
+# bulk bodies are documents, not queries
+NOT_FINGERPRINTED_ENDPOINTS = {"bulk"}
+PROFILED_ENDPOINTS = {"search"}
+
+
+def get_query_shape(body: Any) -> Any:
+    """Returns body with literals replaced by placeholder. Numbers in keys are replaced too,
+    because they are TPRM ids in the parameter field names. Equal items of lists are merged,
+    so terms with any number of values have the same shape"""
+    if isinstance(body, Mapping):
+        return {
+            NUMBER_IN_KEY_PATTERN.sub(LITERAL_PLACEHOLDER, str(key)): (
+                get_query_shape(value)
+            )
+            for key, value in body.items()
+        }
+    if isinstance(body, (list, tuple)):
+        shapes = []
+        for item in body:
+            shape = get_query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return LITERAL_PLACEHOLDER
+
+
+def get_query_fingerprint(shape: Any) -> str:
+    shape_as_str = json.dumps(shape, sort_keys=True)
+    return hashlib.sha1(shape_as_str.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class SlowQueryStats:
+    fingerprint: str
+    endpoint: str
+    index: str | None
+    shape: Any
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    max_took_ms: int | None = None
+    last_seen: float = 0.0
+    profile: dict | None = None
+
+    def as_dict(self, with_profile: bool = False) -> dict:
+        data = asdict(self)
+        data["mean_ms"] = round(self.total_ms / self.count, 3)
+        data["max_ms"] = round(self.max_ms, 3)
+        del data["total_ms"]
+        if not with_profile:
+            del data["profile"]
+        return data
+
+
+class SlowQueryLog:
+    """Keeps stats of the slowest query fingerprints. If the log is full, the fingerprint
+    with the lowest max latency is replaced by a slower one"""
+
+    def __init__(self, size: int, min_ms: float):
+        self.size = size
+        self.min_ms = min_ms
+        self._stats: dict[str, SlowQueryStats] = dict()
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return self.size > 0 and duration_ms >= self.min_ms
+
+    def record(
+        self,
+        endpoint: str,
+        index: str | None,
+        body: Any,
+        duration_ms: float,
+        took_ms: int | None = None,
+        profile: dict | None = None,
+        is_error: bool = False,
+    ):
+        shape = get_query_shape(body)
+        fingerprint = get_query_fingerprint([endpoint, shape])
+
+        stats = self._stats.get(fingerprint)
+        if stats is None:
+            if len(self._stats) >= self.size:
+                fastest = min(self._stats.values(), key=lambda s: s.max_ms)
+                if fastest.max_ms >= duration_ms:
+                    return
+                del self._stats[fastest.fingerprint]
+            stats = SlowQueryStats(
+                fingerprint=fingerprint,
+                endpoint=endpoint,
+                index=index,
+                shape=shape,
+            )
+            self._stats[fingerprint] = stats
+
+        stats.count += 1
+        stats.total_ms += duration_ms
+        stats.last_seen = time.time()
+        if is_error:
+            stats.errors += 1
+        if duration_ms > stats.max_ms:
+            stats.max_ms = duration_ms
+        if took_ms is not None and (
+            stats.max_took_ms is None or took_ms > stats.max_took_ms
+        ):
+            stats.max_took_ms = took_ms
+        if profile is not None:
+            stats.profile = profile
+
+    def get_slowest(
+        self, limit: int | None = None, with_profile: bool = False
+    ) -> list[dict]:
+        slowest = sorted(
+            self._stats.values(), key=lambda s: s.max_ms, reverse=True
+        )
+        return [s.as_dict(with_profile=with_profile) for s in slowest[:limit]]
+
+    def clear(self):
+        self._stats.clear()
+
+
+slow_query_log = SlowQueryLog(
+    size=ES_SLOW_QUERY_LOG_SIZE, min_ms=ES_SLOW_QUERY_MIN_MS
+)
+
+
+def add_profile_to_sampled_body(
+    endpoint_id: Optional[str], body: Any
+) -> tuple[Any, bool]:
+    """Returns the body with "profile": true for sampled search requests and the flag of sampling"""
+    if (
+        ES_PROFILE_SAMPLE_RATE <= 0
+        or endpoint_id not in PROFILED_ENDPOINTS
+        or not isinstance(body, Mapping)
+        or "profile" in body
+        or random.random() >= ES_PROFILE_SAMPLE_RATE
+    ):
+        return body, False
+    return {**body, "profile": True}, True
+
+
+def record_slow_query(
+    endpoint_id: Optional[str],
+    method: str,
+    path_parts: Optional[Mapping[str, Any]],
+    body: Any,
+    duration: float,
+    response_body: Any = None,
+    profile: dict | None = None,
+    is_error: bool = False,
+):
+    """Adds the request to the slow query log if it took at least ES_SLOW_QUERY_MIN_MS"""
+    duration_ms = duration * 1000
+    if body is None or not slow_query_log.is_slow(duration_ms):
+        return
+    if endpoint_id in NOT_FINGERPRINTED_ENDPOINTS:
+        return
+
+    took_ms = None
+    if isinstance(response_body, Mapping):
+        took_ms = response_body.get("took")
+
+    index = path_parts.get("index") if path_parts else None
+    if isinstance(index, (list, tuple)):
+        index = ",".join(index)
+
+    slow_query_log.record(
+        endpoint=endpoint_id or method,
+        index=index,
+        body=body,
+        duration_ms=duration_ms,
+        took_ms=took_ms,
+        profile=profile,
+        is_error=is_error,
+    )
@@ -11,12 +11,16 @@ from elastic.config import (
     DEFAULT_SETTING_FOR_TMO_INDEX,
     DEFAULT_SETTING_FOR_TPRM_INDEX,
     DEFAULT_SETTING_FOR_PRM_INDEX,
+    ALL_MO_OBJ_INDEXES_PATTERN,
 )
 from indexes_mapping.inventory.mapping import (
     INVENTORY_TMO_INDEX_MAPPING,
     INVENTORY_TPRM_INDEX_MAPPING,
     INVENTORY_PRM_INDEX_MAPPING,
     INVENTORY_PRM_AND_MO_LINK_INDEX_MAPPING,
+    INVENTORY_OBJ_INDEX_MAPPING,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+    INVENTORY_FUZZY_FIELD_NAME,
 )
 from services.hierarchy_services.elastic.configs import (
     HIERARCHY_HIERARCHIES_INDEX,
@@ -27,12 +31,18 @@ from services.hierarchy_services.elastic.configs import (
     HIERARCHY_NODE_DATA_INDEX_SETTINGS,
     HIERARCHY_OBJ_INDEX,
     HIERARCHY_OBJ_INDEX_SETTINGS,
+    HIERARCHY_ROLLUPS_INDEX,
+    HIERARCHY_ROLLUPS_INDEX_SETTINGS,
 )
 from services.hierarchy_services.elastic.mapping import (
     HIERARCHY_HIERARCHIES_INDEX_MAPPING,
     HIERARCHY_LEVEL_INDEX_MAPPING,
     HIERARCHY_NODE_DATA_INDEX_MAPPING,
     HIERARCHY_OBJ_INDEX_MAPPING,
+    HIERARCHY_ROLLUPS_INDEX_MAPPING,
+)
+from services.hierarchy_services.rollups.store import (
+    start_rebuild_of_all_hierarchies,
 )
 from services.inventory_services.elastic.security.configs import (
     INVENTORY_SECURITY_MO_PERMISSION_INDEX,
@@ -43,9 +53,15 @@ from services.inventory_services.elastic.security.configs import (
     INVENTORY_SECURITY_TPRM_PERMISSION_SETTINGS,
     INVENTORY_SECURITY_PRM_PERMISSION_SETTINGS,
     INVENTORY_SECURITY_PRM_PERMISSION_INDEX,
+    INVENTORY_SECURITY_PERMISSION_SETS_INDEX,
+    INVENTORY_SECURITY_PERMISSION_SETS_SETTINGS,
 )
 from services.inventory_services.elastic.security.mapping import (
     INVENTORY_SECURITY_INDEXES_MAPPING,
+    INVENTORY_SECURITY_PERMISSION_SETS_MAPPING,
+)
+from services.inventory_services.utils.suggest_backfill import (
+    suggest_backfill,
 )
 from services.loader import load_objects
 
@@ -97,7 +113,13 @@ async def init_all_necessary_indexes(async_client: AsyncElasticsearch):
                 elastic_connected = True
     print("Get all indexes")
     all_indexes = await async_client.indices.get_alias(index="*")
-    all_indexes = set(all_indexes)
+    # hierarchy indexes are aliases of versioned indexes
+    all_aliases = {
+        alias
+        for index_data in all_indexes.values()
+        for alias in index_data.get("aliases", {})
+    }
+    all_indexes = set(all_indexes) | all_aliases
 
     main_idexes_and_configs = {
         INVENTORY_TMO_INDEX_V2: {
@@ -136,6 +158,10 @@ async def init_all_necessary_indexes(async_client: AsyncElasticsearch):
             "settings": HIERARCHY_NODE_DATA_INDEX_SETTINGS,
             "mappings": HIERARCHY_NODE_DATA_INDEX_MAPPING,
         },
+        HIERARCHY_ROLLUPS_INDEX: {
+            "settings": HIERARCHY_ROLLUPS_INDEX_SETTINGS,
+            "mappings": HIERARCHY_ROLLUPS_INDEX_MAPPING,
+        },
         INVENTORY_SECURITY_MO_PERMISSION_INDEX: {
             "settings": INVENTORY_SECURITY_MO_PERMISSION_SETTINGS,
             "mappings": INVENTORY_SECURITY_INDEXES_MAPPING,
@@ -152,6 +178,10 @@ async def init_all_necessary_indexes(async_client: AsyncElasticsearch):
             "settings": INVENTORY_SECURITY_PRM_PERMISSION_SETTINGS,
             "mappings": INVENTORY_SECURITY_INDEXES_MAPPING,
         },
+        INVENTORY_SECURITY_PERMISSION_SETS_INDEX: {
+            "settings": INVENTORY_SECURITY_PERMISSION_SETS_SETTINGS,
+            "mappings": INVENTORY_SECURITY_PERMISSION_SETS_MAPPING,
+        },
     }
 
     for index_name, conf_data in main_idexes_and_configs.items():
@@ -163,3 +193,26 @@ async def init_all_necessary_indexes(async_client: AsyncElasticsearch):
                 settings=conf_data["settings"],
             )
             print(f"Create index {index_name} - end")
+
+            # rollups of the hierarchies which were loaded before the rollups index was created
+            if index_name == HIERARCHY_ROLLUPS_INDEX:
+                start_rebuild_of_all_hierarchies(elastic_client=async_client)
+
+    # fields which were added to the mapping of MO indexes after they were created
+    mo_index_properties = INVENTORY_OBJ_INDEX_MAPPING["properties"]
+    try:
+        await async_client.indices.put_mapping(
+            index=ALL_MO_OBJ_INDEXES_PATTERN,
+            properties={
+                field_name: mo_index_properties[field_name]
+                for field_name in (
+                    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+                    INVENTORY_FUZZY_FIELD_NAME,
+                )
+            },
+            allow_no_indices=True,
+        )
+        # documents indexed before the typeahead sub field are indexed again in background, once
+        await suggest_backfill.start(elastic_client=async_client)
+    except ApiError as ex:
+        print(ex)
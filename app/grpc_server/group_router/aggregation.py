@@ -0,0 +1,87 @@
+import json
+from typing import Annotated
+
+from pydantic import BaseModel, BeforeValidator
+
+"""
+Conversion of process group aggregations. Large aggregations are converted in the rendering pool,
+so this module does not import the gRPC server
+"""
+
+EXCLUDE_AGGREAGATION_KEYS: set[str] = {"doc_count", "key"}
+# aggregations with fewer top level buckets are converted on the event loop
+MIN_BUCKETS_TO_CONVERT_IN_POOL = 1_000
+
+
+def convert_to_str(value):
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+class ProcessGroupKeyDto(BaseModel):
+    grouped_by: str
+    grouping_value: Annotated[str, BeforeValidator(convert_to_str)]
+
+
+class ProcessesGroupItemDto(BaseModel):
+    group: list[ProcessGroupKeyDto]
+    quantity: int
+
+
+def get_grouped_by(aggregations: dict) -> str | None:
+    for key in aggregations.keys():
+        if key in EXCLUDE_AGGREAGATION_KEYS:
+            continue
+        return key
+    return None
+
+
+def convert_aggregation(
+    aggregations: dict,
+    group_keys: list[ProcessGroupKeyDto] | None = None,
+) -> list[ProcessesGroupItemDto]:
+    if not group_keys:
+        group_keys = []
+    results: list[ProcessesGroupItemDto] = []
+
+    if not aggregations:
+        return results
+
+    grouped_by = get_grouped_by(aggregations)
+
+    if grouped_by is None:
+        # deepest level
+        result = ProcessesGroupItemDto(
+            group=group_keys, quantity=aggregations["doc_count"]
+        )
+        results.append(result)
+    else:
+        # mid levels
+        for bucket in aggregations[grouped_by]["buckets"]:
+            # TODO: doc_count_error_upper_bound, sum_other_doc_count
+            group_key = ProcessGroupKeyDto(
+                grouped_by=grouped_by, grouping_value=bucket["key"]
+            )
+            bucket_group_keys = group_keys.copy()
+            bucket_group_keys.append(group_key)
+            result = convert_aggregation(
+                aggregations=bucket, group_keys=bucket_group_keys
+            )
+            results.extend(result)
+    return results
+
+
+def convert_aggregation_to_json(aggregations: dict) -> list[str]:
+    """Returns JSON of group items of aggregations"""
+    return [
+        result.model_dump_json(by_alias=True)
+        for result in convert_aggregation(aggregations=aggregations)
+    ]
+
+
+def get_top_level_buckets_count(aggregations: dict) -> int:
+    grouped_by = get_grouped_by(aggregations or {})
+    if grouped_by is None:
+        return 0
+    return len(aggregations[grouped_by]["buckets"])
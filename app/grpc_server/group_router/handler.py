@@ -1,14 +1,19 @@
 import json
-from typing import Iterator, Annotated, AsyncGenerator, Any
+from typing import Iterator, AsyncGenerator, Any
 
 import grpc
 from elasticsearch import AsyncElasticsearch
 from fastapi import HTTPException
 from google.protobuf import json_format
 from google.protobuf.json_format import MessageToDict
-from pydantic import BaseModel, ValidationError, BeforeValidator
+from pydantic import ValidationError
 
 from elastic.pydantic_models import FilterColumn
+from grpc_server.group_router.aggregation import (
+    MIN_BUCKETS_TO_CONVERT_IN_POOL,
+    convert_aggregation_to_json,
+    get_top_level_buckets_count,
+)
 from grpc_server.group_router.proto.from_group_to_search_pb2 import (
     RequestGetProcesses,
     RequestGetProcessesGroups,
@@ -24,6 +29,7 @@ from grpc_server.group_router.proto.from_group_to_search_pb2_grpc import (
 from indexes_mapping.inventory.mapping import INVENTORY_PARAMETERS_FIELD_NAME
 from security.implementation.disabled import default_user
 from security.security_data_models import UserData
+from services.rendering_services.pool import rendering_pool
 from utils_by_services.inventory.common import search_after_generator
 from v2.routers.inventory.utils.create_inventory_data_filter import (
     create_inventory_data_filter,
@@ -33,25 +39,7 @@ from v2.routers.severity.models import SortColumn, Limit, Ranges
 from v2.routers.severity.utils import get_process_search_args
 
 
-def convert_to_str(value):
-    if isinstance(value, str):
-        return value
-    return json.dumps(value, default=str)
-
-
-class ProcessGroupKeyDto(BaseModel):
-    grouped_by: str
-    grouping_value: Annotated[str, BeforeValidator(convert_to_str)]
-
-
-class ProcessesGroupItemDto(BaseModel):
-    group: list[ProcessGroupKeyDto]
-    quantity: int
-
-
 class GroupSearchHandler(GroupSearchServicer):
-    EXCLUDE_AGGREAGATION_KEYS: set[str] = {"doc_count", "key"}
-
     def __init__(self, elastic_client: AsyncElasticsearch):
         self._elastic_client = elastic_client
 
@@ -79,46 +67,6 @@ class GroupSearchHandler(GroupSearchServicer):
 
         return wrapper
 
-    def _convert_aggregation(
-        self,
-        aggregations: dict,
-        group_keys: list[ProcessGroupKeyDto] | None = None,
-    ) -> list[ProcessesGroupItemDto]:
-        if not group_keys:
-            group_keys = []
-        results: list[ProcessesGroupItemDto] = []
-
-        if not aggregations:
-            return results
-
-        grouped_by = None
-        for key in aggregations.keys():
-            if key in self.EXCLUDE_AGGREAGATION_KEYS:
-                continue
-            grouped_by = key
-            break
-
-        if grouped_by is None:
-            # deepest level
-            result = ProcessesGroupItemDto(
-                group=group_keys, quantity=aggregations["doc_count"]
-            )
-            results.append(result)
-        else:
-            # mid levels
-            for bucket in aggregations[grouped_by]["buckets"]:
-                # TODO: doc_count_error_upper_bound, sum_other_doc_count
-                group_key = ProcessGroupKeyDto(
-                    grouped_by=grouped_by, grouping_value=bucket["key"]
-                )
-                bucket_group_keys = group_keys.copy()
-                bucket_group_keys.append(group_key)
-                result = self._convert_aggregation(
-                    aggregations=bucket, group_keys=bucket_group_keys
-                )
-                results.extend(result)
-        return results
-
     def _convert_request(self, request) -> dict:
         dict_request = MessageToDict(
             request,
@@ -229,15 +177,20 @@ class GroupSearchHandler(GroupSearchServicer):
         search_args: dict = await get_process_search_args(**converted_request)
 
         search_res = await self._elastic_client.search(**search_args)
-        group_results = self._convert_aggregation(
-            aggregations=search_res["aggregations"]
-        )
+        aggregations = search_res["aggregations"]
+        if (
+            get_top_level_buckets_count(aggregations)
+            >= MIN_BUCKETS_TO_CONVERT_IN_POOL
+        ):
+            group_results = await rendering_pool.run(
+                convert_aggregation_to_json, aggregations
+            )
+        else:
+            group_results = convert_aggregation_to_json(aggregations)
 
         process_group_item = ProcessesGroupItem()
         for result in group_results:
-            parsed_result = json_format.Parse(
-                result.model_dump_json(by_alias=True), process_group_item
-            )
+            parsed_result = json_format.Parse(result, process_group_item)
             yield ResponseProcessesGroups(item=parsed_result)
 
     @exception_wrapper
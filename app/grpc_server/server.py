@@ -11,6 +11,8 @@ from grpc_server.mo_finder.proto.mo_finder_pb2_grpc import (
     add_MOFinderServicer_to_server,
 )
 from grpc_server.mo_finder.handler import MOFinderHandler
+from metrics.grpc_interceptor import MetricsServerInterceptor
+from services.rendering_services.pool import rendering_pool
 from settings.config import SERVER_GRPC_PORT
 from v2.grpc_routers.severity.router import SearchSeverity
 from v2.grpc_routers.severity.proto.search_severity_pb2_grpc import (
@@ -20,7 +22,7 @@ from v2.grpc_routers.severity.proto.search_severity_pb2_grpc import (
 
 async def start_grpc_server():
     """Entry point to gRPC server"""
-    server = grpc.aio.server()
+    server = grpc.aio.server(interceptors=[MetricsServerInterceptor()])
     add_MOFinderServicer_to_server(MOFinderHandler(), server)
     add_SearchSeverityServicer_to_server(SearchSeverity(), server=server)
     # async for elastic_client in get_async_client():
@@ -35,4 +37,7 @@ async def start_grpc_server():
     server.add_insecure_port(listen_addr)
     logging.info("Starting server on %s", listen_addr)
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        rendering_pool.shutdown()
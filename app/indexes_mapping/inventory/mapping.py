@@ -10,6 +10,14 @@ from services.inventory_services.models import (
 INVENTORY_PARAMETERS_FIELD_NAME = "parameters"
 INVENTORY_PERMISSIONS_FIELD_NAME = "permissions"
 INVENTORY_FUZZY_FIELD_NAME = "fuzzy_search_fields"
+# search_as_you_type sub field of fuzzy search fields, used by typeahead
+INVENTORY_FUZZY_SUGGEST_FIELD_NAME = "suggest"
+# key of _meta of MO indexes with the state of the backfill of the suggest sub field: id of the task
+# which indexes existing documents again or completed. Indexes created with this mapping are completed
+INVENTORY_SUGGEST_BACKFILL_META = "suggest_backfill"
+INVENTORY_SUGGEST_BACKFILL_COMPLETED = "completed"
+# simplified geometries of lines by zoom, they are kept in source and not indexed
+INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME = "simplified_geometry"
 
 INVENTORY_OBJ_INDEX_MAPPING = {
     "properties": {
@@ -56,10 +64,24 @@ INVENTORY_OBJ_INDEX_MAPPING = {
         INVENTORY_FUZZY_FIELD_NAME: {
             "type": "object",
             "properties": {
-                InventoryFuzzySearchFields.NAME.value: {"type": "text"}
+                InventoryFuzzySearchFields.NAME.value: {
+                    "type": "text",
+                    "fields": {
+                        INVENTORY_FUZZY_SUGGEST_FIELD_NAME: {
+                            "type": "search_as_you_type"
+                        }
+                    },
+                }
             },
         },
-    }
+        INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME: {
+            "type": "object",
+            "enabled": False,
+        },
+    },
+    "_meta": {
+        INVENTORY_SUGGEST_BACKFILL_META: INVENTORY_SUGGEST_BACKFILL_COMPLETED
+    },
 }
 
 INVENTORY_TMO_INDEX_MAPPING = {
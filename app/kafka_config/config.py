@@ -120,11 +120,23 @@ KAFKA_SECURED = str(os.environ.get("KAFKA_SECURED", False)).upper() in (
     "1",
 )
 
+# interval of librdkafka statistics used for the consumer lag metrics, 0 - disabled
+KAFKA_STATISTICS_INTERVAL_MS = int(
+    os.environ.get("KAFKA_STATISTICS_INTERVAL_MS", 15000)
+)
+
+# messages of inventory changes processed at a time by one consumer process,
+# messages which change the same objects are processed in order, 1 - one message at a time
+KAFKA_CONSUMER_MAX_IN_FLIGHT = int(
+    os.environ.get("KAFKA_CONSUMER_MAX_IN_FLIGHT", 16)
+)
+
 KAFKA_CONSUMER_CONNECT_CONFIG = {
     "bootstrap.servers": KAFKA_URL,
     "group.id": KAFKA_CONSUMER_GROUP_ID,
     "auto.offset.reset": KAFKA_CONSUMER_OFFSET,
     "enable.auto.commit": False,
+    "statistics.interval.ms": KAFKA_STATISTICS_INTERVAL_MS,
 }
 
 if KAFKA_SECURED:
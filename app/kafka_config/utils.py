@@ -7,6 +7,7 @@ from requests.exceptions import ConnectionError
 from fastapi import HTTPException
 
 from kafka_config import config
+from metrics.kafka import update_consumer_lag_from_stats
 from security.security_config import KEYCLOAK_TOKEN_URL
 
 
@@ -26,6 +27,8 @@ class ObjClassNames(Enum):
 def consumer_config(conf):
     if "sasl.mechanisms" in conf.keys():
         conf["oauth_cb"] = functools.partial(_get_token_for_kafka_producer)
+    if conf.get("statistics.interval.ms"):
+        conf["stats_cb"] = update_consumer_lag_from_stats
 
     return conf
 
@@ -10,10 +10,13 @@ from elastic.client import ElasticsearchManager
 from elastic.utils import init_all_necessary_indexes
 from kafka_config.config import KAFKA_TURN_ON
 from kafka_config.protobuf_consumer import adapter_function
+from metrics.config import METRICS_PATH
+from metrics.middleware import MetricsMiddleware, metrics_endpoint
 from services.kafka_services.connection_handler.utils import (
     KafkaConnectionHandler,
 )
 from services.kafka_services.msg_counter.utils import KafkaMSGCounter
+from services.rendering_services.pool import rendering_pool
 
 from settings import config
 from settings.config import PREFIX
@@ -81,6 +84,7 @@ async def lifespan(app: FastAPI):
 
     yield
     await ElasticsearchManager().close()
+    rendering_pool.shutdown()
     # stop_event.set()
 
 
@@ -111,6 +115,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
 
 # v1_app.include_router(inventory.router)
 
@@ -0,0 +1,58 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from metrics.config import LATENCY_BUCKETS
+
+"""
+All metrics of the service. Each process exports its own values
+"""
+
+HTTP_REQUEST_DURATION = Histogram(
+    "search_http_request_duration_seconds",
+    "Duration of HTTP requests by route",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS,
+)
+
+ES_REQUEST_DURATION = Histogram(
+    "search_es_request_duration_seconds",
+    "Duration of Elasticsearch requests by API endpoint",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+ES_COALESCED_REQUESTS = Counter(
+    "search_es_coalesced_requests",
+    "Number of Elasticsearch requests which got the response of an identical concurrent request",
+    ["endpoint"],
+)
+
+KAFKA_HANDLER_DURATION = Histogram(
+    "search_kafka_handler_duration_seconds",
+    "Duration of kafka message handling by topic and event",
+    ["topic", "msg_class_name", "msg_event", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+KAFKA_CONSUMER_LAG = Gauge(
+    "search_kafka_consumer_lag",
+    "Number of messages the consumer is behind the high watermark",
+    ["topic", "partition"],
+)
+
+GRPC_SERVER_HANDLING_DURATION = Histogram(
+    "search_grpc_server_handling_seconds",
+    "Duration of gRPC server method handling",
+    ["service", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+RENDERING_POOL_PENDING = Gauge(
+    "search_rendering_pool_pending",
+    "Number of renders which are running or queued in the rendering process pool",
+)
+
+KAFKA_MESSAGES_IN_FLIGHT = Gauge(
+    "search_kafka_messages_in_flight",
+    "Number of kafka messages which are dispatched to lanes but not processed yet",
+    ["topic"],
+)
@@ -0,0 +1,26 @@
+import os
+
+# Port of the HTTP exporter started by the processes without API
+# (gRPC server, kafka consumers). Exporter is disabled if the port is not set
+METRICS_EXPORTER_PORT = os.environ.get("METRICS_EXPORTER_PORT", None)
+METRICS_EXPORTER_ADDR = os.environ.get("METRICS_EXPORTER_ADDR", "0.0.0.0")  # noqa: S104
+
+METRICS_PATH = os.environ.get("METRICS_PATH", "/metrics")
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
@@ -0,0 +1,22 @@
+import logging
+
+from prometheus_client import start_http_server
+
+from metrics.config import METRICS_EXPORTER_ADDR, METRICS_EXPORTER_PORT
+
+
+def start_metrics_exporter():
+    """
+    Starts the HTTP exporter of the metrics in a background thread.
+    Used by the processes without API (gRPC server, kafka consumers), each process should get its own port
+    """
+    if not METRICS_EXPORTER_PORT:
+        return
+    start_http_server(
+        port=int(METRICS_EXPORTER_PORT), addr=METRICS_EXPORTER_ADDR
+    )
+    logging.info(
+        "Metrics exporter started on %s:%s",
+        METRICS_EXPORTER_ADDR,
+        METRICS_EXPORTER_PORT,
+    )
@@ -0,0 +1,76 @@
+import time
+
+import grpc
+
+from metrics.collectors import GRPC_SERVER_HANDLING_DURATION
+
+
+def _split_method_name(full_method: str) -> tuple[str, str]:
+    # full_method: '/package.Service/Method'
+    service, _, method = full_method.lstrip("/").rpartition("/")
+    return service, method
+
+
+def _get_status(context: grpc.aio.ServicerContext, failed: bool) -> str:
+    code = context.code()
+    if isinstance(code, grpc.StatusCode):
+        return code.name
+    return grpc.StatusCode.UNKNOWN.name if failed else grpc.StatusCode.OK.name
+
+
+class MetricsServerInterceptor(grpc.aio.ServerInterceptor):
+    """Measures the duration of the unary-unary and unary-stream methods of the gRPC server"""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return handler
+
+        service, method = _split_method_name(handler_call_details.method)
+
+        def observe(context, start: float, failed: bool):
+            GRPC_SERVER_HANDLING_DURATION.labels(
+                service=service,
+                method=method,
+                status=_get_status(context=context, failed=failed),
+            ).observe(time.perf_counter() - start)
+
+        if handler.unary_unary:
+            behavior = handler.unary_unary
+
+            async def unary_unary(request, context):
+                failed = True
+                start = time.perf_counter()
+                try:
+                    response = await behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    observe(context=context, start=start, failed=failed)
+
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        if handler.unary_stream:
+            behavior = handler.unary_stream
+
+            async def unary_stream(request, context):
+                failed = True
+                start = time.perf_counter()
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                    failed = False
+                finally:
+                    observe(context=context, start=start, failed=failed)
+
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        return handler
@@ -0,0 +1,49 @@
+import json
+import time
+from contextlib import contextmanager
+
+from metrics.collectors import KAFKA_CONSUMER_LAG, KAFKA_HANDLER_DURATION
+
+
+@contextmanager
+def observe_kafka_handler(
+    topic: str | None, msg_class_name: str | None, msg_event: str | None
+):
+    """Measures the duration of the kafka message handler"""
+    status = "error"
+    start = time.perf_counter()
+    try:
+        yield
+        status = "success"
+    finally:
+        KAFKA_HANDLER_DURATION.labels(
+            topic=str(topic),
+            msg_class_name=str(msg_class_name),
+            msg_event=str(msg_event),
+            status=status,
+        ).observe(time.perf_counter() - start)
+
+
+def update_consumer_lag_from_stats(stats_json: str):
+    """
+    Callback for the librdkafka statistics (stats_cb).
+    Statistics are emitted from poll() every 'statistics.interval.ms' and contain the consumer lag of each assigned
+    partition, so no additional requests to the broker are needed
+    """
+    try:
+        stats = json.loads(stats_json)
+    except ValueError:
+        return
+    for topic_name, topic_stats in stats.get("topics", {}).items():
+        for partition, partition_stats in topic_stats.get(
+            "partitions", {}
+        ).items():
+            # -1 is the internal UA/UnAssigned partition
+            if partition == "-1":
+                continue
+            consumer_lag = partition_stats.get("consumer_lag", -1)
+            if consumer_lag < 0:
+                continue
+            KAFKA_CONSUMER_LAG.labels(
+                topic=topic_name, partition=partition
+            ).set(consumer_lag)
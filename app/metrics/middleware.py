@@ -0,0 +1,58 @@
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics.collectors import HTTP_REQUEST_DURATION
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def get_route_name(scope: Scope) -> str:
+    """
+    Returns the path template of the route that handled the request (including the prefix of the mounted app),
+    so that path parameters do not create new label values
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+    return f"{scope.get('root_path', '')}{path_format}"
+
+
+class MetricsMiddleware:
+    """ASGI middleware that measures the duration of each HTTP request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=get_route_name(scope),
+                status_code=str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(
+        content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST
+    )
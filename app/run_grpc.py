@@ -2,8 +2,10 @@ import logging
 import asyncio
 
 from grpc_server.server import start_grpc_server
+from metrics.exporter import start_metrics_exporter
 
 
-if __name__ == '__main__':
+if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    start_metrics_exporter()
     asyncio.run(start_grpc_server())
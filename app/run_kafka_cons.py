@@ -1,5 +1,4 @@
 import asyncio
-import functools
 import os
 import signal
 # from multiprocessing import Process
@@ -20,12 +19,14 @@ from kafka_config.config import (
 
 # ,KAFKA_SUBSCRIBE_TOPICS)
 from kafka_config.utils import consumer_config
+from metrics.exporter import start_metrics_exporter
 from services.inventory_services.kafka.consumers.inventory_changes.utils import (
     InventoryChangesHandler,
 )
 from services.kafka_services.kafka_connection_utils import (
     get_token_for_kafka_by_keycloak,
 )
+from services.kafka_services.keyed_lanes.utils import KeyedLanesConsumer
 # from services.kafka_services.processors import *
 
 
@@ -52,28 +53,12 @@ def _on_assign(consumer: Consumer, partitions: list[TopicPartition]) -> None:
         )
 
 
-def _on_lost(consumer: Consumer, partitions: list[TopicPartition]) -> None:
-    cons_id = consumer.memberid()
-    for p in partitions:
-        print(
-            f"Consumer {cons_id} lost the topic: {p.topic}, partition {p.partition}."
-        )
-
-
-def _on_revoke(consumer: Consumer, partitions: list[TopicPartition]) -> None:
-    consumer.commit()
-    cons_id = consumer.memberid()
-    consumer.unassign()
-    print(f"Consumer {cons_id} will be rebalanced.")
-
-
 def handle_shutdown():
     shutdown_event.set()
 
 
 async def run_kafka_cons_inv():
     if config.KAFKA_TURN_ON:
-        loop = asyncio.get_running_loop()
         # Debug for check special offset in special partition in
         # from confluent_kafka.cimpl import TopicPartition
         # part_num =4
@@ -83,27 +68,21 @@ async def run_kafka_cons_inv():
         kafka_inventory_changes_consumer = Consumer(
             consumer_config(config.KAFKA_CONSUMER_CONNECT_CONFIG)
         )
+        # messages of different MOs are processed concurrently,
+        # messages of the same MO are processed in order of offsets
+        lanes_consumer = KeyedLanesConsumer(
+            consumer=kafka_inventory_changes_consumer,
+            handler_class=InventoryChangesHandler,
+            max_in_flight=config.KAFKA_CONSUMER_MAX_IN_FLIGHT,
+        )
         kafka_inventory_changes_consumer.subscribe(
             [config.KAFKA_INVENTORY_CHANGES_TOPIC],
             on_assign=_on_assign,
-            on_revoke=_on_revoke,
-            on_lost=_on_lost,
+            on_revoke=lanes_consumer.on_revoke,
+            on_lost=lanes_consumer.on_lost,
         )
         try:
-            while not shutdown_event.is_set():
-                msg = await loop.run_in_executor(
-                    None,
-                    functools.partial(
-                        kafka_inventory_changes_consumer.poll, 1.0
-                    ),
-                )
-                if msg is None:
-                    continue
-                handler_inst = InventoryChangesHandler(kafka_msg=msg)
-                await handler_inst.process_the_message()
-                kafka_inventory_changes_consumer.commit(
-                    asynchronous=True, message=msg
-                )
+            await lanes_consumer.run(shutdown_event=shutdown_event)
         finally:
             print("Shutting down consumer...")
             kafka_inventory_changes_consumer.close()
@@ -185,6 +164,7 @@ def init_kafka():
 
 if __name__ == "__main__":
     print("Kafka connect - start")
+    start_metrics_exporter()
 
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGINT, signal.SIGTERM):
@@ -11,6 +11,7 @@ from kafka_config.config import (
     KAFKA_ZEEBE_CHANGES_TOPIC,
 )
 from kafka_config.utils import consumer_config
+from metrics.exporter import start_metrics_exporter
 from services.zeebe_services.kafka.consumers.process_changes.utils import (
     ProcessChangesHandler,
 )
@@ -77,6 +78,7 @@ async def run_kafka_cons_zeebe():
 
 if __name__ == "__main__":
     print("Kafka consumer [process.changes] connect - start")
+    start_metrics_exporter()
 
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGINT, signal.SIGTERM):
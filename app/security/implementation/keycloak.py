@@ -166,12 +166,12 @@ class KeycloakInfo(Keycloak):
     async def get_from_cache(self, token: str) -> dict | None:
         if not self.cache:
             return None
-        return self.cache.get(token)
+        return await self.cache.get(token)
 
     async def set_in_cache(self, token: str, value: dict | None) -> None:
         if not self.cache:
             return
-        self.cache.set(token, value)
+        await self.cache.set(token, value)
 
     async def get_from_keycloak(self, token: str) -> dict | None:
         headers = {"Authorization": f"Bearer {token}"}
@@ -1,45 +1,39 @@
+import hashlib
 from abc import ABC, abstractmethod
 
-from cachetools import TTLCache
+from services.cache_services.caches import create_cache
 
 
 class UserInfoCacheInterface(ABC):
     @abstractmethod
-    def set(self, key, value):
+    async def set(self, key: str, value: dict | None):
         raise NotImplementedError
 
     @abstractmethod
-    def get(self, key):
-        raise NotImplementedError
-
-    @abstractmethod
-    def __getitem__(self, item):
-        raise NotImplementedError
-
-    @abstractmethod
-    def __setitem__(self, key, value):
-        raise NotImplementedError
-
-    @abstractmethod
-    def __delitem__(self, key):
+    async def get(self, key: str) -> dict | None:
         raise NotImplementedError
 
 
 class UserInfoCache(UserInfoCacheInterface):
-    def __init__(self, ttl: int = 60):
-        self._cache = TTLCache(maxsize=500, ttl=ttl)
-
-    def set(self, key, value):
-        self._cache[key] = value
-
-    def get(self, key):
-        return self._cache.get(key)
+    """User info by token, shared by workers if the cache has Redis.
+    Tokens are stored as their hashes"""
 
-    def __getitem__(self, item):
-        return self._cache[item]
-
-    def __setitem__(self, key, value):
-        self._cache[key] = value
-
-    def __delitem__(self, key):
-        del self._cache[key]
+    def __init__(self, ttl: int = 60):
+        self._cache = create_cache(
+            namespace="user_info",
+            local_maxsize=500,
+            local_ttl=ttl,
+            remote_ttl=ttl,
+        )
+
+    @staticmethod
+    def __get_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def set(self, key: str, value: dict | None):
+        if value is None:
+            return
+        await self._cache.set(self.__get_key(key), value)
+
+    async def get(self, key: str) -> dict | None:
+        return await self._cache.get(self.__get_key(key))
@@ -0,0 +1,50 @@
+from services.cache_services.utils import (
+    CacheBackend,
+    RedisCacheBackend,
+    TwoLevelCache,
+)
+from settings.config import (
+    CACHE_KEY_PREFIX,
+    CACHE_LOCAL_MAXSIZE,
+    CACHE_LOCAL_TTL,
+    CACHE_REDIS_URL,
+    CACHE_REMOTE_TTL,
+)
+
+"""
+Caches of the process. Keys of metadata caches are ids of documents as str, they are invalidated
+by the consumers which change the documents and by the reloads of indexes
+"""
+
+
+def get_cache_backend() -> CacheBackend | None:
+    if not CACHE_REDIS_URL:
+        return None
+    return RedisCacheBackend(url=CACHE_REDIS_URL)
+
+
+cache_backend = get_cache_backend()
+
+
+def create_cache(
+    namespace: str,
+    local_maxsize: int = CACHE_LOCAL_MAXSIZE,
+    local_ttl: float = CACHE_LOCAL_TTL,
+    remote_ttl: int = CACHE_REMOTE_TTL,
+) -> TwoLevelCache:
+    return TwoLevelCache(
+        namespace=namespace,
+        backend=cache_backend,
+        local_maxsize=local_maxsize,
+        local_ttl=local_ttl,
+        remote_ttl=remote_ttl,
+        key_prefix=CACHE_KEY_PREFIX,
+    )
+
+
+# documents of INVENTORY_TMO_INDEX_V2 by TMO id, with permissions
+tmo_cache = create_cache(namespace="tmo")
+# val_type and multiple of TPRM by TPRM id
+tprm_types_cache = create_cache(namespace="tprm_types")
+# documents of HIERARCHY_HIERARCHIES_INDEX by hierarchy id, with permissions
+hierarchies_cache = create_cache(namespace="hierarchies")
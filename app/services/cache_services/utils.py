@@ -0,0 +1,331 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+import orjson
+from cachetools import TTLCache
+from redis import asyncio as redis_asyncio
+from redis.exceptions import RedisError
+
+"""
+Two-level cache. Values are kept in an in-process LRU with a short ttl (L1) in front of an optional shared
+backend (L2, Redis) which is common for all workers and processes. Keys of L2 contain the version of namespace,
+so the whole namespace is invalidated by one increment of the version. Invalidations are published to the channel
+of namespace: other processes remove the keys from their L1, so L1 is stale for at most its ttl
+when a message is lost. Errors of the backend are logged and the cache works as L1 only
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Shared storage of cached values with pub/sub of invalidations"""
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_many(self, items: dict[str, bytes], ttl: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, keys: list[str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_version(self, key: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def incr_version(self, key: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes):
+        raise NotImplementedError
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str):
+        # connections are opened on the first command
+        self.client = redis_asyncio.Redis.from_url(url)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self.client.mget(keys)
+
+    async def set_many(self, items: dict[str, bytes], ttl: int):
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for key, value in items.items():
+                pipeline.set(key, value, ex=ttl)
+            await pipeline.execute()
+
+    async def delete(self, keys: list[str]):
+        await self.client.delete(*keys)
+
+    async def get_version(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr_version(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def publish(self, channel: str, message: bytes):
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Backend in memory of the process. Caches created with the same instance behave
+    as caches of different workers sharing one Redis, it is used by tests"""
+
+    def __init__(self):
+        self.values: dict[str, tuple[float, bytes]] = dict()
+        self.versions: dict[str, int] = dict()
+        self._subscribers: dict[str, list[asyncio.Queue]] = dict()
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        now = time.monotonic()
+        result = []
+        for key in keys:
+            cached = self.values.get(key)
+            result.append(cached[1] if cached and cached[0] > now else None)
+        return result
+
+    async def set_many(self, items: dict[str, bytes], ttl: int):
+        expires_at = time.monotonic() + ttl
+        for key, value in items.items():
+            self.values[key] = (expires_at, value)
+
+    async def delete(self, keys: list[str]):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def get_version(self, key: str) -> int:
+        return self.versions.get(key, 0)
+
+    async def incr_version(self, key: str) -> int:
+        self.versions[key] = self.versions.get(key, 0) + 1
+        return self.versions[key]
+
+    async def publish(self, channel: str, message: bytes):
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
+
+
+class TwoLevelCache:
+    """Cache of JSON serializable values of namespace. backend None keeps values only in L1"""
+
+    def __init__(
+        self,
+        namespace: str,
+        backend: CacheBackend | None,
+        local_maxsize: int,
+        local_ttl: float,
+        remote_ttl: int,
+        key_prefix: str,
+    ):
+        self.namespace = namespace
+        self.backend = backend
+        self.remote_ttl = remote_ttl
+        self._local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self._local_ttl = local_ttl
+        self._base_key = f"{key_prefix}:{namespace}"
+        self._version_key = f"{self._base_key}:version"
+        self._channel = f"{self._base_key}:invalidations"
+        self._version: int | None = None
+        # the version is read again after local ttl, in case a message was lost
+        self._version_read_at = 0.0
+        self._listener: asyncio.Task | None = None
+        self._listener_failed_at = float("-inf")
+        self._loading: dict[str, asyncio.Future] = dict()
+
+    def __remote_key(self, key: str, version: int) -> str:
+        return f"{self._base_key}:v{version}:{key}"
+
+    def __ensure_listener(self):
+        if self.backend is None:
+            return
+        if self._listener is not None and not self._listener.done():
+            return
+        if time.monotonic() - self._listener_failed_at < self._local_ttl:
+            # the backend is not available, L1 is invalidated by its ttl
+            return
+        self._listener = asyncio.create_task(self.__listen())
+
+    async def __listen(self):
+        try:
+            async for message in self.backend.subscribe(self._channel):
+                self.__apply_invalidation(orjson.loads(message))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # a call of cache after local ttl subscribes again
+            self._listener_failed_at = time.monotonic()
+            logger.exception(
+                "Invalidations of %s are not received", self._channel
+            )
+
+    def __apply_invalidation(self, message: dict):
+        if "version" in message:
+            self._version = message["version"]
+            self._version_read_at = time.monotonic()
+            self._local.clear()
+            return
+        for key in message.get("keys", []):
+            self._local.pop(key, None)
+
+    async def __get_version(self) -> int:
+        if (
+            self._version is None
+            or time.monotonic() - self._version_read_at > self._local_ttl
+        ):
+            self._version = await self.backend.get_version(self._version_key)
+            self._version_read_at = time.monotonic()
+        return self._version
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Returns cached values of keys, keys which are not cached are missed"""
+        self.__ensure_listener()
+        result = dict()
+        missed_keys = []
+        for key in keys:
+            if key in self._local:
+                result[key] = self._local[key]
+            else:
+                missed_keys.append(key)
+        if not missed_keys or self.backend is None:
+            return result
+
+        try:
+            version = await self.__get_version()
+            values = await self.backend.get_many(
+                [self.__remote_key(key, version) for key in missed_keys]
+            )
+        except (RedisError, OSError):
+            logger.exception("Cache %s is not available", self._base_key)
+            return result
+        for key, value in zip(missed_keys, values):
+            if value is not None:
+                value = orjson.loads(value)
+                self._local[key] = value
+                result[key] = value
+        return result
+
+    async def get(self, key: str) -> Any | None:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, items: dict[str, Any]):
+        self.__ensure_listener()
+        for key, value in items.items():
+            self._local[key] = value
+        if not items or self.backend is None:
+            return
+        try:
+            version = await self.__get_version()
+            await self.backend.set_many(
+                {
+                    self.__remote_key(key, version): orjson.dumps(value)
+                    for key, value in items.items()
+                },
+                ttl=self.remote_ttl,
+            )
+        except (RedisError, OSError):
+            logger.exception("Cache %s is not available", self._base_key)
+
+    async def set(self, key: str, value: Any):
+        await self.set_many({key: value})
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Any | None:
+        """Returns cached value of key or the value returned by loader, which is cached if it is not None.
+        Concurrent calls of the same key wait for one loader"""
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        loading = asyncio.get_running_loop().create_future()
+        self._loading[key] = loading
+        try:
+            value = await loader()
+            if value is not None:
+                await self.set(key, value)
+        except asyncio.CancelledError:
+            loading.cancel()
+            raise
+        except Exception as e:
+            loading.set_exception(e)
+            # waiters get the error, it is raised by this call
+            loading.exception()
+            raise
+        else:
+            loading.set_result(value)
+        finally:
+            del self._loading[key]
+        return value
+
+    async def invalidate(self, keys: Iterable[str]):
+        """Removes keys from the cache of all processes"""
+        keys = list(keys)
+        for key in keys:
+            self._local.pop(key, None)
+        if not keys or self.backend is None:
+            return
+        try:
+            version = await self.__get_version()
+            await self.backend.delete(
+                [self.__remote_key(key, version) for key in keys]
+            )
+            await self.backend.publish(
+                self._channel, orjson.dumps({"keys": keys})
+            )
+        except (RedisError, OSError):
+            logger.exception("Cache %s is not available", self._base_key)
+
+    async def invalidate_all(self):
+        """Removes all keys of namespace from the cache of all processes"""
+        self._local.clear()
+        if self.backend is None:
+            return
+        try:
+            version = await self.backend.incr_version(self._version_key)
+            self._version = version
+            self._version_read_at = time.monotonic()
+            await self.backend.publish(
+                self._channel, orjson.dumps({"version": version})
+            )
+        except (RedisError, OSError):
+            logger.exception("Cache %s is not available", self._base_key)
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
@@ -8,6 +8,7 @@ from elastic.client import ElasticsearchManager
 from kafka_config.config import KAFKA_GROUP_BUILDER_GROUP_TOPIC  # noqa
 
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
 from services.group_builder.kafka.consumers.group.configs import (
     GROUP_TOPIC_PROTOBUF_DESERIALIZERS,
     GROUP_HANDLERS_BY_MSG_EVENT,
@@ -108,7 +109,12 @@ class GroupTopicHandler:
                     self.logger.debug(
                         f"Semaphore caught. Free: {self.update_semaphore._value}"
                     )
-                    await handler(
-                        msg=deserialized_msg, async_client=elastic_client
-                    )
+                    with observe_kafka_handler(
+                        topic=self.msg.topic(),
+                        msg_class_name=self.msg_instance_class_name,
+                        msg_event=self.msg_instance_event,
+                    ):
+                        await handler(
+                            msg=deserialized_msg, async_client=elastic_client
+                        )
             # await elastic_client.close()
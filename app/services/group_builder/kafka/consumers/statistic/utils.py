@@ -7,6 +7,7 @@ from elastic.client import ElasticsearchManager
 from indexes_mapping.inventory.mapping import INVENTORY_PARAMETERS_FIELD_NAME
 from kafka_config.config import KAFKA_GROUP_STATISTIC_TOPIC
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
 from services.group_builder.kafka.consumers.statistic.configs import (
     GROUP_STATISTIC_TOPIC_PROTOBUF_DESERIALIZERS,
     GROUP_STATISTIC_HANDLERS_BY_MSG_EVENT,
@@ -124,5 +125,10 @@ class GroupStatisticTopicHandler:
 
             elastic_client = await self.__get_elastic_async_client()
             handler = self.__get_event_handler()
-            await handler(msg=deserialized_msg, async_client=elastic_client)
+            with observe_kafka_handler(
+                topic=self.msg.topic(),
+                msg_class_name=self.msg_instance_class_name,
+                msg_event=self.msg_instance_event,
+            ):
+                await handler(msg=deserialized_msg, async_client=elastic_client)
             # await elastic_client.close()
@@ -12,6 +12,9 @@ HIERARCHY_NODE_DATA_INDEX = os.environ.get(
 HIERARCHY_OBJ_INDEX = os.environ.get(
     "HIERARCHY_OBJ_INDEX", "hierarchy_obj_index"
 )
+HIERARCHY_ROLLUPS_INDEX = os.environ.get(
+    "HIERARCHY_ROLLUPS_INDEX", "hierarchy_rollups_index"
+)
 
 
 HIERARCHY_OBJ_INDEX_SETTINGS = {
@@ -51,3 +54,11 @@ HIERARCHY_NODE_DATA_INDEX_SETTINGS = {
     "index.mapping.total_fields.limit": 10000,
     "index.store.preload": ["nvd", "dvd"],
 }
+
+
+HIERARCHY_ROLLUPS_INDEX_SETTINGS = {
+    "index.number_of_shards": 1,
+    "index.number_of_replicas": 1,
+    "index.max_terms_count": 2147483646,
+    "index.max_result_window": 2000000,
+}
@@ -74,3 +74,28 @@ HIERARCHY_NODE_DATA_INDEX_MAPPING = {
         "unfolded_key": {"type": "object"},
     }
 }
+
+HIERARCHY_ROLLUP_COUNT_BY_STATE_FIELD_NAME = "count_by_state"
+HIERARCHY_ROLLUP_COUNT_BY_SEVERITY_FIELD_NAME = "count_by_severity"
+
+HIERARCHY_ROLLUPS_INDEX_MAPPING = {
+    "properties": {
+        "id": {"type": "keyword"},
+        "rollup_type": {"type": "keyword"},
+        "hierarchy_id": {"type": "long"},
+        "node_id": {"type": "keyword"},
+        "count": {"type": "long"},
+        HIERARCHY_ROLLUP_COUNT_BY_STATE_FIELD_NAME: {
+            "type": "object",
+            "dynamic": True,
+        },
+        "max_severity": {"type": "double"},
+        # pairs of severity and number of MOs, they are only summed by rollups
+        HIERARCHY_ROLLUP_COUNT_BY_SEVERITY_FIELD_NAME: {
+            "type": "object",
+            "enabled": False,
+        },
+        "tmo_id": {"type": "long"},
+        "tmo_ids": {"type": "long"},
+    }
+}
@@ -0,0 +1,60 @@
+from elasticsearch import AsyncElasticsearch
+
+from services.cache_services.caches import hierarchies_cache
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_HIERARCHIES_INDEX,
+)
+from services.hierarchy_services.elastic.mapping import (
+    HIERARCHY_PERMISSIONS_FIELD_NAME,
+)
+from services.inventory_services.utils.security.filter_by_realm import (
+    document_has_any_permission,
+)
+
+
+async def get_cached_hierarchy(
+    hierarchy_id: int, elastic_client: AsyncElasticsearch
+) -> dict | None:
+    """Returns the document of hierarchy with its permissions, None if hierarchy does not exist"""
+
+    async def load_hierarchy() -> dict | None:
+        search_res = await elastic_client.search(
+            index=HIERARCHY_HIERARCHIES_INDEX,
+            query={"match": {"id": hierarchy_id}},
+            size=1,
+            ignore_unavailable=True,
+        )
+        search_res = search_res["hits"]["hits"]
+        if not search_res:
+            return None
+        return search_res[0]["_source"]
+
+    return await hierarchies_cache.get_or_load(
+        str(hierarchy_id), load_hierarchy
+    )
+
+
+async def get_hierarchy_readable_by_permissions(
+    hierarchy_id: int,
+    elastic_client: AsyncElasticsearch,
+    is_admin: bool,
+    permissions: list[str],
+) -> dict | None:
+    """Returns the hierarchy without its permissions, None if hierarchy does not exist
+    or is not readable by any of permissions"""
+    hierarchy = await get_cached_hierarchy(
+        hierarchy_id=hierarchy_id, elastic_client=elastic_client
+    )
+    if hierarchy is None:
+        return None
+    if not is_admin and not document_has_any_permission(
+        document=hierarchy,
+        permissions=permissions,
+        field_name=HIERARCHY_PERMISSIONS_FIELD_NAME,
+    ):
+        return None
+    return {
+        key: value
+        for key, value in hierarchy.items()
+        if key != HIERARCHY_PERMISSIONS_FIELD_NAME
+    }
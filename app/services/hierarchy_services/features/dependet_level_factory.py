@@ -5,6 +5,9 @@ from pydantic import BaseModel
 
 from services.hierarchy_services.elastic.configs import HIERARCHY_LEVELS_INDEX
 from services.hierarchy_services.models.dto import LevelDTO
+from utils_by_services.inventory.common import msearch_all_hits
+
+LEVELS_SIZE_PER_STEP = 100_000
 
 
 class DependentLevelsChain(BaseModel):
@@ -34,13 +37,9 @@ class DependentLevelsChainFactory:
         self.__current_level = None
         self.__lower_levels_ordered_by_depth = list()
 
-    async def __get_upper_levels_ordered_by_depth_and_current_level(self):
-        """Fills in self.__upper_levels_ordered_by_depth and self.__current_level data"""
-        if not self.parent_level_data:
-            return
-
-        size_per_step = 100_000
-        search_body = {
+    def __get_upper_levels_search_body(self) -> dict:
+        """Returns search body of levels which are not deeper than parent level, the deepest first"""
+        return {
             "query": {
                 "bool": {
                     "must": [
@@ -57,160 +56,94 @@ class DependentLevelsChainFactory:
                 }
             },
             "sort": {"level": {"order": "desc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
+            "size": LEVELS_SIZE_PER_STEP,
         }
 
-        level_id = str(self.parent_level_data.level_id)
-        res_list = list()
-
-        while True:
-            search_res = await self.elastic_client.search(
-                index=HIERARCHY_LEVELS_INDEX,
-                body=search_body,
-                ignore_unavailable=True,
+    def __get_lower_levels_search_body(self) -> dict:
+        """Returns search body of levels which are deeper than parent level
+        (all levels of hierarchy if there is no parent level), the highest first"""
+        must_conditions = [{"match": {"hierarchy_id": self.hierarchy_id}}]
+        if self.parent_level_data:
+            must_conditions.extend(
+                [
+                    {"exists": {"field": "level"}},
+                    {
+                        "range": {
+                            "level": {"gt": self.parent_level_data.level_level}
+                        }
+                    },
+                ]
             )
-
-            total_hits = search_res["hits"]["total"]["value"]
-
-            search_res = search_res["hits"]["hits"]
-
-            for item in search_res:
-                item = item["_source"]
-                if level_id == item["id"]:
-                    level_dto = LevelDTO.model_validate(item)
-                    res_list.insert(0, level_dto)
-
-                    parent_id = item.get("parent_id")
-                    if not parent_id:
-                        break
-                    level_id = parent_id
-
-            if total_hits < size_per_step:
-                break
-
-            if len(search_res) == size_per_step:
-                search_after = search_res[-1]["sort"]
-                search_body["search_after"] = search_after
-            else:
-                break
-
-        if res_list:
-            self.__current_level = res_list.pop()
-            self.__upper_levels_ordered_by_depth = res_list
-
-    async def __get_lower_levels_ordered_by_depth_if_level_data(self):
-        """Fills in self.__lower_levels_ordered_by_depth data if exists self.level_data"""
-        size_per_step = 100_000
-
-        parent_level_level = self.parent_level_data.level_level
-
-        search_body = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {"match": {"hierarchy_id": self.hierarchy_id}},
-                        {"exists": {"field": "level"}},
-                        {"range": {"level": {"gt": parent_level_level}}},
-                    ]
-                }
-            },
+        return {
+            "query": {"bool": {"must": must_conditions}},
             "sort": {"level": {"order": "asc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
+            "size": LEVELS_SIZE_PER_STEP,
         }
 
+    def __set_upper_levels_ordered_by_depth_and_current_level(
+        self, hits: list[dict]
+    ):
+        """Fills in self.__upper_levels_ordered_by_depth and self.__current_level data"""
+        level_id = str(self.parent_level_data.level_id)
         res_list = list()
-        p_ids = {str(self.parent_level_data.level_id)}
-
-        while True:
-            search_res = await self.elastic_client.search(
-                index=HIERARCHY_LEVELS_INDEX,
-                body=search_body,
-                ignore_unavailable=True,
-            )
 
-            total_hits = search_res["hits"]["total"]["value"]
+        for item in hits:
+            item = item["_source"]
+            if level_id == item["id"]:
+                level_dto = LevelDTO.model_validate(item)
+                res_list.insert(0, level_dto)
 
-            search_res = search_res["hits"]["hits"]
-
-            for item in search_res:
-                item = item["_source"]
                 parent_id = item.get("parent_id")
-                item_id = item.get("id")
-
-                if parent_id in p_ids:
-                    level_dto = LevelDTO.model_validate(item)
-                    res_list.append(level_dto)
-                    p_ids.add(item_id)
-
-            if total_hits < size_per_step:
-                break
-
-            if len(search_res) == size_per_step:
-                search_after = search_res[-1]["sort"]
-                search_body["search_after"] = search_after
-            else:
-                break
+                if not parent_id:
+                    break
+                level_id = parent_id
 
         if res_list:
-            self.__lower_levels_ordered_by_depth = res_list
-
-    async def __get_lower_levels_ordered_by_depth_if_not_level_data(self):
-        """Fills in self.__lower_levels_ordered_by_depth data if not exists self.level_data"""
-        size_per_step = 100_000
-
-        search_body = {
-            "query": {
-                "bool": {
-                    "must": [{"match": {"hierarchy_id": self.hierarchy_id}}]
-                }
-            },
-            "sort": {"level": {"order": "asc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
-        }
-
-        res_list = list()
-
-        while True:
-            search_res = await self.elastic_client.search(
-                index=HIERARCHY_LEVELS_INDEX,
-                body=search_body,
-                ignore_unavailable=True,
-            )
-
-            total_hits = search_res["hits"]["total"]["value"]
-
-            search_res = search_res["hits"]["hits"]
+            self.__current_level = res_list.pop()
+            self.__upper_levels_ordered_by_depth = res_list
 
-            step_res = [
-                LevelDTO.model_validate(item["_source"]) for item in search_res
+    def __set_lower_levels_ordered_by_depth(self, hits: list[dict]):
+        """Fills in self.__lower_levels_ordered_by_depth data"""
+        if not self.parent_level_data:
+            self.__lower_levels_ordered_by_depth = [
+                LevelDTO.model_validate(item["_source"]) for item in hits
             ]
-            if res_list:
-                res_list.extend(step_res)
-            else:
-                res_list = step_res
+            return
 
-            if total_hits < size_per_step:
-                break
+        res_list = list()
+        p_ids = {str(self.parent_level_data.level_id)}
+        for item in hits:
+            item = item["_source"]
+            parent_id = item.get("parent_id")
+            item_id = item.get("id")
 
-            if len(search_res) == size_per_step:
-                search_after = search_res[-1]["sort"]
-                search_body["search_after"] = search_after
-            else:
-                break
+            if parent_id in p_ids:
+                level_dto = LevelDTO.model_validate(item)
+                res_list.append(level_dto)
+                p_ids.add(item_id)
 
         if res_list:
             self.__lower_levels_ordered_by_depth = res_list
 
     async def create_dependent_levels_chain_by(self) -> DependentLevelsChain:
-        """Returns instance of DependentLevelsChain"""
-        await self.__get_upper_levels_ordered_by_depth_and_current_level()
+        """Returns instance of DependentLevelsChain.
+        Upper and lower levels are read by one _msearch request"""
+        searches = [
+            (HIERARCHY_LEVELS_INDEX, self.__get_lower_levels_search_body())
+        ]
+        if self.parent_level_data:
+            searches.append(
+                (HIERARCHY_LEVELS_INDEX, self.__get_upper_levels_search_body())
+            )
+        hits_of_searches = await msearch_all_hits(
+            elastic_client=self.elastic_client, searches=searches
+        )
+
+        self.__set_lower_levels_ordered_by_depth(hits_of_searches[0])
         if self.parent_level_data:
-            await self.__get_lower_levels_ordered_by_depth_if_level_data()
-        else:
-            await self.__get_lower_levels_ordered_by_depth_if_not_level_data()
+            self.__set_upper_levels_ordered_by_depth_and_current_level(
+                hits_of_searches[1]
+            )
 
         return DependentLevelsChain(
             upper_levels_ordered_by_depth_asc=self.__upper_levels_ordered_by_depth,
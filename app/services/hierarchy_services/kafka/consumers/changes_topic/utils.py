@@ -5,13 +5,18 @@ from confluent_kafka import cimpl
 from elastic.client import ElasticsearchManager
 from kafka_config.config import KAFKA_HIERARCHY_CHANGES_TOPIC
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
+from services.cache_services.caches import hierarchies_cache
 from services.hierarchy_services.kafka.consumers.changes_topic.configs import (
     HIERARCHY_CHANGES_PROTOBUF_DESERIALIZERS,
     HIERARCHY_CHANGES_HANDLER_BY_MSG_CLASS_NAME,
+    HierarchyMessageType,
+    ObjEventStatus,
 )
 from services.hierarchy_services.kafka.consumers.changes_topic.protobuf.custom_deserializer import (
     protobuf_kafka_msg_to_dict,
 )
+from services.hierarchy_services.rollups.store import HierarchyRollupStore
 
 
 class HierarchyChangesTopicHandler:
@@ -95,6 +100,41 @@ class HierarchyChangesTopicHandler:
         # return await async_client
         return ElasticsearchManager().get_client()
 
+    async def __update_rollups(
+        self,
+        rollup_store: HierarchyRollupStore,
+        msg: dict,
+        parents_before_changes: set,
+    ):
+        if (
+            self.msg_instance_class_name == HierarchyMessageType.HIERARCHY.value
+            and self.msg_instance_event == ObjEventStatus.DELETED.value
+            and msg.get("objects")
+        ):
+            await rollup_store.delete_hierarchies(
+                hierarchy_ids=[int(h["id"]) for h in msg["objects"]]
+            )
+            return
+
+        if (
+            self.msg_instance_class_name == HierarchyMessageType.LEVEL.value
+            and msg.get("objects")
+        ):
+            # TMOs of levels are part of the counts of hierarchies by TMOs of levels
+            await rollup_store.refresh_levels(
+                {int(level["hierarchy_id"]) for level in msg["objects"]}
+            )
+            return
+
+        parents = await rollup_store.get_parents_affected_by_msg(
+            msg_class_name=self.msg_instance_class_name,
+            msg_event=self.msg_instance_event,
+            msg=msg,
+        )
+        await rollup_store.refresh_parents(
+            parents=parents.union(parents_before_changes)
+        )
+
     async def process_the_message(self):
         self.clear_msg_data()
         if self.msg_instance_class_name:
@@ -110,5 +150,29 @@ class HierarchyChangesTopicHandler:
             elastic_client = await self.__get_elastic_async_client()
             handler = self.__get_event_handler()
             print("deserialized_msg", deserialized_msg)
-            await handler(msg=deserialized_msg, elastic_client=elastic_client)
+            rollup_store = HierarchyRollupStore(elastic_client=elastic_client)
+            with observe_kafka_handler(
+                topic=self.msg.topic(),
+                msg_class_name=self.msg_instance_class_name,
+                msg_event=self.msg_instance_event,
+            ):
+                parents = await rollup_store.get_parents_affected_by_msg(
+                    msg_class_name=self.msg_instance_class_name,
+                    msg_event=self.msg_instance_event,
+                    msg=deserialized_msg,
+                )
+                await handler(
+                    msg=deserialized_msg, elastic_client=elastic_client
+                )
+                if self.msg_instance_class_name in {
+                    HierarchyMessageType.HIERARCHY.value,
+                    HierarchyMessageType.HIERARCHY_PERMISSION.value,
+                }:
+                    # hierarchies and their permissions change rarely
+                    await hierarchies_cache.invalidate_all()
+                await self.__update_rollups(
+                    rollup_store=rollup_store,
+                    msg=deserialized_msg,
+                    parents_before_changes=parents,
+                )
             # await elastic_client.close()
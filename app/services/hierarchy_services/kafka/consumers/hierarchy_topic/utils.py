@@ -3,6 +3,7 @@ from typing import Callable
 
 from elastic.client import ElasticsearchManager
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from services.cache_services.caches import hierarchies_cache
 from services.hierarchy_services.kafka.consumers.hierarchy_topic.configs import (
     EVENT_HANDLERS_BY_HIERARCHY_EVENT,
 )
@@ -70,5 +71,6 @@ class HierarchyHierarchiesChangesTopicHandler:
                     )
                 except Exception as ex:
                     print(ex)
+                await hierarchies_cache.invalidate_all()
                 # finally:
                 #     await elastic_client.close()
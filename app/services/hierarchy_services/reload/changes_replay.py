@@ -0,0 +1,207 @@
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, Mapping
+
+from confluent_kafka import Consumer, KafkaError, KafkaException, TopicPartition
+
+from elastic.index_redirects import redirect_indexes
+from kafka_config import config
+from kafka_config.msg_protocol import KafkaMSGProtocol
+from kafka_config.utils import consumer_config
+from services.inventory_services.kafka.consumers.inventory_changes.utils import (
+    InventoryChangesHandler,
+)
+from services.kafka_services.handler_adapter.utils import MSGHandlerAdapter
+from services.zeebe_services.kafka.consumers.process_instance_exporter.utils import (
+    ProcessInstanceChangesHandler,
+)
+
+"""
+Replay of kafka changes into the indexes of a full hierarchy reload. Consumers write changes into the indexes
+behind the hierarchy aliases, so changes consumed while new indexes are loaded are not in the new indexes.
+Offsets of the consumer group are recorded when the reload starts, and before the aliases are moved
+the messages from these offsets are processed again with requests to the aliases redirected to the new indexes.
+Hierarchy messages are processed by their handlers, inventory and process instance messages only refresh rollups.
+The replay consumer is assigned to partitions and does not commit, so it does not change the consumer group
+"""
+
+logger = logging.getLogger(__name__)
+
+KAFKA_TIMEOUT = 10
+POLL_TIMEOUT = 1.0
+# passes are repeated while they replay messages, the last pass is right before the aliases are moved
+MAX_REPLAY_PASSES = 10
+
+HIERARCHY_TOPICS = {
+    config.KAFKA_HIERARCHY_CHANGES_TOPIC,
+    config.KAFKA_HIERARCHY_HIERARCHIES_CHANGES_TOPIC,
+    config.KAFKA_HIERARCHY_LEVELS_CHANGES_TOPIC,
+    config.KAFKA_HIERARCHY_OBJ_CHANGES_TOPIC,
+    config.KAFKA_HIERARCHY_NODE_DATA_CHANGES_TOPIC,
+    config.KAFKA_HIERARCHY_PERMISSIONS_CHANGES_TOPIC,
+}
+
+
+async def process_hierarchy_message(msg: KafkaMSGProtocol):
+    handler_cls = MSGHandlerAdapter(
+        msg_topic=msg.topic()
+    ).get_corresponding_handler()
+    if handler_cls:
+        await handler_cls(kafka_msg=msg).process_the_message()
+
+
+async def refresh_rollups_of_inventory_message(msg: KafkaMSGProtocol):
+    await InventoryChangesHandler(kafka_msg=msg).refresh_rollups()
+
+
+async def refresh_rollups_of_process_instance_message(msg: KafkaMSGProtocol):
+    await ProcessInstanceChangesHandler(kafka_msg=msg).refresh_rollups()
+
+
+def get_replay_processors() -> dict[
+    str, Callable[[KafkaMSGProtocol], Awaitable]
+]:
+    """Returns processors of the consumed topics which change hierarchy indexes"""
+    processors = dict()
+    for topic in config.KAFKA_SUBSCRIBE_TOPICS:
+        if topic in HIERARCHY_TOPICS:
+            processors[topic] = process_hierarchy_message
+    if config.KAFKA_INVENTORY_CHANGES_TOPIC:
+        processors[config.KAFKA_INVENTORY_CHANGES_TOPIC] = (
+            refresh_rollups_of_inventory_message
+        )
+    if config.KAFKA_ZEEBE_PROCESS_INSTANCE_EXPORTER_TOPIC in (
+        config.KAFKA_SUBSCRIBE_TOPICS
+    ):
+        processors[config.KAFKA_ZEEBE_PROCESS_INSTANCE_EXPORTER_TOPIC] = (
+            refresh_rollups_of_process_instance_message
+        )
+    return processors
+
+
+class ChangesReplay:
+    def __init__(
+        self,
+        processors_by_topic: Mapping[
+            str, Callable[[KafkaMSGProtocol], Awaitable]
+        ],
+    ):
+        self.processors_by_topic = processors_by_topic
+        # next offset to replay by (topic, partition)
+        self.offsets: dict[tuple[str, int], int] = dict()
+        self.replayed_messages = 0
+        self.__consumer: Consumer | None = None
+
+    @staticmethod
+    def __create_consumer() -> Consumer:
+        conf = dict(config.KAFKA_CONSUMER_CONNECT_CONFIG)
+        conf.pop("statistics.interval.ms", None)
+        conf["enable.partition.eof"] = True
+        return Consumer(consumer_config(conf))
+
+    async def __run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    async def __get_partitions(self) -> list[TopicPartition]:
+        partitions = list()
+        for topic in self.processors_by_topic:
+            metadata = await self.__run(
+                self.__consumer.list_topics, topic, timeout=KAFKA_TIMEOUT
+            )
+            partitions.extend(
+                TopicPartition(topic, partition)
+                for partition in metadata.topics[topic].partitions
+            )
+        return partitions
+
+    async def __get_end_offsets(self) -> dict[tuple[str, int], int]:
+        end_offsets = dict()
+        for partition in await self.__get_partitions():
+            _, high = await self.__run(
+                self.__consumer.get_watermark_offsets,
+                partition,
+                timeout=KAFKA_TIMEOUT,
+                cached=False,
+            )
+            end_offsets[(partition.topic, partition.partition)] = high
+        return end_offsets
+
+    async def start(self):
+        """Records the offsets from which changes are replayed: offsets committed by the consumer group,
+        messages before them are processed and are loaded with hierarchies. Partitions without
+        committed offsets are replayed from their current end"""
+        if not self.processors_by_topic:
+            return
+        self.__consumer = self.__create_consumer()
+        end_offsets = await self.__get_end_offsets()
+        committed = await self.__run(
+            self.__consumer.committed,
+            [TopicPartition(topic, p) for topic, p in end_offsets],
+            timeout=KAFKA_TIMEOUT,
+        )
+        for partition in committed:
+            key = (partition.topic, partition.partition)
+            self.offsets[key] = (
+                partition.offset if partition.offset >= 0 else end_offsets[key]
+            )
+
+    async def replay(self, index_by_alias: Mapping[str, str]) -> int:
+        """Processes messages from the recorded offsets to the current end of partitions
+        with requests to aliases redirected to index_by_alias, returns the number of messages"""
+        if self.__consumer is None:
+            return 0
+        end_offsets = await self.__get_end_offsets()
+        pending = {
+            key
+            for key, end_offset in end_offsets.items()
+            if self.offsets.get(key, end_offset) < end_offset
+        }
+        if not pending:
+            return 0
+        await self.__run(
+            self.__consumer.assign,
+            [
+                TopicPartition(topic, p, self.offsets[(topic, p)])
+                for topic, p in pending
+            ],
+        )
+
+        replayed = 0
+        with redirect_indexes(index_by_alias):
+            while pending:
+                msg = await self.__run(self.__consumer.poll, POLL_TIMEOUT)
+                if msg is None:
+                    continue
+                key = (msg.topic(), msg.partition())
+                if msg.error():
+                    if msg.error().code() != KafkaError._PARTITION_EOF:
+                        raise KafkaException(msg.error())
+                    pending.discard(key)
+                    continue
+                if key not in pending:
+                    continue
+                await self.processors_by_topic[msg.topic()](msg)
+                self.offsets[key] = msg.offset() + 1
+                replayed += 1
+                if self.offsets[key] >= end_offsets[key]:
+                    pending.discard(key)
+
+        await self.__run(self.__consumer.unassign)
+        self.replayed_messages += replayed
+        logger.info("%d kafka messages are replayed into new indexes", replayed)
+        return replayed
+
+    async def replay_until_caught_up(self, index_by_alias: Mapping[str, str]):
+        """Repeats replay while it finds new messages, at most MAX_REPLAY_PASSES times"""
+        for _ in range(MAX_REPLAY_PASSES):
+            if not await self.replay(index_by_alias=index_by_alias):
+                return
+
+    async def close(self):
+        if self.__consumer is not None:
+            await self.__run(self.__consumer.close)
+            self.__consumer = None
@@ -1,3 +1,6 @@
+import asyncio
+import logging
+import time
 from typing import Union
 
 import grpc
@@ -15,7 +18,8 @@ from grpc_clients.hierarchy.getters.getters_without_level import (
     get_all_node_data_for_spec_level_as_dicts_by_grpc,
     get_all_hierarchies_as_dicts_by_grpc,
 )
-
+from kafka_config.config import KAFKA_TURN_ON
+from services.cache_services.caches import hierarchies_cache
 from services.hierarchy_services.elastic.configs import (
     HIERARCHY_HIERARCHIES_INDEX_SETTINGS,
     HIERARCHY_HIERARCHIES_INDEX,
@@ -25,6 +29,8 @@ from services.hierarchy_services.elastic.configs import (
     HIERARCHY_NODE_DATA_INDEX,
     HIERARCHY_OBJ_INDEX_SETTINGS,
     HIERARCHY_OBJ_INDEX,
+    HIERARCHY_ROLLUPS_INDEX,
+    HIERARCHY_ROLLUPS_INDEX_SETTINGS,
 )
 from services.hierarchy_services.elastic.mapping import (
     HIERARCHY_HIERARCHIES_INDEX_MAPPING,
@@ -32,69 +38,122 @@ from services.hierarchy_services.elastic.mapping import (
     HIERARCHY_NODE_DATA_INDEX_MAPPING,
     HIERARCHY_OBJ_INDEX_MAPPING,
     HIERARCHY_PERMISSIONS_FIELD_NAME,
+    HIERARCHY_ROLLUPS_INDEX_MAPPING,
+)
+from services.hierarchy_services.reload.changes_replay import (
+    ChangesReplay,
+    get_replay_processors,
 )
+from services.hierarchy_services.reload.models import (
+    HierarchyReloadFailure,
+    HierarchyReloadProgress,
+    HierarchyReloadState,
+)
+from services.hierarchy_services.rollups.store import HierarchyRollupStore
 
-from settings.config import HIERARCHY_GRPC_PORT, HIERARCHY_HOST
+from settings.config import (
+    HIERARCHY_GRPC_PORT,
+    HIERARCHY_HOST,
+    HIERARCHY_RELOAD_CONCURRENCY,
+)
+
+"""
+Reload of hierarchy indexes. Names of hierarchy indexes are aliases of versioned indexes. Full reload builds
+new versioned indexes, loading hierarchies concurrently, and moves all aliases to them in one request,
+so hierarchy endpoints read the previous indexes until the new ones are complete.
+Changes consumed from kafka during the build are written into the previous indexes, so they are
+replayed into the new indexes before the aliases are moved
+"""
+
+logger = logging.getLogger(__name__)
+
+# mappings and settings of hierarchy indexes by alias
+HIERARCHY_INDEXES_CONFIGS = {
+    HIERARCHY_HIERARCHIES_INDEX: (
+        HIERARCHY_HIERARCHIES_INDEX_MAPPING,
+        HIERARCHY_HIERARCHIES_INDEX_SETTINGS,
+    ),
+    HIERARCHY_LEVELS_INDEX: (
+        HIERARCHY_LEVEL_INDEX_MAPPING,
+        HIERARCHY_LEVELS_INDEX_SETTINGS,
+    ),
+    HIERARCHY_OBJ_INDEX: (
+        HIERARCHY_OBJ_INDEX_MAPPING,
+        HIERARCHY_OBJ_INDEX_SETTINGS,
+    ),
+    HIERARCHY_NODE_DATA_INDEX: (
+        HIERARCHY_NODE_DATA_INDEX_MAPPING,
+        HIERARCHY_NODE_DATA_INDEX_SETTINGS,
+    ),
+    HIERARCHY_ROLLUPS_INDEX: (
+        HIERARCHY_ROLLUPS_INDEX_MAPPING,
+        HIERARCHY_ROLLUPS_INDEX_SETTINGS,
+    ),
+}
 
 
 class HierarchyIndexesReloader:
+    # progress of the last full reload of the process
+    last_full_reload = HierarchyReloadProgress()
+
     def __init__(
-        self, elastic_client: AsyncElasticsearch, session: AsyncSession
+        self,
+        elastic_client: AsyncElasticsearch,
+        session: AsyncSession,
+        concurrency: int = HIERARCHY_RELOAD_CONCURRENCY,
+        changes_replay: ChangesReplay | None = None,
     ):
         self.elastic_client = elastic_client
         self.session = session
-        self.__hierarchy_levels_data_cache = list()
-
-    async def __stage_1_clear_hierarchies_index(self):
-        """Deletes current HIERARCHY_HIERARCHIES_INDEX from elastic search and creates
-        new HIERARCHY_HIERARCHIES_INDEX index"""
-
-        await self.elastic_client.indices.delete(
-            index=HIERARCHY_HIERARCHIES_INDEX, ignore_unavailable=True
-        )
-        await self.elastic_client.indices.create(
-            index=HIERARCHY_HIERARCHIES_INDEX,
-            mappings=HIERARCHY_HIERARCHIES_INDEX_MAPPING,
-            settings=HIERARCHY_HIERARCHIES_INDEX_SETTINGS,
-        )
-
-    async def __stage_1_clear_hierarchies_level_index(self):
-        """Deletes current HIERARCHY_LEVELS_INDEX from elastic search and creates
-        new HIERARCHY_LEVELS_INDEX index"""
+        self.concurrency = concurrency
+        if changes_replay is None:
+            changes_replay = ChangesReplay(
+                processors_by_topic=get_replay_processors()
+                if KAFKA_TURN_ON
+                else dict()
+            )
+        self.changes_replay = changes_replay
+        # indexes where hierarchies are loaded by alias, full reload replaces them with new indexes
+        self.__indexes = {alias: alias for alias in HIERARCHY_INDEXES_CONFIGS}
+
+    async def __create_versioned_indexes(self) -> dict[str, str]:
+        """Creates empty indexes of the new version, returns their names by alias"""
+        version = int(time.time() * 1000)
+        new_indexes = dict()
+        for alias, (mappings, settings) in HIERARCHY_INDEXES_CONFIGS.items():
+            new_indexes[alias] = f"{alias}_v{version}"
+            await self.elastic_client.indices.create(
+                index=new_indexes[alias], mappings=mappings, settings=settings
+            )
+        return new_indexes
 
-        await self.elastic_client.indices.delete(
-            index=HIERARCHY_LEVELS_INDEX, ignore_unavailable=True
-        )
-        await self.elastic_client.indices.create(
-            index=HIERARCHY_LEVELS_INDEX,
-            mappings=HIERARCHY_LEVEL_INDEX_MAPPING,
-            settings=HIERARCHY_LEVELS_INDEX_SETTINGS,
-        )
+    async def __delete_indexes(self, indexes: list[str]):
+        if indexes:
+            await self.elastic_client.indices.delete(
+                index=",".join(indexes), ignore_unavailable=True
+            )
 
-    async def __stage_1_clear_hierarchies_obj_index(self):
-        """Deletes current HIERARCHY_OBJ_INDEX from elastic search and creates
-        new HIERARCHY_OBJ_INDEX index"""
-        await self.elastic_client.indices.delete(
-            index=HIERARCHY_OBJ_INDEX, ignore_unavailable=True
-        )
-        await self.elastic_client.indices.create(
-            index=HIERARCHY_OBJ_INDEX,
-            mappings=HIERARCHY_OBJ_INDEX_MAPPING,
-            settings=HIERARCHY_OBJ_INDEX_SETTINGS,
-        )
+    async def __swap_aliases(self, new_indexes: dict[str, str]):
+        """Moves aliases to the new indexes in one request and deletes the previous indexes"""
+        actions = list()
+        previous_indexes = list()
+        for alias, new_index in new_indexes.items():
+            if await self.elastic_client.indices.exists_alias(name=alias):
+                current_indexes = await self.elastic_client.indices.get_alias(
+                    name=alias
+                )
+                for current_index in current_indexes:
+                    actions.append(
+                        {"remove": {"index": current_index, "alias": alias}}
+                    )
+                    previous_indexes.append(current_index)
+            elif await self.elastic_client.indices.exists(index=alias):
+                # index created before aliases, it is deleted with the swap
+                actions.append({"remove_index": {"index": alias}})
+            actions.append({"add": {"index": new_index, "alias": alias}})
 
-    async def __stage_1_clear_hierarchies_node_data_index(self):
-        """Deletes current HIERARCHY_NODE_DATA_INDEX from elastic search and creates
-        new HIERARCHY_NODE_DATA_INDEX index"""
-
-        await self.elastic_client.indices.delete(
-            index=HIERARCHY_NODE_DATA_INDEX, ignore_unavailable=True
-        )
-        await self.elastic_client.indices.create(
-            index=HIERARCHY_NODE_DATA_INDEX,
-            mappings=HIERARCHY_NODE_DATA_INDEX_MAPPING,
-            settings=HIERARCHY_NODE_DATA_INDEX_SETTINGS,
-        )
+        await self.elastic_client.indices.update_aliases(actions=actions)
+        await self.__delete_indexes(previous_indexes)
 
     async def __stage_1_clear_special_hierarchy_data_from_hierarchies_index(
         self, hierarchy_id: int
@@ -212,7 +271,7 @@ class HierarchyIndexesReloader:
         if not hierarchy_id:
             raise ValueError("hierarchy_id cannot be empty")
         await self.elastic_client.index(
-            index=HIERARCHY_HIERARCHIES_INDEX,
+            index=self.__indexes[HIERARCHY_HIERARCHIES_INDEX],
             id=str(hierarchy_id),
             document=hierarchy_data,
             refresh="true",
@@ -242,7 +301,9 @@ class HierarchyIndexesReloader:
 
         search_query = {"match": {"id": hierarchy_id}}
         hierarchy_exists = await self.elastic_client.search(
-            index=HIERARCHY_HIERARCHIES_INDEX, query=search_query, size=1
+            index=self.__indexes[HIERARCHY_HIERARCHIES_INDEX],
+            query=search_query,
+            size=1,
         )
         hierarchy_exists = hierarchy_exists["hits"]["hits"]
 
@@ -254,7 +315,7 @@ class HierarchyIndexesReloader:
             )
 
             await self.elastic_client.index(
-                index=HIERARCHY_HIERARCHIES_INDEX,
+                index=self.__indexes[HIERARCHY_HIERARCHIES_INDEX],
                 id=str(hierarchy_id),
                 document=hierarchy_exists,
                 refresh="true",
@@ -263,19 +324,19 @@ class HierarchyIndexesReloader:
     async def __load_and_save_hierarchy_levels(
         self, hierarchy_id: int, channel: Channel
     ):
-        """Loads and saves levels into HIERARCHY_LEVELS_INDEX"""
-        self.__hierarchy_levels_data_cache = list()
+        """Loads and saves levels into HIERARCHY_LEVELS_INDEX, returns levels"""
+        levels = list()
         async for (
             level_chunk
         ) in get_all_levels_for_spec_hierarchy_by_as_dicts_grpc(
             hierarchy_id, channel
         ):
             actions = list()
-            self.__hierarchy_levels_data_cache.extend(level_chunk)
+            levels.extend(level_chunk)
             for item in level_chunk:
                 actions.append(
                     dict(
-                        _index=HIERARCHY_LEVELS_INDEX,
+                        _index=self.__indexes[HIERARCHY_LEVELS_INDEX],
                         _op_type="index",
                         _id=item["id"],
                         _source=item,
@@ -286,14 +347,16 @@ class HierarchyIndexesReloader:
                     client=self.elastic_client, refresh="true", actions=actions
                 )
             except BulkIndexError as e:
-                self.__hierarchy_levels_data_cache = list()
                 print(*actions, sep="\n")
                 print(e.errors)
                 raise e
+        return levels
 
-    async def __load_and_save_hierarchy_obj(self, channel: Channel):
-        """Loads and saves hierarchy objects into HIERARCHY_OBJ_INDEX"""
-        for level_data in self.__hierarchy_levels_data_cache:
+    async def __load_and_save_hierarchy_obj(
+        self, levels: list[dict], channel: Channel
+    ):
+        """Loads and saves hierarchy objects of levels into HIERARCHY_OBJ_INDEX"""
+        for level_data in levels:
             level_id = int(level_data.get("id"))
             async for obj_chunk in get_all_obj_for_spec_level_as_dicts_by_grpc(
                 level_id, channel
@@ -302,7 +365,7 @@ class HierarchyIndexesReloader:
                 for item in obj_chunk:
                     actions.append(
                         dict(
-                            _index=HIERARCHY_OBJ_INDEX,
+                            _index=self.__indexes[HIERARCHY_OBJ_INDEX],
                             _op_type="index",
                             _id=item["id"],
                             _source=item,
@@ -318,10 +381,12 @@ class HierarchyIndexesReloader:
                     print(e.errors)
                     raise e
 
-    async def __load_and_save_hierarchy_node_data(self, channel: Channel):
-        """Loads and saves hierarchy node_data into HIERARCHY_NODE_DATA_INDEX"""
+    async def __load_and_save_hierarchy_node_data(
+        self, levels: list[dict], channel: Channel
+    ):
+        """Loads and saves hierarchy node_data of levels into HIERARCHY_NODE_DATA_INDEX"""
 
-        for level_data in self.__hierarchy_levels_data_cache:
+        for level_data in levels:
             level_id = int(level_data.get("id"))
 
             async for (
@@ -333,7 +398,7 @@ class HierarchyIndexesReloader:
                 for item in node_data_chunk:
                     actions.append(
                         dict(
-                            _index=HIERARCHY_NODE_DATA_INDEX,
+                            _index=self.__indexes[HIERARCHY_NODE_DATA_INDEX],
                             _op_type="index",
                             _id=item["id"],
                             _source=item,
@@ -371,37 +436,124 @@ class HierarchyIndexesReloader:
         )
 
         # load and save levels data
-        await self.__load_and_save_hierarchy_levels(hierarchy_id, async_channel)
+        levels = await self.__load_and_save_hierarchy_levels(
+            hierarchy_id, async_channel
+        )
 
         # load and save obj data
-        await self.__load_and_save_hierarchy_obj(async_channel)
+        await self.__load_and_save_hierarchy_obj(levels, async_channel)
 
         # load and save node_data data
-        await self.__load_and_save_hierarchy_node_data(async_channel)
+        await self.__load_and_save_hierarchy_node_data(levels, async_channel)
+
+        # recalculate rollups of the loaded nodes
+        await HierarchyRollupStore(
+            elastic_client=self.elastic_client,
+            obj_index=self.__indexes[HIERARCHY_OBJ_INDEX],
+            node_data_index=self.__indexes[HIERARCHY_NODE_DATA_INDEX],
+            rollups_index=self.__indexes[HIERARCHY_ROLLUPS_INDEX],
+            levels_index=self.__indexes[HIERARCHY_LEVELS_INDEX],
+        ).rebuild_hierarchy(hierarchy_id)
+
+    async def __load_hierarchies(
+        self,
+        hierarchy_ids: list[int],
+        async_channel: Channel,
+        progress: HierarchyReloadProgress,
+    ):
+        """Loads hierarchies concurrently, failed hierarchies are added to progress"""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
 
-    async def refresh_all_hierarchies_indexes(self):
-        await self.__stage_1_clear_hierarchies_index()
-        await self.__stage_1_clear_hierarchies_level_index()
-        await self.__stage_1_clear_hierarchies_obj_index()
-        await self.__stage_1_clear_hierarchies_node_data_index()
-        # get all hierarchies
+        async def load(hierarchy_id: int):
+            async with semaphore:
+                try:
+                    await self._load_and_save_data_for_special_hierarchy(
+                        hierarchy_id, async_channel
+                    )
+                except Exception as e:
+                    logger.exception("Hierarchy %s is not loaded", hierarchy_id)
+                    progress.failed_hierarchies.append(
+                        HierarchyReloadFailure(
+                            hierarchy_id=hierarchy_id,
+                            error=str(e) or type(e).__name__,
+                        )
+                    )
+                else:
+                    progress.loaded_hierarchies += 1
+                    logger.info(
+                        "Hierarchy %s is loaded, %d of %d",
+                        hierarchy_id,
+                        progress.loaded_hierarchies,
+                        progress.total_hierarchies,
+                    )
 
-        async with grpc.aio.insecure_channel(
-            f"{HIERARCHY_HOST}:{HIERARCHY_GRPC_PORT}"
-        ) as async_channel:
-            all_hierarchies = []
+        await asyncio.gather(*[load(h_id) for h_id in hierarchy_ids])
 
-            # get all hierarchies
-            async for hierarchy_chunk in get_all_hierarchies_as_dicts_by_grpc(
-                async_channel
-            ):
-                all_hierarchies.extend(hierarchy_chunk)
-            print(all_hierarchies)
-            for hierarchy in all_hierarchies:
-                hierarchy_id = hierarchy.get("id")
-                await self._load_and_save_data_for_special_hierarchy(
-                    int(hierarchy_id), async_channel
+    async def refresh_all_hierarchies_indexes(
+        self, swap_with_failures: bool = False
+    ) -> HierarchyReloadProgress:
+        """Loads all hierarchies into new indexes and moves aliases to them.
+        If some hierarchies are failed, the new indexes are deleted, unless swap_with_failures"""
+        progress = HierarchyReloadProgress(
+            state=HierarchyReloadState.LOADING, started_at=time.time()
+        )
+        HierarchyIndexesReloader.last_full_reload = progress
+        new_indexes = await self.__create_versioned_indexes()
+        progress.indexes = new_indexes
+        self.__indexes = new_indexes
+        try:
+            # changes after these offsets can be missed by the new indexes
+            await self.changes_replay.start()
+            async with grpc.aio.insecure_channel(
+                f"{HIERARCHY_HOST}:{HIERARCHY_GRPC_PORT}"
+            ) as async_channel:
+                hierarchy_ids = list()
+                async for (
+                    hierarchy_chunk
+                ) in get_all_hierarchies_as_dicts_by_grpc(async_channel):
+                    hierarchy_ids.extend(
+                        int(hierarchy["id"]) for hierarchy in hierarchy_chunk
+                    )
+                progress.total_hierarchies = len(hierarchy_ids)
+                await self.__load_hierarchies(
+                    hierarchy_ids=hierarchy_ids,
+                    async_channel=async_channel,
+                    progress=progress,
+                )
+            # rollups of TMOs do not depend on hierarchies, they are calculated for the new rollups index
+            await HierarchyRollupStore(
+                elastic_client=self.elastic_client,
+                rollups_index=new_indexes[HIERARCHY_ROLLUPS_INDEX],
+            ).rebuild_tmos()
+            if not progress.failed_hierarchies or swap_with_failures:
+                await self.changes_replay.replay_until_caught_up(
+                    index_by_alias=new_indexes
+                )
+                progress.replayed_messages = (
+                    self.changes_replay.replayed_messages
                 )
+        except Exception:
+            progress.state = HierarchyReloadState.FAILED
+            progress.finished_at = time.time()
+            await self.__delete_indexes(list(new_indexes.values()))
+            raise
+        finally:
+            self.__indexes = {
+                alias: alias for alias in HIERARCHY_INDEXES_CONFIGS
+            }
+            await self.changes_replay.close()
+
+        if progress.failed_hierarchies and not swap_with_failures:
+            # hierarchy endpoints keep reading the previous indexes
+            await self.__delete_indexes(list(new_indexes.values()))
+            progress.state = HierarchyReloadState.FAILED
+        else:
+            await self.__swap_aliases(new_indexes)
+            progress.swapped = True
+            progress.state = HierarchyReloadState.COMPLETED
+            await hierarchies_cache.invalidate_all()
+        progress.finished_at = time.time()
+        return progress
 
     async def refresh_index_for_special_hierarchy(self, hierarchy_id: int):
         """Refresh all data for special tmo_id"""
@@ -419,6 +571,9 @@ class HierarchyIndexesReloader:
         await self.__stage_1_clear_obj_for_special_hierarchy_from_obj_index(
             hierarchy_id
         )
+        await HierarchyRollupStore(
+            elastic_client=self.elastic_client
+        ).delete_hierarchies([hierarchy_id])
 
         async with grpc.aio.insecure_channel(
             f"{HIERARCHY_HOST}:{HIERARCHY_GRPC_PORT}"
@@ -426,9 +581,10 @@ class HierarchyIndexesReloader:
             await self._load_and_save_data_for_special_hierarchy(
                 hierarchy_id, async_channel
             )
+        await hierarchies_cache.invalidate(keys=[str(hierarchy_id)])
 
     async def clear_all_indexes(self):
-        await self.__stage_1_clear_hierarchies_index()
-        await self.__stage_1_clear_hierarchies_level_index()
-        await self.__stage_1_clear_hierarchies_obj_index()
-        await self.__stage_1_clear_hierarchies_node_data_index()
+        """Moves aliases to new empty indexes"""
+        new_indexes = await self.__create_versioned_indexes()
+        await self.__swap_aliases(new_indexes)
+        await hierarchies_cache.invalidate_all()
@@ -0,0 +1,30 @@
+import enum
+
+from pydantic import BaseModel
+
+
+class HierarchyReloadState(str, enum.Enum):
+    NOT_STARTED = "not_started"
+    LOADING = "loading"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class HierarchyReloadFailure(BaseModel):
+    hierarchy_id: int
+    error: str
+
+
+class HierarchyReloadProgress(BaseModel):
+    state: HierarchyReloadState = HierarchyReloadState.NOT_STARTED
+    # names of the indexes which are built by reload, by alias
+    indexes: dict[str, str] = dict()
+    total_hierarchies: int = 0
+    loaded_hierarchies: int = 0
+    failed_hierarchies: list[HierarchyReloadFailure] = list()
+    # kafka messages consumed during the load which are replayed into the new indexes
+    replayed_messages: int = 0
+    # True if aliases were moved to the new indexes
+    swapped: bool = False
+    started_at: float | None = None
+    finished_at: float | None = None
@@ -0,0 +1,928 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import BulkIndexError, async_bulk
+
+from elastic.config import (
+    ALL_MO_OBJ_INDEXES_PATTERN,
+    INVENTORY_TMO_INDEX_V2,
+    INVENTORY_TPRM_INDEX_V2,
+)
+from elastic.enum_models import InventoryFieldValType
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from indexes_mapping.inventory.mapping import INVENTORY_PARAMETERS_FIELD_NAME
+from indexes_mapping.inventory.zeebe_enums import ZeebeProcessInstanceFields
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_HIERARCHIES_INDEX,
+    HIERARCHY_LEVELS_INDEX,
+    HIERARCHY_NODE_DATA_INDEX,
+    HIERARCHY_OBJ_INDEX,
+    HIERARCHY_ROLLUPS_INDEX,
+)
+from services.hierarchy_services.elastic.mapping import (
+    HIERARCHY_ROLLUP_COUNT_BY_SEVERITY_FIELD_NAME,
+    HIERARCHY_ROLLUP_COUNT_BY_STATE_FIELD_NAME,
+)
+from services.hierarchy_services.kafka.consumers.changes_topic.configs import (
+    HierarchyMessageType,
+    ObjEventStatus,
+)
+from services.hierarchy_services.kafka.consumers.changes_topic.events.limits import (
+    QUERY_MAX_SIZE,
+    TERMS_MAX_SIZE,
+)
+from services.zeebe_services.kafka.consumers.process_instance_exporter.intents import (
+    CamundaOperateStatuses,
+)
+
+"""
+Rollups of hierarchy nodes: for each parent node the number of MOs of its children
+with a lifecycle process by the state of the process and by severity, and the maximum severity of these MOs.
+The rollup of a hierarchy is the sum of the rollups of all its nodes, changes of node rollups are added to it.
+Rollups of TMOs with lifecycle and severity keep the number of all their MOs and their maximum severity,
+rollups of levels keep TMOs of the levels of hierarchies, together they are the counts of hierarchies
+by TMOs of their levels.
+Rollups are recalculated only for the parents and TMOs touched by hierarchy, inventory (TMO, TPRM, MO and
+severity PRM) and Zeebe events, so reading the rollup of a hierarchy is a get by key.
+Rollups are saved by versions which are read before they are calculated, rollups which were saved by other
+processes in the meantime are calculated again. Rollups are saved without refresh, they are read by gets,
+which are realtime
+"""
+
+NODE_ROLLUP_TYPE = "node"
+HIERARCHY_ROLLUP_TYPE = "hierarchy"
+TMO_ROLLUP_TYPE = "tmo"
+LEVELS_ROLLUP_TYPE = "levels"
+HIERARCHY_ROLLUP_ID_PREFIX = "hierarchy_"
+ROOT_ROLLUP_ID_PREFIX = "root_"
+TMO_ROLLUP_ID_PREFIX = "tmo_"
+LEVELS_ROLLUP_ID_PREFIX = "levels_"
+# MO of TMO with lifecycle without a started process
+STATE_WITHOUT_PROCESS = "NONE"
+LIFECYCLE_STATES = [
+    *(state.value for state in CamundaOperateStatuses),
+    STATE_WITHOUT_PROCESS,
+]
+
+# (hierarchy_id, parent node id), parent node id is None for the top level nodes
+ParentRef = tuple[int, str | None]
+
+# rollups which are saved by other processes while they are calculated are calculated again,
+# not more than MAX_SAVE_ATTEMPTS times
+MAX_SAVE_ATTEMPTS = 10
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def get_node_rollup_id(hierarchy_id: int, parent_id: str | None) -> str:
+    if parent_id:
+        return parent_id
+    return f"{ROOT_ROLLUP_ID_PREFIX}{hierarchy_id}"
+
+
+def get_hierarchy_rollup_id(hierarchy_id: int) -> str:
+    return f"{HIERARCHY_ROLLUP_ID_PREFIX}{hierarchy_id}"
+
+
+def get_tmo_rollup_id(tmo_id: int) -> str:
+    return f"{TMO_ROLLUP_ID_PREFIX}{tmo_id}"
+
+
+def get_levels_rollup_id(hierarchy_id: int) -> str:
+    return f"{LEVELS_ROLLUP_ID_PREFIX}{hierarchy_id}"
+
+
+def get_severity_tprm_filters() -> list[dict]:
+    """Conditions of severity TPRMs, the same rule as in the hierarchy info router"""
+    return [
+        {
+            "wildcard": {
+                "name": {
+                    "value": "*severity*",
+                    "case_insensitive": True,
+                }
+            }
+        },
+        {
+            "terms": {
+                "val_type": [
+                    InventoryFieldValType.INT.value,
+                    InventoryFieldValType.FLOAT.value,
+                ]
+            }
+        },
+    ]
+
+
+def get_chunks(items: Iterable, size: int) -> Iterable[list]:
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class RollupSaveConflict(Exception):
+    pass
+
+
+class RollupCounts:
+    """Numbers of MOs by state and by severity, rollups of hierarchies are sums of rollups of nodes"""
+
+    def __init__(self):
+        self.by_state = Counter()
+        self.by_severity = Counter()
+
+    def add_mo(self, state: str, severity: float | None):
+        self.by_state[state] += 1
+        if severity is not None:
+            self.by_severity[severity] += 1
+
+    def add_rollup(self, rollup: dict | None, sign: int = 1):
+        if not rollup:
+            return
+        for state, count in rollup.get(
+            HIERARCHY_ROLLUP_COUNT_BY_STATE_FIELD_NAME, {}
+        ).items():
+            self.by_state[state] += sign * count
+        for item in rollup.get(
+            HIERARCHY_ROLLUP_COUNT_BY_SEVERITY_FIELD_NAME, []
+        ):
+            self.by_severity[item["severity"]] += sign * item["count"]
+
+    def add_counts(self, counts: "RollupCounts"):
+        self.by_state.update(counts.by_state)
+        self.by_severity.update(counts.by_severity)
+
+    def to_dict(self) -> dict:
+        by_state = {state: c for state, c in self.by_state.items() if c > 0}
+        by_severity = {s: c for s, c in self.by_severity.items() if c > 0}
+        return {
+            "count": sum(by_state.values()),
+            HIERARCHY_ROLLUP_COUNT_BY_STATE_FIELD_NAME: by_state,
+            HIERARCHY_ROLLUP_COUNT_BY_SEVERITY_FIELD_NAME: [
+                {"severity": severity, "count": count}
+                for severity, count in sorted(by_severity.items())
+            ],
+            "max_severity": max(by_severity, default=None),
+        }
+
+
+class HierarchyRollupStore:
+    def __init__(
+        self,
+        elastic_client: AsyncElasticsearch,
+        obj_index: str = HIERARCHY_OBJ_INDEX,
+        node_data_index: str = HIERARCHY_NODE_DATA_INDEX,
+        rollups_index: str = HIERARCHY_ROLLUPS_INDEX,
+        levels_index: str = HIERARCHY_LEVELS_INDEX,
+    ):
+        """Indexes can be replaced by the indexes which are built by reload"""
+        self.elastic_client = elastic_client
+        self.obj_index = obj_index
+        self.node_data_index = node_data_index
+        self.rollups_index = rollups_index
+        self.levels_index = levels_index
+
+    async def _get_stored(self, rollup_ids: Iterable[str]) -> dict[str, dict]:
+        """Returns stored rollups with _source, _seq_no and _primary_term by id"""
+        rollup_ids = list(rollup_ids)
+        if not rollup_ids:
+            return dict()
+        response = await self.elastic_client.mget(
+            index=self.rollups_index, ids=rollup_ids
+        )
+        return {doc["_id"]: doc for doc in response["docs"] if doc.get("found")}
+
+    async def get_hierarchy_rollups(
+        self, hierarchy_ids: list[int]
+    ) -> dict[int, dict]:
+        """Returns rollups of hierarchies by hierarchy id, hierarchies without rollups are skipped"""
+        stored = await self._get_stored(
+            get_hierarchy_rollup_id(h_id) for h_id in hierarchy_ids
+        )
+        return {
+            int(doc["_source"]["hierarchy_id"]): doc["_source"]
+            for doc in stored.values()
+            if doc["_source"]["count"] > 0
+        }
+
+    async def get_level_tmo_rollups(
+        self, hierarchy_ids: list[int]
+    ) -> dict[int, dict]:
+        """Returns the number of MOs of TMOs with lifecycle and severity of the levels of hierarchies
+        and their maximum severity by hierarchy id, hierarchies without these MOs are skipped"""
+        stored_levels = await self._get_stored(
+            get_levels_rollup_id(h_id) for h_id in hierarchy_ids
+        )
+        tmo_ids_by_hierarchy = {
+            int(doc["_source"]["hierarchy_id"]): doc["_source"]["tmo_ids"]
+            for doc in stored_levels.values()
+        }
+        stored_tmos = await self._get_stored(
+            get_tmo_rollup_id(tmo_id)
+            for tmo_id in {
+                tmo_id
+                for tmo_ids in tmo_ids_by_hierarchy.values()
+                for tmo_id in tmo_ids
+            }
+        )
+
+        result = dict()
+        for hierarchy_id, tmo_ids in tmo_ids_by_hierarchy.items():
+            count = 0
+            max_severity = None
+            for tmo_id in tmo_ids:
+                tmo_rollup = stored_tmos.get(get_tmo_rollup_id(tmo_id))
+                if tmo_rollup is None:
+                    continue
+                count += tmo_rollup["_source"]["count"]
+                severity = tmo_rollup["_source"]["max_severity"]
+                if severity is not None and (
+                    max_severity is None or severity > max_severity
+                ):
+                    max_severity = severity
+            if count > 0:
+                result[hierarchy_id] = {
+                    "count": count,
+                    "max_severity": max_severity,
+                }
+        return result
+
+    async def _search_all(
+        self, index: str, query: dict, includes: list[str]
+    ) -> AsyncIterator[dict]:
+        search_after = None
+        while True:
+            response = await self.elastic_client.search(
+                index=index,
+                query=query,
+                size=QUERY_MAX_SIZE,
+                sort=[{"id": "asc"}],
+                source_includes=includes,
+                search_after=search_after,
+                track_total_hits=False,
+                ignore_unavailable=True,
+            )
+            hits = response["hits"]["hits"]
+            for hit in hits:
+                yield hit["_source"]
+            if len(hits) < QUERY_MAX_SIZE:
+                return
+            search_after = hits[-1]["sort"]
+
+    async def get_parents_of_nodes(
+        self, node_ids: Iterable[str]
+    ) -> set[ParentRef]:
+        parents = set()
+        for chunk_node_ids in get_chunks(node_ids, TERMS_MAX_SIZE):
+            async for node in self._search_all(
+                index=self.obj_index,
+                query={"terms": {"id": chunk_node_ids}},
+                includes=["hierarchy_id", "parent_id"],
+            ):
+                parents.add(
+                    (int(node["hierarchy_id"]), node.get("parent_id") or None)
+                )
+        return parents
+
+    async def get_nodes_of_node_data(
+        self, query: dict, chunk_values: Iterable, field: str
+    ) -> set[str]:
+        node_ids = set()
+        for chunk in get_chunks(chunk_values, TERMS_MAX_SIZE):
+            async for node_data in self._search_all(
+                index=self.node_data_index,
+                query={"bool": {"filter": [query, {"terms": {field: chunk}}]}},
+                includes=["node_id"],
+            ):
+                node_ids.add(node_data["node_id"])
+        return node_ids
+
+    async def _get_children_by_parent(
+        self, parents: set[ParentRef]
+    ) -> dict[ParentRef, set[str]]:
+        children_by_parent = defaultdict(set)
+        parent_hierarchy_ids = {p_id: h_id for h_id, p_id in parents if p_id}
+        root_hierarchy_ids = [h_id for h_id, p_id in parents if not p_id]
+
+        for chunk_parent_ids in get_chunks(
+            parent_hierarchy_ids, TERMS_MAX_SIZE
+        ):
+            async for node in self._search_all(
+                index=self.obj_index,
+                query={"terms": {"parent_id": chunk_parent_ids}},
+                includes=["id", "parent_id"],
+            ):
+                parent_id = node["parent_id"]
+                parent_ref = (parent_hierarchy_ids[parent_id], parent_id)
+                children_by_parent[parent_ref].add(node["id"])
+
+        if root_hierarchy_ids:
+            root_query = {
+                "bool": {
+                    "filter": [{"terms": {"hierarchy_id": root_hierarchy_ids}}],
+                    "should": [
+                        {
+                            "bool": {
+                                "must_not": {"exists": {"field": "parent_id"}}
+                            }
+                        },
+                        {"term": {"parent_id": ""}},
+                    ],
+                    "minimum_should_match": 1,
+                }
+            }
+            async for node in self._search_all(
+                index=self.obj_index,
+                query=root_query,
+                includes=["id", "hierarchy_id"],
+            ):
+                parent_ref = (int(node["hierarchy_id"]), None)
+                children_by_parent[parent_ref].add(node["id"])
+        return children_by_parent
+
+    async def _get_mos_by_node(
+        self, node_ids: Iterable[str]
+    ) -> dict[str, set[tuple[int, int]]]:
+        """Returns (mo_id, tmo_id) of MOs of nodes by node id"""
+        mos_by_node = defaultdict(set)
+        for chunk_node_ids in get_chunks(node_ids, TERMS_MAX_SIZE):
+            async for node_data in self._search_all(
+                index=self.node_data_index,
+                query={"terms": {"node_id": chunk_node_ids}},
+                includes=["node_id", "mo_id", "mo_tmo_id"],
+            ):
+                mos_by_node[node_data["node_id"]].add(
+                    (int(node_data["mo_id"]), int(node_data["mo_tmo_id"]))
+                )
+        return mos_by_node
+
+    async def _get_lifecycle_tmos(
+        self, tmo_ids: Iterable[int]
+    ) -> dict[int, int | None]:
+        """Returns severity tprm id by id of TMO with lifecycle"""
+        tmo_ids = list(tmo_ids)
+        if not tmo_ids:
+            return dict()
+
+        severity_by_tmo = dict()
+        tmo_query = {
+            "bool": {
+                "filter": [
+                    {"terms": {"id": tmo_ids}},
+                    {"exists": {"field": "lifecycle_process_definition"}},
+                ]
+            }
+        }
+        async for tmo in self._search_all(
+            index=INVENTORY_TMO_INDEX_V2, query=tmo_query, includes=["id"]
+        ):
+            severity_by_tmo[int(tmo["id"])] = None
+        if not severity_by_tmo:
+            return severity_by_tmo
+
+        tprm_query = {
+            "bool": {
+                "filter": [
+                    {"terms": {"tmo_id": list(severity_by_tmo)}},
+                    *get_severity_tprm_filters(),
+                ]
+            }
+        }
+        async for tprm in self._search_all(
+            index=INVENTORY_TPRM_INDEX_V2,
+            query=tprm_query,
+            includes=["id", "tmo_id"],
+        ):
+            severity_by_tmo[int(tprm["tmo_id"])] = int(tprm["id"])
+        return severity_by_tmo
+
+    async def _get_mo_states(
+        self, mos: Iterable[tuple[int, int]], severity_by_tmo: dict
+    ) -> dict[int, tuple[str, float | None]]:
+        """Returns (state, severity) by MO id. Multi get is realtime, so just updated
+        states are returned even if the MO indexes were not refreshed"""
+        state_field = ZeebeProcessInstanceFields.STATE.value
+        states = dict()
+        for chunk_mos in get_chunks(mos, QUERY_MAX_SIZE):
+            docs = []
+            for mo_id, tmo_id in chunk_mos:
+                includes = [state_field]
+                severity_tprm_id = severity_by_tmo[tmo_id]
+                if severity_tprm_id:
+                    includes.append(
+                        f"{INVENTORY_PARAMETERS_FIELD_NAME}.{severity_tprm_id}"
+                    )
+                docs.append(
+                    {
+                        "_index": get_index_name_by_tmo(tmo_id),
+                        "_id": str(mo_id),
+                        "_source": includes,
+                    }
+                )
+            response = await self.elastic_client.mget(docs=docs)
+            for (mo_id, tmo_id), doc in zip(chunk_mos, response["docs"]):
+                if not doc.get("found"):
+                    continue
+                source = doc["_source"]
+                state = source.get(state_field)
+                if state not in LIFECYCLE_STATES:
+                    state = STATE_WITHOUT_PROCESS
+
+                severity = None
+                severity_tprm_id = severity_by_tmo[tmo_id]
+                if severity_tprm_id:
+                    severity = source.get(
+                        INVENTORY_PARAMETERS_FIELD_NAME, {}
+                    ).get(str(severity_tprm_id))
+                    if isinstance(severity, list):
+                        severity = max(severity, default=None)
+                states[mo_id] = (state, severity)
+        return states
+
+    async def _calculate_node_rollups(
+        self, parents: set[ParentRef]
+    ) -> dict[ParentRef, RollupCounts]:
+        children_by_parent = await self._get_children_by_parent(parents)
+        mos_by_node = await self._get_mos_by_node(
+            {node_id for ch in children_by_parent.values() for node_id in ch}
+        )
+        severity_by_tmo = await self._get_lifecycle_tmos(
+            {tmo_id for mos in mos_by_node.values() for _, tmo_id in mos}
+        )
+        mo_states = await self._get_mo_states(
+            mos={
+                mo
+                for mos in mos_by_node.values()
+                for mo in mos
+                if mo[1] in severity_by_tmo
+            },
+            severity_by_tmo=severity_by_tmo,
+        )
+
+        counts_by_parent = dict()
+        for parent in parents:
+            counts = RollupCounts()
+            for node_id in children_by_parent.get(parent, []):
+                for mo_id, _ in mos_by_node.get(node_id, []):
+                    mo_state = mo_states.get(mo_id)
+                    if mo_state is not None:
+                        counts.add_mo(*mo_state)
+            counts_by_parent[parent] = counts
+        return counts_by_parent
+
+    async def _save_versioned(
+        self,
+        rollup_ids: set[str],
+        calculate: Callable[
+            [set[str], dict[str, dict]], Awaitable[dict[str, dict | None]]
+        ],
+    ) -> dict[str, tuple[dict | None, dict]]:
+        """Calculates rollups by calculate(rollup_ids, stored rollups) and saves them if they were not saved
+        by other processes since they were read, other rollups are calculated again.
+        calculate returns None for rollups which are not saved. Returns (stored, saved) rollups by id"""
+        saved = dict()
+        for _ in range(MAX_SAVE_ATTEMPTS):
+            stored = await self._get_stored(rollup_ids)
+            rollups = await calculate(rollup_ids, stored)
+            actions = list()
+            changes = dict()
+            for rollup_id in rollup_ids:
+                rollup = rollups.get(rollup_id)
+                stored_rollup = stored.get(rollup_id)
+                stored_source = (
+                    stored_rollup["_source"] if stored_rollup else None
+                )
+                if rollup is None or rollup == stored_source:
+                    continue
+                action = dict(
+                    _index=self.rollups_index, _id=rollup_id, _source=rollup
+                )
+                if stored_rollup is None:
+                    action["_op_type"] = "create"
+                else:
+                    action["_op_type"] = "index"
+                    action["if_seq_no"] = stored_rollup["_seq_no"]
+                    action["if_primary_term"] = stored_rollup["_primary_term"]
+                actions.append(action)
+                changes[rollup_id] = (stored_source, rollup)
+
+            conflicted_ids = await self._save(actions)
+            for rollup_id, change in changes.items():
+                if rollup_id not in conflicted_ids:
+                    saved[rollup_id] = change
+            if not conflicted_ids:
+                return saved
+            rollup_ids = conflicted_ids
+        raise RollupSaveConflict(
+            f"Rollups {sorted(rollup_ids)} are not saved after {MAX_SAVE_ATTEMPTS} attempts"
+        )
+
+    async def _save(self, actions: list[dict]) -> set[str]:
+        """Saves rollups, returns ids of rollups which were changed by other processes since they were read"""
+        if not actions:
+            return set()
+        _, errors = await async_bulk(
+            client=self.elastic_client, actions=actions, raise_on_error=False
+        )
+        conflicted_ids = set()
+        failed = list()
+        for error in errors:
+            result = next(iter(error.values()))
+            if result.get("status") == 409:
+                conflicted_ids.add(result["_id"])
+            else:
+                failed.append(error)
+        if failed:
+            print(*failed, sep="\n")
+            raise BulkIndexError(
+                f"{len(failed)} rollup(s) failed to save.", failed
+            )
+        return conflicted_ids
+
+    async def refresh_parents(
+        self, parents: set[ParentRef], save_empty: bool = True
+    ):
+        """Recalculates rollups of the parent nodes and adds their changes to the rollups of their hierarchies.
+        Empty rollups of parents without rollups are saved only if save_empty, so a rollup saved
+        by another process from older data in the meantime is overwritten"""
+        if not parents:
+            return
+        parent_by_id = {
+            get_node_rollup_id(*parent): parent for parent in parents
+        }
+
+        async def calculate(
+            rollup_ids: set[str], stored: dict[str, dict]
+        ) -> dict[str, dict | None]:
+            counts_by_parent = await self._calculate_node_rollups(
+                {parent_by_id[rollup_id] for rollup_id in rollup_ids}
+            )
+            rollups = dict()
+            for rollup_id in rollup_ids:
+                hierarchy_id, parent_id = parent_by_id[rollup_id]
+                rollup = counts_by_parent[(hierarchy_id, parent_id)].to_dict()
+                if (
+                    not rollup["count"]
+                    and not save_empty
+                    and rollup_id not in stored
+                ):
+                    continue
+                rollups[rollup_id] = {
+                    "id": rollup_id,
+                    "rollup_type": NODE_ROLLUP_TYPE,
+                    "hierarchy_id": hierarchy_id,
+                    "node_id": parent_id,
+                    **rollup,
+                }
+            return rollups
+
+        saved = await self._save_versioned(set(parent_by_id), calculate)
+
+        changes_by_hierarchy = defaultdict(RollupCounts)
+        for rollup_id, (stored_rollup, rollup) in saved.items():
+            changes = changes_by_hierarchy[parent_by_id[rollup_id][0]]
+            changes.add_rollup(rollup)
+            changes.add_rollup(stored_rollup, sign=-1)
+        await self._add_to_hierarchies(changes_by_hierarchy)
+
+    async def _add_to_hierarchies(
+        self, changes_by_hierarchy: dict[int, RollupCounts]
+    ):
+        """Adds changes of rollups of nodes to the rollups of their hierarchies"""
+        hierarchy_by_id = {
+            get_hierarchy_rollup_id(h_id): h_id for h_id in changes_by_hierarchy
+        }
+
+        async def calculate(
+            rollup_ids: set[str], stored: dict[str, dict]
+        ) -> dict[str, dict | None]:
+            rollups = dict()
+            for rollup_id in rollup_ids:
+                hierarchy_id = hierarchy_by_id[rollup_id]
+                counts = RollupCounts()
+                if rollup_id in stored:
+                    counts.add_rollup(stored[rollup_id]["_source"])
+                counts.add_counts(changes_by_hierarchy[hierarchy_id])
+                rollup = counts.to_dict()
+                if not rollup["count"] and rollup_id not in stored:
+                    continue
+                rollups[rollup_id] = {
+                    "id": rollup_id,
+                    "rollup_type": HIERARCHY_ROLLUP_TYPE,
+                    "hierarchy_id": hierarchy_id,
+                    **rollup,
+                }
+            return rollups
+
+        await self._save_versioned(set(hierarchy_by_id), calculate)
+
+    async def _get_mo_count_and_max_severity(
+        self, tmo_id: int, severity_tprm_id: int
+    ) -> tuple[int, float | None]:
+        response = await self.elastic_client.search(
+            index=ALL_MO_OBJ_INDEXES_PATTERN,
+            query={"term": {"tmo_id": tmo_id}},
+            aggs={
+                "max_severity": {
+                    "max": {
+                        "field": f"{INVENTORY_PARAMETERS_FIELD_NAME}.{severity_tprm_id}"
+                    }
+                }
+            },
+            size=0,
+            track_total_hits=True,
+            ignore_unavailable=True,
+        )
+        return (
+            response["hits"]["total"]["value"],
+            response["aggregations"]["max_severity"]["value"],
+        )
+
+    async def refresh_tmos(self, tmo_ids: Iterable[int]):
+        """Recalculates rollups of TMOs: the number of all MOs of TMOs with lifecycle and severity
+        and their maximum severity, rollups of other TMOs are empty"""
+        tmo_by_id = {get_tmo_rollup_id(tmo_id): tmo_id for tmo_id in tmo_ids}
+        if not tmo_by_id:
+            return
+
+        async def calculate(
+            rollup_ids: set[str], stored: dict[str, dict]
+        ) -> dict[str, dict | None]:
+            severity_by_tmo = await self._get_lifecycle_tmos(
+                tmo_by_id[rollup_id] for rollup_id in rollup_ids
+            )
+            rollups = dict()
+            for rollup_id in rollup_ids:
+                tmo_id = tmo_by_id[rollup_id]
+                count, max_severity = 0, None
+                severity_tprm_id = severity_by_tmo.get(tmo_id)
+                if severity_tprm_id:
+                    (
+                        count,
+                        max_severity,
+                    ) = await self._get_mo_count_and_max_severity(
+                        tmo_id=tmo_id, severity_tprm_id=severity_tprm_id
+                    )
+                rollups[rollup_id] = {
+                    "id": rollup_id,
+                    "rollup_type": TMO_ROLLUP_TYPE,
+                    "tmo_id": tmo_id,
+                    "count": count,
+                    "max_severity": max_severity,
+                }
+            return rollups
+
+        await self._save_versioned(set(tmo_by_id), calculate)
+
+    async def refresh_levels(self, hierarchy_ids: Iterable[int]):
+        """Recalculates TMOs of not virtual levels of hierarchies"""
+        hierarchy_by_id = {
+            get_levels_rollup_id(h_id): h_id for h_id in hierarchy_ids
+        }
+        if not hierarchy_by_id:
+            return
+
+        async def calculate(
+            rollup_ids: set[str], stored: dict[str, dict]
+        ) -> dict[str, dict | None]:
+            tmo_ids_by_hierarchy = defaultdict(set)
+            query = {
+                "bool": {
+                    "filter": [
+                        {
+                            "terms": {
+                                "hierarchy_id": [
+                                    hierarchy_by_id[rollup_id]
+                                    for rollup_id in rollup_ids
+                                ]
+                            }
+                        },
+                        {"term": {"is_virtual": False}},
+                    ]
+                }
+            }
+            async for level in self._search_all(
+                index=self.levels_index,
+                query=query,
+                includes=["hierarchy_id", "object_type_id"],
+            ):
+                if level.get("object_type_id"):
+                    tmo_ids_by_hierarchy[int(level["hierarchy_id"])].add(
+                        int(level["object_type_id"])
+                    )
+            return {
+                rollup_id: {
+                    "id": rollup_id,
+                    "rollup_type": LEVELS_ROLLUP_TYPE,
+                    "hierarchy_id": hierarchy_by_id[rollup_id],
+                    "tmo_ids": sorted(
+                        tmo_ids_by_hierarchy[hierarchy_by_id[rollup_id]]
+                    ),
+                }
+                for rollup_id in rollup_ids
+            }
+
+        await self._save_versioned(set(hierarchy_by_id), calculate)
+
+    async def get_parents_affected_by_msg(
+        self, msg_class_name: str, msg_event: str, msg: dict | None
+    ) -> set[ParentRef]:
+        """Returns the parents whose rollups are changed by the hierarchy changes message.
+        Called before and after the message handler, so both old and new parents are refreshed"""
+        if not msg or not msg.get("objects"):
+            return set()
+
+        objects = msg["objects"]
+        if msg_class_name == HierarchyMessageType.OBJ.value:
+            parents = {
+                (int(obj["hierarchy_id"]), obj.get("parent_id") or None)
+                for obj in objects
+            }
+            parents.update(
+                await self.get_parents_of_nodes(obj["id"] for obj in objects)
+            )
+            if msg_event == ObjEventStatus.DELETED.value:
+                parents.update(
+                    (int(obj["hierarchy_id"]), obj["id"]) for obj in objects
+                )
+            return parents
+
+        if msg_class_name == HierarchyMessageType.NODE_DATA.value:
+            node_ids = {obj["node_id"] for obj in objects if obj.get("node_id")}
+            node_ids.update(
+                await self.get_nodes_of_node_data(
+                    query={"match_all": {}},
+                    chunk_values=[int(obj["id"]) for obj in objects],
+                    field="id",
+                )
+            )
+            return await self.get_parents_of_nodes(node_ids)
+        return set()
+
+    async def refresh_by_mo_ids(self, mo_ids: Iterable[int]):
+        """Recalculates rollups of the parents of the nodes of MOs"""
+        node_ids = await self.get_nodes_of_node_data(
+            query={"match_all": {}}, chunk_values=mo_ids, field="mo_id"
+        )
+        parents = await self.get_parents_of_nodes(node_ids)
+        await self.refresh_parents(parents)
+
+    async def refresh_by_mos(self, mos: Iterable[tuple[int, int]]):
+        """Recalculates rollups of the parents of the nodes of MOs of TMOs with lifecycle
+        and rollups of these TMOs, mos are (mo_id, tmo_id) of created, updated or deleted MOs"""
+        mos = list(mos)
+        severity_by_tmo = await self._get_lifecycle_tmos(
+            {tmo_id for _, tmo_id in mos}
+        )
+        mo_ids = {mo_id for mo_id, tmo_id in mos if tmo_id in severity_by_tmo}
+        if mo_ids:
+            await self.refresh_by_mo_ids(mo_ids=mo_ids)
+        await self.refresh_tmos(
+            tmo_id for tmo_id, tprm_id in severity_by_tmo.items() if tprm_id
+        )
+
+    async def refresh_by_tmos(self, tmo_ids: Iterable[int]):
+        """Recalculates rollups of created, updated or deleted TMOs and of TMOs of changed TPRMs,
+        they can get or lose lifecycle and severity"""
+        await self.refresh_tmos(tmo_ids)
+
+    async def refresh_by_prms(self, prms: Iterable[tuple[int, int]]):
+        """Recalculates rollups of the parents of the nodes of MOs whose severity is changed,
+        prms are (mo_id, tprm_id) of created, updated or deleted PRMs. Values of other TPRMs
+        are not part of rollups"""
+        prms = list(prms)
+        if not prms:
+            return
+
+        tmo_by_tprm = dict()
+        tprm_query = {
+            "bool": {
+                "filter": [
+                    {"terms": {"id": list({tprm_id for _, tprm_id in prms})}},
+                    *get_severity_tprm_filters(),
+                ]
+            }
+        }
+        async for tprm in self._search_all(
+            index=INVENTORY_TPRM_INDEX_V2,
+            query=tprm_query,
+            includes=["id", "tmo_id"],
+        ):
+            tmo_by_tprm[int(tprm["id"])] = int(tprm["tmo_id"])
+        if not tmo_by_tprm:
+            return
+
+        severity_by_tmo = await self._get_lifecycle_tmos(
+            set(tmo_by_tprm.values())
+        )
+        mo_ids = {
+            mo_id
+            for mo_id, tprm_id in prms
+            if tprm_id in tmo_by_tprm
+            and severity_by_tmo.get(tmo_by_tprm[tprm_id]) == tprm_id
+        }
+        if mo_ids:
+            await self.refresh_by_mo_ids(mo_ids=mo_ids)
+            await self.refresh_tmos(
+                {
+                    tmo_by_tprm[tprm_id]
+                    for mo_id, tprm_id in prms
+                    if mo_id in mo_ids and tprm_id in tmo_by_tprm
+                }
+            )
+
+    async def refresh_by_process_instance_id(self, process_instance_id: int):
+        """Recalculates rollups of the parents of the nodes of MOs with the process instance"""
+        response = await self.elastic_client.search(
+            index=ALL_MO_OBJ_INDEXES_PATTERN,
+            query={
+                "term": {
+                    ZeebeProcessInstanceFields.PROCESS_INSTANCE_ID.value: process_instance_id
+                }
+            },
+            size=QUERY_MAX_SIZE,
+            source_includes=["id"],
+            track_total_hits=False,
+            ignore_unavailable=True,
+        )
+        mo_ids = [hit["_source"]["id"] for hit in response["hits"]["hits"]]
+        if mo_ids:
+            await self.refresh_by_mo_ids(mo_ids=mo_ids)
+
+    async def rebuild_hierarchy(self, hierarchy_id: int):
+        """Recalculates all rollups of the hierarchy, e.g. after its reload"""
+        await self.delete_hierarchies([hierarchy_id])
+        parents = set()
+        async for node in self._search_all(
+            index=self.obj_index,
+            query={"term": {"hierarchy_id": hierarchy_id}},
+            includes=["parent_id"],
+        ):
+            parents.add((hierarchy_id, node.get("parent_id") or None))
+        for chunk_parents in get_chunks(parents, TERMS_MAX_SIZE):
+            await self.refresh_parents(set(chunk_parents), save_empty=False)
+        await self.refresh_levels([hierarchy_id])
+
+    async def rebuild_tmos(self):
+        """Recalculates rollups of all TMOs with lifecycle"""
+        tmo_ids = [
+            int(tmo["id"])
+            async for tmo in self._search_all(
+                index=INVENTORY_TMO_INDEX_V2,
+                query={"exists": {"field": "lifecycle_process_definition"}},
+                includes=["id"],
+            )
+        ]
+        for chunk_tmo_ids in get_chunks(tmo_ids, TERMS_MAX_SIZE):
+            await self.refresh_tmos(chunk_tmo_ids)
+
+    async def rebuild_all_hierarchies(self):
+        """Recalculates rollups of all hierarchies and TMOs, e.g. when the rollups index is created
+        for hierarchies which are already loaded"""
+        hierarchy_ids = [
+            int(hierarchy["id"])
+            async for hierarchy in self._search_all(
+                index=HIERARCHY_HIERARCHIES_INDEX,
+                query={"match_all": {}},
+                includes=["id"],
+            )
+        ]
+        for hierarchy_id in hierarchy_ids:
+            await self.rebuild_hierarchy(hierarchy_id)
+        await self.rebuild_tmos()
+
+    async def delete_hierarchies(self, hierarchy_ids: list[int]):
+        # rollups are saved without refresh, delete by query deletes only refreshed documents
+        await self.elastic_client.indices.refresh(
+            index=self.rollups_index, ignore_unavailable=True
+        )
+        await self.elastic_client.delete_by_query(
+            index=self.rollups_index,
+            query={"terms": {"hierarchy_id": hierarchy_ids}},
+            ignore_unavailable=True,
+            conflicts="proceed",
+            refresh=True,
+        )
+
+
+async def _rebuild_all_hierarchies(elastic_client: AsyncElasticsearch):
+    print("Rebuild hierarchy rollups - start")
+    try:
+        await HierarchyRollupStore(
+            elastic_client=elastic_client
+        ).rebuild_all_hierarchies()
+    except Exception as ex:
+        print("Rebuild hierarchy rollups", type(ex), ex)
+        return
+    print("Rebuild hierarchy rollups - end")
+
+
+def start_rebuild_of_all_hierarchies(elastic_client: AsyncElasticsearch):
+    """Recalculates rollups of all hierarchies in background"""
+    task = asyncio.create_task(_rebuild_all_hierarchies(elastic_client))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
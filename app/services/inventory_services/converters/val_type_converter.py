@@ -1,5 +1,7 @@
 import pickle
-from typing import Any, Callable, Iterable
+from datetime import datetime
+from typing import Any, Callable, Iterable, Sequence
+
 from dateutil.parser import parse
 
 from elastic.enum_models import InventoryFieldValType, ElasticFieldValType
@@ -24,12 +26,94 @@ def to_bool(value: Any):
     return False
 
 
+def parse_datetime(value: Any) -> datetime:
+    """Parses ISO 8601 strings by datetime.fromisoformat, other formats by dateutil parser"""
+    value = str(value)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parse(value)
+
+
 def to_date(value):
-    return str(parse(str(value)).date().__format__("%Y-%m-%d"))
+    return str(parse_datetime(value).date().__format__("%Y-%m-%d"))
 
 
 def to_datetime(value):
-    return parse(str(value)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return parse_datetime(value).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# Column converters convert all values of one TPRM at once. Dates are parsed once per distinct value:
+# values of a date TPRM repeat often, and parsing is the most expensive conversion
+
+
+def column_to_str(values: Sequence) -> list:
+    return list(map(str, values))
+
+
+def column_to_bool(values: Sequence) -> list:
+    true_values = {"1", "true", "yes"}
+    return [str(item).lower() in true_values for item in values]
+
+
+def _convert_distinct_values(values: Sequence, converter: Callable) -> list:
+    converted = {value: converter(value) for value in dict.fromkeys(values)}
+    return [converted[value] for value in values]
+
+
+def column_to_date(values: Sequence) -> list:
+    return _convert_distinct_values(values, to_date)
+
+
+def column_to_datetime(values: Sequence) -> list:
+    return _convert_distinct_values(values, to_datetime)
+
+
+column_convert_functions_by_value_convert_function = {
+    to_str: column_to_str,
+    to_bool: column_to_bool,
+    to_date: column_to_date,
+    to_datetime: column_to_datetime,
+}
+
+
+def convert_column(values: Sequence, converter: Callable) -> list:
+    """Converts all values by converter. Uses column converter if it exists for this converter"""
+    column_converter = column_convert_functions_by_value_convert_function.get(
+        converter
+    )
+    if column_converter is None:
+        return [converter(item) for item in values]
+    return column_converter(values)
+
+
+def convert_column_of_multiple_values(
+    values: Sequence[Iterable], converter: Callable
+) -> list[list]:
+    """Converts all items of all values by converter as one column and returns them grouped by values"""
+    lengths = list()
+    all_items = list()
+    for value in values:
+        value = list(value)
+        lengths.append(len(value))
+        all_items.extend(value)
+
+    converted_items = convert_column(all_items, converter)
+    result = list()
+    start = 0
+    for length in lengths:
+        result.append(converted_items[start : start + length])
+        start += length
+    return result
+
+
+def convert_column_of_multiple_pickled_values(
+    hex_values: Sequence[str], converter: Callable
+) -> list[list]:
+    """Converts all items of all values by converter. Each value must be hex formatted string"""
+    return convert_column_of_multiple_values(
+        [pickle.loads(bytes.fromhex(value)) for value in hex_values], converter
+    )
 
 
 convert_functions_by_inventory_val_type = {
@@ -117,6 +201,42 @@ def get_convert_function_by_val_type_for_multiple_pickled_values(
     return convert_multiply_values
 
 
+def get_column_convert_function_by_val_type(
+    val_type: str,
+) -> Callable[[Sequence], list]:
+    """Returns convert function for column of values"""
+    converter = get_convert_function_by_val_type(val_type)
+
+    def convert_values(values: Sequence):
+        return convert_column(values, converter)
+
+    return convert_values
+
+
+def get_column_convert_function_for_multiple_values(
+    val_type: str,
+) -> Callable[[Sequence[Iterable]], list[list]]:
+    """Returns convert function for column of multiple values"""
+    converter = get_convert_function_by_val_type(val_type)
+
+    def convert_values(values: Sequence[Iterable]):
+        return convert_column_of_multiple_values(values, converter)
+
+    return convert_values
+
+
+def get_column_convert_function_for_multiple_pickled_values(
+    val_type: str,
+) -> Callable[[Sequence[str]], list[list]]:
+    """Returns convert function for column of multiple values. Values must be hex formatted strings"""
+    converter = get_convert_function_by_val_type(val_type)
+
+    def convert_values(hex_values: Sequence[str]):
+        return convert_column_of_multiple_pickled_values(hex_values, converter)
+
+    return convert_values
+
+
 def get_converted_func_by_val_type_and_multiple_from_prm_index(
     value: str, val_type: str, multiple: bool
 ):
@@ -0,0 +1,231 @@
+import math
+from typing import List, Literal
+
+from elasticsearch import AsyncElasticsearch
+
+from services.group_builder.models import GroupStatisticUniqueFields
+from services.inventory_services.models import InventoryMODefaultFields
+
+"""
+Clusters and vector tiles of MOs for maps. Coordinates of MO are stored as latitude and longitude numbers,
+so points are aggregated by the geo_point runtime field built from them: the bounding box is filtered
+by the indexed numbers and only the matched MOs run the script. Lines are read from geometry.path
+"""
+
+LOCATION_FIELD = "location"
+LOCATION_RUNTIME_MAPPINGS = {
+    LOCATION_FIELD: {
+        "type": "geo_point",
+        "script": {
+            "source": (
+                "if (doc['latitude'].size() != 0 && doc['longitude'].size() != 0) "
+                "{ emit(doc['latitude'].value, doc['longitude'].value); }"
+            )
+        },
+    }
+}
+GEOMETRY_PATH_FIELD = "geometry.path"
+# part of tile size added to each side of tile, as the default buffer (5) and extent (4096) of search_mvt
+TILE_BUFFER = 5 / 4096
+# properties of MO features in vector tiles
+VECTOR_TILE_FIELDS = [
+    InventoryMODefaultFields.ID.value,
+    InventoryMODefaultFields.TMO_ID.value,
+    InventoryMODefaultFields.NAME.value,
+]
+
+
+def get_tile_bounding_box(
+    zoom: int, x: int, y: int
+) -> tuple[float, float, float, float]:
+    """Returns bounding box (latitude_min, latitude_max, longitude_min, longitude_max) of tile zoom/x/y
+    of Web Mercator with the buffer of vector tiles"""
+    tiles = 2**zoom
+
+    def get_longitude(tile_x: float) -> float:
+        return min(max(tile_x / tiles * 360 - 180, -180.0), 180.0)
+
+    def get_latitude(tile_y: float) -> float:
+        tile_y = min(max(tile_y, 0), tiles)
+        return math.degrees(
+            math.atan(math.sinh(math.pi * (1 - 2 * tile_y / tiles)))
+        )
+
+    return (
+        get_latitude(y + 1 + TILE_BUFFER),
+        get_latitude(y - TILE_BUFFER),
+        get_longitude(x - TILE_BUFFER),
+        get_longitude(x + 1 + TILE_BUFFER),
+    )
+
+
+def get_map_objects_query(
+    geometry: Literal["points", "lines"],
+    only_active: bool,
+    bounding_box: tuple[float, float, float, float] | None = None,
+    conditions: List[dict] | None = None,
+) -> dict:
+    """Returns query of MOs which are not groups, with coordinates (points) or with geometry (lines),
+    in bounding_box (latitude_min, latitude_max, longitude_min, longitude_max) if it is set,
+    and matching conditions"""
+    if geometry == "points":
+        location_condition = [
+            {"exists": {"field": InventoryMODefaultFields.LATITUDE.value}},
+            {"exists": {"field": InventoryMODefaultFields.LONGITUDE.value}},
+        ]
+    else:
+        location_condition = [{"exists": {"field": GEOMETRY_PATH_FIELD}}]
+
+    if bounding_box is not None:
+        latitude_min, latitude_max, longitude_min, longitude_max = bounding_box
+        if geometry == "points":
+            location_condition = [
+                {
+                    "range": {
+                        InventoryMODefaultFields.LATITUDE.value: {
+                            "gte": latitude_min,
+                            "lte": latitude_max,
+                        }
+                    }
+                },
+                {
+                    "range": {
+                        InventoryMODefaultFields.LONGITUDE.value: {
+                            "gte": longitude_min,
+                            "lte": longitude_max,
+                        }
+                    }
+                },
+            ]
+        else:
+            location_condition.append(
+                {
+                    "geo_bounding_box": {
+                        GEOMETRY_PATH_FIELD: {
+                            "top_left": {
+                                "lat": latitude_max,
+                                "lon": longitude_min,
+                            },
+                            "bottom_right": {
+                                "lat": latitude_min,
+                                "lon": longitude_max,
+                            },
+                        }
+                    }
+                }
+            )
+
+    return {
+        "bool": {
+            "filter": [
+                *location_condition,
+                {"term": {InventoryMODefaultFields.ACTIVE.value: only_active}},
+                *(conditions or []),
+            ],
+            "must_not": [
+                {
+                    "exists": {
+                        "field": GroupStatisticUniqueFields.GROUP_NAME.value
+                    }
+                }
+            ],
+        }
+    }
+
+
+def parse_clusters(grid_aggregation: dict) -> List[dict]:
+    """Returns clusters from buckets of grid aggregation with centroid and sample sub aggregations"""
+    clusters = list()
+    for bucket in grid_aggregation["buckets"]:
+        centroid = bucket["centroid"].get("location")
+        clusters.append(
+            {
+                "key": bucket["key"],
+                "count": bucket["doc_count"],
+                "centroid": centroid,
+                "sample_id": int(bucket["sample_id"]["value"])
+                if bucket["sample_id"]["value"] is not None
+                else None,
+            }
+        )
+    return clusters
+
+
+async def get_clusters(
+    elastic_client: AsyncElasticsearch,
+    index: str,
+    query: dict,
+    grid: Literal["geotile", "geohash"],
+    precision: int,
+    size: int,
+) -> dict:
+    """Returns number of MOs and clusters of points of MOs matching query, grouped by cells of grid"""
+    search_res = await elastic_client.search(
+        index=index,
+        query=query,
+        runtime_mappings=LOCATION_RUNTIME_MAPPINGS,
+        size=0,
+        track_total_hits=True,
+        ignore_unavailable=True,
+        aggs={
+            "clusters": {
+                f"{grid}_grid": {
+                    "field": LOCATION_FIELD,
+                    "precision": precision,
+                    "size": size,
+                },
+                "aggs": {
+                    "centroid": {"geo_centroid": {"field": LOCATION_FIELD}},
+                    # the smallest id is a sample which is the same for repeated requests
+                    "sample_id": {
+                        "min": {"field": InventoryMODefaultFields.ID.value}
+                    },
+                },
+            }
+        },
+    )
+    if "aggregations" not in search_res:
+        return {"clusters": [], "total_hits": 0}
+    return {
+        "clusters": parse_clusters(search_res["aggregations"]["clusters"]),
+        "total_hits": search_res["hits"]["total"]["value"],
+    }
+
+
+async def get_vector_tile(
+    elastic_client: AsyncElasticsearch,
+    index: str,
+    query: dict,
+    geometry: Literal["points", "lines"],
+    zoom: int,
+    x: int,
+    y: int,
+    size: int,
+    grid_precision: int,
+) -> bytes:
+    """Returns Mapbox vector tile with MOs matching query. Tiles of points contain the layer of
+    aggregated cells if grid_precision is greater than 0"""
+    if geometry == "points":
+        field = LOCATION_FIELD
+        runtime_mappings = LOCATION_RUNTIME_MAPPINGS
+    else:
+        field = GEOMETRY_PATH_FIELD
+        runtime_mappings = None
+        # aggregations of shapes are not used, lines are returned as hits
+        grid_precision = 0
+    tile = await elastic_client.search_mvt(
+        index=index,
+        field=field,
+        zoom=zoom,
+        x=x,
+        y=y,
+        query=query,
+        runtime_mappings=runtime_mappings,
+        fields=VECTOR_TILE_FIELDS,
+        size=size,
+        grid_precision=grid_precision,
+        grid_agg="geotile",
+        exact_bounds=False,
+        track_total_hits=False,
+    )
+    return tile.body
@@ -0,0 +1,184 @@
+from typing import List
+
+from elasticsearch import AsyncElasticsearch
+
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+)
+from services.inventory_services.models import InventoryMODefaultFields
+from settings.config import INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS
+
+"""
+Simplified geometries of lines. When MO is indexed, the path of its geometry is simplified by Douglas-Peucker
+for each zoom of INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS with the tolerance of one pixel of the 256 px tile
+of the zoom. Coordinates endpoints return the simplified path of the nearest stored zoom which is not
+lower than the requested one, and the full path for higher zooms
+"""
+
+# lines with fewer vertices are returned as they are at all zooms
+MIN_VERTICES_TO_SIMPLIFY = 8
+# paths of MultiPoint are ordered vertices of line
+LINE_GEOMETRY_TYPES = {"LineString", "MultiPoint", "MultiLineString"}
+GEOMETRY_FIELD = InventoryMODefaultFields.GEOMETRY.value
+SIZE_PER_STEP = 10_000
+
+
+def get_tolerance_by_zoom(zoom: int) -> float:
+    """Returns size of one pixel of the 256 px tile of zoom in degrees"""
+    return 360 / (256 * 2**zoom)
+
+
+def get_level_key(zoom: int) -> str:
+    return f"z{zoom}"
+
+
+def get_level_key_by_zoom(zoom: int | None) -> str | None:
+    """Returns key of the stored level for map zoom, None if the full geometry is required"""
+    if zoom is None:
+        return None
+    for level_zoom in INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS:
+        if level_zoom >= zoom:
+            return get_level_key(level_zoom)
+    return None
+
+
+def __get_distance_to_segment(
+    point: List[float], start: List[float], end: List[float]
+) -> float:
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    if dx == 0 and dy == 0:
+        return ((point[0] - start[0]) ** 2 + (point[1] - start[1]) ** 2) ** 0.5
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (
+        dx * dx + dy * dy
+    )
+    t = max(0.0, min(1.0, t))
+    x = start[0] + t * dx
+    y = start[1] + t * dy
+    return ((point[0] - x) ** 2 + (point[1] - y) ** 2) ** 0.5
+
+
+def simplify_line(
+    coordinates: List[List[float]], tolerance: float
+) -> List[List[float]]:
+    """Returns vertices of line kept by Douglas-Peucker with tolerance, the first and the last are always kept"""
+    if len(coordinates) < 3:
+        return coordinates
+    keep = [False] * len(coordinates)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coordinates) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_distance = 0.0
+        max_index = None
+        for index in range(start + 1, end):
+            distance = __get_distance_to_segment(
+                coordinates[index], coordinates[start], coordinates[end]
+            )
+            if distance > max_distance:
+                max_distance = distance
+                max_index = index
+        if max_index is not None and max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((start, max_index))
+            stack.append((max_index, end))
+    return [vertex for vertex, is_kept in zip(coordinates, keep) if is_kept]
+
+
+def get_simplified_geometries(path: dict) -> dict | None:
+    """Returns simplified paths by level key for path of line with many vertices, otherwise None"""
+    geometry_type = path.get("type")
+    coordinates = path.get("coordinates")
+    if geometry_type not in LINE_GEOMETRY_TYPES or not coordinates:
+        return None
+    if geometry_type == "MultiLineString":
+        lines = coordinates
+    else:
+        lines = [coordinates]
+    if sum(len(line) for line in lines) < MIN_VERTICES_TO_SIMPLIFY:
+        return None
+
+    simplified = dict()
+    for zoom in INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS:
+        tolerance = get_tolerance_by_zoom(zoom)
+        simplified_lines = [simplify_line(line, tolerance) for line in lines]
+        simplified[get_level_key(zoom)] = {
+            "type": geometry_type,
+            "coordinates": simplified_lines
+            if geometry_type == "MultiLineString"
+            else simplified_lines[0],
+        }
+    return simplified
+
+
+def set_simplified_geometry(mo_data: dict):
+    """Sets simplified geometries of the normalized geometry of MO document. If MO data has no geometry,
+    the field is removed, so an update keeps the simplified geometries of the current geometry"""
+    geometry = mo_data.get(GEOMETRY_FIELD)
+    simplified = None
+    if isinstance(geometry, dict) and isinstance(geometry.get("path"), dict):
+        simplified = get_simplified_geometries(geometry["path"])
+    if geometry and simplified:
+        mo_data[INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME] = simplified
+    elif geometry:
+        mo_data[INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME] = None
+    else:
+        mo_data.pop(INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME, None)
+
+
+def get_source_filter_for_level(
+    level_key: str, source_includes: List[str] | None
+) -> tuple[List[str] | None, List[str]]:
+    """Returns includes and excludes of source which read the simplified level instead of geometry"""
+    level_field = f"{INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME}.{level_key}"
+    if source_includes is not None:
+        source_includes = [
+            field for field in source_includes if field != GEOMETRY_FIELD
+        ] + [level_field, InventoryMODefaultFields.ID.value]
+    excludes = [GEOMETRY_FIELD] + [
+        f"{INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME}.{get_level_key(zoom)}"
+        for zoom in INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS
+        if get_level_key(zoom) != level_key
+    ]
+    return source_includes, excludes
+
+
+async def replace_geometries_by_level(
+    objects: List[dict],
+    level_key: str,
+    elastic_client: AsyncElasticsearch,
+    index: str | List[str],
+):
+    """Sets the simplified path of level_key as geometry of objects read with source filter of the level.
+    Geometries of objects without the level (short lines, points, documents indexed before) are read again"""
+    without_level = dict()
+    for item in objects:
+        simplified = item.pop(INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME, None)
+        path = simplified.get(level_key) if simplified else None
+        if path:
+            item[GEOMETRY_FIELD] = {"path": path}
+        else:
+            without_level[item[InventoryMODefaultFields.ID.value]] = item
+
+    mo_ids = list(without_level)
+    for start in range(0, len(mo_ids), SIZE_PER_STEP):
+        mo_ids_chunk = mo_ids[start : start + SIZE_PER_STEP]
+        search_res = await elastic_client.search(
+            index=index,
+            query={
+                "bool": {
+                    "filter": [
+                        {"terms": {"id": mo_ids_chunk}},
+                        {"exists": {"field": f"{GEOMETRY_FIELD}.path"}},
+                    ]
+                }
+            },
+            size=len(mo_ids_chunk),
+            source_includes=[InventoryMODefaultFields.ID.value, GEOMETRY_FIELD],
+            track_total_hits=False,
+            ignore_unavailable=True,
+        )
+        for hit in search_res["hits"]["hits"]:
+            item = without_level.get(hit["_source"]["id"])
+            if item is not None:
+                item[GEOMETRY_FIELD] = hit["_source"][GEOMETRY_FIELD]
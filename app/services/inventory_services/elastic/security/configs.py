@@ -16,6 +16,25 @@ INVENTORY_SECURITY_PRM_PERMISSION_INDEX = os.environ.get(
     "INVENTORY_SECURITY_PRM_PERMISSION_INDEX", "inventory_security_prm_index"
 )
 
+# If True, MO and TPRM permissions are kept only in the security indexes and applied at query time
+# by the cached sets of ids readable by each permission, instead of rewriting the permissions
+# field of MO and TPRM documents on each permission change
+INVENTORY_QUERY_TIME_PERMISSIONS = os.environ.get(
+    "INVENTORY_QUERY_TIME_PERMISSIONS", "False"
+).upper() in ("TRUE", "Y", "YES", "1")
+INVENTORY_PERMISSION_SETS_CACHE_TTL = float(
+    os.environ.get("INVENTORY_PERMISSION_SETS_CACHE_TTL", 30)
+)
+# Sets of readable ids with more ids are not sent in the query: they are saved into
+# INVENTORY_SECURITY_PERMISSION_SETS_INDEX and the query refers to them by terms lookup
+INVENTORY_PERMISSION_SET_MAX_TERMS = int(
+    os.environ.get("INVENTORY_PERMISSION_SET_MAX_TERMS", 10_000)
+)
+INVENTORY_SECURITY_PERMISSION_SETS_INDEX = os.environ.get(
+    "INVENTORY_SECURITY_PERMISSION_SETS_INDEX",
+    "inventory_security_permission_sets_index",
+)
+
 INVENTORY_SECURITY_MO_PERMISSION_SETTINGS = {
     "index.number_of_shards": 1,
     "index.number_of_replicas": 1,
@@ -51,3 +70,8 @@ INVENTORY_SECURITY_PRM_PERMISSION_SETTINGS = {
     "index.mapping.total_fields.limit": 10000,
     "index.store.preload": ["nvd", "dvd"],
 }
+
+INVENTORY_SECURITY_PERMISSION_SETS_SETTINGS = {
+    "index.number_of_shards": 1,
+    "index.number_of_replicas": 1,
+}
@@ -13,3 +13,14 @@ INVENTORY_SECURITY_INDEXES_MAPPING = {
         "object_type_id": {"type": "long"},
     }
 }
+
+# chunks of sets of ids readable by permissions, used by terms lookup
+INVENTORY_SECURITY_PERMISSION_SETS_MAPPING = {
+    "properties": {
+        "security_index": {"type": "keyword"},
+        "permission": {"type": "keyword"},
+        "version": {"type": "keyword"},
+        "ids": {"type": "long", "index": False, "doc_values": False},
+        "superseded_at": {"type": "long"},
+    }
+}
@@ -1,35 +1,17 @@
 import pickle
-from typing import Any, Callable
-from dateutil.parser import parse
+from typing import Callable, Sequence
 
 from elastic.enum_models import InventoryFieldValType
-
-
-def to_str(value: Any):
-    return str(value)
-
-
-def to_int(value: Any):
-    return int(value)
-
-
-def to_float(value: Any):
-    return float(value)
-
-
-def to_bool(value: Any):
-    value = str(value).lower()
-    if value in {"1", "true", "yes"}:
-        return True
-    return False
-
-
-def to_date(value):
-    return str(parse(str(value)).date().__format__("%Y-%m-%d"))
-
-
-def to_datetime(value):
-    return parse(str(value)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+from services.inventory_services.converters.val_type_converter import (
+    convert_column,
+    convert_column_of_multiple_pickled_values,
+    to_bool,
+    to_date,
+    to_datetime,
+    to_float,
+    to_int,
+    to_str,
+)
 
 
 inventory_kafka_mag_convert_functions_by_inventory_val_type = {
@@ -82,3 +64,20 @@ def get_convert_func_for_inventory_kafka_msg_for_multiple_pickled_values(
         return [converter(item) for item in values]
 
     return convert_multiply_values
+
+
+def get_column_convert_func_for_inventory_kafka_msg(
+    val_type: str, multiple: bool
+) -> Callable[[Sequence], list]:
+    """Returns convert function for column of values of one TPRM. If multiple is True, values must be
+    hex formatted strings"""
+    converter = get_convert_func_for_inventory_kafka_msg_for_not_multiple_tprm(
+        val_type
+    )
+
+    def convert_values(values: Sequence):
+        if multiple:
+            return convert_column_of_multiple_pickled_values(values, converter)
+        return convert_column(values, converter)
+
+    return convert_values
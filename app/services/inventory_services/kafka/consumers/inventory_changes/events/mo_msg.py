@@ -15,6 +15,9 @@ from services.inventory_services.kafka.consumers.inventory_changes.helpers.mo_ut
     change_value_of_mo_linked_values,
     normalize_geometry,
 )
+from services.inventory_services.coord_features.simplified_geometry.impl import (
+    set_simplified_geometry,
+)
 from services.inventory_services.models import InventoryFuzzySearchFields
 
 
@@ -93,6 +96,7 @@ async def on_create_mo(msg, async_client: AsyncElasticsearch):
                 mo_data["geometry"] = normalized
             else:
                 mo_data.pop("geometry", None)
+            set_simplified_geometry(mo_data)
 
             # add fields for fuzzy search
             fuzzy_search_data = dict()
@@ -351,6 +355,7 @@ async def on_update_mo(msg, async_client: AsyncElasticsearch):
             mo_data["geometry"] = normalized
         else:
             mo_data.pop("geometry", None)
+        set_simplified_geometry(mo_data)
 
         # add fields for fuzzy search
         fuzzy_search_data = dict()
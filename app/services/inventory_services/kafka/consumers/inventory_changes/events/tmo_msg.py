@@ -8,6 +8,7 @@ from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
 from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
+from services.cache_services.caches import tmo_cache
 
 
 async def on_create_tmo(msg, async_client: AsyncElasticsearch):
@@ -84,6 +85,7 @@ async def on_update_tmo(msg, async_client: AsyncElasticsearch):
             document=new_tmo_data,
             refresh="true",
         )
+    await tmo_cache.invalidate(keys=[str(tmo_id) for tmo_id in existing_tmos])
 
 
 async def on_delete_tmo(msg, async_client: AsyncElasticsearch):
@@ -103,3 +105,6 @@ async def on_delete_tmo(msg, async_client: AsyncElasticsearch):
         ignore_unavailable=True,
         refresh=True,
     )
+    await tmo_cache.invalidate(
+        keys=[str(tmo_id) for tmo_id in indexes_names_tmo_data.values()]
+    )
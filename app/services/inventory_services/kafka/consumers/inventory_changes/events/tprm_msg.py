@@ -3,6 +3,9 @@ from elasticsearch.helpers import async_bulk
 
 from elastic.config import INVENTORY_TPRM_INDEX_V2
 from elastic.enum_models import InventoryFieldValType
+from elastic.query_builder_service.inventory_index.mo_object.query_plan import (
+    filter_query_plans,
+)
 from elastic.query_builder_service.inventory_index.utils.convert_types_utils import (
     get_corresponding_elastic_data_type,
 )
@@ -10,6 +13,7 @@ from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
 from indexes_mapping.inventory.mapping import INVENTORY_PARAMETERS_FIELD_NAME
+from services.cache_services.caches import tprm_types_cache
 
 
 async def on_create_tprm(msg, async_client: AsyncElasticsearch):
@@ -116,6 +120,10 @@ async def on_update_tprm(msg, async_client: AsyncElasticsearch):
 
     if actions:
         await async_bulk(client=async_client, refresh="true", actions=actions)
+    await tprm_types_cache.invalidate(
+        keys=[str(tprm_id) for tprm_id in existing_tprm_ids]
+    )
+    filter_query_plans.invalidate(tprm_ids=existing_tprm_ids)
 
 
 async def on_delete_tprm(msg, async_client: AsyncElasticsearch):
@@ -129,3 +137,7 @@ async def on_delete_tprm(msg, async_client: AsyncElasticsearch):
             ignore_unavailable=True,
             refresh=True,
         )
+        await tprm_types_cache.invalidate(
+            keys=[str(tprm_id) for tprm_id in tpmr_ids]
+        )
+        filter_query_plans.invalidate(tprm_ids=tpmr_ids)
@@ -22,6 +22,7 @@ from services.inventory_services.converters.val_type_converter import (
     get_convert_function_by_val_type,
 )
 from services.inventory_services.kafka.consumers.inventory_changes.converters.val_type_converter import (
+    get_column_convert_func_for_inventory_kafka_msg,
     get_convert_func_for_inventory_kafka_msg_for_not_multiple_tprm,
     get_convert_func_for_inventory_kafka_msg_for_multiple_pickled_values,
 )
@@ -321,24 +322,7 @@ class PRMCreateHandler:
                             )
 
     async def __stage_4_other_prm_types_handler(self):
-        conv_f_by_tprm_id_for_other = dict()
-
-        for tprm_data in self.other_tprms.values():
-            val_type = tprm_data["val_type"]
-            is_multiple = tprm_data.get("multiple")
-            if is_multiple:
-                conv_f_by_tprm_id_for_other[tprm_data["id"]] = (
-                    get_convert_func_for_inventory_kafka_msg_for_multiple_pickled_values(
-                        val_type
-                    )
-                )
-            else:
-                conv_f_by_tprm_id_for_other[tprm_data["id"]] = (
-                    get_convert_func_for_inventory_kafka_msg_for_not_multiple_tprm(
-                        val_type
-                    )
-                )
-
+        prms_by_tprm_id = defaultdict(list)
         for prm_item in self.other_prms.values():
             tprm_id_of_prm = prm_item["tprm_id"]
 
@@ -351,10 +335,20 @@ class PRMCreateHandler:
             self.all_actions.append(prm_action)
 
             if tprm_id_of_prm in self.other_tprms:
+                prms_by_tprm_id[tprm_id_of_prm].append(prm_item)
+
+        # values are converted by columns of one TPRM
+        for tprm_id, prms in prms_by_tprm_id.items():
+            tprm_data = self.other_tprms[tprm_id]
+            convert_func = get_column_convert_func_for_inventory_kafka_msg(
+                val_type=tprm_data["val_type"],
+                multiple=bool(tprm_data.get("multiple")),
+            )
+            converted_values = convert_func([prm["value"] for prm in prms])
+            for prm_item, converted_value in zip(prms, converted_values):
                 prm_copy = dict()
                 prm_copy.update(prm_item)
-                convert_func = conv_f_by_tprm_id_for_other[tprm_id_of_prm]
-                prm_copy["value"] = convert_func(prm_copy["value"])
+                prm_copy["value"] = converted_value
                 self.changed_other_prms[prm_copy["id"]] = prm_copy
 
     async def __stage_5_create_update_actions_for_existing_mos(self):
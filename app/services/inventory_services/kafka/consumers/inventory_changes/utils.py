@@ -5,6 +5,8 @@ from confluent_kafka import cimpl
 from elastic.client import ElasticsearchManager
 from kafka_config.config import KAFKA_INVENTORY_CHANGES_TOPIC
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
+from services.hierarchy_services.rollups.store import HierarchyRollupStore
 
 from services.inventory_services.kafka.consumers.inventory_changes.configs import (
     INVENTORY_CHANGES_PROTOBUF_DESERIALIZERS,
@@ -21,6 +23,7 @@ class InventoryChangesHandler:
         self.msg_instance_class_name = None
         self.msg_instance_event = None
         self.elastic_client = ElasticsearchManager().get_client()
+        self.__deserialized_msg = None
 
     def clear_msg_data(self):
         """Clears the message data, if successful, change self.msg_instance_class_name and self.msg_instance_event,
@@ -91,18 +94,79 @@ class InventoryChangesHandler:
                 f"msg_event = '{self.msg_instance_event}'"
             )
 
-    async def process_the_message(self):
-        self.clear_msg_data()
-        if self.msg_instance_class_name:
+    def __get_deserialized_msg(self) -> dict | None:
+        """Returns the message as dict, None if the message has no class name and event
+        or can not be deserialized. The message is deserialized once"""
+        if self.__deserialized_msg is None:
+            self.clear_msg_data()
+            if not self.msg_instance_class_name:
+                return None
             deserialized_msg = self.__from_bytes_to_python_proto_model_msg()
+            if not deserialized_msg:
+                return None
+            self.__deserialized_msg = self.__deserialize_to_dict(
+                deserializer_instance=deserialized_msg
+            )
+        return self.__deserialized_msg
 
-            if deserialized_msg:
-                deserialized_msg = self.__deserialize_to_dict(
-                    deserializer_instance=deserialized_msg
-                )
-            else:
-                return
-            handler = self.__get_event_handler()
-            await handler(
-                msg=deserialized_msg, async_client=self.elastic_client
+    def get_lane_keys(self) -> set[tuple[str, int]] | None:
+        """Returns keys of MOs changed by the message: messages with a common key are processed in order.
+        None for messages which change TMO indexes (TMO, TPRM) or are not known: they are processed
+        after all previous messages and before all next ones"""
+        self.clear_msg_data()
+        key_field_by_class_name = {"MO": "id", "PRM": "mo_id"}
+        key_field = key_field_by_class_name.get(self.msg_instance_class_name)
+        if key_field is None:
+            return None
+        deserialized_msg = self.__get_deserialized_msg()
+        if deserialized_msg is None:
+            return None
+        return {
+            ("MO", int(item[key_field]))
+            for item in deserialized_msg.get("objects", [])
+        }
+
+    async def __update_rollups(self, msg: dict):
+        """Lifecycle states and severity of MOs, lifecycle of TMOs and their severity TPRMs
+        are part of hierarchy rollups"""
+        objects = msg.get("objects") or []
+        rollup_store = HierarchyRollupStore(elastic_client=self.elastic_client)
+        if self.msg_instance_class_name == "MO":
+            await rollup_store.refresh_by_mos(
+                mos={(int(mo["id"]), int(mo["tmo_id"])) for mo in objects}
+            )
+        elif self.msg_instance_class_name == "PRM":
+            await rollup_store.refresh_by_prms(
+                prms={
+                    (int(prm["mo_id"]), int(prm["tprm_id"])) for prm in objects
+                }
             )
+        elif self.msg_instance_class_name == "TMO":
+            await rollup_store.refresh_by_tmos(
+                tmo_ids={int(tmo["id"]) for tmo in objects}
+            )
+        elif self.msg_instance_class_name == "TPRM":
+            await rollup_store.refresh_by_tmos(
+                tmo_ids={int(tprm["tmo_id"]) for tprm in objects}
+            )
+
+    async def refresh_rollups(self):
+        """Refreshes only the hierarchy rollups changed by the message, e.g. to replay it
+        into hierarchy indexes which were reloaded while it was processed"""
+        deserialized_msg = self.__get_deserialized_msg()
+        if deserialized_msg is not None:
+            await self.__update_rollups(msg=deserialized_msg)
+
+    async def process_the_message(self):
+        deserialized_msg = self.__get_deserialized_msg()
+        if deserialized_msg is not None:
+            handler = self.__get_event_handler()
+            with observe_kafka_handler(
+                topic=self.msg.topic(),
+                msg_class_name=self.msg_instance_class_name,
+                msg_event=self.msg_instance_event,
+            ):
+                await handler(
+                    msg=deserialized_msg, async_client=self.elastic_client
+                )
+                await self.__update_rollups(msg=deserialized_msg)
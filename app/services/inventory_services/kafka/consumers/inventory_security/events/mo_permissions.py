@@ -6,8 +6,12 @@ from elasticsearch.helpers import async_bulk, BulkIndexError
 from elastic.config import ALL_MO_OBJ_INDEXES_PATTERN
 from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from services.inventory_services.elastic.security.configs import (
+    INVENTORY_QUERY_TIME_PERMISSIONS,
     INVENTORY_SECURITY_MO_PERMISSION_INDEX,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    permission_sets,
+)
 
 
 async def with_mo_permissions_create(
@@ -43,6 +47,14 @@ async def with_mo_permissions_create(
             print(e.errors)
             raise e
 
+    if INVENTORY_QUERY_TIME_PERMISSIONS:
+        # MO documents are not changed, permissions are applied at query time
+        await permission_sets.invalidate(
+            security_index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+            permissions={item.get("permission") for item in msg},
+        )
+        return
+
     for k, v in mo_ids_grouped_by_permissions.items():
         search_query = {"terms": {"id": v}}
         update_script = {
@@ -107,6 +119,14 @@ async def with_mo_permissions_update(
             print(e.errors)
             raise e
 
+    if INVENTORY_QUERY_TIME_PERMISSIONS:
+        # MO documents are not changed, permissions are applied at query time
+        await permission_sets.invalidate(
+            security_index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+            permissions={item.get("permission") for item in msg},
+        )
+        return
+
     for k, v in mo_ids_grouped_by_permissions_read_true.items():
         search_query = {"terms": {"id": v}}
         update_script = {
@@ -193,8 +213,18 @@ async def with_mo_permissions_delete(
             }
         }
         await async_client.delete_by_query(
-            index=INVENTORY_SECURITY_MO_PERMISSION_INDEX, query=delete_query
+            index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+            query=delete_query,
+            refresh=True,
+        )
+
+    if INVENTORY_QUERY_TIME_PERMISSIONS:
+        # MO documents are not changed, permissions are applied at query time
+        await permission_sets.invalidate(
+            security_index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+            permissions={item.get("permission") for item in msg},
         )
+        return
 
     for k, v in mo_ids_grouped_by_permissions.items():
         # search_query = {"terms": {"id": v}}
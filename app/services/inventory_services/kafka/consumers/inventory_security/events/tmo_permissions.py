@@ -6,6 +6,7 @@ from elasticsearch.helpers import async_bulk, BulkIndexError
 
 from elastic.config import INVENTORY_TMO_INDEX_V2
 from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from services.cache_services.caches import tmo_cache
 from services.inventory_services.elastic.security.configs import (
     INVENTORY_SECURITY_TMO_PERMISSION_INDEX,
 )
@@ -66,6 +67,9 @@ async def with_tmo_permissions_create(
             script=update_script,
             refresh=True,
         )
+    await tmo_cache.invalidate(
+        keys={str(item["parent_id"]) for item in msg if item.get("parent_id")}
+    )
 
 
 async def with_tmo_permissions_update(
@@ -164,6 +168,9 @@ async def with_tmo_permissions_update(
             script=update_script,
             refresh=True,
         )
+    await tmo_cache.invalidate(
+        keys={str(item["parent_id"]) for item in msg if item.get("parent_id")}
+    )
 
 
 async def with_tmo_permissions_delete(
@@ -231,3 +238,6 @@ async def with_tmo_permissions_delete(
             script=update_script,
             refresh=True,
         )
+    await tmo_cache.invalidate(
+        keys={str(item["parent_id"]) for item in msg if item.get("parent_id")}
+    )
@@ -3,6 +3,7 @@ from typing import List, Callable, Union
 from elastic.client import ElasticsearchManager
 from kafka_config.config import KAFKA_INVENTORY_SECURITY_TOPIC
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
 from services.inventory_services.kafka.consumers.inventory_security.configs import (
     INVENTORY_SECURITY_HANDLER_BY_MSG_PERMISSION_SCOPE,
 )
@@ -106,5 +107,10 @@ class InventorySecurityHandler:
 
             elastic_client = await self.__get_elastic_async_client()
             handler = self.__get_event_handler()
-            await handler(msg=deserialized_msg, async_client=elastic_client)
+            with observe_kafka_handler(
+                topic=self.msg.topic(),
+                msg_class_name=self.msg_instance_class_name,
+                msg_event=self.msg_instance_event,
+            ):
+                await handler(msg=deserialized_msg, async_client=elastic_client)
             # await elastic_client.close()
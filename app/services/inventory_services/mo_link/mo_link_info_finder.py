@@ -129,6 +129,10 @@ class MOLinkInfoFinder(object):
         ) = await self._gather_info_about_in_mo_link(
             mo_ids=[mo_id], is_admin=is_admin, user_permissions=user_permissions
         )
+        in_mo_by_id = MOLinkInfoFinder._get_mo_by_id(in_tmo_mo_data)
+        in_mo_links_by_tprm = MOLinkInfoFinder._group_in_mo_links_by_tprm(
+            root_mo_in_mo_data[mo_id]
+        )
         # get linked mos
         mo_link_data: list[MOLinkInfo] = []
         additional_info: list[TMOInfo] = []
@@ -146,28 +150,15 @@ class MOLinkInfoFinder(object):
                 )
             )
             for tprm_id in tprm_info[tmo_id]:  # type: dict
-                for mo_data in in_tmo_mo_data[tmo_id]:  # type: DTOMOInfo
-                    for mo_link_info in root_mo_in_mo_data[mo_id]:  # type: DTOMOLinkInfo
-                        if (
-                            mo_link_info.tprm_id == tprm_id
-                            and mo_data.id == mo_link_info.mo_id
-                        ):
-                            mo_link_data.append(
-                                MOLinkInfo(
-                                    mo_id=mo_data.id,
-                                    mo_name=mo_data.name,
-                                    parent_mo_name=mo_data.parent_name,
-                                    parent_mo_id=mo_data.p_id,
-                                    tmo_id=tmo_id,
-                                    tmo_name=tmo_name,
-                                    tprm_id=tprm_info[tmo_id][tprm_id].id,
-                                    tprm_name=tprm_info[tmo_id][tprm_id].name,
-                                    multiple=tprm_info[tmo_id][
-                                        tprm_id
-                                    ].multiple,
-                                    value=mo_link_info.value,
-                                )
-                            )
+                mo_link_data.extend(
+                    MOLinkInfoFinder._join_in_mo_links(
+                        mo_links=in_mo_links_by_tprm.get(tprm_id, []),
+                        in_mo_by_id=in_mo_by_id,
+                        tmo_id=tmo_id,
+                        tmo_name=tmo_name,
+                        tprm_data=tprm_info[tmo_id][tprm_id],
+                    )
+                )
         response = MOLinkInfoResponse(
             mo_link_info=mo_link_data,
             additional_info=additional_info,
@@ -193,8 +184,12 @@ class MOLinkInfoFinder(object):
             mo_ids=mo_ids, is_admin=is_admin, user_permissions=user_permissions
         )
 
+        in_mo_by_id = MOLinkInfoFinder._get_mo_by_id(in_tmo_mo_data)
         list_info = list()
         for root_mo_id in mo_ids:
+            in_mo_links_by_tprm = MOLinkInfoFinder._group_in_mo_links_by_tprm(
+                root_mo_in_mo_data[root_mo_id]
+            )
             mo_link_data: list[MOLinkInfo] = []
             additional_info: list[TMOInfo] = []
             for tmo_id, tmo_name in in_tmo_data.items():  # type: int, dict
@@ -215,32 +210,15 @@ class MOLinkInfoFinder(object):
                                 ],
                             )
                         )
-                        for mo_data in in_tmo_mo_data[tmo_id]:  # type: DTOMOInfo
-                            for mo_link_info in root_mo_in_mo_data[root_mo_id]:  # type: DTOMOLinkInfo
-                                if (
-                                    mo_link_info.tprm_id == current_tprm_in
-                                    and mo_data.id == mo_link_info.mo_id
-                                ):
-                                    mo_link_data.append(
-                                        MOLinkInfo(
-                                            mo_id=mo_data.id,
-                                            mo_name=mo_data.name,
-                                            parent_mo_name=mo_data.parent_name,
-                                            parent_mo_id=mo_data.p_id,
-                                            tmo_id=tmo_id,
-                                            tmo_name=tmo_name,
-                                            tprm_id=tprm_info[tmo_id][
-                                                current_tprm_in
-                                            ].id,
-                                            tprm_name=tprm_info[tmo_id][
-                                                current_tprm_in
-                                            ].name,
-                                            multiple=tprm_info[tmo_id][
-                                                current_tprm_in
-                                            ].multiple,
-                                            value=mo_link_info.value,
-                                        )
-                                    )
+                        mo_link_data.extend(
+                            MOLinkInfoFinder._join_in_mo_links(
+                                mo_links=in_mo_links_by_tprm[current_tprm_in],
+                                in_mo_by_id=in_mo_by_id,
+                                tmo_id=tmo_id,
+                                tmo_name=tmo_name,
+                                tprm_data=tprm_info[tmo_id][current_tprm_in],
+                            )
+                        )
             response = MOLinkInfoResponse(
                 mo_link_info=mo_link_data,
                 additional_info=additional_info,
@@ -461,6 +439,7 @@ class MOLinkInfoFinder(object):
             sorting={"id": {"order": "asc"}},
         )
 
+        root_mo_ids = set(mo_ids)
         for mo_link in in_mo_links:
             data: dict = mo_link.get("_source")
             if data:
@@ -477,7 +456,7 @@ class MOLinkInfoFinder(object):
                         f"Incorrect PRM value {data.get('value')} for mo link."
                     )
                 for root_mo_id in temp_dto_mo_in_info.value:
-                    if root_mo_id in mo_ids:
+                    if root_mo_id in root_mo_ids:
                         root_mo_in_mo_data[root_mo_id].append(
                             temp_dto_mo_in_info
                         )
@@ -511,6 +490,56 @@ class MOLinkInfoFinder(object):
             output_tmo.setdefault(data.tmo_id, []).append(data)
         return output_mo, output_tmo
 
+    @staticmethod
+    def _get_mo_by_id(tmo_mo_data: dict[int, list[DTOMOInfo]]) -> dict:
+        """return: {mo_id: DTOMOInfo}"""
+        return {
+            mo_data.id: mo_data
+            for list_mo_data in tmo_mo_data.values()
+            for mo_data in list_mo_data
+        }
+
+    @staticmethod
+    def _group_in_mo_links_by_tprm(
+        mo_links: list[DTOMOLinkInfo],
+    ) -> dict[int, list[DTOMOLinkInfo]]:
+        """return: {tprm_id: [MO link info, ]}, links of each TPRM are ordered by linked mo id"""
+        result = defaultdict(list)
+        # sort is stable, links of the same MO keep order of PRM ids
+        for mo_link_info in sorted(mo_links, key=lambda item: item.mo_id):
+            result[mo_link_info.tprm_id].append(mo_link_info)
+        return result
+
+    @staticmethod
+    def _join_in_mo_links(
+        mo_links: list[DTOMOLinkInfo],
+        in_mo_by_id: dict[int, DTOMOInfo],
+        tmo_id: int,
+        tmo_name: str,
+        tprm_data: DTOTPRMInfo,
+    ) -> list[MOLinkInfo]:
+        """Joins links of TPRM with linked MOs of TMO, links of MOs which are not available are skipped"""
+        result = []
+        for mo_link_info in mo_links:
+            mo_data = in_mo_by_id.get(mo_link_info.mo_id)
+            if mo_data is None or mo_data.tmo_id != tmo_id:
+                continue
+            result.append(
+                MOLinkInfo(
+                    mo_id=mo_data.id,
+                    mo_name=mo_data.name,
+                    parent_mo_name=mo_data.parent_name,
+                    parent_mo_id=mo_data.p_id,
+                    tmo_id=tmo_id,
+                    tmo_name=tmo_name,
+                    tprm_id=tprm_data.id,
+                    tprm_name=tprm_data.name,
+                    multiple=tprm_data.multiple,
+                    value=mo_link_info.value,
+                )
+            )
+        return result
+
     @staticmethod
     def _generate_mo_info(
         out_mo_data: dict, tprm_ids: list[int], tprm_id_out_mo_id_conn: dict
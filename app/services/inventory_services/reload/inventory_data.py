@@ -1,3 +1,4 @@
+import bisect
 import math
 import pickle
 
@@ -28,6 +29,9 @@ from elastic.enum_models import (
     InventoryFieldValType,
 )
 from elastic.pydantic_models import SearchModel
+from elastic.query_builder_service.inventory_index.mo_object.query_plan import (
+    filter_query_plans,
+)
 from elastic.query_builder_service.inventory_index.search_query_builder import (
     InventoryIndexQueryBuilder,
 )
@@ -58,12 +62,19 @@ from indexes_mapping.inventory.mapping import (
     INVENTORY_PRM_INDEX_MAPPING,
     INVENTORY_PRM_AND_MO_LINK_INDEX_MAPPING,
     INVENTORY_FUZZY_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
 )
+from services.cache_services.caches import tmo_cache, tprm_types_cache
 from services.inventory_services.converters.val_type_converter import (
+    get_column_convert_function_by_val_type,
+    get_column_convert_function_for_multiple_pickled_values,
     get_convert_function_by_val_type,
     get_convert_function_by_val_type_for_multiple_values,
     get_convert_function_by_val_type_for_multiple_pickled_values,
 )
+from services.inventory_services.coord_features.simplified_geometry.impl import (
+    set_simplified_geometry,
+)
 from services.inventory_services.kafka.consumers.inventory_changes.helpers.mo_utils import (
     normalize_geometry,
 )
@@ -415,11 +426,13 @@ class InventoryIndexesReloader:
         for tprm_item in mo_link_tprms:
             is_multiple = tprm_item["multiple"]
             if is_multiple:
-                convert_function = get_convert_function_by_val_type_for_multiple_pickled_values(
-                    InventoryFieldValType.INT.value
+                convert_function = (
+                    get_column_convert_function_for_multiple_pickled_values(
+                        InventoryFieldValType.INT.value
+                    )
                 )
             else:
-                convert_function = get_convert_function_by_val_type(
+                convert_function = get_column_convert_function_by_val_type(
                     InventoryFieldValType.INT.value
                 )
 
@@ -427,7 +440,12 @@ class InventoryIndexesReloader:
                 tprm_id=tprm_item["id"], async_channel=async_channel
             ):
                 actions = list()
-                for item in prm_chunk.prms:
+                converted_values = convert_function(
+                    [item.value for item in prm_chunk.prms]
+                )
+                for item, converted_value in zip(
+                    prm_chunk.prms, converted_values
+                ):
                     prm_action = dict(
                         _index=INVENTORY_PRM_INDEX,
                         _op_type="index",
@@ -450,7 +468,7 @@ class InventoryIndexesReloader:
                             "version": item.version,
                             "tprm_id": item.tprm_id,
                             "mo_id": item.mo_id,
-                            "value": convert_function(item.value),
+                            "value": converted_value,
                         },
                     )
                     actions.append(prm_action)
@@ -513,18 +531,25 @@ class InventoryIndexesReloader:
             for tprm_item in prm_link_tprms:
                 is_multiple = tprm_item["multiple"]
                 if is_multiple:
-                    convert_function = get_convert_function_by_val_type_for_multiple_pickled_values(
-                        InventoryFieldValType.INT.value
+                    convert_function = (
+                        get_column_convert_function_for_multiple_pickled_values(
+                            InventoryFieldValType.INT.value
+                        )
                     )
                 else:
-                    convert_function = get_convert_function_by_val_type(
+                    convert_function = get_column_convert_function_by_val_type(
                         InventoryFieldValType.INT.value
                     )
                 async for prm_chunk in get_raw_prm_data_by_tprm_id(
                     tprm_id=tprm_item["id"], async_channel=async_channel
                 ):
                     actions = list()
-                    for item in prm_chunk.prms:
+                    converted_values = convert_function(
+                        [item.value for item in prm_chunk.prms]
+                    )
+                    for item, converted_value in zip(
+                        prm_chunk.prms, converted_values
+                    ):
                         prm_action = dict(
                             _index=INVENTORY_PRM_INDEX,
                             _op_type="index",
@@ -547,7 +572,7 @@ class InventoryIndexesReloader:
                                 "version": item.version,
                                 "tprm_id": item.tprm_id,
                                 "mo_id": item.mo_id,
-                                "value": convert_function(item.value),
+                                "value": converted_value,
                             },
                         )
                         actions.append(prm_action)
@@ -906,6 +931,77 @@ class InventoryIndexesReloader:
                 modified_mo_data.append(mo_data_to_modify)
         return modified_mo_data
 
+    @staticmethod
+    def __build_mo_document(
+        item: dict,
+        tprms_not_mo_link_no_prm_link: dict,
+        ids_of_int_tprms: dict,
+    ) -> dict:
+        """Converts MO with params from inventory into the document of MO index.
+        Values of mo_link and prm_link parameters are added by the following updates"""
+        LONG_TYPE_MAX = 9223372036854775807
+
+        add_to_elastic = True
+        parameters_out_of_range = list()
+
+        params = dict()
+        for param in item["params"]:
+            if param["tprm_id"] in tprms_not_mo_link_no_prm_link:
+                param_tprm_id = param["tprm_id"]
+                if param_tprm_id in ids_of_int_tprms:
+                    is_multiple = ids_of_int_tprms[param_tprm_id]["multiple"]
+
+                    if is_multiple:
+                        not_greater = list()
+                        for v in param["value"]:
+                            if v > LONG_TYPE_MAX:
+                                add_to_elastic = False
+                                parameters_out_of_range.append(param)
+                            else:
+                                not_greater.append(v)
+                        if not_greater:
+                            params[param_tprm_id] = not_greater
+
+                    else:
+                        if param["value"] > LONG_TYPE_MAX:
+                            add_to_elastic = False
+                            parameters_out_of_range.append(param)
+                        else:
+                            params[param_tprm_id] = param["value"]
+
+                else:
+                    params[param_tprm_id] = param["value"]
+
+        if not add_to_elastic:
+            print(
+                f"One or more parameters are outside the range of long: MO.id = {item['id']}, "
+                f"parameters: {parameters_out_of_range}"
+            )
+
+        item[INVENTORY_PARAMETERS_FIELD_NAME] = params
+
+        geometry = item.get("geometry")
+        normalized = normalize_geometry(geometry)
+        if normalized:
+            item["geometry"] = normalized
+        else:
+            item.pop("geometry", None)
+        set_simplified_geometry(item)
+
+        del item["params"]
+
+        # add fields for fuzzy search
+        fuzzy_search_data = dict()
+        for enum_item in InventoryFuzzySearchFields:
+            field_name = enum_item.value
+            field_value = item.get(field_name)
+            fuzzy_search_data[field_name] = field_value
+
+        if fuzzy_search_data:
+            item[INVENTORY_FUZZY_FIELD_NAME] = fuzzy_search_data
+
+        return item
+
     async def __load_tprm_and_mo_data_by_tmo_id_version2(
         self, tmo_id: int, async_channel: Channel
     ):
@@ -958,73 +1054,14 @@ class InventoryIndexesReloader:
             for k, v in tprms_not_mo_link_no_prm_link.items()
             if v["val_type"] == "int"
         }
-        LONG_TYPE_MAX = 9223372036854775807
-
         async for grpc_chunk in grpc_response:
             actions = []
             for item in grpc_chunk.mos_with_params:
-                add_to_elastic = True
-                parameters_out_of_range = list()
-
-                item = pickle.loads(bytes.fromhex(item))
-
-                params = dict()
-                for param in item["params"]:
-                    if param["tprm_id"] in tprms_not_mo_link_no_prm_link:
-                        param_tprm_id = param["tprm_id"]
-                        if param_tprm_id in ids_of_int_tprms:
-                            is_multiple = ids_of_int_tprms[param_tprm_id][
-                                "multiple"
-                            ]
-
-                            if is_multiple:
-                                not_greater = list()
-                                for v in param["value"]:
-                                    if v > LONG_TYPE_MAX:
-                                        add_to_elastic = False
-                                        parameters_out_of_range.append(param)
-                                    else:
-                                        not_greater.append(v)
-                                if not_greater:
-                                    params[param_tprm_id] = not_greater
-
-                            else:
-                                if param["value"] > LONG_TYPE_MAX:
-                                    add_to_elastic = False
-                                    parameters_out_of_range.append(param)
-                                else:
-                                    params[param_tprm_id] = param["value"]
-
-                        else:
-                            params[param_tprm_id] = param["value"]
-
-                if not add_to_elastic:
-                    print(
-                        f"One or more parameters are outside the range of long: MO.id = {item['id']}, "
-                        f"parameters: {parameters_out_of_range}"
-                    )
-
-                item[INVENTORY_PARAMETERS_FIELD_NAME] = params
-
-                geometry = item.get("geometry")
-                normalized = normalize_geometry(geometry)
-                if normalized:
-                    item["geometry"] = normalized
-                else:
-                    item.pop("geometry", None)
-
-                del item["params"]
-
-                # add fields for fuzzy search
-                fuzzy_search_data = dict()
-                for enum_item in InventoryFuzzySearchFields:
-                    field_name = enum_item.value
-                    field_value = item.get(field_name)
-                    fuzzy_search_data[field_name] = field_value
-
-                if fuzzy_search_data:
-                    item[INVENTORY_FUZZY_FIELD_NAME] = fuzzy_search_data
-
+                item = self.__build_mo_document(
+                    item=pickle.loads(bytes.fromhex(item)),
+                    tprms_not_mo_link_no_prm_link=tprms_not_mo_link_no_prm_link,
+                    ids_of_int_tprms=ids_of_int_tprms,
+                )
                 action_item = dict(
                     _index=new_index_name,
                     _op_type="index",
@@ -1044,64 +1081,105 @@ class InventoryIndexesReloader:
 
         # if was mo_links update mo params
         if mo_link_tprms:
-            for _, tprm_data in mo_link_tprms.items():
-                data_per_step = 10000
-                search_query = {"match": {"tprm_id": tprm_data["id"]}}
-                is_multiple = tprm_data["multiple"]
-                if is_multiple:
-                    convert_function = (
-                        get_convert_function_by_val_type_for_multiple_values(
-                            InventoryFieldValType.INT.value
-                        )
-                    )
-                else:
-                    convert_function = get_convert_function_by_val_type(
+            await self.__update_mo_link_params(
+                index_name=new_index_name,
+                mo_link_tprms=mo_link_tprms,
+                async_channel=async_channel,
+            )
+        # if was prm_links update mo params
+        if prm_link_tprms:
+            await self.__update_prm_link_params(
+                index_name=new_index_name, prm_link_tprms=prm_link_tprms
+            )
+
+    @staticmethod
+    def __get_prms_of_tprm_query(
+        tprm_id: int, mo_id_range: tuple[int, int] | None
+    ) -> dict:
+        """Returns query of PRMs of tprm_id, only of MOs with id in [start, end) if mo_id_range is set"""
+        if mo_id_range is None:
+            return {"match": {"tprm_id": tprm_id}}
+        start, end = mo_id_range
+        return {
+            "bool": {
+                "filter": [
+                    {"match": {"tprm_id": tprm_id}},
+                    {"range": {"mo_id": {"gte": start, "lt": end}}},
+                ]
+            }
+        }
+
+    async def __update_mo_link_params(
+        self,
+        index_name: str,
+        mo_link_tprms: dict,
+        async_channel: Channel,
+        mo_id_range: tuple[int, int] | None = None,
+    ):
+        """Sets names of linked MOs as values of mo_link parameters of MOs in index_name"""
+        for _, tprm_data in mo_link_tprms.items():
+            data_per_step = 10000
+            search_query = self.__get_prms_of_tprm_query(
+                tprm_data["id"], mo_id_range
+            )
+            is_multiple = tprm_data["multiple"]
+            if is_multiple:
+                convert_function = (
+                    get_convert_function_by_val_type_for_multiple_values(
                         InventoryFieldValType.INT.value
                     )
-
-                search_res = await self.elastic_client.search(
-                    query=search_query,
-                    index=INVENTORY_PRM_INDEX,
-                    ignore_unavailable=True,
-                    track_total_hits=True,
-                    size=0,
+                )
+            else:
+                convert_function = get_convert_function_by_val_type(
+                    InventoryFieldValType.INT.value
                 )
 
-                total_hits = search_res["hits"]["total"]["value"]
-                if total_hits:
-                    steps = math.ceil(total_hits / data_per_step)
-
-                    for step in range(steps):
-                        start = step * data_per_step
-                        search_res = await self.elastic_client.search(
-                            query=search_query,
-                            index=INVENTORY_PRM_INDEX,
-                            from_=start,
-                            ignore_unavailable=True,
-                            track_total_hits=True,
-                            size=data_per_step,
-                        )
-                        if search_res["hits"]["total"]["value"]:
-                            if not is_multiple:
-                                await self.__mo_tprm_value_updater_for_mo_link_with_multiple_false(
-                                    mo_data_index_name=new_index_name,
-                                    elastic_search_results=search_res,
-                                    convert_function=convert_function,
-                                    async_channel=async_channel,
-                                )
-                            else:
-                                await self.__mo_tprm_value_updater_for_mo_link_with_multiple_true(
-                                    mo_data_index_name=new_index_name,
-                                    elastic_search_results=search_res,
-                                    convert_function=convert_function,
-                                    async_channel=async_channel,
-                                )
+            search_res = await self.elastic_client.search(
+                query=search_query,
+                index=INVENTORY_PRM_INDEX,
+                ignore_unavailable=True,
+                track_total_hits=True,
+                size=0,
+            )
 
-        # if was prm_links update mo params
-        temporary_tprm_prm_link_cache = dict_of_loaded_tprms.get(
-            "temporary_tprm_prm_link_cache"
-        )
-        for _, tprm_data in temporary_tprm_prm_link_cache.items():
+            total_hits = search_res["hits"]["total"]["value"]
+            if total_hits:
+                steps = math.ceil(total_hits / data_per_step)
+
+                for step in range(steps):
+                    start = step * data_per_step
+                    search_res = await self.elastic_client.search(
+                        query=search_query,
+                        index=INVENTORY_PRM_INDEX,
+                        from_=start,
+                        ignore_unavailable=True,
+                        track_total_hits=True,
+                        size=data_per_step,
+                    )
+                    if search_res["hits"]["total"]["value"]:
+                        if not is_multiple:
+                            await self.__mo_tprm_value_updater_for_mo_link_with_multiple_false(
+                                mo_data_index_name=index_name,
+                                elastic_search_results=search_res,
+                                convert_function=convert_function,
+                                async_channel=async_channel,
+                            )
+                        else:
+                            await self.__mo_tprm_value_updater_for_mo_link_with_multiple_true(
+                                mo_data_index_name=index_name,
+                                elastic_search_results=search_res,
+                                convert_function=convert_function,
+                                async_channel=async_channel,
+                            )
+
+    async def __update_prm_link_params(
+        self,
+        index_name: str,
+        prm_link_tprms: dict,
+        mo_id_range: tuple[int, int] | None = None,
+    ):
+        """Sets values of linked PRMs as values of prm_link parameters of MOs in index_name"""
+        for _, tprm_data in prm_link_tprms.items():
             base_tprm_is_multiple = tprm_data["multiple"]
             base_tprm_id = tprm_data["id"]
 
@@ -1130,7 +1208,9 @@ class InventoryIndexesReloader:
                     prm_mod_function = self.__prm_handler_base_prm_multiply_true_corresp_tprm_multiple_false
 
             data_per_step = 10000
-            search_query = {"match": {"tprm_id": base_tprm_id}}
+            search_query = self.__get_prms_of_tprm_query(
+                base_tprm_id, mo_id_range
+            )
             if base_tprm_is_multiple:
                 base_convert_function = get_convert_function_by_val_type_for_multiple_pickled_values(
                     InventoryFieldValType.INT.value
@@ -1208,12 +1288,14 @@ class InventoryIndexesReloader:
                         join_data_stages.append(join_data_stage)
 
                 if corresponding_tprm_is_multiple:
-                    corresponding_convert_function = get_convert_function_by_val_type_for_multiple_pickled_values(
-                        corresponding_tprm_val_type
+                    corresponding_convert_function = (
+                        get_column_convert_function_for_multiple_pickled_values(
+                            corresponding_tprm_val_type
+                        )
                     )
                 else:
                     corresponding_convert_function = (
-                        get_convert_function_by_val_type(
+                        get_column_convert_function_by_val_type(
                             corresponding_tprm_val_type
                         )
                     )
@@ -1237,14 +1319,18 @@ class InventoryIndexesReloader:
                         size=len(ids_of_corresponding_prms),
                     )
 
-                    stage_results = {
-                        prm_data["_source"][
-                            "id"
-                        ]: corresponding_convert_function(
-                            prm_data["_source"]["value"]
-                        )
+                    stage_prms = [
+                        prm_data["_source"]
                         for prm_data in stage_prm_search_res["hits"]["hits"]
-                    }
+                    ]
+                    stage_results = dict(
+                        zip(
+                            [prm_data["id"] for prm_data in stage_prms],
+                            corresponding_convert_function(
+                                [prm_data["value"] for prm_data in stage_prms]
+                            ),
+                        )
+                    )
 
                     updated_mo_data = prm_mod_function(
                         stage_results, modifications_of_mo_params
@@ -1260,7 +1346,7 @@ class InventoryIndexesReloader:
                             }
                         }
                         action_item = dict(
-                            _index=new_index_name,
+                            _index=index_name,
                             _op_type="update",
                             _id=mo_data["mo_id"],
                             doc=data,
@@ -1272,6 +1358,171 @@ class InventoryIndexesReloader:
                         actions=actions,
                     )
 
+    async def __index_mo_documents_keeping_other_fields(
+        self, index_name: str, documents: List[dict]
+    ):
+        """Indexes MO documents built from inventory. Fields which are not loaded from inventory
+        (process instances, groups, permissions) are kept from the current documents"""
+        inventory_fields = {
+            "geometry",
+            INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            INVENTORY_PARAMETERS_FIELD_NAME,
+        }
+        current_documents = await self.elastic_client.mget(
+            index=index_name,
+            ids=[str(document["id"]) for document in documents],
+        )
+        current_documents = {
+            int(item["_id"]): item["_source"]
+            for item in current_documents["docs"]
+            if item.get("found")
+        }
+        actions = list()
+        for document in documents:
+            current_document = current_documents.get(document["id"], {})
+            source = {
+                key: value
+                for key, value in current_document.items()
+                if key not in inventory_fields
+            }
+            source.update(document)
+            actions.append(
+                dict(
+                    _index=index_name,
+                    _op_type="index",
+                    _id=document["id"],
+                    _source=source,
+                )
+            )
+        try:
+            await async_bulk(client=self.elastic_client, actions=actions)
+        except BulkIndexError as e:
+            print(e.errors)
+            raise e
+
+    async def __delete_mo_documents_not_in_inventory(
+        self,
+        index_name: str,
+        mo_id_range: tuple[int, int],
+        inventory_mo_ids: set[int],
+    ) -> int:
+        """Deletes documents of MOs with id in [start, end) which are not in inventory_mo_ids"""
+        start, end = mo_id_range
+        search_res = await self.elastic_client.search(
+            index=index_name,
+            query={"range": {"id": {"gte": start, "lt": end}}},
+            size=end - start,
+            source_includes=["id"],
+            track_total_hits=False,
+        )
+        actions = [
+            dict(_index=index_name, _op_type="delete", _id=item["_id"])
+            for item in search_res["hits"]["hits"]
+            if item["_source"]["id"] not in inventory_mo_ids
+        ]
+        if actions:
+            await async_bulk(
+                client=self.elastic_client,
+                actions=actions,
+                ignore_status=(404,),
+            )
+        return len(actions)
+
+    async def reindex_mo_id_ranges_of_tmo(
+        self,
+        tmo_id: int,
+        mo_id_ranges: List[tuple[int, int]],
+        async_channel: Channel,
+    ) -> dict:
+        """Rewrites documents of MOs of tmo_id with id in the ranges [start, end) from inventory
+        and deletes documents of the ranges which are not in inventory. A range may have at most
+        10 000 ids. Returns number of indexed and deleted documents"""
+        stats = {"indexed": 0, "deleted": 0}
+        if not mo_id_ranges:
+            return stats
+        index_name = get_index_name_by_tmo(tmo_id=tmo_id)
+        if not await self.elastic_client.indices.exists(index=index_name):
+            await self.elastic_client.indices.create(
+                index=index_name,
+                mappings=INVENTORY_OBJ_INDEX_MAPPING,
+                settings=DEFAULT_SETTING_FOR_MO_INDEXES,
+            )
+
+        dict_of_loaded_tprms = (
+            await self.__get_tprm_data_from_inventory_by_tmo_id(
+                tmo_id=tmo_id, async_channel=async_channel
+            )
+        )
+        mo_link_tprms = dict_of_loaded_tprms.get("temporary_tprm_mo_link_cache")
+        prm_link_tprms = dict_of_loaded_tprms.get(
+            "temporary_tprm_prm_link_cache"
+        )
+        tprms_not_mo_link_no_prm_link = dict_of_loaded_tprms.get(
+            "temporary_other_tprm_cache"
+        )
+        ids_of_int_tprms = {
+            k: v
+            for k, v in tprms_not_mo_link_no_prm_link.items()
+            if v["val_type"] == "int"
+        }
+
+        mo_id_ranges = sorted(mo_id_ranges)
+        range_starts = [start for start, _ in mo_id_ranges]
+        inventory_mo_ids = [set() for _ in mo_id_ranges]
+
+        # inventory has no request of MOs by id range, MOs of other ranges are skipped
+        stub = mo_info_pb2_grpc.InformerStub(async_channel)
+        msg = mo_info_pb2.GetAllMOWithParamsByTMOIdRequest(tmo_id=tmo_id)
+        grpc_response = stub.GetAllMOWithParamsByTMOId(msg)
+        async for grpc_chunk in grpc_response:
+            documents = []
+            for item in grpc_chunk.mos_with_params:
+                item = pickle.loads(bytes.fromhex(item))
+                range_index = bisect.bisect_right(range_starts, item["id"]) - 1
+                if (
+                    range_index < 0
+                    or item["id"] >= mo_id_ranges[range_index][1]
+                ):
+                    continue
+                inventory_mo_ids[range_index].add(item["id"])
+                documents.append(
+                    self.__build_mo_document(
+                        item=item,
+                        tprms_not_mo_link_no_prm_link=tprms_not_mo_link_no_prm_link,
+                        ids_of_int_tprms=ids_of_int_tprms,
+                    )
+                )
+            if documents:
+                await self.__index_mo_documents_keeping_other_fields(
+                    index_name=index_name, documents=documents
+                )
+                stats["indexed"] += len(documents)
+
+        await self.elastic_client.indices.refresh(index=index_name)
+        for mo_id_range, range_mo_ids in zip(mo_id_ranges, inventory_mo_ids):
+            stats[
+                "deleted"
+            ] += await self.__delete_mo_documents_not_in_inventory(
+                index_name=index_name,
+                mo_id_range=mo_id_range,
+                inventory_mo_ids=range_mo_ids,
+            )
+            if mo_link_tprms:
+                await self.__update_mo_link_params(
+                    index_name=index_name,
+                    mo_link_tprms=mo_link_tprms,
+                    async_channel=async_channel,
+                    mo_id_range=mo_id_range,
+                )
+            if prm_link_tprms:
+                await self.__update_prm_link_params(
+                    index_name=index_name,
+                    prm_link_tprms=prm_link_tprms,
+                    mo_id_range=mo_id_range,
+                )
+        await self.elastic_client.indices.refresh(index=index_name)
+        return stats
+
     async def __load_prm_index_by_tprm_id(
         self, tprm_id: int, async_channel: Channel
     ):
@@ -1357,6 +1608,7 @@ class InventoryIndexesReloader:
         await self.__stage_1_delete_all_mo_index()
         await self.__stage_2_load_tmo_index_and_create_load_order()
         await self.__stage_5_load_tprm_and_mo_data()
+        await self.__invalidate_caches()
 
     async def refresh_index_by_tmo_id(self, tmo_id: int):
         """Refresh all data for special tmo_id"""
@@ -1397,6 +1649,13 @@ class InventoryIndexesReloader:
             await self.__full_refresh_dataa_for_one_tmo_in_all_indexes(
                 async_channel=async_channel, tmo_from_order=tmo_in_order
             )
+        await self.__invalidate_caches()
+
+    @staticmethod
+    async def __invalidate_caches():
+        await tmo_cache.invalidate_all()
+        await tprm_types_cache.invalidate_all()
+        filter_query_plans.clear()
 
     async def clear_all_indexes(self):
         await self.__stage_1_clear_prm_link_index()
@@ -1405,3 +1664,4 @@ class InventoryIndexesReloader:
         await self.__stage_1_clear_tmo_index()
         await self.__stage_1_clear_tprm_index()
         await self.__stage_1_delete_all_mo_index()
+        await self.__invalidate_caches()
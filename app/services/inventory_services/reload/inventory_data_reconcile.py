@@ -0,0 +1,206 @@
+import pickle
+from collections import defaultdict
+from typing import AsyncIterator, List
+
+import grpc
+from elasticsearch import AsyncElasticsearch
+from grpc.aio import Channel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from grpc_clients.inventory.getters.getters_without_channel import (
+    get_all_tmo_data_from_inventory,
+)
+from grpc_clients.inventory.protobuf.mo_info import (
+    mo_info_pb2_grpc,
+    mo_info_pb2,
+)
+from services.inventory_services.models import InventoryMODefaultFields
+from services.inventory_services.reload.inventory_data import (
+    InventoryIndexesReloader,
+)
+from settings.config import (
+    INVENTORY_GRPC_PORT,
+    INVENTORY_HOST,
+    INVENTORY_RECONCILE_RANGE_SIZE,
+)
+
+"""
+Reconcile of MO indexes. Unlike the refresh of TMO, the MO index of TMO is not rebuilt: MOs are grouped into
+ranges of ids, and the checksum of each range (number of MOs, sum of ids and sum of versions) is calculated
+from the MOs of inventory and from the index by one composite aggregation. Versions of MO only grow, so
+a stale, missing or extra document changes the checksum of its range. Only the ranges with different
+checksums are loaded from inventory again, the drift report lists these ranges
+"""
+
+ID_FIELD = InventoryMODefaultFields.ID.value
+VERSION_FIELD = InventoryMODefaultFields.VERSION.value
+
+
+class InventoryDataReconciler:
+    COMPOSITE_PAGE_SIZE = 1_000
+
+    def __init__(
+        self,
+        elastic_client: AsyncElasticsearch,
+        session: AsyncSession,
+        range_size: int = INVENTORY_RECONCILE_RANGE_SIZE,
+    ):
+        self.elastic_client = elastic_client
+        self.session = session
+        # documents of a range are read by one search, so a range is not greater than max_result_window
+        self.range_size = min(max(1, range_size), 10_000)
+
+    async def __get_inventory_checksums(
+        self, mo_chunks: AsyncIterator[List[dict]]
+    ) -> dict[int, tuple[int, int, int]]:
+        """Returns number of MOs, sum of ids and sum of versions by start of range"""
+        checksums = defaultdict(lambda: [0, 0, 0])
+        async for mo_chunk in mo_chunks:
+            for mo in mo_chunk:
+                checksum = checksums[mo[ID_FIELD] // self.range_size]
+                checksum[0] += 1
+                checksum[1] += mo[ID_FIELD]
+                checksum[2] += mo.get(VERSION_FIELD) or 0
+        return {
+            range_number * self.range_size: tuple(checksum)
+            for range_number, checksum in checksums.items()
+        }
+
+    async def __get_index_checksums(
+        self, index_name: str
+    ) -> dict[int, tuple[int, int, int]]:
+        """Returns number of documents, sum of ids and sum of versions by start of range"""
+        checksums = dict()
+        if not await self.elastic_client.indices.exists(index=index_name):
+            return checksums
+        composite = {
+            "size": self.COMPOSITE_PAGE_SIZE,
+            "sources": [
+                {
+                    "range_start": {
+                        "histogram": {
+                            "field": ID_FIELD,
+                            "interval": self.range_size,
+                        }
+                    }
+                }
+            ],
+        }
+        while True:
+            search_res = await self.elastic_client.search(
+                index=index_name,
+                size=0,
+                track_total_hits=False,
+                aggs={
+                    "ranges": {
+                        "composite": composite,
+                        "aggs": {
+                            "ids": {"sum": {"field": ID_FIELD}},
+                            "versions": {"sum": {"field": VERSION_FIELD}},
+                        },
+                    }
+                },
+            )
+            ranges = search_res["aggregations"]["ranges"]
+            for bucket in ranges["buckets"]:
+                checksums[int(bucket["key"]["range_start"])] = (
+                    bucket["doc_count"],
+                    int(round(bucket["ids"]["value"])),
+                    int(round(bucket["versions"]["value"])),
+                )
+            if len(ranges["buckets"]) < self.COMPOSITE_PAGE_SIZE:
+                break
+            composite["after"] = ranges["after_key"]
+        return checksums
+
+    async def get_drift(
+        self, tmo_id: int, mo_chunks: AsyncIterator[List[dict]]
+    ) -> List[dict]:
+        """Returns ranges of ids [start, end) whose MOs in mo_chunks differ from the MO index of tmo_id"""
+        inventory_checksums = await self.__get_inventory_checksums(mo_chunks)
+        index_checksums = await self.__get_index_checksums(
+            get_index_name_by_tmo(tmo_id=tmo_id)
+        )
+        drift = list()
+        for range_start in sorted(
+            inventory_checksums.keys() | index_checksums.keys()
+        ):
+            inventory_checksum = inventory_checksums.get(range_start, (0, 0, 0))
+            index_checksum = index_checksums.get(range_start, (0, 0, 0))
+            if inventory_checksum != index_checksum:
+                drift.append(
+                    {
+                        "start": range_start,
+                        "end": range_start + self.range_size,
+                        "inventory_mos": inventory_checksum[0],
+                        "index_mos": index_checksum[0],
+                    }
+                )
+        return drift
+
+    @staticmethod
+    async def __get_mos_of_tmo(
+        tmo_id: int, async_channel: Channel
+    ) -> AsyncIterator[List[dict]]:
+        stub = mo_info_pb2_grpc.InformerStub(async_channel)
+        msg = mo_info_pb2.GetAllMOWithParamsByTMOIdRequest(tmo_id=tmo_id)
+        grpc_response = stub.GetAllMOWithParamsByTMOId(msg)
+        async for grpc_chunk in grpc_response:
+            yield [
+                pickle.loads(bytes.fromhex(item))
+                for item in grpc_chunk.mos_with_params
+            ]
+
+    async def __reconcile_tmo(
+        self, tmo_id: int, async_channel: Channel, dry_run: bool
+    ) -> dict:
+        drift = await self.get_drift(
+            tmo_id=tmo_id,
+            mo_chunks=self.__get_mos_of_tmo(tmo_id, async_channel),
+        )
+        report = {"tmo_id": tmo_id, "drift": drift, "indexed": 0, "deleted": 0}
+        if drift and not dry_run:
+            reloader = InventoryIndexesReloader(
+                elastic_client=self.elastic_client, session=self.session
+            )
+            report.update(
+                await reloader.reindex_mo_id_ranges_of_tmo(
+                    tmo_id=tmo_id,
+                    mo_id_ranges=[
+                        (item["start"], item["end"]) for item in drift
+                    ],
+                    async_channel=async_channel,
+                )
+            )
+        return report
+
+    async def reconcile_tmos(
+        self, tmo_ids: List[int] | None = None, dry_run: bool = False
+    ) -> List[dict]:
+        """Reloads ranges of MOs which differ from inventory for tmo_ids, for all TMOs if tmo_ids is None.
+        If dry_run is True, only the drift is returned. Returns the drift report by TMO"""
+        reports = list()
+        async with grpc.aio.insecure_channel(
+            f"{INVENTORY_HOST}:{INVENTORY_GRPC_PORT}",
+            options=[
+                ("grpc.keepalive_time_ms", 20_000),
+                ("grpc.keepalive_timeout_ms", 15_000),
+                ("grpc.http2.max_pings_without_data", 5),
+                ("grpc.keepalive_permit_without_calls", 1),
+            ],
+        ) as async_channel:
+            if tmo_ids is None:
+                all_tmo = await get_all_tmo_data_from_inventory(async_channel)
+                tmo_ids = [item["id"] for item in all_tmo]
+            for tmo_id in tmo_ids:
+                reports.append(
+                    await self.__reconcile_tmo(
+                        tmo_id=tmo_id,
+                        async_channel=async_channel,
+                        dry_run=dry_run,
+                    )
+                )
+        return reports
@@ -13,7 +13,9 @@ from elastic.config import (
     INVENTORY_TPRM_INDEX_V2,
 )
 from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from services.cache_services.caches import tmo_cache
 from services.inventory_services.elastic.security.configs import (
+    INVENTORY_QUERY_TIME_PERMISSIONS,
     INVENTORY_SECURITY_MO_PERMISSION_INDEX,
     INVENTORY_SECURITY_MO_PERMISSION_SETTINGS,
     INVENTORY_SECURITY_TMO_PERMISSION_INDEX,
@@ -31,6 +33,9 @@ from services.inventory_services.grpc.security_getters.getters_without_channel i
     get_tmo_permissions,
     get_tprm_permissions,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    permission_sets,
+)
 from settings.config import INVENTORY_HOST, INVENTORY_GRPC_PORT
 
 
@@ -53,6 +58,9 @@ class InventorySecurityReloader:
             mappings=INVENTORY_SECURITY_INDEXES_MAPPING,
             settings=INVENTORY_SECURITY_MO_PERMISSION_SETTINGS,
         )
+        if INVENTORY_QUERY_TIME_PERMISSIONS:
+            # MO documents do not store permissions
+            return
 
         search_query = {"exists": {"field": INVENTORY_PERMISSIONS_FIELD_NAME}}
         update_script = {
@@ -109,6 +117,9 @@ class InventorySecurityReloader:
             mappings=INVENTORY_SECURITY_INDEXES_MAPPING,
             settings=INVENTORY_SECURITY_TPRM_PERMISSION_SETTINGS,
         )
+        if INVENTORY_QUERY_TIME_PERMISSIONS:
+            # TPRM documents do not store permissions
+            return
 
         search_query = {"exists": {"field": INVENTORY_PERMISSIONS_FIELD_NAME}}
         update_script = {
@@ -193,6 +204,9 @@ class InventorySecurityReloader:
                     print(e.errors)
                     raise e
 
+            if INVENTORY_QUERY_TIME_PERMISSIONS:
+                continue
+
             for k, v in mo_ids_grouped_by_permissions.items():
                 search_query = {"terms": {"id": v}}
                 update_script = {
@@ -311,6 +325,9 @@ class InventorySecurityReloader:
                     print(e.errors)
                     raise e
 
+            if INVENTORY_QUERY_TIME_PERMISSIONS:
+                continue
+
             for k, v in tprm_ids_grouped_by_permissions.items():
                 search_query = {"terms": {"id": v}}
                 update_script = {
@@ -357,3 +374,6 @@ class InventorySecurityReloader:
             await self.__step_2_load_mo_security_data(channel=async_channel)
             await self.__step_2_load_tmo_security_data(channel=async_channel)
             await self.__step_2_load_tprm_security_data(channel=async_channel)
+
+        await permission_sets.clear()
+        await tmo_cache.invalidate_all()
@@ -0,0 +1,328 @@
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, List
+
+import grpc
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk, BulkIndexError
+
+from elastic.config import (
+    ALL_MO_OBJ_INDEXES_PATTERN,
+    INVENTORY_TMO_INDEX_V2,
+    INVENTORY_TPRM_INDEX_V2,
+)
+from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from services.cache_services.caches import tmo_cache
+from services.inventory_services.elastic.security.configs import (
+    INVENTORY_QUERY_TIME_PERMISSIONS,
+    INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+    INVENTORY_SECURITY_MO_PERMISSION_SETTINGS,
+    INVENTORY_SECURITY_PRM_PERMISSION_INDEX,
+    INVENTORY_SECURITY_PRM_PERMISSION_SETTINGS,
+    INVENTORY_SECURITY_TMO_PERMISSION_INDEX,
+    INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+    INVENTORY_SECURITY_TPRM_PERMISSION_INDEX,
+    INVENTORY_SECURITY_TPRM_PERMISSION_SETTINGS,
+)
+from services.inventory_services.elastic.security.mapping import (
+    INVENTORY_SECURITY_INDEXES_MAPPING,
+)
+from services.inventory_services.grpc.security_getters.getters_without_channel import (
+    get_mo_permissions,
+    get_tmo_permissions,
+    get_tprm_permissions,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    permission_sets,
+)
+from settings.config import INVENTORY_HOST, INVENTORY_GRPC_PORT
+
+"""
+Reconcile of security indexes. Unlike InventorySecurityReloader, the security indexes are not cleared:
+the permissions of inventory are compared with the current grants of the security indexes,
+and only added, changed and removed grants are written. The permissions field of MO, TMO and TPRM documents
+is rewritten only for the documents whose set of readable permissions has changed.
+Grants are compared by the indexed fields only, with values converted to the types of the mapping, and missing
+values are equal to None and to the default values of gRPC, so unchanged grants are never written.
+"""
+
+GRANT_FIELD_TYPES = {
+    field_name: field_mapping["type"]
+    for field_name, field_mapping in INVENTORY_SECURITY_INDEXES_MAPPING[
+        "properties"
+    ].items()
+}
+
+
+def normalize_grant_value(value, field_type: str):
+    if field_type == "long":
+        return int(value)
+    if field_type == "boolean" and isinstance(value, str):
+        return value.lower() == "true"
+    if field_type == "boolean":
+        return bool(value)
+    return str(value)
+
+
+def normalize_grant(item: dict) -> dict:
+    """Returns indexed fields of grant with values of mapping types, without empty values"""
+    normalized = dict()
+    for field_name, field_type in GRANT_FIELD_TYPES.items():
+        value = item.get(field_name)
+        if value is None or value == "":
+            continue
+        value = normalize_grant_value(value, field_type)
+        if value:
+            normalized[field_name] = value
+    return normalized
+
+
+async def get_no_permissions() -> AsyncIterator[List[dict]]:
+    """Inventory does not transfer PRM permissions, the full reload leaves their index empty as well"""
+    for list_of_permissions in ():
+        yield list_of_permissions
+
+
+class InventorySecurityReconciler:
+    SIZE_PER_STEP = 10_000
+    BULK_CHUNK_SIZE = 5_000
+
+    def __init__(self, elastic_client: AsyncElasticsearch):
+        self.elastic_client = elastic_client
+
+    async def __create_index_if_not_exists(self, index: str, settings: dict):
+        if not await self.elastic_client.indices.exists(index=index):
+            await self.elastic_client.indices.create(
+                index=index,
+                mappings=INVENTORY_SECURITY_INDEXES_MAPPING,
+                settings=settings,
+            )
+
+    async def __get_current_grants(
+        self, security_index: str
+    ) -> dict[int, dict]:
+        """Returns all normalized documents of security index by their ids"""
+        grants = dict()
+        search_after = None
+        while True:
+            search_res = await self.elastic_client.search(
+                index=security_index,
+                query={"match_all": {}},
+                sort=[{"id": "asc"}],
+                size=self.SIZE_PER_STEP,
+                search_after=search_after,
+                track_total_hits=False,
+            )
+            search_res = search_res["hits"]["hits"]
+            for item in search_res:
+                grant = normalize_grant(item["_source"])
+                grants[grant["id"]] = grant
+            if len(search_res) < self.SIZE_PER_STEP:
+                break
+            search_after = search_res[-1]["sort"]
+        return grants
+
+    @staticmethod
+    def __get_readable_permissions(
+        grants: Iterable[dict],
+    ) -> dict[int, set[str]]:
+        """Returns permissions which can read the object, grouped by object id"""
+        readable_permissions = defaultdict(set)
+        for item in grants:
+            parent_id = item.get("parent_id")
+            permission = item.get("permission")
+            if all([item.get("read"), parent_id, permission]):
+                readable_permissions[parent_id].add(permission)
+        return readable_permissions
+
+    async def __bulk(self, actions: List[dict], ignore_status: tuple = ()):
+        try:
+            await async_bulk(
+                client=self.elastic_client,
+                actions=actions,
+                ignore_status=ignore_status,
+            )
+        except BulkIndexError as e:
+            print(e.errors)
+            raise e
+        actions.clear()
+
+    async def __update_documents_permissions(
+        self,
+        document_index: str,
+        permissions_by_id: dict[int, list[str]],
+    ):
+        """Sets permissions field of documents with changed permissions. Documents are found
+        by id to get their index, because MO documents are stored in an index per TMO"""
+        ids = list(permissions_by_id)
+        for start in range(0, len(ids), self.SIZE_PER_STEP):
+            ids_chunk = ids[start : start + self.SIZE_PER_STEP]
+            search_res = await self.elastic_client.search(
+                index=document_index,
+                query={"terms": {"id": ids_chunk}},
+                size=len(ids_chunk),
+                source_includes=["id"],
+                track_total_hits=False,
+                ignore_unavailable=True,
+            )
+            actions = [
+                {
+                    "_index": item["_index"],
+                    "_op_type": "update",
+                    "_id": item["_id"],
+                    "doc": {
+                        INVENTORY_PERMISSIONS_FIELD_NAME: permissions_by_id[
+                            item["_source"]["id"]
+                        ]
+                    },
+                }
+                for item in search_res["hits"]["hits"]
+            ]
+            if actions:
+                await self.__bulk(actions=actions, ignore_status=(404,))
+        await self.elastic_client.indices.refresh(
+            index=document_index, ignore_unavailable=True
+        )
+
+    async def reconcile_security_index(
+        self,
+        security_index: str,
+        settings: dict,
+        permission_chunks: AsyncIterator[List[dict]],
+        document_index: str | None,
+    ) -> dict:
+        """Applies the difference between permission_chunks and security_index to security_index and
+        to the permissions field of document_index. If document_index is None, documents are not changed.
+        Returns number of added, updated and deleted grants and number of changed documents"""
+        await self.__create_index_if_not_exists(
+            index=security_index, settings=settings
+        )
+        current_grants = await self.__get_current_grants(security_index)
+        old_readable_permissions = self.__get_readable_permissions(
+            current_grants.values()
+        )
+        new_readable_permissions = defaultdict(set)
+        stats = {"added": 0, "updated": 0, "deleted": 0, "documents": 0}
+
+        actions = []
+        # grants are deleted only after the whole set of inventory permissions is received,
+        # so an interrupted stream never removes grants
+        async for list_of_permissions in permission_chunks:
+            for item in list_of_permissions:
+                item_id = item.get("id")
+                if not item_id:
+                    continue
+                grant = normalize_grant(item)
+                current_item = current_grants.pop(grant["id"], None)
+                if current_item is None:
+                    actions.append(
+                        {
+                            "_index": security_index,
+                            "_op_type": "index",
+                            "_id": item_id,
+                            "_source": item,
+                        }
+                    )
+                    stats["added"] += 1
+                elif current_item != grant:
+                    # the document is replaced as by the full reload, so removed fields are not kept
+                    actions.append(
+                        {
+                            "_index": security_index,
+                            "_op_type": "index",
+                            "_id": item_id,
+                            "_source": item,
+                        }
+                    )
+                    stats["updated"] += 1
+
+                parent_id = grant.get("parent_id")
+                permission = grant.get("permission")
+                if all([grant.get("read"), parent_id, permission]):
+                    new_readable_permissions[parent_id].add(permission)
+
+            if len(actions) >= self.BULK_CHUNK_SIZE:
+                await self.__bulk(actions=actions)
+
+        for item_id in current_grants:
+            actions.append(
+                {
+                    "_index": security_index,
+                    "_op_type": "delete",
+                    "_id": item_id,
+                }
+            )
+            stats["deleted"] += 1
+            if len(actions) >= self.BULK_CHUNK_SIZE:
+                await self.__bulk(actions=actions, ignore_status=(404,))
+        if actions:
+            await self.__bulk(actions=actions, ignore_status=(404,))
+        await self.elastic_client.indices.refresh(index=security_index)
+
+        if document_index:
+            permissions_by_id = {
+                parent_id: sorted(new_readable_permissions.get(parent_id, []))
+                for parent_id in old_readable_permissions.keys()
+                | new_readable_permissions.keys()
+                if old_readable_permissions.get(parent_id)
+                != new_readable_permissions.get(parent_id)
+            }
+            stats["documents"] = len(permissions_by_id)
+            await self.__update_documents_permissions(
+                document_index=document_index,
+                permissions_by_id=permissions_by_id,
+            )
+
+        await permission_sets.invalidate(security_index=security_index)
+        await tmo_cache.invalidate_all()
+        return stats
+
+    async def reconcile_all_inventory_security_indexes(self) -> dict:
+        """Reconciles MO, TMO, TPRM and PRM security indexes with inventory.
+        Returns stats of changes by security index"""
+        result = dict()
+        async with grpc.aio.insecure_channel(
+            f"{INVENTORY_HOST}:{INVENTORY_GRPC_PORT}",
+            options=[
+                ("grpc.keepalive_time_ms", 20_000),
+                ("grpc.keepalive_timeout_ms", 15_000),
+                ("grpc.http2.max_pings_without_data", 5),
+                ("grpc.keepalive_permit_without_calls", 1),
+            ],
+        ) as async_channel:
+            result[
+                INVENTORY_SECURITY_MO_PERMISSION_INDEX
+            ] = await self.reconcile_security_index(
+                security_index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+                settings=INVENTORY_SECURITY_MO_PERMISSION_SETTINGS,
+                permission_chunks=get_mo_permissions(async_channel),
+                document_index=None
+                if INVENTORY_QUERY_TIME_PERMISSIONS
+                else ALL_MO_OBJ_INDEXES_PATTERN,
+            )
+            result[
+                INVENTORY_SECURITY_TMO_PERMISSION_INDEX
+            ] = await self.reconcile_security_index(
+                security_index=INVENTORY_SECURITY_TMO_PERMISSION_INDEX,
+                settings=INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+                permission_chunks=get_tmo_permissions(async_channel),
+                document_index=INVENTORY_TMO_INDEX_V2,
+            )
+            result[
+                INVENTORY_SECURITY_TPRM_PERMISSION_INDEX
+            ] = await self.reconcile_security_index(
+                security_index=INVENTORY_SECURITY_TPRM_PERMISSION_INDEX,
+                settings=INVENTORY_SECURITY_TPRM_PERMISSION_SETTINGS,
+                permission_chunks=get_tprm_permissions(async_channel),
+                document_index=None
+                if INVENTORY_QUERY_TIME_PERMISSIONS
+                else INVENTORY_TPRM_INDEX_V2,
+            )
+            result[
+                INVENTORY_SECURITY_PRM_PERMISSION_INDEX
+            ] = await self.reconcile_security_index(
+                security_index=INVENTORY_SECURITY_PRM_PERMISSION_INDEX,
+                settings=INVENTORY_SECURITY_PRM_PERMISSION_SETTINGS,
+                permission_chunks=get_no_permissions(),
+                document_index=None,
+            )
+        return result
@@ -1,3 +1,4 @@
+import copy
 from typing import List, Iterable
 
 from elasticsearch import AsyncElasticsearch
@@ -8,6 +9,7 @@ from elastic.pydantic_models import FilterColumn, SortColumn
 from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_config import ADMIN_ROLE
 from security.security_data_models import ClientRoles
+from services.cache_services.caches import tmo_cache
 from services.inventory_services.elastic.security.configs import (
     INVENTORY_SECURITY_TMO_PERMISSION_INDEX,
     INVENTORY_SECURITY_MO_PERMISSION_INDEX,
@@ -439,6 +441,44 @@ async def get_all_tprm_data_of_special_tmo_ids(
     return result
 
 
+def document_has_any_permission(
+    document: dict,
+    permissions: Iterable[str],
+    field_name: str = INVENTORY_PERMISSIONS_FIELD_NAME,
+) -> bool:
+    """Returns True if the permissions field of document contains any of permissions"""
+    document_permissions = document.get(field_name)
+    if not document_permissions:
+        return False
+    if isinstance(document_permissions, str):
+        document_permissions = [document_permissions]
+    return not set(document_permissions).isdisjoint(permissions)
+
+
+async def get_cached_tmo_data(
+    elastic_client: AsyncElasticsearch, tmo_id: int
+) -> dict | None:
+    """Returns the document of TMO with its permissions, None if TMO does not exist"""
+
+    async def load_tmo_data() -> dict | None:
+        tmo_data = await elastic_client.search(
+            index=INVENTORY_TMO_INDEX_V2,
+            query={"match": {"id": tmo_id}},
+            size=1,
+            ignore_unavailable=True,
+        )
+        tmo_data = tmo_data["hits"]["hits"]
+        if not tmo_data:
+            return None
+        return tmo_data[0]["_source"]
+
+    tmo_data = await tmo_cache.get_or_load(str(tmo_id), load_tmo_data)
+    if tmo_data is None:
+        return None
+    # callers change the returned document
+    return copy.deepcopy(tmo_data)
+
+
 async def check_availability_of_tmo_data(
     elastic_client: AsyncElasticsearch,
     is_admin: bool,
@@ -451,24 +491,16 @@ async def check_availability_of_tmo_data(
     if not is_admin and not user_permissions:
         return result
 
-    search_conditions = [{"match": {"id": tmo_id}}]
-    if not is_admin:
-        search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
-        )
-    search_query = {"bool": {"must": search_conditions}}
-    tmo_data = await elastic_client.search(
-        index=INVENTORY_TMO_INDEX_V2,
-        query=search_query,
-        size=1,
-        track_total_hits=True,
-        ignore_unavailable=True,
+    tmo_data = await get_cached_tmo_data(
+        elastic_client=elastic_client, tmo_id=tmo_id
     )
-    tmo_data = tmo_data["hits"]["hits"]
     if not tmo_data:
         return result
 
-    tmo_data = tmo_data[0]["_source"]
+    if not is_admin and not document_has_any_permission(
+        document=tmo_data, permissions=user_permissions
+    ):
+        return result
 
     result.data_available = True
     result.tmo_data_as_dict = tmo_data
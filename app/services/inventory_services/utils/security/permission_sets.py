@@ -0,0 +1,406 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import defaultdict
+from typing import Iterable, List
+
+import orjson
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import BulkIndexError, async_bulk
+
+from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from services.cache_services.caches import create_cache
+from services.cache_services.utils import TwoLevelCache
+from services.inventory_services.elastic.security.configs import (
+    INVENTORY_PERMISSION_SET_MAX_TERMS,
+    INVENTORY_PERMISSION_SETS_CACHE_TTL,
+    INVENTORY_QUERY_TIME_PERMISSIONS,
+    INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+    INVENTORY_SECURITY_PERMISSION_SETS_INDEX,
+    INVENTORY_SECURITY_TPRM_PERMISSION_INDEX,
+)
+
+"""
+Query-time permissions. The security indexes store one document per grant (parent_id, permission, read),
+so the set of ids readable by a permission is one search by the permission. Sets are cached per permission,
+so a permission change costs the update of its grants and the reload of one set instead of
+rewriting the permissions field of all documents of the grants.
+Small sets are sent in the query as 'id' terms. Large sets are saved into the permission sets index
+by chunks and the query refers to the chunks by terms lookup, so the size of the request does not grow
+with the number of readable ids. Chunks are saved by version (hash of ids), so processes with
+different versions of a set do not overwrite each other's chunks; replaced versions are removed
+after every process has reloaded the set.
+Each cached set keeps the stamp of the permission read before the set was loaded. Invalidation removes
+the stamp from the shared stamps cache, whose invalidations are published to all processes, so every process
+which reads a new stamp reloads the set instead of serving it until ttl.
+"""
+
+SIZE_PER_STEP = 10_000
+LOOKUP_CHUNK_SIZE = 100_000
+
+
+class PermissionSets:
+    """Cache of sets of ids readable by each permission, loaded from the security index.
+    A set is reloaded after ttl seconds or after its stamp is changed by invalidation in any process.
+    stamps None keeps stamps only in this process"""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_terms: int = INVENTORY_PERMISSION_SET_MAX_TERMS,
+        lookup_index: str = INVENTORY_SECURITY_PERMISSION_SETS_INDEX,
+        stamps: TwoLevelCache | None = None,
+    ):
+        self.ttl = ttl
+        self.max_terms = max_terms
+        self.lookup_index = lookup_index
+        if stamps is None:
+            stamps = TwoLevelCache(
+                namespace="permission_set_stamps",
+                backend=None,
+                local_maxsize=10_000,
+                local_ttl=ttl,
+                remote_ttl=int(ttl),
+                key_prefix="local",
+            )
+        self.stamps = stamps
+        # expiration time, ids and stamp of set by key of set
+        self._sets: dict[tuple[str, str], tuple[float, frozenset[int], str]] = (
+            dict()
+        )
+        # set, its version and ids of its saved chunks by key of set
+        self._lookups: dict[
+            tuple[str, str], tuple[frozenset[int], str, list[str]]
+        ] = dict()
+        self._locks: dict[tuple[str, str], asyncio.Lock] = defaultdict(
+            asyncio.Lock
+        )
+
+    async def get_allowed_ids(
+        self,
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permissions: Iterable[str],
+    ) -> set[int]:
+        """Returns ids readable by any of permissions"""
+        allowed_ids = set()
+        for permission in set(permissions):
+            allowed_ids.update(
+                await self._get_permission_set(
+                    elastic_client=elastic_client,
+                    security_index=security_index,
+                    permission=permission,
+                )
+            )
+        return allowed_ids
+
+    async def get_ids_condition(
+        self,
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permissions: Iterable[str],
+    ) -> dict:
+        """Returns condition which matches ids readable by any of permissions. Ids are sent
+        in the condition up to max_terms ids, larger sets are referred to by terms lookup"""
+        permissions = set(permissions)
+        allowed_ids = await self.get_allowed_ids(
+            elastic_client=elastic_client,
+            security_index=security_index,
+            permissions=permissions,
+        )
+        if len(allowed_ids) <= self.max_terms:
+            return {"terms": {"id": sorted(allowed_ids)}}
+
+        lookups = list()
+        for permission in permissions:
+            chunk_ids = await self._get_lookup_chunk_ids(
+                elastic_client=elastic_client,
+                security_index=security_index,
+                permission=permission,
+            )
+            lookups.extend(
+                {
+                    "terms": {
+                        "id": {
+                            "index": self.lookup_index,
+                            "id": chunk_id,
+                            "path": "ids",
+                        }
+                    }
+                }
+                for chunk_id in chunk_ids
+            )
+        return {"bool": {"should": lookups, "minimum_should_match": 1}}
+
+    async def _get_lookup_chunk_ids(
+        self,
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permission: str,
+    ) -> list[str]:
+        """Returns ids of the saved chunks of the set of permission, the set is saved
+        when its version was not saved by this process"""
+        key = (security_index, permission)
+        ids = await self._get_permission_set(
+            elastic_client=elastic_client,
+            security_index=security_index,
+            permission=permission,
+        )
+        lookup = self._lookups.get(key)
+        if lookup and lookup[0] is ids:
+            return lookup[2]
+
+        async with self._locks[key]:
+            lookup = self._lookups.get(key)
+            if lookup and lookup[0] is ids:
+                return lookup[2]
+            version = get_set_version(ids)
+            if lookup and lookup[1] == version:
+                chunk_ids = lookup[2]
+            else:
+                chunk_ids = await self._save_lookup(
+                    elastic_client=elastic_client,
+                    security_index=security_index,
+                    permission=permission,
+                    ids=ids,
+                    version=version,
+                )
+            self._lookups[key] = (ids, version, chunk_ids)
+            return chunk_ids
+
+    async def _save_lookup(
+        self,
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permission: str,
+        ids: frozenset[int],
+        version: str,
+    ) -> list[str]:
+        sorted_ids = sorted(ids)
+        actions = list()
+        for i in range(0, len(sorted_ids), LOOKUP_CHUNK_SIZE):
+            actions.append(
+                dict(
+                    _index=self.lookup_index,
+                    _op_type="index",
+                    _id=f"{security_index}:{permission}:{version}:{len(actions)}",
+                    _source={
+                        "security_index": security_index,
+                        "permission": permission,
+                        "version": version,
+                        "ids": sorted_ids[i : i + LOOKUP_CHUNK_SIZE],
+                    },
+                )
+            )
+        # terms lookup gets chunks by id in real time, so the index is not refreshed
+        try:
+            await async_bulk(client=elastic_client, actions=actions)
+        except BulkIndexError as e:
+            print(*e.errors, sep="\n")
+            raise e
+
+        # other versions are marked as replaced and removed when processes which could
+        # use them have reloaded the set
+        now = int(time.time())
+        set_query = [
+            {"term": {"security_index": security_index}},
+            {"term": {"permission": permission}},
+        ]
+        await elastic_client.update_by_query(
+            index=self.lookup_index,
+            query={
+                "bool": {
+                    "filter": set_query,
+                    "must_not": [
+                        {"term": {"version": version}},
+                        {"exists": {"field": "superseded_at"}},
+                    ],
+                }
+            },
+            script={
+                "source": "ctx._source.superseded_at = params.now",
+                "lang": "painless",
+                "params": {"now": now},
+            },
+            conflicts="proceed",
+            refresh=True,
+        )
+        await elastic_client.delete_by_query(
+            index=self.lookup_index,
+            query={
+                "bool": {
+                    "filter": [
+                        *set_query,
+                        {
+                            "range": {
+                                "superseded_at": {"lt": now - 2 * self.ttl}
+                            }
+                        },
+                    ],
+                    "must_not": [{"term": {"version": version}}],
+                }
+            },
+            conflicts="proceed",
+        )
+        return [action["_id"] for action in actions]
+
+    def _get_cached(
+        self, key: tuple[str, str], stamp: str
+    ) -> frozenset[int] | None:
+        cached = self._sets.get(key)
+        if cached and cached[0] > time.monotonic() and cached[2] == stamp:
+            return cached[1]
+        return None
+
+    async def _get_stamp(self, key: tuple[str, str]) -> str:
+        """Returns stamp of the set, a new stamp is saved when the stamp was invalidated"""
+
+        async def create_stamp() -> str:
+            return uuid.uuid4().hex
+
+        return await self.stamps.get_or_load(
+            get_stamp_key(*key), loader=create_stamp
+        )
+
+    async def _get_permission_set(
+        self,
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permission: str,
+    ) -> frozenset[int]:
+        key = (security_index, permission)
+        # the stamp is read before the load, so the set loaded before invalidation is not kept
+        stamp = await self._get_stamp(key)
+        ids = self._get_cached(key, stamp)
+        if ids is not None:
+            return ids
+
+        # concurrent requests of the same permission wait for one load
+        async with self._locks[key]:
+            ids = self._get_cached(key, stamp)
+            if ids is not None:
+                return ids
+            ids = await self._load_permission_set(
+                elastic_client=elastic_client,
+                security_index=security_index,
+                permission=permission,
+            )
+            self._sets[key] = (time.monotonic() + self.ttl, ids, stamp)
+            return ids
+
+    @staticmethod
+    async def _load_permission_set(
+        elastic_client: AsyncElasticsearch,
+        security_index: str,
+        permission: str,
+    ) -> frozenset[int]:
+        search_query = {
+            "bool": {
+                "filter": [
+                    {"term": {"permission": permission}},
+                    {"term": {"read": True}},
+                ]
+            }
+        }
+        ids = set()
+        search_after = None
+        while True:
+            search_res = await elastic_client.search(
+                index=security_index,
+                query=search_query,
+                sort=[{"id": "asc"}],
+                size=SIZE_PER_STEP,
+                source_includes=["parent_id"],
+                search_after=search_after,
+                track_total_hits=False,
+                ignore_unavailable=True,
+            )
+            search_res = search_res["hits"]["hits"]
+            ids.update(
+                int(item["_source"]["parent_id"])
+                for item in search_res
+                if item["_source"].get("parent_id")
+            )
+            if len(search_res) < SIZE_PER_STEP:
+                break
+            search_after = search_res[-1]["sort"]
+        return frozenset(ids)
+
+    async def invalidate(
+        self, security_index: str, permissions: Iterable[str] | None = None
+    ):
+        """Removes cached sets of permissions in all processes, all sets if permissions is None"""
+        if permissions is None:
+            await self.clear()
+            return
+        keys = [(security_index, permission) for permission in permissions]
+        for key in keys:
+            self._sets.pop(key, None)
+        await self.stamps.invalidate(get_stamp_key(*key) for key in keys)
+
+    async def clear(self):
+        """Removes all cached sets in all processes"""
+        self._sets.clear()
+        await self.stamps.invalidate_all()
+
+
+def get_set_version(ids: frozenset[int]) -> str:
+    return hashlib.sha1(orjson.dumps(sorted(ids))).hexdigest()
+
+
+def get_stamp_key(security_index: str, permission: str) -> str:
+    return f"{security_index}:{permission}"
+
+
+permission_sets = PermissionSets(
+    ttl=INVENTORY_PERMISSION_SETS_CACHE_TTL,
+    stamps=create_cache(
+        namespace="permission_set_stamps",
+        local_ttl=INVENTORY_PERMISSION_SETS_CACHE_TTL,
+    ),
+)
+
+
+async def get_condition_by_permission_set(
+    client_permissions: List[str],
+    elastic_client: AsyncElasticsearch,
+    security_index: str,
+) -> dict:
+    if not INVENTORY_QUERY_TIME_PERMISSIONS:
+        return {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: client_permissions}}
+
+    return await permission_sets.get_ids_condition(
+        elastic_client=elastic_client,
+        security_index=security_index,
+        permissions=client_permissions,
+    )
+
+
+async def get_mo_permissions_condition(
+    client_permissions: List[str], elastic_client: AsyncElasticsearch
+) -> dict:
+    """Returns condition for MO indexes which matches only MOs readable by client permissions"""
+    return await get_condition_by_permission_set(
+        client_permissions=client_permissions,
+        elastic_client=elastic_client,
+        security_index=INVENTORY_SECURITY_MO_PERMISSION_INDEX,
+    )
+
+
+async def get_tprm_permissions_condition(
+    client_permissions: List[str], elastic_client: AsyncElasticsearch
+) -> dict:
+    """Returns condition for INVENTORY_TPRM_INDEX_V2 which matches only TPRMs readable by client permissions"""
+    return await get_condition_by_permission_set(
+        client_permissions=client_permissions,
+        elastic_client=elastic_client,
+        security_index=INVENTORY_SECURITY_TPRM_PERMISSION_INDEX,
+    )
+
+
+def add_condition_to_query(query: dict, condition: dict) -> dict:
+    """Returns query which matches documents of query which also match condition"""
+    if not query:
+        return {"bool": {"filter": [condition]}}
+    return {"bool": {"must": [query], "filter": [condition]}}
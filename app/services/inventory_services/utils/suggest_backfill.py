@@ -0,0 +1,167 @@
+import time
+from typing import Iterable, List
+
+from elasticsearch import AsyncElasticsearch, NotFoundError
+
+from elastic.config import ALL_MO_OBJ_INDEXES_PATTERN
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_FUZZY_FIELD_NAME,
+    INVENTORY_FUZZY_SUGGEST_FIELD_NAME,
+    INVENTORY_SUGGEST_BACKFILL_COMPLETED,
+    INVENTORY_SUGGEST_BACKFILL_META,
+)
+from services.inventory_services.models import InventoryFuzzySearchFields
+
+"""
+Backfill of the search_as_you_type sub field in documents of MO indexes which were indexed before the sub field
+was added to their mapping. The state of the backfill is kept in _meta of each MO index: the id of the
+update_by_query task while documents are indexed again and completed after the task has succeeded.
+The backfill is started only for indexes without state or with a lost or failed task, so restarts do not
+index documents again. Prefix searches use the sub field only after the backfill of all MO indexes is completed
+"""
+
+# max number of indexes in the url of one request
+INDEXES_PER_REQUEST = 100
+
+
+def get_backfill_query() -> dict:
+    """Returns query of MO documents whose name is not indexed in the suggest sub field"""
+    name_field = (
+        f"{INVENTORY_FUZZY_FIELD_NAME}.{InventoryFuzzySearchFields.NAME.value}"
+    )
+    suggest_field = f"{name_field}.{INVENTORY_FUZZY_SUGGEST_FIELD_NAME}"
+    return {
+        "bool": {
+            "filter": [{"exists": {"field": name_field}}],
+            "must_not": [{"exists": {"field": suggest_field}}],
+        }
+    }
+
+
+def get_index_chunks(indexes: Iterable[str]) -> Iterable[List[str]]:
+    indexes = sorted(indexes)
+    for start in range(0, len(indexes), INDEXES_PER_REQUEST):
+        yield indexes[start : start + INDEXES_PER_REQUEST]
+
+
+class SuggestBackfill:
+    """State of the backfill of MO indexes matching index_pattern. Completion is final, because
+    MO indexes are created with the completed state, so the state is not read after it"""
+
+    def __init__(
+        self,
+        check_interval: float,
+        index_pattern: str = ALL_MO_OBJ_INDEXES_PATTERN,
+    ):
+        self.check_interval = check_interval
+        self.index_pattern = index_pattern
+        self._completed = False
+        self._checked_at = float("-inf")
+
+    async def _get_states(
+        self, elastic_client: AsyncElasticsearch
+    ) -> dict[str, str | None]:
+        """Returns state of the backfill by index: None, id of task or completed"""
+        response = await elastic_client.indices.get(
+            index=self.index_pattern,
+            features=["mappings", "settings"],
+            # uuid is requested to get indexes without _meta
+            filter_path=["*.mappings._meta", "*.settings.index.uuid"],
+            allow_no_indices=True,
+        )
+        return {
+            index_name: data.get("mappings", {})
+            .get("_meta", {})
+            .get(INVENTORY_SUGGEST_BACKFILL_META)
+            for index_name, data in response.body.items()
+        }
+
+    @staticmethod
+    async def _get_task_state(
+        elastic_client: AsyncElasticsearch, task_id: str
+    ) -> str | None:
+        """Returns completed if task has succeeded, task_id if it is running and None if it is lost or failed"""
+        try:
+            task = await elastic_client.tasks.get(task_id=task_id)
+        except NotFoundError:
+            return None
+        if not task["completed"]:
+            return task_id
+        if task.get("error") or task.get("response", {}).get("failures"):
+            print(f"Backfill of suggest field failed: {task}")
+            return None
+        return INVENTORY_SUGGEST_BACKFILL_COMPLETED
+
+    @staticmethod
+    async def _save_state(
+        elastic_client: AsyncElasticsearch, indexes: List[str], state: str
+    ):
+        for indexes_chunk in get_index_chunks(indexes):
+            await elastic_client.indices.put_mapping(
+                index=indexes_chunk,
+                meta={INVENTORY_SUGGEST_BACKFILL_META: state},
+            )
+
+    async def _update_states(
+        self, elastic_client: AsyncElasticsearch
+    ) -> dict[str, str | None]:
+        """Returns states of indexes, indexes whose tasks have succeeded are saved as completed"""
+        states = await self._get_states(elastic_client)
+        task_states = dict()
+        for state in set(states.values()):
+            if state not in (None, INVENTORY_SUGGEST_BACKFILL_COMPLETED):
+                task_states[state] = await self._get_task_state(
+                    elastic_client=elastic_client, task_id=state
+                )
+
+        completed_indexes = list()
+        for index_name, state in states.items():
+            if state not in task_states:
+                continue
+            states[index_name] = task_states[state]
+            if task_states[state] == INVENTORY_SUGGEST_BACKFILL_COMPLETED:
+                completed_indexes.append(index_name)
+        await self._save_state(
+            elastic_client=elastic_client,
+            indexes=completed_indexes,
+            state=INVENTORY_SUGGEST_BACKFILL_COMPLETED,
+        )
+        return states
+
+    async def start(self, elastic_client: AsyncElasticsearch):
+        """Starts background backfill of indexes without state or with a lost or failed task"""
+        states = await self._update_states(elastic_client)
+        indexes = [
+            index_name for index_name, state in states.items() if state is None
+        ]
+        for indexes_chunk in get_index_chunks(indexes):
+            response = await elastic_client.update_by_query(
+                index=indexes_chunk,
+                query=get_backfill_query(),
+                conflicts="proceed",
+                wait_for_completion=False,
+                ignore_unavailable=True,
+            )
+            await self._save_state(
+                elastic_client=elastic_client,
+                indexes=indexes_chunk,
+                state=response["task"],
+            )
+
+    async def is_completed(self, elastic_client: AsyncElasticsearch) -> bool:
+        """Returns True if the backfill of all indexes is completed. States are read
+        at most once per check_interval until the backfill is completed"""
+        if self._completed:
+            return True
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = time.monotonic()
+        states = await self._update_states(elastic_client)
+        self._completed = all(
+            state == INVENTORY_SUGGEST_BACKFILL_COMPLETED
+            for state in states.values()
+        )
+        return self._completed
+
+
+suggest_backfill = SuggestBackfill(check_interval=60)
@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import logging
+from collections import OrderedDict
+from typing import Coroutine, Hashable, Iterable
+
+from confluent_kafka import Consumer, TopicPartition
+
+from metrics.collectors import KAFKA_MESSAGES_IN_FLIGHT
+
+"""
+Concurrent processing of kafka messages by keyed lanes. Each message has keys of objects it changes:
+messages with a common key are processed in order of offsets, other messages are processed concurrently.
+A message without keys is a barrier: it is processed after all previous messages and before all next ones.
+Offsets are committed only up to the lowest offset of partition which is not processed yet
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedLanes:
+    """Runs coroutines concurrently, coroutines with a common key run in order of submit"""
+
+    def __init__(self, max_in_flight: int):
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._last_task_by_key: dict[Hashable, asyncio.Task] = dict()
+        self._barrier: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def submit(
+        self, coro: Coroutine, keys: Iterable[Hashable] | None
+    ) -> asyncio.Task:
+        """Waits for a free slot and starts coro after previous coroutines of its keys.
+        keys None means barrier"""
+        await self._slots.acquire()
+        is_barrier = keys is None
+        if is_barrier:
+            keys = []
+            dependencies = set(self._tasks)
+        else:
+            keys = list(keys)
+            dependencies = {
+                self._last_task_by_key[key]
+                for key in keys
+                if key in self._last_task_by_key
+            }
+            if self._barrier is not None:
+                dependencies.add(self._barrier)
+
+        task = asyncio.create_task(self.__run(coro, dependencies))
+        self._tasks.add(task)
+        if is_barrier:
+            self._barrier = task
+        for key in keys:
+            self._last_task_by_key[key] = task
+        task.add_done_callback(functools.partial(self.__on_done, keys=keys))
+        return task
+
+    @staticmethod
+    async def __run(coro: Coroutine, dependencies: set[asyncio.Task]):
+        if dependencies:
+            # results of previous coroutines are handled by their callers
+            await asyncio.wait(dependencies)
+        return await coro
+
+    def __on_done(self, task: asyncio.Task, keys: list[Hashable]):
+        self._tasks.discard(task)
+        self._slots.release()
+        if self._barrier is task:
+            self._barrier = None
+        for key in keys:
+            if self._last_task_by_key.get(key) is task:
+                del self._last_task_by_key[key]
+
+    async def wait_all(self):
+        """Waits for all submitted coroutines"""
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+
+class PartitionOffsets:
+    """Offsets of dispatched messages by partition. The committed offset of partition
+    is the next offset after messages which are all processed"""
+
+    def __init__(self):
+        # offsets of partition in order of dispatch, True if processed
+        self._offsets: dict[tuple[str, int], OrderedDict[int, bool]] = dict()
+        self._committable: dict[tuple[str, int], int] = dict()
+
+    def add(self, topic: str, partition: int, offset: int):
+        self._offsets.setdefault((topic, partition), OrderedDict())[offset] = (
+            False
+        )
+
+    def done(self, topic: str, partition: int, offset: int):
+        offsets = self._offsets.get((topic, partition))
+        if offsets is None or offset not in offsets:
+            # partition was revoked or lost
+            return
+        offsets[offset] = True
+        while offsets and next(iter(offsets.values())):
+            processed_offset, _ = offsets.popitem(last=False)
+            self._committable[(topic, partition)] = processed_offset + 1
+
+    def pop_committable(self) -> list[TopicPartition]:
+        """Returns offsets to commit which were not returned before"""
+        committable = [
+            TopicPartition(topic, partition, offset)
+            for (topic, partition), offset in self._committable.items()
+        ]
+        self._committable.clear()
+        return committable
+
+    def forget(self, partitions: list[TopicPartition]):
+        for partition in partitions:
+            key = (partition.topic, partition.partition)
+            self._offsets.pop(key, None)
+            self._committable.pop(key, None)
+
+
+class KeyedLanesConsumer:
+    """Polls consumer and processes messages by keyed lanes.
+    handler_class is created with kafka_msg, its get_lane_keys() returns keys of message
+    and its process_the_message() processes message. If a message fails, polling stops,
+    processed messages are committed and the error is raised"""
+
+    def __init__(self, consumer: Consumer, handler_class, max_in_flight: int):
+        self.consumer = consumer
+        self.handler_class = handler_class
+        self.lanes = KeyedLanes(max_in_flight=max_in_flight)
+        self.offsets = PartitionOffsets()
+        self.error: Exception | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def __process(self, handler, msg):
+        if self.error is not None:
+            # messages after the failed one are processed again after restart
+            return
+        KAFKA_MESSAGES_IN_FLIGHT.labels(topic=msg.topic()).inc()
+        try:
+            await handler.process_the_message()
+        except Exception as e:
+            # the offset of failed message is never committed, the error is raised by run()
+            if self.error is None:
+                self.error = e
+        else:
+            self.offsets.done(msg.topic(), msg.partition(), msg.offset())
+        finally:
+            KAFKA_MESSAGES_IN_FLIGHT.labels(topic=msg.topic()).dec()
+
+    async def dispatch(self, msg):
+        handler = self.handler_class(kafka_msg=msg)
+        keys = handler.get_lane_keys()
+        self.offsets.add(msg.topic(), msg.partition(), msg.offset())
+        await self.lanes.submit(self.__process(handler, msg), keys=keys)
+
+    def commit(self, asynchronous: bool = True):
+        offsets = self.offsets.pop_committable()
+        if offsets:
+            self.consumer.commit(offsets=offsets, asynchronous=asynchronous)
+
+    def on_revoke(self, consumer: Consumer, partitions: list[TopicPartition]):
+        """Is called by poll() in the thread of poll: waits for dispatched messages
+        and commits them before partitions are given to another consumer"""
+        if self.lanes.in_flight and self._loop is not None:
+            # close() calls it in the thread of the loop after run(), when nothing is in flight
+            asyncio.run_coroutine_threadsafe(
+                self.lanes.wait_all(), self._loop
+            ).result()
+        self.commit(asynchronous=False)
+        self.offsets.forget(partitions)
+        consumer.unassign()
+        print(f"Consumer {consumer.memberid()} will be rebalanced.")
+
+    def on_lost(self, consumer: Consumer, partitions: list[TopicPartition]):
+        # offsets of lost partitions can not be committed
+        self.offsets.forget(partitions)
+        for p in partitions:
+            print(
+                f"Consumer {consumer.memberid()} lost the topic: {p.topic}, partition {p.partition}."
+            )
+
+    async def run(self, shutdown_event: asyncio.Event):
+        self._loop = asyncio.get_running_loop()
+        try:
+            while not shutdown_event.is_set() and self.error is None:
+                msg = await self._loop.run_in_executor(
+                    None, functools.partial(self.consumer.poll, 1.0)
+                )
+                if msg is None:
+                    pass
+                elif msg.error():
+                    print(f"Kafka consumer error: {msg.error()}")
+                else:
+                    await self.dispatch(msg)
+                self.commit()
+        finally:
+            await self.lanes.wait_all()
+            self.commit(asynchronous=False)
+        if self.error is not None:
+            logger.error("Kafka message processing failed, consumer stops")
+            raise self.error
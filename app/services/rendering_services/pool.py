@@ -0,0 +1,81 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable
+
+from metrics.collectors import RENDERING_POOL_PENDING
+from settings.config import (
+    RENDERING_POOL_QUEUE_SIZE,
+    RENDERING_POOL_QUEUE_TIMEOUT,
+    RENDERING_POOL_WORKERS,
+)
+
+"""
+Process pool for CPU heavy rendering (export files, conversion of large aggregations),
+so the event loop of the process keeps serving other requests while a file is rendered.
+Rendered functions must be module level functions, their arguments and results are pickled
+"""
+
+
+class RenderingPoolOverloadedError(Exception):
+    pass
+
+
+class RenderingPool:
+    def __init__(
+        self,
+        workers: int = RENDERING_POOL_WORKERS,
+        queue_size: int = RENDERING_POOL_QUEUE_SIZE,
+        queue_timeout: float = RENDERING_POOL_QUEUE_TIMEOUT,
+    ):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        # backpressure: not more than workers + queue_size renders are submitted to the pool
+        self._slots = asyncio.Semaphore(max(1, workers) + queue_size)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the API process has running threads, forking them is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Returns result of func called in a process of the pool.
+        Raises RenderingPoolOverloadedError if there is no place in the queue during queue_timeout"""
+        if self.workers <= 0:
+            return func(*args, **kwargs)
+        try:
+            await asyncio.wait_for(
+                self._slots.acquire(), timeout=self.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            raise RenderingPoolOverloadedError(
+                "Too many files are being rendered, try again later"
+            )
+        RENDERING_POOL_PENDING.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), partial(func, *args, **kwargs)
+            )
+        except BrokenProcessPool:
+            # a process was killed (e.g. out of memory), the next render starts a new pool
+            self.shutdown()
+            raise
+        finally:
+            RENDERING_POOL_PENDING.dec()
+            self._slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+rendering_pool = RenderingPool()
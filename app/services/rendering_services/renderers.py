@@ -0,0 +1,61 @@
+import io
+import os
+
+import pandas as pd
+
+"""
+Functions rendered in the processes of the rendering pool
+"""
+
+
+def get_table(
+    pages: list[list[dict]], rename_columns: dict[str, str]
+) -> pd.DataFrame:
+    result_df = pd.DataFrame([row for page in pages for row in page])
+    if rename_columns:
+        result_df.rename(columns=rename_columns, inplace=True)
+    return result_df
+
+
+def render_table_file(
+    pages: list[list[dict]],
+    rename_columns: dict[str, str],
+    file_type: str,
+    csv_separator: str = ";",
+) -> bytes:
+    """Returns csv or xlsx file with rows of pages. Columns of rows are renamed by rename_columns"""
+    result_df = get_table(pages=pages, rename_columns=rename_columns)
+    del pages
+
+    if file_type == "csv":
+        file_like_obj = io.StringIO()
+        result_df.to_csv(file_like_obj, index=False, sep=csv_separator)
+        return file_like_obj.getvalue().encode("utf-8")
+
+    file_like_obj = io.BytesIO()
+    result_df.to_excel(file_like_obj, index=False)
+    return file_like_obj.getvalue()
+
+
+def write_table_file(
+    path: str,
+    pages: list[list[dict]],
+    rename_columns: dict[str, str],
+    file_type: str,
+    csv_separator: str = ";",
+) -> int:
+    """Writes csv or xlsx file with rows of pages to path and returns size of file.
+    The file appears at path only when it is completely written"""
+    result_df = get_table(pages=pages, rename_columns=rename_columns)
+    del pages
+
+    directory, file_name = os.path.split(path)
+    partial_path = os.path.join(directory, f".partial.{file_name}")
+    if file_type == "csv":
+        result_df.to_csv(
+            partial_path, index=False, sep=csv_separator, encoding="utf-8"
+        )
+    else:
+        result_df.to_excel(partial_path, index=False)
+    os.replace(partial_path, path)
+    return os.path.getsize(path)
@@ -3,6 +3,7 @@ from typing import Callable
 
 from kafka_config.config import KAFKA_ZEEBE_CHANGES_TOPIC
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
 from services.zeebe_services.kafka.consumers.process_changes.configs import (
     PROCESS_CHANGES_PROTOBUF_DESERIALIZERS,
     PROCESS_CHANGES_HANDLER_BY_MSG_CLASS_NAME,
@@ -104,10 +105,15 @@ class ProcessChangesHandler:
 
             if handler:
                 try:
-                    await handler(
-                        message_as_dict=deserialized_msg,
-                        elastic_client=self.elastic_client,
-                    )
+                    with observe_kafka_handler(
+                        topic=self.msg.topic(),
+                        msg_class_name=self.msg_instance_class_name,
+                        msg_event=self.msg_instance_event,
+                    ):
+                        await handler(
+                            message_as_dict=deserialized_msg,
+                            elastic_client=self.elastic_client,
+                        )
 
                 except Exception as e:
                     print("ProcessChangesHandler", type(e), e)
@@ -4,6 +4,8 @@ from typing import Callable
 
 from elastic.client import ElasticsearchManager
 from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.kafka import observe_kafka_handler
+from services.hierarchy_services.rollups.store import HierarchyRollupStore
 from services.zeebe_services.kafka.consumers.process_instance_exporter.configs import (
     EVENT_HANDLERS_BY_BPMN_ELEMENT_TYPE,
     PROCESS_HANDLER_BY_EVENT,
@@ -75,16 +77,39 @@ class ProcessInstanceChangesHandler:
             if handler_be_event:
                 return handler_be_event
 
+    async def refresh_rollups(self):
+        """Refreshes only the hierarchy rollups of the MOs of the process instance, e.g. to replay
+        the message into hierarchy indexes which were reloaded while it was processed"""
+        self.clear_msg_data()
+        if self.msg_cleared_info is None:
+            return
+        await HierarchyRollupStore(
+            elastic_client=self.elastic_client
+        ).refresh_by_process_instance_id(
+            process_instance_id=self.msg_cleared_info.process_instance_id
+        )
+
     async def process_the_message(self):
         self.clear_msg_data()
         if self.msg_instance_event and self.msg_instance_class_name:
             handler = self.__get_event_handler()
             if handler:
                 try:
-                    await handler(
-                        msg_data=self.msg_cleared_info,
-                        elastic_client=self.elastic_client,
-                    )
+                    with observe_kafka_handler(
+                        topic=self.msg.topic(),
+                        msg_class_name=self.msg_instance_class_name,
+                        msg_event=self.msg_instance_event,
+                    ):
+                        await handler(
+                            msg_data=self.msg_cleared_info,
+                            elastic_client=self.elastic_client,
+                        )
+                        # lifecycle states of MOs are part of hierarchy rollups
+                        await HierarchyRollupStore(
+                            elastic_client=self.elastic_client
+                        ).refresh_by_process_instance_id(
+                            process_instance_id=self.msg_cleared_info.process_instance_id
+                        )
                 except Exception as ex:
                     print("ProcessInstanceChangesHandler", type(ex), ex)
                     raise ex
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # AUTH CREDENTIALS
 INV_USER = os.environ.get("INV_USER", "test_user")
@@ -64,6 +65,69 @@ DOCS_REDOC_JS_URL = os.environ.get("DOCS_REDOC_JS_URL", None)
 
 SERVER_GRPC_PORT = os.environ.get("SERVER_GRPC_PORT", "50051")
 
+# RENDERING POOL
+# Processes which render export files and other CPU heavy transforms,
+# 0 renders them on the event loop
+RENDERING_POOL_WORKERS = int(os.environ.get("RENDERING_POOL_WORKERS", 2))
+# Renders which wait for a free process, the next renders wait for a place in the queue
+RENDERING_POOL_QUEUE_SIZE = int(os.environ.get("RENDERING_POOL_QUEUE_SIZE", 8))
+# Seconds to wait for a place in the queue before the render is rejected
+RENDERING_POOL_QUEUE_TIMEOUT = float(
+    os.environ.get("RENDERING_POOL_QUEUE_TIMEOUT", 60)
+)
+
+# EXPORT JOBS
+# Directory of files of background exports, it must be shared by all API processes of the host
+EXPORT_JOBS_DIR = os.environ.get(
+    "EXPORT_JOBS_DIR", os.path.join(tempfile.gettempdir(), "search_export_jobs")
+)
+# Seconds a finished export is kept
+EXPORT_JOBS_TTL = int(os.environ.get("EXPORT_JOBS_TTL", 24 * 60 * 60))
+# Seconds without progress after which a running export is considered lost
+# (e.g. its process was restarted), submit of the same export starts it again
+EXPORT_JOBS_STALE_AFTER = int(
+    os.environ.get("EXPORT_JOBS_STALE_AFTER", 30 * 60)
+)
+
+# INVENTORY RECONCILE
+# Number of ids in a range of MOs compared by the reconcile of MO indexes, at most 10 000
+INVENTORY_RECONCILE_RANGE_SIZE = int(
+    os.environ.get("INVENTORY_RECONCILE_RANGE_SIZE", 10_000)
+)
+
+# SIMPLIFIED GEOMETRY
+# Zooms of map for which simplified geometries of lines are stored, higher zooms use the full geometry
+INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS = sorted(
+    int(zoom)
+    for zoom in os.environ.get(
+        "INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS", "6,9,12,15"
+    ).split(",")
+    if zoom.strip()
+)
+
+# HIERARCHY RELOAD
+# Hierarchies which are loaded concurrently by the full reload of hierarchy indexes
+HIERARCHY_RELOAD_CONCURRENCY = int(
+    os.environ.get("HIERARCHY_RELOAD_CONCURRENCY", 4)
+)
+
+# CACHE
+# Redis shared by all API processes and consumers as the second level of caches,
+# empty keeps cached values only in the memory of each process
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "")
+# Prefix of keys and channels of caches in Redis
+CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "search")
+# Max number of values of each cache kept in the memory of process
+CACHE_LOCAL_MAXSIZE = int(os.environ.get("CACHE_LOCAL_MAXSIZE", 1000))
+# Seconds a value is kept in the memory of process
+CACHE_LOCAL_TTL = float(os.environ.get("CACHE_LOCAL_TTL", 30))
+# Seconds a value is kept in Redis
+CACHE_REMOTE_TTL = int(os.environ.get("CACHE_REMOTE_TTL", 300))
+# Max number of query plans of filter columns kept in the memory of process, 0 disables plans cache
+FILTER_QUERY_PLANS_CACHE_SIZE = int(
+    os.environ.get("FILTER_QUERY_PLANS_CACHE_SIZE", 1000)
+)
+
 # TESTS
 TEST_LOCAL_DB_HOST = os.environ.get("TEST_DOCKER_DB_HOST", "localhost")
 TESTS_RUN_CONTAINER_POSTGRES_LOCAL = os.environ.get(
@@ -79,3 +143,26 @@ TESTS_DB_NAME = os.environ.get("TESTS_DB_NAME", "airflow")
 TESTS_DB_TYPE = os.environ.get("TESTS_DB_TYPE", "postgresql+asyncpg")
 
 TEST_DATABASE_URL = f"{TESTS_DB_TYPE}://{TESTS_DB_USER}:{TESTS_DB_PASS}@{TESTS_DB_HOST}:{TESTS_DB_PORT}/{TESTS_DB_NAME}"
+
+# BENCHMARKS
+BENCHMARKS_RUN = os.environ.get("BENCHMARKS_RUN", "False").upper() in (
+    "TRUE",
+    "Y",
+    "YES",
+    "1",
+)
+BENCHMARKS_REPORT_PATH = os.environ.get(
+    "BENCHMARKS_REPORT_PATH", "benchmark_report.json"
+)
+BENCHMARKS_ITERATIONS = int(os.environ.get("BENCHMARKS_ITERATIONS", 20))
+BENCHMARKS_SEED = int(os.environ.get("BENCHMARKS_SEED", 42))
+BENCHMARKS_TMO_COUNT = int(os.environ.get("BENCHMARKS_TMO_COUNT", 3))
+BENCHMARKS_MO_PER_TMO = int(os.environ.get("BENCHMARKS_MO_PER_TMO", 5000))
+BENCHMARKS_HIERARCHY_DEPTH = int(
+    os.environ.get("BENCHMARKS_HIERARCHY_DEPTH", 4)
+)
+BENCHMARKS_HIERARCHY_CHILDREN = int(
+    os.environ.get("BENCHMARKS_HIERARCHY_CHILDREN", 8)
+)
+BENCHMARKS_BATCH_SIZE = int(os.environ.get("BENCHMARKS_BATCH_SIZE", 1000))
+BENCHMARKS_REPLAY_PATH = os.environ.get("BENCHMARKS_REPLAY_PATH")
@@ -7,10 +7,13 @@ from elastic.query_builder_service.inventory_index.mo_object.utils import (
     get_dict_of_inventory_attr_and_params_types,
     get_search_query_for_inventory_obj_index,
 )
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_data_models import UserPermission
 from services.hierarchy_services.models.dto import NodeDTO
 from services.inventory_services.models import InventoryMODefaultFields
+from services.inventory_services.utils.security.permission_sets import (
+    add_condition_to_query,
+    get_mo_permissions_condition,
+)
 from utils_by_services.hierarchy.level_condition_grouper import LevelConditions
 from v2.routers.inventory.utils.search_by_value_utils import (
     get_query_for_search_by_value_in_tmo_scope,
@@ -35,19 +38,13 @@ class LevelConditionsQueryBuilder:
     async def get_list_of_should_conditions(self) -> List[dict]:
         """Returns a list of 'should' conditions for inventory_tmo_obj index"""
         user_permissions = None
-        permission_filter_column = None
+        permissions_condition = None
         if self.user_permissions and self.user_permissions.is_admin is False:
             user_permissions = self.user_permissions.user_permissions
-            filter_item = FilterItem(
-                operator=SearchOperator.IS_ANY_OF,
-                value=self.user_permissions.user_permissions,
-            )
-            filter_column = FilterColumn(
-                columnName=INVENTORY_PERMISSIONS_FIELD_NAME,
-                rule=LogicalOperator.AND.value,
-                filters=[filter_item],
+            permissions_condition = await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=self.elastic_client,
             )
-            permission_filter_column = filter_column
 
         # create filter conditions
         level_id_filter_columns = {}
@@ -91,12 +88,6 @@ class LevelConditionsQueryBuilder:
                     InventoryMODefaultFields.ACTIVE.value
                 )
 
-                if permission_filter_column:
-                    additional_filters.append(permission_filter_column)
-                    all_inventory_filter_column_names.add(
-                        INVENTORY_PERMISSIONS_FIELD_NAME
-                    )
-
                 if hierarchy_filter.filter_columns:
                     level_id_filter_columns[level_cond.level.id] = (
                         hierarchy_filter.filter_columns + additional_filters
@@ -167,6 +158,12 @@ class LevelConditionsQueryBuilder:
                                 search_by_value_query
                             )
 
+                if filter_search_query and permissions_condition:
+                    filter_search_query = add_condition_to_query(
+                        query=filter_search_query,
+                        condition=permissions_condition,
+                    )
+
                 if filter_search_query:
                     inventory_should_conditions.append(filter_search_query)
         else:
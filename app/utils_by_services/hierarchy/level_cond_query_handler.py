@@ -1,3 +1,4 @@
+import asyncio
 from collections import defaultdict
 from typing import Union
 
@@ -5,6 +6,7 @@ from elasticsearch import AsyncElasticsearch
 from pydantic import BaseModel
 
 from common_utils.dto_models.models import HierarchyAggregateByTMO
+from elastic.config import ES_MSEARCH_CONCURRENCY, ES_MSEARCH_MAX_SEARCHES
 from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
@@ -26,12 +28,19 @@ from utils_by_services.hierarchy.level_condition_grouper import LevelConditions
 from itertools import chain
 
 from utils_by_services.hierarchy.models import HierarchyModel, InventoryModel
-from utils_by_services.inventory.common import search_after_generator_with_total
+from utils_by_services.inventory.common import (
+    SOURCE_HITS_FILTER_PATH,
+    msearch_all_hits,
+    search_after_generator_with_total,
+)
 from v2.routers.hierarchy.utils.response_models import (
     HierarchyFilterHierarchyItem,
     HierarchyFilterInventoryItem,
 )
 
+# page size of searches of level conditions
+LEVEL_SEARCH_SIZE_PER_STEP = 500_000
+
 
 class LevelConditionsOrderResults(BaseModel):
     nodes: list = list()
@@ -121,45 +130,19 @@ class LevelConditionsOrderHandler:
 
             filter_on_level = False
 
-            for one_level_cond in level_conditions:
+            # searches of level conditions of the depth do not depend on each other,
+            # results are combined in order of level conditions
+            search_results = await self.__search_level_conditions(
+                level_conditions=level_conditions
+            )
+            for one_level_cond, (node_ids_node, node_ids_mo_ids) in zip(
+                level_conditions, search_results
+            ):
                 print("one_level_cond")
                 print(one_level_cond)
                 level_p_id = one_level_cond.level.parent_id
-                # get data from hierarchy obj index
-
-                node_ids_node = await self.__process_hierarchy_obj_conditions(
-                    one_level_cond=one_level_cond
-                )
                 print("hierarchy results ")
                 print(len(node_ids_node))
-                # get data from inventory
-                # if on previous level was filter - no need to get all inventory objects
-
-                if self.__applied_filter_at_prev_depth:
-                    mo_ids = list()
-                    if node_ids_node:
-                        mo_ids_from_nodes = await self.__get_mo_ids_from_hierarchy_node_data_filter_conditions(
-                            node_ids=list(node_ids_node)
-                        )
-                        mo_ids = (
-                            await self.__process_inventory_filter_conditions(
-                                one_level_cond=one_level_cond,
-                                mo_ids=mo_ids_from_nodes,
-                            )
-                        )
-                else:
-                    mo_ids = await self.__process_inventory_filter_conditions(
-                        one_level_cond=one_level_cond
-                    )
-                print("inventory results")
-                print(len(mo_ids))
-                node_ids_mo_ids = (
-                    await self.__process_hierarchy_node_data_filter_conditions(
-                        one_level_cond=one_level_cond,
-                        mo_ids=list(mo_ids),
-                        node_ids=list(node_ids_node),
-                    )
-                )
                 print("inersection")
                 print(len(node_ids_mo_ids))
                 # aggregation - start
@@ -424,25 +407,38 @@ class LevelConditionsOrderHandler:
 
     # PROCESS FILTER COND BLOCK - Start
 
-    async def __process_inventory_filter_conditions(
-        self,
+    async def __get_inventory_should_conditions(
+        self, level_conditions: list[LevelConditions]
+    ) -> list[list[dict]]:
+        """Returns 'should' conditions for inventory of each level condition"""
+        semaphore = asyncio.Semaphore(max(1, ES_MSEARCH_CONCURRENCY))
+
+        async def get_should_conditions(
+            one_level_cond: LevelConditions,
+        ) -> list[dict]:
+            query_builder = LevelConditionsQueryBuilder(
+                levels_conditions=[one_level_cond],
+                elastic_client=self.elastic_client,
+                parent_node_dto=self.parent_node_dto,
+                user_permissions=self.user_permissions,
+            )
+            async with semaphore:
+                return await query_builder.get_list_of_should_conditions()
+
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [
+                task_group.create_task(get_should_conditions(one_level_cond))
+                for one_level_cond in level_conditions
+            ]
+        return [task.result() for task in tasks]
+
+    @staticmethod
+    def __get_inventory_search(
         one_level_cond: LevelConditions,
+        inventory_filter_should_conditions: list[dict],
         mo_ids: list[str | int] | None = None,
-    ) -> set[int]:
-        """Returns set of inventory mo ids that match search_body"""
-        # get objects from inventory
-
-        query_builder = LevelConditionsQueryBuilder(
-            levels_conditions=[one_level_cond],
-            elastic_client=self.elastic_client,
-            parent_node_dto=self.parent_node_dto,
-            user_permissions=self.user_permissions,
-        )
-        inventory_filter_should_conditions = (
-            await query_builder.get_list_of_should_conditions()
-        )
-
-        size_per_step = 500_000
+    ) -> tuple[str, dict]:
+        """Returns index and search body of inventory mo ids of level condition"""
         bool_conditions = {
             "should": inventory_filter_should_conditions,
             "minimum_should_match": 1,
@@ -453,216 +449,182 @@ class LevelConditionsOrderHandler:
         search_body = {
             "query": {"bool": bool_conditions},
             "sort": {"_doc": {"order": "asc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
+            "size": LEVEL_SEARCH_SIZE_PER_STEP,
             "_source": {"includes": ["id"]},
         }
-
-        step_mo_ids = set()
         index_name = get_index_name_by_tmo(one_level_cond.level.object_type_id)
+        return index_name, search_body
 
-        while True:
-            search_res = await self.elastic_client.search(
-                index=index_name, body=search_body, ignore_unavailable=True
-            )
-
-            total_hits = search_res["hits"]["total"]["value"]
-
-            search_res = search_res["hits"]["hits"]
-            if not step_mo_ids:
-                step_mo_ids = {
-                    item_id
-                    for item in search_res
-                    if (item_id := item["_source"].get("id"))
-                }
-            else:
-                mo_ids = {
-                    item_id
-                    for item in search_res
-                    if (item_id := item["_source"].get("id"))
-                }
-                step_mo_ids.update(mo_ids)
-
-            if total_hits < size_per_step:
-                break
-
-            if len(search_res) == size_per_step:
-                search_after = search_res[-1]["sort"]
-                search_body["search_after"] = search_after
-            else:
-                break
-        return step_mo_ids
-
-    async def __process_hierarchy_node_data_filter_conditions(
-        self,
+    @staticmethod
+    def __get_node_data_search(
         one_level_cond: LevelConditions,
         mo_ids: list[int],
         node_ids: list[str],
-    ) -> dict[str, list[str]]:
-        """Returns a dictionary with node_ids as keys and lists of mo_ids as values that match search_body"""
+    ) -> tuple[str, dict] | None:
+        """Returns index and search body of node_ids and mo_ids of level condition, None if nothing can match"""
         if not mo_ids or not node_ids:
-            return dict()
+            return None
 
         node_data_must_conds = [
-            {"match": {"level_id": one_level_cond.level.id}}
+            {"match": {"level_id": one_level_cond.level.id}},
+            {"terms": {"mo_id": mo_ids}},
+            {"terms": {"node_id": node_ids}},
         ]
-        if mo_ids:
-            mo_ids_must_cond = [{"terms": {"mo_id": mo_ids}}]
-            node_data_must_conds = node_data_must_conds + mo_ids_must_cond
-
-        if node_ids:
-            node_ids_must_cond = [{"terms": {"node_id": list(node_ids)}}]
-            node_data_must_conds = node_data_must_conds + node_ids_must_cond
-
-        size_per_step = 500_000
-
         search_body = {
             "query": {"bool": {"must": node_data_must_conds}},
             "sort": {"_doc": {"order": "asc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
+            "size": LEVEL_SEARCH_SIZE_PER_STEP,
             "_source": {"includes": ["node_id", "mo_id"]},
         }
+        return HIERARCHY_NODE_DATA_INDEX, search_body
 
-        node_ids_mo_ids = defaultdict(list)
-        if search_body:
-            while True:
-                search_res = await self.elastic_client.search(
-                    index=HIERARCHY_NODE_DATA_INDEX,
-                    body=search_body,
-                    ignore_unavailable=True,
-                )
-
-                total_hits = search_res["hits"]["total"]["value"]
-
-                search_res = search_res["hits"]["hits"]
-
-                for item in search_res:
-                    item = item["_source"]
-                    node_ids_mo_ids[item["node_id"]].append(item["mo_id"])
-
-                if total_hits < size_per_step:
-                    break
-
-                if len(search_res) == size_per_step:
-                    search_after = search_res[-1]["sort"]
-                    search_body["search_after"] = search_after
-                else:
-                    break
-
-        return node_ids_mo_ids
-
-    async def __get_mo_ids_from_hierarchy_node_data_filter_conditions(
-        self, node_ids: list[str]
-    ) -> list[str]:
-        """Returns a list with mo_ids"""
-
-        size_per_step = 500_000
+    @staticmethod
+    def __get_node_data_mo_ids_search(
+        node_ids: list[str],
+    ) -> tuple[str, dict] | None:
+        """Returns index and search body of mo_ids of nodes, None if there are no nodes"""
+        if not node_ids:
+            return None
 
         search_body = {
             "query": {"bool": {"must": {"terms": {"node_id": node_ids}}}},
             "sort": {"_doc": {"order": "asc"}},
-            "track_total_hits": True,
-            "size": size_per_step,
+            "size": LEVEL_SEARCH_SIZE_PER_STEP,
             "_source": {"includes": ["node_id", "mo_id"]},
         }
+        return HIERARCHY_NODE_DATA_INDEX, search_body
 
-        mo_ids = list()
-        if search_body:
-            while True:
-                search_res = await self.elastic_client.search(
-                    index=HIERARCHY_NODE_DATA_INDEX,
-                    body=search_body,
-                    ignore_unavailable=True,
-                )
-
-                total_hits = search_res["hits"]["total"]["value"]
-
-                search_res = search_res["hits"]["hits"]
-
-                if mo_ids:
-                    mo_ids.extend(
-                        [item["_source"]["mo_id"] for item in search_res]
-                    )
-                else:
-                    mo_ids = [item["_source"]["mo_id"] for item in search_res]
-
-                if total_hits < size_per_step:
-                    break
-
-                if len(search_res) == size_per_step:
-                    search_after = search_res[-1]["sort"]
-                    search_body["search_after"] = search_after
-                else:
-                    break
-
-        return mo_ids
-
-    async def __process_hierarchy_obj_conditions(
+    def __get_hierarchy_obj_search(
         self, one_level_cond: LevelConditions
-    ) -> dict:
-        """Returns a dictionary with node_ids as keys and node info as values, that match search body"""
-
-        # get data from hierarchy obj index - start
-
+    ) -> tuple[str, dict] | None:
+        """Returns index and search body of hierarchy nodes of level condition, None if level is not searched"""
         hierarchy_obj_should_conditions = (
             self.__create_search_query_for_list_level_conditions(
                 list_level_conditions=[one_level_cond]
             )
         )
+        if not hierarchy_obj_should_conditions:
+            return None
 
-        node_id_node = dict()
-
-        if hierarchy_obj_should_conditions:
-            bool_cond = {
-                "should": hierarchy_obj_should_conditions,
-                "minimum_should_match": 1,
-            }
-
-            size_per_step = 500_000
-
-            search_body = {
-                "query": {"bool": bool_cond},
-                "sort": {"_doc": {"order": "asc"}},
-                "track_total_hits": True,
-                "size": size_per_step,
-                # '_source': {'includes': ['id', 'parent_id', 'level_id']}
-            }
-
-            if search_body:
-                while True:
-                    search_res = await self.elastic_client.search(
-                        index=HIERARCHY_OBJ_INDEX,
-                        body=search_body,
-                        ignore_unavailable=True,
-                    )
+        search_body = {
+            "query": {
+                "bool": {
+                    "should": hierarchy_obj_should_conditions,
+                    "minimum_should_match": 1,
+                }
+            },
+            "sort": {"_doc": {"order": "asc"}},
+            "size": LEVEL_SEARCH_SIZE_PER_STEP,
+        }
+        return HIERARCHY_OBJ_INDEX, search_body
+
+    async def __msearch(
+        self, *groups_of_searches: list[tuple[str, dict] | None]
+    ) -> list[list[list[dict]]]:
+        """Returns hits of each search of each group. Searches of all groups are sent together,
+        None instead of search means that search has no hits"""
+        searches = [
+            search
+            for group in groups_of_searches
+            for search in group
+            if search is not None
+        ]
+        hits_of_searches = iter(
+            await msearch_all_hits(
+                elastic_client=self.elastic_client,
+                searches=searches,
+                max_searches_per_request=ES_MSEARCH_MAX_SEARCHES,
+                concurrency=ES_MSEARCH_CONCURRENCY,
+            )
+        )
+        return [
+            [
+                next(hits_of_searches) if search is not None else []
+                for search in group
+            ]
+            for group in groups_of_searches
+        ]
 
-                    total_hits = search_res["hits"]["total"]["value"]
+    async def __search_level_conditions(
+        self, level_conditions: list[LevelConditions]
+    ) -> list[tuple[dict, dict[str, list]]]:
+        """Returns for each level condition of depth a dictionary with node_ids as keys and node info as values
+        and a dictionary with node_ids as keys and lists of mo_ids as values, that match level condition.
+        Searches of all level conditions of depth are sent together step by step"""
+        inventory_should_conditions = (
+            await self.__get_inventory_should_conditions(level_conditions)
+        )
+        hierarchy_searches = [
+            self.__get_hierarchy_obj_search(one_level_cond)
+            for one_level_cond in level_conditions
+        ]
+        # if on previous level was filter - no need to get all inventory objects
+        inventory_searches = [None] * len(level_conditions)
+        if not self.__applied_filter_at_prev_depth:
+            inventory_searches = [
+                self.__get_inventory_search(one_level_cond, should_conditions)
+                for one_level_cond, should_conditions in zip(
+                    level_conditions, inventory_should_conditions
+                )
+            ]
 
-                    search_res = search_res["hits"]["hits"]
+        hierarchy_hits, inventory_hits = await self.__msearch(
+            hierarchy_searches, inventory_searches
+        )
+        nodes_of_levels = [
+            {item["_source"]["id"]: item["_source"] for item in hits}
+            for hits in hierarchy_hits
+        ]
 
-                    if not node_id_node:
-                        node_id_node = {
-                            item["_source"]["id"]: item["_source"]
-                            for item in search_res
-                        }
-                    else:
-                        node_id_node.update(
-                            {
-                                item["_source"]["id"]: item["_source"]
-                                for item in search_res
-                            }
-                        )
+        if self.__applied_filter_at_prev_depth:
+            (node_data_hits,) = await self.__msearch(
+                [
+                    self.__get_node_data_mo_ids_search(list(node_ids_node))
+                    for node_ids_node in nodes_of_levels
+                ]
+            )
+            inventory_searches = [
+                self.__get_inventory_search(
+                    one_level_cond,
+                    should_conditions,
+                    mo_ids=[item["_source"]["mo_id"] for item in hits],
+                )
+                if node_ids_node
+                else None
+                for one_level_cond, should_conditions, node_ids_node, hits in zip(
+                    level_conditions,
+                    inventory_should_conditions,
+                    nodes_of_levels,
+                    node_data_hits,
+                )
+            ]
+            (inventory_hits,) = await self.__msearch(inventory_searches)
 
-                    if total_hits < size_per_step:
-                        break
+        mo_ids_of_levels = [
+            {item_id for item in hits if (item_id := item["_source"].get("id"))}
+            for hits in inventory_hits
+        ]
+        (node_data_hits,) = await self.__msearch(
+            [
+                self.__get_node_data_search(
+                    one_level_cond,
+                    mo_ids=list(mo_ids),
+                    node_ids=list(node_ids_node),
+                )
+                for one_level_cond, mo_ids, node_ids_node in zip(
+                    level_conditions, mo_ids_of_levels, nodes_of_levels
+                )
+            ]
+        )
 
-                    if len(search_res) == size_per_step:
-                        search_after = search_res[-1]["sort"]
-                        search_body["search_after"] = search_after
-                    else:
-                        break
-        return node_id_node
+        results = []
+        for node_ids_node, hits in zip(nodes_of_levels, node_data_hits):
+            node_ids_mo_ids = defaultdict(list)
+            for item in hits:
+                item = item["_source"]
+                node_ids_mo_ids[item["node_id"]].append(item["mo_id"])
+            results.append((node_ids_node, node_ids_mo_ids))
+        return results
 
     # PROCESS FILTER COND BLOCK - END
     # PROCESS RESULTS BLOCK - START
@@ -899,9 +861,10 @@ class LevelConditionsOrderHandlerWithoutFilters(LevelConditionsOrderHandler):
                 index=HIERARCHY_OBJ_INDEX,
                 body=search_body,
                 ignore_unavailable=True,
+                filter_path=SOURCE_HITS_FILTER_PATH,
             )
             total_hits = search_res.get("hits").get("total").get("value")
-            search_res = search_res.get("hits").get("hits")
+            search_res = search_res.get("hits").get("hits", [])
             hierarchies = [
                 HierarchyModel.model_validate(
                     item.get("_source", None)
@@ -943,9 +906,10 @@ class LevelConditionsOrderHandlerWithoutFilters(LevelConditionsOrderHandler):
                 index=index_name,
                 body=search_body,
                 ignore_unavailable=True,
+                filter_path=SOURCE_HITS_FILTER_PATH,
             )
             total_hits = search_res.get("hits").get("total").get("value")
-            search_res = search_res.get("hits").get("hits")
+            search_res = search_res.get("hits").get("hits", [])
             inventory_data = [
                 InventoryModel.model_validate(
                     item.get("_source", None)
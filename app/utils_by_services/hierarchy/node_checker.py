@@ -13,7 +13,6 @@ from elastic.query_builder_service.inventory_index.mo_object.utils import (
 from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_data_models import UserPermission
 
 from services.hierarchy_services.features.dependet_level_factory import (
@@ -29,6 +28,10 @@ from services.hierarchy_services.models.dto import (
     LevelDTO,
 )
 from services.inventory_services.models import InventoryMODefaultFields
+from services.inventory_services.utils.security.permission_sets import (
+    add_condition_to_query,
+    get_mo_permissions_condition,
+)
 
 
 class LevelFilterStepRes(BaseModel):
@@ -169,17 +172,12 @@ class NodeCheckerWithFilters:
             )
 
         # add user permissions
+        permissions_condition = None
         if self.user_permissions and self.user_permissions.is_admin is False:
-            filter_item = FilterItem(
-                operator=SearchOperator.IS_ANY_OF,
-                value=self.user_permissions.user_permissions,
-            )
-            filter_column = FilterColumn(
-                columnName=INVENTORY_PERMISSIONS_FIELD_NAME,
-                rule=LogicalOperator.AND.value,
-                filters=[filter_item],
+            permissions_condition = await get_mo_permissions_condition(
+                client_permissions=self.user_permissions.user_permissions,
+                elastic_client=self.elastic_client,
             )
-            list_of_filter_columns.append(filter_column)
 
         # add parent node mo_ids to filter list
 
@@ -238,6 +236,10 @@ class NodeCheckerWithFilters:
         filter_search_query = get_search_query_for_inventory_obj_index(
             filter_columns=list_of_filter_columns, dict_of_types=dict_of_types
         )
+        if permissions_condition:
+            filter_search_query = add_condition_to_query(
+                query=filter_search_query, condition=permissions_condition
+            )
 
         size_per_step = 100_000
         search_body = {
@@ -1,39 +1,67 @@
+import asyncio
+import heapq
+from contextlib import aclosing
 from copy import deepcopy
 from typing import AsyncIterator
 
 from elasticsearch import AsyncElasticsearch
 
+from elastic.config import (
+    ES_MSEARCH_CONCURRENCY,
+    ES_MSEARCH_MAX_SEARCHES,
+    ES_SLICED_SCAN_MAX_PAGES_IN_FLIGHT,
+    ES_SLICED_SCAN_SLICES,
+)
+
 
 SIZE_PER_STEP = 10_000
+# filter_path of searches which need only documents: _shards, _index, _id and _score
+# of each hit are dropped by Elasticsearch and are not parsed
+SOURCE_HITS_FILTER_PATH = ["hits.total", "hits.hits._source", "hits.hits.sort"]
+
+
+def get_filter_path(
+    filter_path: list[str] | None, *required: str
+) -> list[str] | None:
+    """Returns filter_path with paths which are required by search helper,
+    None means the whole response"""
+    if filter_path is None:
+        return None
+    return sorted({*filter_path, *required})
 
 
 async def scroll_search(
     elastic_client: AsyncElasticsearch,
     index: str,
     body: dict,
+    filter_path: list[str] | None = None,
 ) -> list:
-    """Implement search based on Scroll in Elastic"""
+    """Implement search based on Scroll in Elastic.
+    filter_path limits the response of Elastic to the specified paths of hits"""
     output: list = []
     scroll_time = "2s"
+    filter_path = get_filter_path(filter_path, "_scroll_id", "hits.total")
     response = await elastic_client.search(
         index=index,
         body=body,
         ignore_unavailable=True,
         size=SIZE_PER_STEP,
         scroll=scroll_time,
+        filter_path=filter_path,
     )
     print(f"{id(elastic_client)=}")
     scroll_id = response["_scroll_id"]
-    hits = response["hits"]["hits"]
+    hits = response["hits"].get("hits", [])
     output.extend(hits)
     if response["hits"]["total"]["value"] > SIZE_PER_STEP:
         while len(hits) > 0:
             search_res = await elastic_client.scroll(
                 scroll_id=scroll_id,
                 scroll=scroll_time,
+                filter_path=filter_path,
             )
             print(f"Cycle: {id(elastic_client)=}")
-            hits = search_res["hits"]["hits"]
+            hits = search_res.get("hits", {}).get("hits", [])
             output.extend(hits)
     await elastic_client.clear_scroll(scroll_id=scroll_id)
     print(body)
@@ -45,17 +73,23 @@ async def search_after(
     elastic_client: AsyncElasticsearch,
     index: str,
     body: dict,
+    filter_path: list[str] | None = None,
 ) -> list:
-    """Implement search based on search_after in Elastic"""
+    """Implement search based on search_after in Elastic.
+    filter_path limits the response of Elastic to the specified paths of hits"""
     output: list = []
     body["size"] = SIZE_PER_STEP
+    filter_path = get_filter_path(filter_path, "hits.total", "hits.hits.sort")
     while True:
         response = await elastic_client.search(
-            index=index, body=body, ignore_unavailable=True
+            index=index,
+            body=body,
+            ignore_unavailable=True,
+            filter_path=filter_path,
         )
 
         total_hits = response["hits"]["total"]["value"]
-        hits = response["hits"]["hits"]
+        hits = response.get("hits", {}).get("hits", [])
 
         output.extend(hits)
 
@@ -79,6 +113,7 @@ async def search_after_generator(
     size: int = int(body.get("size", 0))
     base_query.pop("from_", None)
     base_query.pop("size", None)
+    base_query["filter_path"] = SOURCE_HITS_FILTER_PATH
 
     if "sort" not in base_query:
         raise ValueError("Field 'sort' must be included in query.")
@@ -99,7 +134,7 @@ async def search_after_generator(
                 query["search_after"] = search_after_field
 
             response = await elastic_client.search(**query)
-            hits = response["hits"]["hits"]
+            hits = response.get("hits", {}).get("hits", [])
 
             if not hits:
                 return
@@ -118,7 +153,7 @@ async def search_after_generator(
             query["search_after"] = search_after_field
 
         response = await elastic_client.search(**query)
-        hits = response["hits"]["hits"]
+        hits = response.get("hits", {}).get("hits", [])
 
         if not hits:
             return
@@ -142,6 +177,7 @@ async def search_after_generator_with_total(
     size: int = int(body.get("size", 0))
     base_query.pop("from_", None)
     base_query.pop("size", None)
+    base_query["filter_path"] = SOURCE_HITS_FILTER_PATH
 
     if "sort" not in base_query:
         raise ValueError("Field 'sort' must be included in query.")
@@ -162,7 +198,7 @@ async def search_after_generator_with_total(
                 query["search_after"] = search_after_field
 
             response = await elastic_client.search(**query)
-            hits = response["hits"]["hits"]
+            hits = response.get("hits", {}).get("hits", [])
             result.update({"hits": response["hits"]["total"]["value"]})
 
             if not hits:
@@ -182,7 +218,7 @@ async def search_after_generator_with_total(
             query["search_after"] = search_after_field
 
         response = await elastic_client.search(**query)
-        hits = response["hits"]["hits"]
+        hits = response.get("hits", {}).get("hits", [])
         if not result.get("update"):
             result.update({"hits": response["hits"]["total"]["value"]})
 
@@ -197,3 +233,313 @@ async def search_after_generator_with_total(
                 return
 
         search_after_field = hits[-1]["sort"]
+
+
+def get_sort_orders(sort: list | dict | str | None) -> list[bool]:
+    """Returns True for each descending column of sort of Elastic"""
+    if not sort:
+        return []
+    if not isinstance(sort, list):
+        sort = [sort]
+    orders = []
+    for sort_item in sort:
+        if isinstance(sort_item, str):
+            orders.append(sort_item.endswith(":desc"))
+            continue
+        for column_sort in sort_item.values():
+            if isinstance(column_sort, dict):
+                column_sort = column_sort.get("order", "asc")
+            orders.append(column_sort == "desc")
+    return orders
+
+
+class _SortKey:
+    """Comparable sort values of hit. Missing values (None) are last in both directions as in Elastic"""
+
+    __slots__ = ("values", "orders")
+
+    def __init__(self, values: list, orders: list[bool]):
+        self.values = values
+        self.orders = orders
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        for index, (value, other_value) in enumerate(
+            zip(self.values, other.values)
+        ):
+            if value == other_value:
+                continue
+            if value is None:
+                return False
+            if other_value is None:
+                return True
+            if index < len(self.orders) and self.orders[index]:
+                return value > other_value
+            return value < other_value
+        return False
+
+
+async def _scan_slice(
+    elastic_client: AsyncElasticsearch,
+    body: dict,
+    slice_id: int,
+    slices: int,
+    page_size: int,
+    filter_path: list[str] | None,
+    queue: asyncio.Queue,
+):
+    """Puts pages of hits of slice into queue, None after the last page.
+    Exception is put into queue instead of the next page"""
+    try:
+        search_after_field = None
+        while True:
+            slice_body = dict(body)
+            slice_body["size"] = page_size
+            if slices > 1:
+                slice_body["slice"] = {"id": slice_id, "max": slices}
+            if search_after_field:
+                slice_body["search_after"] = search_after_field
+            response = await elastic_client.search(
+                body=slice_body, filter_path=filter_path
+            )
+            hits = response.get("hits", {}).get("hits", [])
+            if hits:
+                await queue.put(hits)
+            if len(hits) < page_size:
+                break
+            search_after_field = hits[-1]["sort"]
+        await queue.put(None)
+    except Exception as e:
+        await queue.put(e)
+
+
+async def _get_page(queue: asyncio.Queue) -> list | None:
+    page = await queue.get()
+    if isinstance(page, Exception):
+        raise page
+    return page
+
+
+async def sliced_pit_scan(
+    elastic_client: AsyncElasticsearch,
+    index: str | list[str],
+    body: dict,
+    ordered: bool = False,
+    slices: int = ES_SLICED_SCAN_SLICES,
+    max_pages_in_flight: int = ES_SLICED_SCAN_MAX_PAGES_IN_FLIGHT,
+    page_size: int = SIZE_PER_STEP,
+    keep_alive: str = "1m",
+    filter_path: list[str] | None = None,
+) -> AsyncIterator[list]:
+    """Reads all documents of body query by concurrent slices of point in time and yields pages of hits.
+    If ordered is True, pages of slices are merged by sort of body, otherwise pages are yielded as they are read.
+    Not more than max_pages_in_flight pages are read but not yielded (in ordered mode at least one page
+    per slice). size, from and track_total_hits of body are ignored"""
+    scan_body = {
+        key: value
+        for key, value in body.items()
+        if key not in {"size", "from", "from_", "track_total_hits", "index"}
+    }
+    if not scan_body.get("sort"):
+        scan_body["sort"] = ["_shard_doc"]
+    slices = max(1, slices)
+    filter_path = get_filter_path(filter_path, "hits.hits.sort")
+
+    pit = await elastic_client.open_point_in_time(
+        index=index, keep_alive=keep_alive, ignore_unavailable=True
+    )
+    scan_body["pit"] = {"id": pit["id"], "keep_alive": keep_alive}
+
+    if ordered:
+        per_slice_pages = max(1, max_pages_in_flight // slices)
+        queues = [asyncio.Queue(maxsize=per_slice_pages) for _ in range(slices)]
+    else:
+        queues = [asyncio.Queue(maxsize=max(1, max_pages_in_flight))] * slices
+    tasks = [
+        asyncio.create_task(
+            _scan_slice(
+                elastic_client=elastic_client,
+                body=scan_body,
+                slice_id=slice_id,
+                slices=slices,
+                page_size=page_size,
+                filter_path=filter_path,
+                queue=queue,
+            )
+        )
+        for slice_id, queue in enumerate(queues)
+    ]
+    try:
+        if not ordered:
+            finished_slices = 0
+            while finished_slices < slices:
+                page = await _get_page(queues[0])
+                if page is None:
+                    finished_slices += 1
+                else:
+                    yield page
+            return
+
+        # k-way merge of sorted slices
+        orders = get_sort_orders(scan_body["sort"])
+        heap = []
+        pages = {}
+        for slice_id, queue in enumerate(queues):
+            page = await _get_page(queue)
+            if page:
+                pages[slice_id] = page
+                heapq.heappush(
+                    heap, (_SortKey(page[0]["sort"], orders), slice_id, 0)
+                )
+        output = []
+        while heap:
+            _, slice_id, position = heapq.heappop(heap)
+            page = pages[slice_id]
+            output.append(page[position])
+            position += 1
+            if position == len(page):
+                page = await _get_page(queues[slice_id])
+                position = 0
+                if page:
+                    pages[slice_id] = page
+                else:
+                    del pages[slice_id]
+            if page:
+                heapq.heappush(
+                    heap,
+                    (
+                        _SortKey(page[position]["sort"], orders),
+                        slice_id,
+                        position,
+                    ),
+                )
+            if len(output) == page_size:
+                yield output
+                output = []
+        if output:
+            yield output
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await elastic_client.options(ignore_status=404).close_point_in_time(
+            id=pit["id"]
+        )
+
+
+async def read_page_by_sliced_scan(
+    elastic_client: AsyncElasticsearch,
+    index: str | list[str],
+    body: dict,
+    offset: int,
+    limit: int,
+) -> list[dict]:
+    """Returns sources of documents from offset to offset + limit of body query, read by sliced_pit_scan.
+    Slices are always merged by sort, by _shard_doc if body has no sort, so consecutive pages
+    are read in the same order and do not overlap"""
+    sources = list()
+    skipped = 0
+    async with aclosing(
+        sliced_pit_scan(
+            elastic_client=elastic_client,
+            index=index,
+            body=body,
+            ordered=True,
+            filter_path=["hits.hits._source"],
+        )
+    ) as pages:
+        async for hits in pages:
+            if skipped < offset:
+                skip_in_page = min(offset - skipped, len(hits))
+                skipped += skip_in_page
+                hits = hits[skip_in_page:]
+            sources.extend(
+                item["_source"] for item in hits[: limit - len(sources)]
+            )
+            if len(sources) >= limit:
+                break
+    return sources
+
+
+class MultiSearchError(Exception):
+    pass
+
+
+# filter_path of _msearch responses: errors and documents of each search. status is kept,
+# so responses without hits are not dropped and responses stay in order of searches
+MSEARCH_HITS_FILTER_PATH = [
+    "responses.status",
+    "responses.error",
+    "responses.hits.hits._source",
+    "responses.hits.hits.sort",
+]
+
+
+async def _msearch_page(
+    elastic_client: AsyncElasticsearch,
+    searches: list[tuple[str | list[str], dict]],
+    semaphore: asyncio.Semaphore,
+) -> list[dict]:
+    msearch_body = []
+    for index, body in searches:
+        msearch_body.append({"index": index, "ignore_unavailable": True})
+        msearch_body.append(body)
+    async with semaphore:
+        response = await elastic_client.msearch(
+            body=msearch_body, filter_path=MSEARCH_HITS_FILTER_PATH
+        )
+    return response.get("responses", [])
+
+
+async def msearch_all_hits(
+    elastic_client: AsyncElasticsearch,
+    searches: list[tuple[str | list[str], dict]],
+    max_searches_per_request: int = ES_MSEARCH_MAX_SEARCHES,
+    concurrency: int = ES_MSEARCH_CONCURRENCY,
+) -> list[list[dict]]:
+    """Returns all hits of each (index, body) search, in order of searches.
+    Pages of searches are sent together by _msearch requests of not more than max_searches_per_request searches,
+    not more than concurrency requests at a time. While a page of search is full, the next page
+    is requested by search_after on sort of body"""
+    bodies = [dict(body) for _, body in searches]
+    results = [[] for _ in searches]
+    pending = list(range(len(searches)))
+    max_searches_per_request = max(1, max_searches_per_request)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    while pending:
+        batches = [
+            pending[start : start + max_searches_per_request]
+            for start in range(0, len(pending), max_searches_per_request)
+        ]
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [
+                task_group.create_task(
+                    _msearch_page(
+                        elastic_client=elastic_client,
+                        searches=[
+                            (searches[position][0], bodies[position])
+                            for position in batch
+                        ],
+                        semaphore=semaphore,
+                    )
+                )
+                for batch in batches
+            ]
+
+        pending = []
+        for batch, task in zip(batches, tasks):
+            responses = task.result()
+            # responses are matched with searches by position
+            if len(responses) != len(batch):
+                raise MultiSearchError(
+                    f"_msearch returned {len(responses)} responses of {len(batch)} searches"
+                )
+            for position, response in zip(batch, responses):
+                if "error" in response:
+                    raise MultiSearchError(response["error"])
+                hits = response.get("hits", {}).get("hits", [])
+                results[position].extend(hits)
+                if hits and len(hits) >= bodies[position].get("size", 10):
+                    bodies[position]["search_after"] = hits[-1]["sort"]
+                    pending.append(position)
+    return results
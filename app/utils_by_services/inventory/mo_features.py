@@ -7,8 +7,17 @@ from elastic.config import (
     ALL_MO_OBJ_INDEXES_PATTERN,
     INVENTORY_TMO_INDEX_V2,
 )
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
-from utils_by_services.inventory.common import search_after
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_PERMISSIONS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+)
+from utils_by_services.inventory.common import (
+    SOURCE_HITS_FILTER_PATH,
+    search_after,
+)
 
 
 async def get_info_about_tmos(
@@ -29,7 +38,10 @@ async def get_info_about_tmos(
         sorting=sorting,
     )
     output = await search_after(
-        elastic_client=elastic_client, index=INVENTORY_TMO_INDEX_V2, body=body
+        elastic_client=elastic_client,
+        index=INVENTORY_TMO_INDEX_V2,
+        body=body,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     return output
 
@@ -43,6 +55,11 @@ async def get_info_mos(
     sorting: dict | None = None,
 ) -> list[Any]:
     """Implement request to Elastic ALL_MO_OBJ_INDEXES_PATTERN with correct request and return _source data"""
+    permissions_condition = None
+    if not is_admin:
+        permissions_condition = await get_mo_permissions_condition(
+            client_permissions=user_permissions, elastic_client=elastic_client
+        )
     body = generate_request_body(
         field_for_request="id",
         ids=mo_ids,
@@ -51,11 +68,13 @@ async def get_info_mos(
         user_permissions=user_permissions,
         returned_columns=returned_columns,
         sorting=sorting,
+        permissions_condition=permissions_condition,
     )
     output = await search_after(
         elastic_client=elastic_client,
         index=ALL_MO_OBJ_INDEXES_PATTERN,
         body=body,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     return output
 
@@ -82,7 +101,10 @@ async def get_mo_link_data_by_mo_ids(
         sorting=sorting,
     )
     output = await search_after(
-        elastic_client=elastic_client, index=INVENTORY_MO_LINK_INDEX, body=body
+        elastic_client=elastic_client,
+        index=INVENTORY_MO_LINK_INDEX,
+        body=body,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     return output
 
@@ -109,7 +131,10 @@ async def get_mo_link_data_by_value(
         sorting=sorting,
     )
     output = await search_after(
-        elastic_client=elastic_client, index=INVENTORY_MO_LINK_INDEX, body=body
+        elastic_client=elastic_client,
+        index=INVENTORY_MO_LINK_INDEX,
+        body=body,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     return output
 
@@ -122,6 +147,7 @@ def generate_request_body(
     user_permissions: list[str],
     returned_columns: list[str] | None = None,
     sorting: dict | None = None,
+    permissions_condition: dict | None = None,
 ) -> dict:
     if len(ids) == 1:
         search_conditions = [{"term": {field_for_request: ids[0]}}]
@@ -133,14 +159,21 @@ def generate_request_body(
         else:
             search_conditions.append({"terms": {"tprm_id": tprm_ids}})
     if not is_admin:
-        search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
-        )
+        if permissions_condition is None:
+            permissions_condition = {
+                "terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}
+            }
+        search_conditions.append(permissions_condition)
     query = {"bool": {"must": search_conditions}}
     body = {
         "query": query,
         "track_total_hits": True,
-        "_source": {"excludes": [INVENTORY_PERMISSIONS_FIELD_NAME]},
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
     }
     if sorting:
         body["sort"] = sorting
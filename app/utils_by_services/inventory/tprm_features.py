@@ -7,9 +7,14 @@ from elastic.enum_models import InventoryFieldValType
 from elastic.query_builder_service.inventory_index.utils.search_utils import (
     get_field_name_for_tprm_id,
 )
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_data_models import UserPermission
-from utils_by_services.inventory.common import search_after
+from services.inventory_services.utils.security.permission_sets import (
+    get_tprm_permissions_condition,
+)
+from utils_by_services.inventory.common import (
+    SOURCE_HITS_FILTER_PATH,
+    search_after,
+)
 from v2.routers.inventory.utils.helpers import (
     get_query_to_find_tprms_by_val_types,
 )
@@ -30,11 +35,10 @@ async def get_list_of_ids_of_unavailable_tprms(
             "bool": {
                 "must": [{"match": {"tmo_id": tmo_id}}],
                 "must_not": [
-                    {
-                        "terms": {
-                            INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions.user_permissions
-                        }
-                    }
+                    await get_tprm_permissions_condition(
+                        client_permissions=user_permissions.user_permissions,
+                        elastic_client=elastic_client,
+                    )
                 ],
             }
         },
@@ -88,11 +92,10 @@ async def get_list_of_unavailable_parameters(
             "bool": {
                 "must": [{"match": {"tmo_id": tmo_id}}],
                 "must_not": [
-                    {
-                        "terms": {
-                            INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions.user_permissions
-                        }
-                    }
+                    await get_tprm_permissions_condition(
+                        client_permissions=user_permissions.user_permissions,
+                        elastic_client=elastic_client,
+                    )
                 ],
             }
         },
@@ -180,6 +183,9 @@ async def get_list_of_mo_link_tprm(
     if sorting:
         body["sort"] = sorting
     output = await search_after(
-        elastic_client=elastic_client, index=INVENTORY_TPRM_INDEX_V2, body=body
+        elastic_client=elastic_client,
+        index=INVENTORY_TPRM_INDEX_V2,
+        body=body,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     return output
@@ -1,5 +1,8 @@
+from fastapi.responses import ORJSONResponse
+
 from init_app import create_app
 from settings import config
+from v2.routers.elastic.router import router as elastic_router
 from v2.routers.inventory.router import router as inventory_router
 from v2.routers.severity.router import router as severity_router
 from v2.routers.hierarchy.hierarchy_router import (
@@ -19,9 +22,11 @@ v2_app = create_app(
     version="2",
     root_path=v2_prefix,
     debug=config.DEBUG,
+    default_response_class=ORJSONResponse,
 )
 v2_app.include_router(inventory_router)
 v2_app.include_router(severity_router)
 v2_app.include_router(ms_hierarchy_h_data_router)
 v2_app.include_router(ms_hierarchy_reload_router)
 v2_app.include_router(ms_hierarchy_info_router)
+v2_app.include_router(elastic_router)
@@ -0,0 +1,18 @@
+from fastapi import Depends
+
+from elastic.client import SingleFlightAsyncElasticsearch, create_async_client
+from security.security_data_models import UserData
+from security.security_factory import security
+
+
+async def get_coalescing_async_client(user_data: UserData = Depends(security)):
+    """Generator of elastic async session for endpoints which opt in to single flight: identical
+    concurrent reads of users with the same realm roles share one request to Elasticsearch"""
+    async_client = create_async_client(SingleFlightAsyncElasticsearch)
+    if user_data.realm_access:
+        async_client.single_flight_scope = (
+            user_data.realm_access.name,
+            tuple(sorted(set(user_data.realm_access.roles))),
+        )
+    async with async_client as elastic_client:
+        yield elastic_client
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+
+from elastic.slow_queries import slow_query_log
+from security.security_data_models import UserData
+from security.security_factory import security
+from services.inventory_services.utils.security.filter_by_realm import (
+    check_permission_is_admin,
+    raise_forbidden_exception,
+)
+
+router = APIRouter(prefix="/elastic", tags=["Elasticsearch: diagnostics"])
+
+
+@router.get("/slow_queries")
+async def get_slow_queries(
+    limit: int = Query(None, ge=1),
+    with_profile: bool = Query(
+        False, description="Include profiles of sampled requests"
+    ),
+    user_data: UserData = Depends(security),
+):
+    """Returns the slowest Elasticsearch query fingerprints (query shapes without literal values)
+    with their latency and took. Each worker process has its own log"""
+    if not check_permission_is_admin(client_role=user_data.realm_access):
+        raise_forbidden_exception()
+    return slow_query_log.get_slowest(limit=limit, with_profile=with_profile)
+
+
+@router.delete("/slow_queries", status_code=204)
+async def clear_slow_queries(user_data: UserData = Depends(security)):
+    """Clears the slow query log of the worker process"""
+    if not check_permission_is_admin(client_role=user_data.realm_access):
+        raise_forbidden_exception()
+    slow_query_log.clear()
@@ -30,7 +30,10 @@ from elastic.query_builder_service.inventory_index.mo_object.utils import (
 from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_PERMISSIONS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+)
 from security.security_data_models import UserData, UserPermissionBuilder
 from security.security_factory import security
 from services.hierarchy_services.elastic.configs import (
@@ -59,6 +62,9 @@ from services.inventory_services.utils.security.filter_by_realm import (
     raise_forbidden_ex_if_user_has_no_permission,
     get_only_available_to_read_tmo_ids_for_special_client,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    get_tprm_permissions_condition,
+)
 from utils_by_services.hierarchy.level_cond_query_handler import (
     LevelConditionsOrderHandler,
     LevelConditionsOrderHandlerWithoutFilters,
@@ -73,6 +79,7 @@ from utils_by_services.hierarchy.result_aggregation_handler import (
 from utils_by_services.inventory.tprm_features import (
     get_list_of_unavailable_parameters,
 )
+from v2.routers.elastic.dependencies import get_coalescing_async_client
 from v2.routers.hierarchy.configs import HIERARCHY_ROUTER_PREFIX
 from v2.routers.hierarchy.utils.checkers import (
     get_hierarchy_with_permission_check_or_raise_error,
@@ -99,7 +106,7 @@ router = APIRouter(
 )
 async def get_hierarchies(
     with_lifecycle: bool = False,
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
     sort_by_field: Union[LITERAL_HIERARCHY_SORT_PARAMETERS, None] = "id",
     sort_direction: Union[None, Literal["asc", "desc"]] = "asc",
@@ -211,7 +218,7 @@ async def get_hierarchies(
 @router.get("/{hierarchy_id}", response_model=HierarchyDTO)
 async def get_hierarchy(
     hierarchy_id: int,
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     hierarchy = await get_hierarchy_with_permission_check_or_raise_error(
@@ -317,11 +324,10 @@ async def get_hierarchy_and_inventory_results_by_filter(
                     "bool": {
                         "must": [
                             {"terms": {"id": list(all_tprms)}},
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions.user_permissions
-                                }
-                            },
+                            await get_tprm_permissions_condition(
+                                client_permissions=user_permissions.user_permissions,
+                                elastic_client=elastic_client,
+                            ),
                         ]
                     }
                 },
@@ -545,7 +551,10 @@ async def get_hierarchy_and_inventory_results_by_filter(
             tmo_id=handler_res.level.object_type_id,
         )
 
-    excludes_fields = [INVENTORY_PERMISSIONS_FIELD_NAME]
+    excludes_fields = [
+        INVENTORY_PERMISSIONS_FIELD_NAME,
+        INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+    ]
     if unavailable_parameters:
         excludes_fields.extend(unavailable_parameters)
 
@@ -868,11 +877,10 @@ async def get_hierarchy_and_inventory_results(
                     "bool": {
                         "must": [
                             {"terms": {"id": list(all_tprms)}},
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions.user_permissions
-                                }
-                            },
+                            await get_tprm_permissions_condition(
+                                client_permissions=user_permissions.user_permissions,
+                                elastic_client=elastic_client,
+                            ),
                         ]
                     }
                 },
@@ -1,5 +1,5 @@
 from elasticsearch import AsyncElasticsearch
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from elastic.client import get_async_client
@@ -7,6 +7,10 @@ from elastic.client import get_async_client
 from services.hierarchy_services.reload.hierarchy_data import (
     HierarchyIndexesReloader,
 )
+from services.hierarchy_services.reload.models import (
+    HierarchyReloadProgress,
+    HierarchyReloadState,
+)
 
 from v2.database.database import get_session
 
@@ -17,14 +21,39 @@ router = APIRouter(
 )
 
 
-@router.get("/reload_all_hierarchy_indexes", status_code=200)
+@router.get(
+    "/reload_all_hierarchy_indexes",
+    status_code=200,
+    response_model=HierarchyReloadProgress,
+)
 async def reload_all_hierarchy_indexes(
+    swap_with_failures: bool = False,
     elastic_client: AsyncElasticsearch = Depends(get_async_client),
     db_session: AsyncSession = Depends(get_session),
 ):
+    """Loads all hierarchies into new indexes and switches hierarchy indexes to them.
+    If some hierarchies are failed, the previous indexes are kept, unless swap_with_failures"""
+    if (
+        HierarchyIndexesReloader.last_full_reload.state
+        == HierarchyReloadState.LOADING
+    ):
+        raise HTTPException(
+            status_code=409, detail="Hierarchy indexes are already reloading"
+        )
     reloader = HierarchyIndexesReloader(elastic_client, db_session)
-    await reloader.refresh_all_hierarchies_indexes()
-    return {"status": "ok"}
+    return await reloader.refresh_all_hierarchies_indexes(
+        swap_with_failures=swap_with_failures
+    )
+
+
+@router.get(
+    "/reload_all_hierarchy_indexes/progress",
+    status_code=200,
+    response_model=HierarchyReloadProgress,
+)
+async def get_progress_of_reload_all_hierarchy_indexes():
+    """Returns progress of the last full reload of hierarchy indexes in this process"""
+    return HierarchyIndexesReloader.last_full_reload
 
 
 @router.get("/reload_all_data_for_special_hierarchy", status_code=200)
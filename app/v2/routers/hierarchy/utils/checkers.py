@@ -4,12 +4,9 @@ from elasticsearch import AsyncElasticsearch
 from fastapi import HTTPException
 
 from security.security_data_models import UserData
-from services.hierarchy_services.elastic.configs import (
-    HIERARCHY_HIERARCHIES_INDEX,
-    HIERARCHY_OBJ_INDEX,
-)
-from services.hierarchy_services.elastic.mapping import (
-    HIERARCHY_PERMISSIONS_FIELD_NAME,
+from services.hierarchy_services.elastic.configs import HIERARCHY_OBJ_INDEX
+from services.hierarchy_services.elastic.utils import (
+    get_hierarchy_readable_by_permissions,
 )
 from services.inventory_services.utils.security.filter_by_realm import (
     check_permission_is_admin,
@@ -31,34 +28,19 @@ async def get_hierarchy_with_permission_check_or_raise_error(
             client_permissions=user_permissions
         )
 
-    search_conditions = [{"match": {"id": hierarchy_id}}]
-
-    if not is_admin:
-        search_conditions.append(
-            {"terms": {HIERARCHY_PERMISSIONS_FIELD_NAME: user_permissions}}
-        )
-
-    search_body = {
-        "query": {"bool": {"must": search_conditions}},
-        "size": 1,
-        "_source": {"excludes": [HIERARCHY_PERMISSIONS_FIELD_NAME]},
-    }
-
-    search_res = await elastic_client.search(
-        index=HIERARCHY_HIERARCHIES_INDEX,
-        body=search_body,
-        ignore_unavailable=True,
+    hierarchy = await get_hierarchy_readable_by_permissions(
+        hierarchy_id=hierarchy_id,
+        elastic_client=elastic_client,
+        is_admin=is_admin,
+        permissions=user_permissions,
     )
-    search_res = search_res["hits"]["hits"]
 
-    if not search_res:
+    if hierarchy is None:
         raise HTTPException(
             status_code=404,
             detail=f"Hierarchy with id = {hierarchy_id} not found",
         )
 
-    hierarchy = search_res[0]["_source"]
-
     return hierarchy
 
 
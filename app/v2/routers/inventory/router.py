@@ -1,14 +1,12 @@
 import io
 import time
 
-from collections import defaultdict
 from typing import List, Annotated, Literal
 
-import pandas as pd
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import APIRouter, Depends, Query, Body, HTTPException, status, Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import StreamingResponse
+from starlette.responses import FileResponse, Response, StreamingResponse
 
 from elastic.client import get_async_client
 from elastic.config import (
@@ -25,10 +23,6 @@ from elastic.enum_models import (
     ElasticFieldValType,
 )
 from elastic.pydantic_models import SearchModel, SortColumn, FilterColumn
-from elastic.query_builder_service.inventory_index.mo_object.utils import (
-    get_search_query_for_inventory_obj_index,
-    get_dict_of_inventory_attr_and_params_types,
-)
 from elastic.query_builder_service.inventory_index.search_query_builder import (
     InventoryIndexQueryBuilder,
 )
@@ -51,8 +45,8 @@ from indexes_mapping.inventory.mapping import (
     INVENTORY_PARAMETERS_FIELD_NAME,
     INVENTORY_PERMISSIONS_FIELD_NAME,
     INVENTORY_FUZZY_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
 )
-from indexes_mapping.inventory.zeebe_enums import ZeebeProcessInstanceFields
 from security.security_data_models import UserData
 from security.security_factory import security
 from services.group_builder.models import GroupStatisticUniqueFields
@@ -62,53 +56,97 @@ from services.inventory_services.coord_features.common_models import (
     EdgeItemImpl,
     WayItemResponseModel,
 )
+from services.inventory_services.coord_features.map_clusters.impl import (
+    get_clusters,
+    get_map_objects_query,
+    get_tile_bounding_box,
+    get_vector_tile,
+)
 from services.inventory_services.coord_features.points_in_one_line.impl import (
     reform_all_connected_points_between_start_point_and_end_point_into_line,
 )
+from services.inventory_services.coord_features.simplified_geometry.impl import (
+    get_level_key_by_zoom,
+    get_source_filter_for_level,
+    replace_geometries_by_level,
+)
 from services.inventory_services.mo_link.mo_link_info_finder import (
     MOLinkInfoFinder,
 )
 from services.inventory_services.models import (
     InventoryMODefaultFields,
-    InventoryMOProcessedFields,
     InventoryFuzzySearchFields,
 )
 from services.inventory_services.reload.inventory_data import (
     InventoryIndexesReloader,
 )
+from services.inventory_services.reload.inventory_data_reconcile import (
+    InventoryDataReconciler,
+)
 from services.inventory_services.reload.inventory_security import (
     InventorySecurityReloader,
 )
+from services.inventory_services.reload.inventory_security_reconcile import (
+    InventorySecurityReconciler,
+)
 
 from services.inventory_services.utils.security.filter_by_realm import (
     check_permission_is_admin,
     get_permissions_from_client_role,
-    get_cleared_filter_columns_with_available_tprm_ids,
-    get_cleared_sort_columns_with_available_tprm_ids,
     get_only_available_to_read_tmo_ids_for_special_client,
     get_only_available_to_read_tprm_ids_for_special_client,
     raise_forbidden_ex_if_user_has_no_permission,
-    get_post_filter_condition_according_user_permissions,
     raise_forbidden_ex_if_user_has_no_permission_to_special_mo,
-    check_availability_of_tmo_data,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+)
+from services.inventory_services.utils.suggest_backfill import (
+    suggest_backfill,
 )
 from services.zeebe_services.reload.utils import ZeebeProcessInstanceReloader
+from services.rendering_services.pool import (
+    RenderingPoolOverloadedError,
+    rendering_pool,
+)
+from services.rendering_services.renderers import render_table_file
 from settings.config import (
     ZEEBE_CLIENT_HOST,
     ZEEBE_CLIENT_GRPC_PORT,
     GROUP_BUILDER_HOST,
     GROUP_BUILDER_GRPC_PORT,
 )
+from utils_by_services.inventory.common import (
+    SIZE_PER_STEP,
+    SOURCE_HITS_FILTER_PATH,
+    read_page_by_sliced_scan,
+)
 from v2.database.database import get_session
+from v2.routers.elastic.dependencies import get_coalescing_async_client
 from v2.routers.inventory.utils.create_inventory_data_filter import (
     create_inventory_data_filter,
     InventoryDataFilter,
 )
+from v2.routers.inventory.utils.export_jobs import (
+    EXPORT_JOB_ID_PATTERN,
+    ExportJob,
+    ExportJobState,
+    export_jobs,
+)
+from v2.routers.inventory.utils.export_utils import (
+    ExportParams,
+    create_export_plan,
+    read_export_pages,
+)
 from v2.routers.inventory.utils.helpers import (
     get_tprm_val_types_need_to_check_in_global_search_by_inputted_data,
     get_operator_for_global_search_by_inventory_val_type,
     get_query_to_find_tprms_by_val_types,
 )
+from v2.routers.inventory.utils.map_utils import (
+    get_map_objects_conditions,
+    validate_bounding_box,
+)
 from v2.routers.inventory.utils.models import (
     MOLinkInfoResponse,
     FuzzySearchRequestModel,
@@ -120,8 +158,12 @@ from v2.routers.inventory.utils.models import (
 from v2.routers.inventory.utils.search_by_value_utils import (
     get_query_for_search_by_value_in_tmo_scope,
 )
+from v2.routers.inventory.utils.typeahead_utils import (
+    TYPEAHEAD_SOURCE_FIELDS,
+    get_prefix_condition,
+    get_typeahead_query,
+)
 from v2.routers.severity.utils import (
-    clear_receiving_columns,
     get_group_inventory_must_not_conditions,
 )
 
@@ -184,7 +226,10 @@ async def get_objects_by_ids(
             client_permissions=user_permissions
         )
         search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+            await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+            )
         )
 
         # get available TMOs
@@ -258,9 +303,11 @@ async def read_objects_by_coords(
     elastic_client: AsyncElasticsearch = Depends(get_async_client),
     only_active: bool = Query(True),
     with_parameters: bool = Query(False),
+    zoom: int = Query(None, ge=0, le=29),
     user_data: UserData = Depends(security),
 ):
-    """Returns Inventory objects with all params that match filter condition"""
+    """Returns Inventory objects with all params that match filter condition. If zoom of map is set,
+    geometries of lines are simplified for the zoom"""
 
     is_admin = check_permission_is_admin(client_role=user_data.realm_access)
     user_permissions = get_permissions_from_client_role(
@@ -486,13 +533,29 @@ async def read_objects_by_coords(
 
     body = {
         "query": final_query,
-        "_source": {"excludes": [INVENTORY_PERMISSIONS_FIELD_NAME]},
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
         "track_total_hits": True,
     }
 
     if source_includes:
         body["_source"] = {"includes": source_includes}
 
+    level_key = get_level_key_by_zoom(zoom)
+    if level_key:
+        source_includes, source_excludes = get_source_filter_for_level(
+            level_key=level_key, source_includes=source_includes
+        )
+        body["_source"] = {
+            "excludes": [INVENTORY_PERMISSIONS_FIELD_NAME, *source_excludes]
+        }
+        if source_includes:
+            body["_source"]["includes"] = source_includes
+
     if limit:
         body["size"] = limit
 
@@ -500,14 +563,143 @@ async def read_objects_by_coords(
         body["from_"] = offset
     # use body to senf POST request (GET request is limited by size)
     res = await elastic_client.search(
-        index=search_index, body=body, ignore_unavailable=True
+        index=search_index,
+        body=body,
+        ignore_unavailable=True,
+        filter_path=SOURCE_HITS_FILTER_PATH,
     )
     total_hit = res["hits"]["total"]["value"]
 
-    res = [item["_source"] for item in res["hits"]["hits"]]
+    res = [item["_source"] for item in res["hits"].get("hits", [])]
+    if level_key:
+        await replace_geometries_by_level(
+            objects=res,
+            level_key=level_key,
+            elastic_client=elastic_client,
+            index=search_index,
+        )
     return {"objects": res, "total_hits": total_hit}
 
 
+@router.get("/get_clusters_by_coords", tags=["Inventory indexes: main"])
+async def read_clusters_by_coords(
+    latitude_min: Annotated[float, Query(ge=-90, le=90)],
+    latitude_max: Annotated[float, Query(ge=-90, le=90)],
+    longitude_min: Annotated[float, Query(ge=-180, le=180)],
+    longitude_max: Annotated[float, Query(ge=-180, le=180)],
+    precision: int = Query(default=7, ge=1, le=29),
+    grid: Literal["geotile", "geohash"] = Query("geotile"),
+    size: int = Query(default=10_000, ge=1, le=65_535),
+    tmo_ids: List[int] = Query(None),
+    only_active: bool = Query(True),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
+    user_data: UserData = Depends(security),
+):
+    """Returns clusters of Inventory objects with coordinates in the bounding box: number of objects,
+    centroid and id of one object of each cell of geotile (precision is zoom) or geohash grid"""
+    validate_bounding_box(
+        latitude_min=latitude_min,
+        latitude_max=latitude_max,
+        longitude_min=longitude_min,
+        longitude_max=longitude_max,
+    )
+    if grid == "geohash" and precision > 12:
+        raise HTTPException(
+            status_code=400,
+            detail="precision of geohash grid can`t be more than 12",
+        )
+
+    is_admin = check_permission_is_admin(client_role=user_data.realm_access)
+    user_permissions = get_permissions_from_client_role(
+        client_role=user_data.realm_access
+    )
+    conditions = await get_map_objects_conditions(
+        tmo_ids=tmo_ids,
+        is_admin=is_admin,
+        user_permissions=user_permissions,
+        elastic_client=elastic_client,
+    )
+    if conditions is None:
+        return {"clusters": [], "total_hits": 0}
+
+    query = get_map_objects_query(
+        geometry="points",
+        only_active=only_active,
+        bounding_box=(latitude_min, latitude_max, longitude_min, longitude_max),
+        conditions=conditions,
+    )
+    return await get_clusters(
+        elastic_client=elastic_client,
+        index=ALL_MO_OBJ_INDEXES_PATTERN,
+        query=query,
+        grid=grid,
+        precision=precision,
+        size=size,
+    )
+
+
+@router.get(
+    "/map_tiles/{zoom}/{x}/{y}",
+    tags=["Inventory indexes: main"],
+    response_class=Response,
+)
+async def read_map_tile(
+    zoom: Annotated[int, Path(ge=0, le=29)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    geometry: Literal["points", "lines"] = Query("points"),
+    grid_precision: int = Query(default=8, ge=0, le=8),
+    size: int = Query(default=10_000, ge=0, le=10_000),
+    tmo_ids: List[int] = Query(None),
+    only_active: bool = Query(True),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
+    user_data: UserData = Depends(security),
+):
+    """Returns Mapbox vector tile zoom/x/y with points (coordinates) or lines (geometry) of Inventory objects.
+    Tiles of points contain the layer of clusters if grid_precision is greater than 0"""
+    if x >= 2**zoom or y >= 2**zoom:
+        raise HTTPException(
+            status_code=400,
+            detail="x and y of tile must be less than 2 ** zoom",
+        )
+
+    is_admin = check_permission_is_admin(client_role=user_data.realm_access)
+    user_permissions = get_permissions_from_client_role(
+        client_role=user_data.realm_access
+    )
+    conditions = await get_map_objects_conditions(
+        tmo_ids=tmo_ids,
+        is_admin=is_admin,
+        user_permissions=user_permissions,
+        elastic_client=elastic_client,
+    )
+    tile = b""
+    if conditions is not None:
+        tile = await get_vector_tile(
+            elastic_client=elastic_client,
+            index=ALL_MO_OBJ_INDEXES_PATTERN,
+            query=get_map_objects_query(
+                geometry=geometry,
+                only_active=only_active,
+                # points are filtered by indexed coordinates, so only MOs of the tile run the script
+                # of location, shapes of lines are filtered by the tile by search_mvt
+                bounding_box=get_tile_bounding_box(zoom=zoom, x=x, y=y)
+                if geometry == "points"
+                else None,
+                conditions=conditions,
+            ),
+            geometry=geometry,
+            zoom=zoom,
+            x=x,
+            y=y,
+            size=size,
+            grid_precision=grid_precision,
+        )
+    return Response(
+        content=tile, media_type="application/vnd.mapbox-vector-tile"
+    )
+
+
 @router.post(
     "/get_inventory_objects_by_filters", tags=["Inventory indexes: main"]
 )
@@ -537,14 +729,38 @@ async def get_inventory_objects_by_filters(
         tmo_id=tmo_id,
     )
 
-    search_res = await elastic_client.search(
+    if offset + limit <= SIZE_PER_STEP:
+        search_res = await elastic_client.search(
+            index=inventory_filter.search_index,
+            body=inventory_filter.body,
+            ignore_unavailable=True,
+            filter_path=SOURCE_HITS_FILTER_PATH,
+        )
+        total_hits = search_res["hits"]["total"]["value"]
+        objects = [
+            item["_source"] for item in search_res["hits"].get("hits", [])
+        ]
+        return {"objects": objects, "total_hits": total_hits}
+
+    # large result is read by concurrent slices instead of a single from/size search
+    count_query = inventory_filter.body["query"]
+    post_filter = inventory_filter.body.get("post_filter")
+    if post_filter:
+        count_query = {"bool": {"must": [count_query, post_filter]}}
+    count_res = await elastic_client.count(
         index=inventory_filter.search_index,
-        body=inventory_filter.body,
+        query=count_query,
         ignore_unavailable=True,
     )
-    total_hits = search_res["hits"]["total"]["value"]
-    objects = [item["_source"] for item in search_res["hits"]["hits"]]
-    return {"objects": objects, "total_hits": total_hits}
+
+    objects = await read_page_by_sliced_scan(
+        elastic_client=elastic_client,
+        index=inventory_filter.search_index,
+        body=inventory_filter.body,
+        offset=offset,
+        limit=limit,
+    )
+    return {"objects": objects, "total_hits": count_res["count"]}
 
 
 @router.get("/get_inventory_objects_by_value", tags=["Inventory indexes: main"])
@@ -728,7 +944,12 @@ async def get_inventory_objects_by_value(
     body = {
         "query": search_query_base,
         "track_total_hits": True,
-        "_source": {"excludes": [INVENTORY_PERMISSIONS_FIELD_NAME]},
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
     }
 
     if limit:
@@ -738,10 +959,8 @@ async def get_inventory_objects_by_value(
         body["from"] = offset
 
     if not is_admin:
-        body["post_filter"] = (
-            get_post_filter_condition_according_user_permissions(
-                user_permissions
-            )
+        body["post_filter"] = await get_mo_permissions_condition(
+            client_permissions=user_permissions, elastic_client=elastic_client
         )
 
         source_includes = [f.value for f in InventoryMODefaultFields]
@@ -845,7 +1064,7 @@ async def get_inventory_objects_by_value_in_the_special_tmo_scope(
 )
 async def get_available_search_operators_for_special_mo_attr_or_tprm(
     mo_attr_or_tprm_id: "str",
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     operators = ""
@@ -946,6 +1165,24 @@ async def refresh_all_data_of_special_tmo(
     await rebuilder.refresh_all_inventory_security_indexes()
 
 
+@router.get("/reconcile_mo_indexes", tags=["Inventory indexes: main"])
+async def reconcile_mo_indexes(
+    tmo_ids: List[int] | None = Query(None),
+    dry_run: bool = False,
+    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    db_session: AsyncSession = Depends(get_session),
+    user_data: UserData = Depends(security),
+):
+    """Compares checksums of ranges of MO ids of inventory and MO indexes of tmo_ids (of all TMOs
+    if tmo_ids is empty) and reloads only the ranges which differ. If dry_run is True, indexes are not changed.
+    Permissions of the added MOs are written by the reconcile of security indexes.
+    Returns the drift report by TMO"""
+    reconciler = InventoryDataReconciler(
+        elastic_client=elastic_client, session=db_session
+    )
+    return await reconciler.reconcile_tmos(tmo_ids=tmo_ids, dry_run=dry_run)
+
+
 @router.get("/get_connected_by_mo_link_objects_to_special_mo_id")
 async def get_connected_by_mo_link_objects_to_special_mo_id(
     mo_id: int,
@@ -1055,7 +1292,10 @@ async def get_connected_by_mo_link_objects_to_special_mo_id(
     search_conditions = [{"terms": {"id": linked_mo_ids}}]
     if not is_admin:
         search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+            await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+            )
         )
 
     query = {"bool": {"must": search_conditions}}
@@ -1065,7 +1305,12 @@ async def get_connected_by_mo_link_objects_to_special_mo_id(
         "track_total_hits": True,
         "size": limit,
         "from": offset,
-        "_source": {"excludes": [INVENTORY_PERMISSIONS_FIELD_NAME]},
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
         "sort": {"id": {"order": "asc"}},
     }
 
@@ -1138,10 +1383,17 @@ async def get_operators_for_columns(
     "/reload_inventory_security_indexes", tags=["Inventory indexes: main"]
 )
 async def reload_inventory_security_indexes(
+    reconcile: bool = False,
     elastic_client: AsyncElasticsearch = Depends(get_async_client),
     db_session: AsyncSession = Depends(get_session),
     user_data: UserData = Depends(security),
 ):
+    """Reloads security indexes from inventory. If reconcile is True, security indexes are not cleared:
+    only the difference with inventory is applied, and the number of changes by index is returned"""
+    if reconcile:
+        reconciler = InventorySecurityReconciler(elastic_client)
+        return await reconciler.reconcile_all_inventory_security_indexes()
+
     rebuilder = InventorySecurityReloader(elastic_client, session=db_session)
     await rebuilder.refresh_all_inventory_security_indexes()
 
@@ -1160,384 +1412,84 @@ async def export_data(
     with_parents_data: bool = Body(False),
     user_data: UserData = Depends(security),
 ):
-    # get user permissions
-    is_admin = check_permission_is_admin(client_role=user_data.realm_access)
-    user_permissions = get_permissions_from_client_role(
-        client_role=user_data.realm_access
-    )
-    if not is_admin:
-        raise_forbidden_ex_if_user_has_no_permission(
-            client_permissions=user_permissions
-        )
-
-    # check if index for tmo_id exists
-    mo_index_for_tmo_id = get_index_name_by_tmo(tmo_id)
-    if not await elastic_client.indices.exists(index=mo_index_for_tmo_id):
-        raise HTTPException(
-            status_code=404,
-            detail=f"Index for tmo_id = {tmo_id} does not exist",
-        )
-
-    # get severity id for tmo-id
-    # check if id exists
-    search_conditions = [{"match": {"id": tmo_id}}]
-    if not is_admin:
-        search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
-        )
-    search_query = {"bool": {"must": search_conditions}}
-    tmo_data = await elastic_client.search(
-        index=INVENTORY_TMO_INDEX_V2,
-        query=search_query,
-        size=1,
-        track_total_hits=True,
-        ignore_unavailable=True,
-    )
-
-    tmo_data = tmo_data["hits"]["hits"]
-    if not tmo_data:
-        raise HTTPException(
-            status_code=404, detail=f"TMO with id = {tmo_id} does not exist"
-        )
-
-    tmo_data = tmo_data[0]["_source"]
-
-    if not is_admin:
-        # get all available tprm_ids fot special user
-        available_tprm_ids = (
-            await get_only_available_to_read_tprm_ids_for_special_client(
-                client_permissions=user_permissions,
-                elastic_client=elastic_client,
-                tmo_ids=[tmo_id],
-            )
-        )
-        set_of_available_tprm_ids = set(available_tprm_ids)
-
-        # clear filters_list
-        if filters_list:
-            filters_list = get_cleared_filter_columns_with_available_tprm_ids(
-                filter_columns=filters_list,
-                available_tprm_ids=set_of_available_tprm_ids,
-            )
-
-        # clear sort
-        if sort:
-            sort = get_cleared_sort_columns_with_available_tprm_ids(
-                sort_columns=sort, available_tprm_ids=set_of_available_tprm_ids
-            )
-
-    # get column_names types from ranges_objects and filters_list
-    column_names = set()
-
-    if filters_list:
-        column_names.update(
-            {filter_column.column_name for filter_column in filters_list}
-        )
-
-    if sort:
-        column_names.update(sort_column.column_name for sort_column in sort)
-
-    dict_of_types = await get_dict_of_inventory_attr_and_params_types(
-        array_of_attr_and_params_names=column_names,
-        elastic_client=elastic_client,
+    params = ExportParams(
+        tmo_id=tmo_id,
+        find_by_value=find_by_value,
+        filters_list=filters_list,
+        with_groups=with_groups,
+        sort=sort,
+        columns=columns,
+        file_type=file_type,
+        csv_delimiter=csv_delimiter,
+        with_parents_data=with_parents_data,
     )
-    # get filter column query
-    filters_must_cond = list()
-    filters_must_not_cond = list()
-    if filters_list:
-        filter_column_query = get_search_query_for_inventory_obj_index(
-            filter_columns=filters_list, dict_of_types=dict_of_types
-        )
-        filter_bool = filter_column_query.get("bool")
-        if filter_bool:
-            filter_must_cond = filter_bool.get("must")
-            filter_must_not_cond = filter_bool.get("must_not")
-            if filter_must_cond:
-                filters_must_cond.extend(filter_must_cond)
-
-            if filter_must_not_cond:
-                filters_must_not_cond.extend(filter_must_not_cond)
-
-    # get find_by_value search query
-    find_by_value_must_cond = list()
-    find_by_value_must_not_cond = list()
-    if find_by_value:
-        by_value_search_query = (
-            await get_query_for_search_by_value_in_tmo_scope(
-                elastic_client, tmo_ids=[tmo_id], search_value=find_by_value
-            )
-        )
-        find_by_value_bool = by_value_search_query.get("bool")
-        if find_by_value_bool:
-            by_value_must_cond = find_by_value_bool.get("must")
-            by_value_must_not_cond = find_by_value_bool.get("must_not")
-            if by_value_must_cond:
-                find_by_value_must_cond.extend(by_value_must_cond)
-
-            if by_value_must_not_cond:
-                find_by_value_must_not_cond.extend(by_value_must_not_cond)
-
-    # get group condition query
-    group_condition_must_not = get_group_inventory_must_not_conditions(
-        with_groups
+    plan = await create_export_plan(
+        elastic_client=elastic_client, user_data=user_data, params=params
     )
-
-    # tmo_id condition query
-    tmo_id_condition_must_query = [{"match": {"tmo_id": tmo_id}}]
-
-    all_must_cond = [
-        filters_must_cond,
-        find_by_value_must_cond,
-        tmo_id_condition_must_query,
-    ]
-    all_must_not_cond = [
-        filters_must_not_cond,
-        find_by_value_must_not_cond,
-        group_condition_must_not,
+    pages_of_rows = [
+        page async for page in read_export_pages(elastic_client, plan)
     ]
-
-    main_query_must_cond = list()
-    main_query_must_not_cond = list()
-
-    for must_cond in all_must_cond:
-        main_query_must_cond.extend(must_cond)
-
-    for must_not_cond in all_must_not_cond:
-        main_query_must_not_cond.extend(must_not_cond)
-
-    main_query = dict()
-
-    if main_query_must_cond:
-        main_query["must"] = main_query_must_cond
-
-    if main_query_must_not_cond:
-        main_query["must_not"] = main_query_must_not_cond
-
-    if main_query:
-        main_query = {"bool": main_query}
-
-    sort_cond = list()
-    if sort:
-        for sort_column in sort:
-            column_name = sort_column.column_name
-            sort_column_type = dict_of_types.get(column_name)
-            if sort_column_type:
-                sort_column_type = sort_column_type.get("val_type")
-
-            if column_name.isdigit():
-                column_name = f"{INVENTORY_PARAMETERS_FIELD_NAME}.{column_name}"
-            order_direction = "asc" if sort_column.ascending else "desc"
-            data = dict()
-            data["order"] = order_direction
-            if sort_column_type in {"date", "datetime"}:
-                data["type"] = "date"
-            sort_cond.append({column_name: {"order": order_direction}})
-
-    # append sort by id to implement search_after
-    sort_cond.append({"id": {"order": "asc"}})
-
-    search_args = {
-        "index": ALL_MO_OBJ_INDEXES_PATTERN,
-        "query": main_query,
-        "size": 10000,
-        "track_total_hits": True,
-        "sort": sort_cond,
-        "_source_excludes": [INVENTORY_PERMISSIONS_FIELD_NAME],
-    }
-
-    kwargs_for_clearing_columns = {
-        "tmo_id": tmo_id,
-        "elastic_client": elastic_client,
-        "columns": columns,
+    headers = {
+        "Content-Disposition": f'attachment; filename="{params.file_name}"'
     }
 
-    # if not admin return only available tprms
-    if not is_admin:
-        kwargs_for_clearing_columns["user_permissions"] = user_permissions
-
-    cleared_columns_data_dict = await clear_receiving_columns(
-        **kwargs_for_clearing_columns
-    )
-    ordered_columns_list = cleared_columns_data_dict["cleared_ordered_columns"]
-    data_of_included_tprms = cleared_columns_data_dict["data_of_included_tprms"]
-
-    result_df = pd.DataFrame()
-
-    parent_tmo_av_data = None
-
-    if with_parents_data:
-        # check if there are parent_id
-        parent_tmo_id = tmo_data.get("p_id")
-        if parent_tmo_id:
-            parent_tmo_av_data = await check_availability_of_tmo_data(
-                elastic_client=elastic_client,
-                is_admin=is_admin,
-                tmo_id=parent_tmo_id,
-                user_permissions=user_permissions,
-            )
-    parent_data_source_includes = None
-    if parent_tmo_av_data is not None and parent_tmo_av_data.data_available:
-        mo_default_attrs = [x.value for x in InventoryMODefaultFields]
-        mo_processed_attrs = [x.value for x in InventoryMOProcessedFields]
-        mo_camunda_fields = [x.value for x in ZeebeProcessInstanceFields]
-        parent_tprms_fields = list()
-        if parent_tmo_av_data.available_tprm_data:
-            parent_tprms_fields = [
-                f"{INVENTORY_PARAMETERS_FIELD_NAME}.{tprm_id}"
-                for tprm_id in parent_tmo_av_data.available_tprm_data
-            ]
-
-        parent_data_source_includes = (
-            mo_default_attrs
-            + mo_processed_attrs
-            + mo_camunda_fields
-            + parent_tprms_fields
+    # file is rendered in another process, the event loop serves other requests meanwhile
+    try:
+        file_content = await rendering_pool.run(
+            render_table_file,
+            pages=pages_of_rows,
+            rename_columns=plan.rename_columns,
+            file_type=plan.file_type,
+            csv_separator=plan.csv_separator,
         )
+    except RenderingPoolOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    del pages_of_rows
 
-    if main_query and ordered_columns_list:
-        default_dict_of_data = dict()
+    return StreamingResponse(io.BytesIO(file_content), headers=headers)
 
-        include_columns = dict(id=None, p_id=None)
-        for column_name in ordered_columns_list:
-            if column_name.isdigit():
-                include_columns[
-                    f"{INVENTORY_PARAMETERS_FIELD_NAME}.{column_name}"
-                ] = None
-            else:
-                include_columns[column_name] = None
-            default_dict_of_data[column_name] = None
 
-        search_after = []
-        while True:
-            search_res = await elastic_client.search(
-                **search_args,
-                search_after=search_after if search_after else None,
-                source_includes=list(include_columns),
-            )
-            rows = dict()
-            parent_id_item_ids = defaultdict(list)
-            for row in search_res["hits"]["hits"]:
-                row = row["_source"]
-                item_id = row.get("id")
-                item_p_id = row.get("p_id")
-                row_parameters = row.get(INVENTORY_PARAMETERS_FIELD_NAME)
-                if row_parameters:
-                    row.update(row_parameters)
-
-                ordered_row_data = {k: row.get(k) for k in default_dict_of_data}
-                rows[item_id] = ordered_row_data
-                if item_p_id:
-                    parent_id_item_ids[item_p_id].append(item_id)
-
-            # get data for parents and add to results Start
-            if (
-                parent_tmo_av_data is not None
-                and parent_tmo_av_data.data_available
-            ):
-                if parent_id_item_ids:
-                    parent_ids = list(parent_id_item_ids)
-
-                    search_conditions = [{"terms": {"id": parent_ids}}]
-                    if not is_admin:
-                        search_conditions.append(
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions
-                                }
-                            }
-                        )
-
-                    body = {
-                        "query": {"bool": {"must": search_conditions}},
-                        "size": len(parent_ids),
-                        "track_total_hits": True,
-                        "_source": {"includes": parent_data_source_includes},
-                    }
-
-                    parent_data = await elastic_client.search(
-                        index=ALL_MO_OBJ_INDEXES_PATTERN,
-                        body=body,
-                        ignore_unavailable=True,
-                    )
-                    parent_data = parent_data["hits"]["hits"]
-                    if parent_data:
-                        # add data to results
-                        for parent_item in parent_data:
-                            parent_item = parent_item["_source"]
-                            parent_item_parameters = parent_item.get(
-                                INVENTORY_PARAMETERS_FIELD_NAME
-                            )
-                            if parent_item_parameters:
-                                parent_item.update(parent_item_parameters)
-                                del parent_item[INVENTORY_PARAMETERS_FIELD_NAME]
-                            id_of_parent = parent_item.get("id")
-                            parent_item = {
-                                f"__parent__.{k}": v
-                                for k, v in parent_item.items()
-                            }
-
-                            list_of_children = parent_id_item_ids.get(
-                                id_of_parent
-                            )
-                            if list_of_children:
-                                for children_id in list_of_children:
-                                    rows[children_id].update(parent_item)
-                # get data for parents and add to results End
-
-            if rows:
-                search_after = search_res["hits"]["hits"][-1]["sort"]
-                step_df = pd.DataFrame(list(rows.values()))
-                result_df = pd.concat([result_df, step_df])
-            else:
-                break
-
-    # rename df columns
-    rename_tprm_id_tprm_name = dict()
-    if data_of_included_tprms:
-        rename_tprm_id_tprm_name = {
-            str(k): v.get("name") for k, v in data_of_included_tprms.items()
-        }
-        result_df.rename(columns=rename_tprm_id_tprm_name, inplace=True)
-
-    rename_parent_tprm_id_tprm_name = dict()
-    if (
-        parent_tmo_av_data
-        and parent_tmo_av_data.data_available
-        and parent_tmo_av_data.available_tprm_data
-    ):
-        rename_parent_tprm_id_tprm_name = {
-            f"__parent__.{k}": f"__parent__.{v.get('name')}"
-            for k, v in parent_tmo_av_data.available_tprm_data.items()
-        }
-
-    rename_data = {
-        **rename_tprm_id_tprm_name,
-        **rename_parent_tprm_id_tprm_name,
-    }
-    if rename_data:
-        result_df.rename(columns=rename_data, inplace=True)
-
-    file_name = "pm_data"
-    if file_type == "csv":
-        default_csv_separator = ";"
-        if csv_delimiter:
-            default_csv_separator = csv_delimiter
-        file_name = f"{file_name}.csv"
+@router.post(
+    "/export_jobs",
+    tags=["Inventory indexes: main"],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ExportJob,
+)
+async def submit_export_job(
+    params: ExportParams,
+    user_data: UserData = Depends(security),
+):
+    """Starts export with the parameters of /export in background and returns its state.
+    If the same export of user is running or is completed, returns it instead of starting a new one"""
+    return await export_jobs.submit(user_data=user_data, params=params)
 
-        headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
-        file_like_obj = io.StringIO()
-        result_df.to_csv(file_like_obj, index=False, sep=default_csv_separator)
 
-    else:
-        file_like_obj = io.BytesIO()
-        file_name = f"{file_name}.xlsx"
-        headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
-        result_df.to_excel(file_like_obj, index=False)
+@router.get(
+    "/export_jobs/{job_id}",
+    tags=["Inventory indexes: main"],
+    response_model=ExportJob,
+)
+async def get_export_job(
+    job_id: str = Path(pattern=EXPORT_JOB_ID_PATTERN),
+    user_data: UserData = Depends(security),
+):
+    """Returns state and progress of export"""
+    return export_jobs.get_user_job(job_id=job_id, user_data=user_data)
 
-    del result_df
-    file_like_obj.seek(0)
 
-    return StreamingResponse(file_like_obj, headers=headers)
+@router.get("/export_jobs/{job_id}/file", tags=["Inventory indexes: main"])
+async def download_export_job_file(
+    job_id: str = Path(pattern=EXPORT_JOB_ID_PATTERN),
+    user_data: UserData = Depends(security),
+):
+    """Returns file of completed export. Supports Range requests to resume interrupted download"""
+    job = export_jobs.get_user_job(job_id=job_id, user_data=user_data)
+    if job.state != ExportJobState.COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Export {job_id} is not completed, its state is {job.state.value}",
+        )
+    return FileResponse(export_jobs.get_file_path(job), filename=job.file_name)
 
 
 @router.get(
@@ -1545,7 +1497,7 @@ async def export_data(
 )
 async def get_children_grouped_by_tmo(
     p_id: int = Path(gt=0),
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     # get user permissions
@@ -1565,7 +1517,10 @@ async def get_children_grouped_by_tmo(
 
     if not is_admin:
         search_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+            await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+            )
         )
 
     body = {
@@ -1617,7 +1572,10 @@ async def get_objects_by_name_with_misspelled_words_or_typo_mistakes(
 
     if not is_admin:
         must_conditions.append(
-            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+            await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+            )
         )
 
     all_fuzzy_search_fields = [
@@ -1631,17 +1589,20 @@ async def get_objects_by_name_with_misspelled_words_or_typo_mistakes(
                 "fields": all_fuzzy_search_fields,
             }
         },
-        {
-            "query_string": {
-                "query": f"{search_cond.search_value}*",
-                "fields": all_fuzzy_search_fields,
-            }
-        },
+        # prefixes are matched by the search_as_you_type sub fields instead of wildcard
+        # after the documents indexed before the sub fields are indexed again
+        get_prefix_condition(
+            search_value=search_cond.search_value,
+            suggest_completed=await suggest_backfill.is_completed(
+                elastic_client
+            ),
+        ),
         {
             "multi_match": {
                 "query": search_cond.search_value,
                 "fields": all_fuzzy_search_fields,
-                "fuzziness": 2,
+                "fuzziness": "AUTO",
+                "prefix_length": 1,
             }
         },
     ]
@@ -1665,6 +1626,7 @@ async def get_objects_by_name_with_misspelled_words_or_typo_mistakes(
             "excludes": [
                 INVENTORY_PERMISSIONS_FIELD_NAME,
                 INVENTORY_FUZZY_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
             ]
         },
     }
@@ -1693,6 +1655,62 @@ async def get_objects_by_name_with_misspelled_words_or_typo_mistakes(
     return res
 
 
+@router.get(
+    "/get_objects_suggestions_by_name", tags=["Inventory indexes: main"]
+)
+async def read_objects_suggestions_by_name(
+    search_value: str = Query(min_length=1, max_length=256),
+    tmo_id: int = Query(None),
+    limit: int = Query(default=10, ge=1, le=100),
+    only_active: bool = Query(True),
+    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    user_data: UserData = Depends(security),
+):
+    """Returns suggestions of Inventory objects for typeahead: objects whose names contain the entered
+    words, the last word may be incomplete"""
+    is_admin = check_permission_is_admin(client_role=user_data.realm_access)
+    user_permissions = get_permissions_from_client_role(
+        client_role=user_data.realm_access
+    )
+    conditions = list()
+    if not is_admin:
+        raise_forbidden_ex_if_user_has_no_permission(
+            client_permissions=user_permissions
+        )
+        conditions.append(
+            await get_mo_permissions_condition(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+            )
+        )
+
+    search_index = ALL_MO_OBJ_INDEXES_PATTERN
+    if tmo_id:
+        search_index = get_index_name_by_tmo(tmo_id)
+
+    search_res = await elastic_client.search(
+        index=search_index,
+        query=get_typeahead_query(
+            search_value=search_value,
+            only_active=only_active,
+            conditions=conditions,
+            suggest_completed=await suggest_backfill.is_completed(
+                elastic_client
+            ),
+        ),
+        size=limit,
+        source_includes=TYPEAHEAD_SOURCE_FIELDS,
+        track_total_hits=False,
+        ignore_unavailable=True,
+        filter_path=SOURCE_HITS_FILTER_PATH,
+    )
+    return {
+        "objects": [
+            item["_source"] for item in search_res["hits"].get("hits", [])
+        ]
+    }
+
+
 @router.post(
     "/reform_all_connected_points_between_start_point_and_end_point_into_line",
     tags=["Inventory indexes: main"],
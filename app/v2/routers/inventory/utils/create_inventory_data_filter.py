@@ -14,6 +14,7 @@ from elastic.query_builder_service.inventory_index.utils.index_utils import (
 from indexes_mapping.inventory.mapping import (
     INVENTORY_PERMISSIONS_FIELD_NAME,
     INVENTORY_PARAMETERS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
 )
 from security.security_data_models import UserData
 from services.inventory_services.models import InventoryMODefaultFields
@@ -25,7 +26,9 @@ from services.inventory_services.utils.security.filter_by_realm import (
     get_only_available_to_read_tprm_ids_for_special_client,
     get_cleared_filter_columns_with_available_tprm_ids,
     get_cleared_sort_columns_with_available_tprm_ids,
-    get_post_filter_condition_according_user_permissions,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
 )
 from v2.routers.inventory.utils.search_by_value_utils import (
     get_query_for_search_by_value_in_tmo_scope,
@@ -210,7 +213,12 @@ async def create_inventory_data_filter(
 
     body = {
         "query": main_query,
-        "_source": {"excludes": [INVENTORY_PERMISSIONS_FIELD_NAME]},
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
         "track_total_hits": True,
     }
     if sort_query:
@@ -223,10 +231,8 @@ async def create_inventory_data_filter(
         body["from"] = offset
 
     if not is_admin:
-        body["post_filter"] = (
-            get_post_filter_condition_according_user_permissions(
-                user_permissions
-            )
+        body["post_filter"] = await get_mo_permissions_condition(
+            client_permissions=user_permissions, elastic_client=elastic_client
         )
 
         source_includes = [f.value for f in InventoryMODefaultFields]
@@ -0,0 +1,264 @@
+import asyncio
+import enum
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from elastic.client import ElasticsearchManager
+from security.security_data_models import UserData
+from services.rendering_services.pool import (
+    RenderingPoolOverloadedError,
+    rendering_pool,
+)
+from services.rendering_services.renderers import write_table_file
+from settings.config import (
+    EXPORT_JOBS_DIR,
+    EXPORT_JOBS_STALE_AFTER,
+    EXPORT_JOBS_TTL,
+)
+from v2.routers.inventory.utils.export_utils import (
+    ExportParams,
+    count_export_rows,
+    create_export_plan,
+    read_export_pages,
+)
+
+"""
+Background exports. The state of export is kept in a directory of export on local disk next to its file,
+so all API processes of the host see the same exports. Id of export is the hash of user and parameters of export:
+the same export of the same user is not started twice while it is running or its file is kept
+"""
+
+logger = logging.getLogger(__name__)
+
+JOB_STATE_FILE_NAME = "job.json"
+EXPORT_JOB_ID_PATTERN = "^[0-9a-f]{32}$"
+
+
+class ExportJobState(str, enum.Enum):
+    QUEUED = "queued"
+    READING = "reading"
+    RENDERING = "rendering"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJob(BaseModel):
+    job_id: str
+    user_id: str
+    state: ExportJobState
+    file_name: str
+    read_rows: int = 0
+    total_rows: int | None = None
+    # share of read rows, from 0 to 1
+    progress: float = 0
+    file_size: int | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
+
+    @property
+    def is_running(self) -> bool:
+        return self.state not in {
+            ExportJobState.COMPLETED,
+            ExportJobState.FAILED,
+        }
+
+
+def get_user_id(user_data: UserData) -> str:
+    return user_data.id or user_data.preferred_name
+
+
+def get_export_job_id(user_data: UserData, params: ExportParams) -> str:
+    """Returns the same id for the same parameters of the same user with the same roles"""
+    params_data = params.model_dump(mode="json")
+    # filters are a set, their order is not stable
+    for filter_column in params_data.get("filters_list") or []:
+        filter_column["filters"] = sorted(
+            filter_column["filters"],
+            key=lambda item: json.dumps(item, sort_keys=True),
+        )
+    roles = []
+    if user_data.realm_access:
+        roles = sorted(user_data.realm_access.roles)
+    key = json.dumps(
+        [get_user_id(user_data), roles, params_data], sort_keys=True
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+class ExportJobs:
+    def __init__(
+        self,
+        directory: str = EXPORT_JOBS_DIR,
+        ttl: int = EXPORT_JOBS_TTL,
+        stale_after: int = EXPORT_JOBS_STALE_AFTER,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.stale_after = stale_after
+        # references of running jobs of the process
+        self._tasks: set[asyncio.Task] = set()
+
+    def __get_job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def get_file_path(self, job: ExportJob) -> str:
+        return os.path.join(self.__get_job_dir(job.job_id), job.file_name)
+
+    def __save(self, job: ExportJob, job_dir: str | None = None):
+        job.updated_at = time.time()
+        job_dir = job_dir or self.__get_job_dir(job.job_id)
+        partial_path = os.path.join(job_dir, f".partial.{JOB_STATE_FILE_NAME}")
+        with open(partial_path, "w") as state_file:
+            state_file.write(job.model_dump_json())
+        os.replace(partial_path, os.path.join(job_dir, JOB_STATE_FILE_NAME))
+
+    def get_job(self, job_id: str) -> ExportJob | None:
+        path = os.path.join(self.__get_job_dir(job_id), JOB_STATE_FILE_NAME)
+        try:
+            with open(path) as state_file:
+                return ExportJob.model_validate_json(state_file.read())
+        except FileNotFoundError:
+            return None
+
+    def get_user_job(self, job_id: str, user_data: UserData) -> ExportJob:
+        job = self.get_job(job_id)
+        if job is None or job.user_id != get_user_id(user_data):
+            raise HTTPException(
+                status_code=404, detail=f"Export {job_id} does not exist"
+            )
+        return job
+
+    def __is_outdated(self, job: ExportJob, now: float) -> bool:
+        if job.is_running:
+            return now - job.updated_at > self.stale_after
+        return now - job.updated_at > self.ttl
+
+    def remove_outdated_jobs(self):
+        """Removes expired exports and exports lost by their processes"""
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for job_id in os.listdir(self.directory):
+            job_dir = self.__get_job_dir(job_id)
+            if job_id.startswith("."):
+                # directory of export which was not submitted
+                if now - os.path.getmtime(job_dir) > self.stale_after:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                continue
+            job = self.get_job(job_id)
+            if job is not None and self.__is_outdated(job, now):
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+    async def submit(
+        self, user_data: UserData, params: ExportParams
+    ) -> ExportJob:
+        """Starts export in background and returns it.
+        If the same export of user is running or its file is kept, returns it instead"""
+        self.remove_outdated_jobs()
+        job_id = get_export_job_id(user_data=user_data, params=params)
+        job = self.get_job(job_id)
+        if job is not None and job.state != ExportJobState.FAILED:
+            return job
+        if job is not None:
+            shutil.rmtree(self.__get_job_dir(job_id), ignore_errors=True)
+
+        now = time.time()
+        job = ExportJob(
+            job_id=job_id,
+            user_id=get_user_id(user_data),
+            state=ExportJobState.QUEUED,
+            file_name=params.file_name,
+            created_at=now,
+            updated_at=now,
+        )
+        # the directory of export appears with its state, so other processes
+        # never see the directory without state
+        os.makedirs(self.directory, exist_ok=True)
+        new_job_dir = os.path.join(
+            self.directory, f".{job_id}.{uuid.uuid4().hex}"
+        )
+        os.makedirs(new_job_dir)
+        self.__save(job, job_dir=new_job_dir)
+        try:
+            os.rename(new_job_dir, self.__get_job_dir(job_id))
+        except OSError:
+            # the same export was submitted by another request
+            shutil.rmtree(new_job_dir, ignore_errors=True)
+            return self.get_job(job_id) or job
+
+        task = asyncio.create_task(
+            self.__run(
+                job=job,
+                user_data=user_data,
+                params=params,
+                elastic_client=ElasticsearchManager().get_client(),
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def __run(
+        self,
+        job: ExportJob,
+        user_data: UserData,
+        params: ExportParams,
+        elastic_client: AsyncElasticsearch,
+    ):
+        try:
+            plan = await create_export_plan(
+                elastic_client=elastic_client,
+                user_data=user_data,
+                params=params,
+            )
+            job.total_rows = await count_export_rows(elastic_client, plan)
+            job.state = ExportJobState.READING
+            self.__save(job)
+
+            pages_of_rows = list()
+            async for page in read_export_pages(elastic_client, plan):
+                pages_of_rows.append(page)
+                job.read_rows += len(page)
+                if job.total_rows:
+                    job.progress = min(1.0, job.read_rows / job.total_rows)
+                self.__save(job)
+
+            job.progress = 1.0
+            job.state = ExportJobState.RENDERING
+            self.__save(job)
+            while True:
+                try:
+                    job.file_size = await rendering_pool.run(
+                        write_table_file,
+                        path=self.get_file_path(job),
+                        pages=pages_of_rows,
+                        rename_columns=plan.rename_columns,
+                        file_type=plan.file_type,
+                        csv_separator=plan.csv_separator,
+                    )
+                    break
+                except RenderingPoolOverloadedError:
+                    # background export waits for the pool as long as it is needed
+                    self.__save(job)
+            job.state = ExportJobState.COMPLETED
+        except HTTPException as e:
+            job.state = ExportJobState.FAILED
+            job.error = str(e.detail)
+        except Exception as e:
+            logger.exception("Export %s failed", job.job_id)
+            job.state = ExportJobState.FAILED
+            job.error = str(e)
+        self.__save(job)
+
+
+export_jobs = ExportJobs()
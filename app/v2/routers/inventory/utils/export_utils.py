@@ -0,0 +1,489 @@
+import dataclasses
+from collections import defaultdict
+from typing import Any, AsyncIterator, Literal
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+
+from elastic.config import ALL_MO_OBJ_INDEXES_PATTERN, INVENTORY_TMO_INDEX_V2
+from elastic.pydantic_models import FilterColumn
+from elastic.query_builder_service.inventory_index.mo_object.utils import (
+    get_dict_of_inventory_attr_and_params_types,
+    get_search_query_for_inventory_obj_index,
+)
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_PARAMETERS_FIELD_NAME,
+    INVENTORY_PERMISSIONS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+)
+from indexes_mapping.inventory.zeebe_enums import ZeebeProcessInstanceFields
+from security.security_data_models import UserData
+from services.inventory_services.models import (
+    InventoryMODefaultFields,
+    InventoryMOProcessedFields,
+)
+from services.inventory_services.utils.security.filter_by_realm import (
+    check_availability_of_tmo_data,
+    check_permission_is_admin,
+    get_cleared_filter_columns_with_available_tprm_ids,
+    get_cleared_sort_columns_with_available_tprm_ids,
+    get_only_available_to_read_tprm_ids_for_special_client,
+    get_permissions_from_client_role,
+    raise_forbidden_ex_if_user_has_no_permission,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+)
+from utils_by_services.inventory.common import sliced_pit_scan
+from v2.routers.inventory.utils.search_by_value_utils import (
+    get_query_for_search_by_value_in_tmo_scope,
+)
+from v2.routers.severity.models import SortColumn
+from v2.routers.severity.utils import (
+    clear_receiving_columns,
+    get_group_inventory_must_not_conditions,
+)
+
+"""
+Export of inventory objects of TMO to csv or xlsx file: the plan of export is created from request parameters,
+then rows of export are read page by page
+"""
+
+
+class ExportParams(BaseModel):
+    tmo_id: int
+    find_by_value: str | None = None
+    filters_list: list[FilterColumn] | None = None
+    with_groups: bool | None = True
+    sort: list[SortColumn] | None = None
+    columns: list[str] | None = None
+    file_type: Literal["csv", "xlsx"] = "csv"
+    csv_delimiter: str | None = Field(None, max_length=1)
+    with_parents_data: bool = False
+
+    @property
+    def file_name(self) -> str:
+        return f"pm_data.{self.file_type}"
+
+
+@dataclasses.dataclass
+class ExportPlan:
+    index: str
+    scan_body: dict
+    # rows are ordered only if the user asked for sorting
+    ordered: bool
+    is_admin: bool
+    user_permissions: list[str]
+    # columns of rows, empty if there is nothing to export
+    default_dict_of_data: dict
+    parent_tmo_av_data: Any | None
+    parent_data_source_includes: list[str] | None
+    rename_columns: dict[str, str]
+    file_type: str
+    csv_separator: str
+
+
+async def create_export_plan(
+    elastic_client: AsyncElasticsearch,
+    user_data: UserData,
+    params: ExportParams,
+) -> ExportPlan:
+    """Checks the access of user to TMO and creates query, columns and renaming of columns of export"""
+    tmo_id = params.tmo_id
+    find_by_value = params.find_by_value
+    filters_list = params.filters_list
+    with_groups = params.with_groups
+    sort = params.sort
+    columns = params.columns
+    with_parents_data = params.with_parents_data
+
+    # get user permissions
+    is_admin = check_permission_is_admin(client_role=user_data.realm_access)
+    user_permissions = get_permissions_from_client_role(
+        client_role=user_data.realm_access
+    )
+    if not is_admin:
+        raise_forbidden_ex_if_user_has_no_permission(
+            client_permissions=user_permissions
+        )
+
+    # check if index for tmo_id exists
+    mo_index_for_tmo_id = get_index_name_by_tmo(tmo_id)
+    if not await elastic_client.indices.exists(index=mo_index_for_tmo_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Index for tmo_id = {tmo_id} does not exist",
+        )
+
+    # get severity id for tmo-id
+    # check if id exists
+    search_conditions = [{"match": {"id": tmo_id}}]
+    if not is_admin:
+        search_conditions.append(
+            {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+        )
+    search_query = {"bool": {"must": search_conditions}}
+    tmo_data = await elastic_client.search(
+        index=INVENTORY_TMO_INDEX_V2,
+        query=search_query,
+        size=1,
+        track_total_hits=True,
+        ignore_unavailable=True,
+    )
+
+    tmo_data = tmo_data["hits"]["hits"]
+    if not tmo_data:
+        raise HTTPException(
+            status_code=404, detail=f"TMO with id = {tmo_id} does not exist"
+        )
+
+    tmo_data = tmo_data[0]["_source"]
+
+    if not is_admin:
+        # get all available tprm_ids fot special user
+        available_tprm_ids = (
+            await get_only_available_to_read_tprm_ids_for_special_client(
+                client_permissions=user_permissions,
+                elastic_client=elastic_client,
+                tmo_ids=[tmo_id],
+            )
+        )
+        set_of_available_tprm_ids = set(available_tprm_ids)
+
+        # clear filters_list
+        if filters_list:
+            filters_list = get_cleared_filter_columns_with_available_tprm_ids(
+                filter_columns=filters_list,
+                available_tprm_ids=set_of_available_tprm_ids,
+            )
+
+        # clear sort
+        if sort:
+            sort = get_cleared_sort_columns_with_available_tprm_ids(
+                sort_columns=sort, available_tprm_ids=set_of_available_tprm_ids
+            )
+
+    # get column_names types from ranges_objects and filters_list
+    column_names = set()
+
+    if filters_list:
+        column_names.update(
+            {filter_column.column_name for filter_column in filters_list}
+        )
+
+    if sort:
+        column_names.update(sort_column.column_name for sort_column in sort)
+
+    dict_of_types = await get_dict_of_inventory_attr_and_params_types(
+        array_of_attr_and_params_names=column_names,
+        elastic_client=elastic_client,
+    )
+    # get filter column query
+    filters_must_cond = list()
+    filters_must_not_cond = list()
+    if filters_list:
+        filter_column_query = get_search_query_for_inventory_obj_index(
+            filter_columns=filters_list, dict_of_types=dict_of_types
+        )
+        filter_bool = filter_column_query.get("bool")
+        if filter_bool:
+            filter_must_cond = filter_bool.get("must")
+            filter_must_not_cond = filter_bool.get("must_not")
+            if filter_must_cond:
+                filters_must_cond.extend(filter_must_cond)
+
+            if filter_must_not_cond:
+                filters_must_not_cond.extend(filter_must_not_cond)
+
+    # get find_by_value search query
+    find_by_value_must_cond = list()
+    find_by_value_must_not_cond = list()
+    if find_by_value:
+        by_value_search_query = (
+            await get_query_for_search_by_value_in_tmo_scope(
+                elastic_client, tmo_ids=[tmo_id], search_value=find_by_value
+            )
+        )
+        find_by_value_bool = by_value_search_query.get("bool")
+        if find_by_value_bool:
+            by_value_must_cond = find_by_value_bool.get("must")
+            by_value_must_not_cond = find_by_value_bool.get("must_not")
+            if by_value_must_cond:
+                find_by_value_must_cond.extend(by_value_must_cond)
+
+            if by_value_must_not_cond:
+                find_by_value_must_not_cond.extend(by_value_must_not_cond)
+
+    # get group condition query
+    group_condition_must_not = get_group_inventory_must_not_conditions(
+        with_groups
+    )
+
+    # tmo_id condition query
+    tmo_id_condition_must_query = [{"match": {"tmo_id": tmo_id}}]
+
+    all_must_cond = [
+        filters_must_cond,
+        find_by_value_must_cond,
+        tmo_id_condition_must_query,
+    ]
+    all_must_not_cond = [
+        filters_must_not_cond,
+        find_by_value_must_not_cond,
+        group_condition_must_not,
+    ]
+
+    main_query_must_cond = list()
+    main_query_must_not_cond = list()
+
+    for must_cond in all_must_cond:
+        main_query_must_cond.extend(must_cond)
+
+    for must_not_cond in all_must_not_cond:
+        main_query_must_not_cond.extend(must_not_cond)
+
+    main_query = dict()
+
+    if main_query_must_cond:
+        main_query["must"] = main_query_must_cond
+
+    if main_query_must_not_cond:
+        main_query["must_not"] = main_query_must_not_cond
+
+    if main_query:
+        main_query = {"bool": main_query}
+
+    sort_cond = list()
+    if sort:
+        for sort_column in sort:
+            column_name = sort_column.column_name
+            sort_column_type = dict_of_types.get(column_name)
+            if sort_column_type:
+                sort_column_type = sort_column_type.get("val_type")
+
+            if column_name.isdigit():
+                column_name = f"{INVENTORY_PARAMETERS_FIELD_NAME}.{column_name}"
+            order_direction = "asc" if sort_column.ascending else "desc"
+            data = dict()
+            data["order"] = order_direction
+            if sort_column_type in {"date", "datetime"}:
+                data["type"] = "date"
+            sort_cond.append({column_name: {"order": order_direction}})
+
+    # append sort by id to implement search_after
+    sort_cond.append({"id": {"order": "asc"}})
+
+    scan_body = {
+        "query": main_query,
+        "sort": sort_cond,
+        "_source": {
+            "excludes": [
+                INVENTORY_PERMISSIONS_FIELD_NAME,
+                INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+            ]
+        },
+    }
+
+    kwargs_for_clearing_columns = {
+        "tmo_id": tmo_id,
+        "elastic_client": elastic_client,
+        "columns": columns,
+    }
+
+    # if not admin return only available tprms
+    if not is_admin:
+        kwargs_for_clearing_columns["user_permissions"] = user_permissions
+
+    cleared_columns_data_dict = await clear_receiving_columns(
+        **kwargs_for_clearing_columns
+    )
+    ordered_columns_list = cleared_columns_data_dict["cleared_ordered_columns"]
+    data_of_included_tprms = cleared_columns_data_dict["data_of_included_tprms"]
+
+    parent_tmo_av_data = None
+
+    if with_parents_data:
+        # check if there are parent_id
+        parent_tmo_id = tmo_data.get("p_id")
+        if parent_tmo_id:
+            parent_tmo_av_data = await check_availability_of_tmo_data(
+                elastic_client=elastic_client,
+                is_admin=is_admin,
+                tmo_id=parent_tmo_id,
+                user_permissions=user_permissions,
+            )
+    parent_data_source_includes = None
+    if parent_tmo_av_data is not None and parent_tmo_av_data.data_available:
+        mo_default_attrs = [x.value for x in InventoryMODefaultFields]
+        mo_processed_attrs = [x.value for x in InventoryMOProcessedFields]
+        mo_camunda_fields = [x.value for x in ZeebeProcessInstanceFields]
+        parent_tprms_fields = list()
+        if parent_tmo_av_data.available_tprm_data:
+            parent_tprms_fields = [
+                f"{INVENTORY_PARAMETERS_FIELD_NAME}.{tprm_id}"
+                for tprm_id in parent_tmo_av_data.available_tprm_data
+            ]
+
+        parent_data_source_includes = (
+            mo_default_attrs
+            + mo_processed_attrs
+            + mo_camunda_fields
+            + parent_tprms_fields
+        )
+
+    default_dict_of_data = dict()
+    if main_query and ordered_columns_list:
+        include_columns = dict(id=None, p_id=None)
+        for column_name in ordered_columns_list:
+            if column_name.isdigit():
+                include_columns[
+                    f"{INVENTORY_PARAMETERS_FIELD_NAME}.{column_name}"
+                ] = None
+            else:
+                include_columns[column_name] = None
+            default_dict_of_data[column_name] = None
+        scan_body["_source"]["includes"] = list(include_columns)
+
+    # rename df columns
+    rename_tprm_id_tprm_name = dict()
+    if data_of_included_tprms:
+        rename_tprm_id_tprm_name = {
+            str(k): v.get("name") for k, v in data_of_included_tprms.items()
+        }
+
+    rename_parent_tprm_id_tprm_name = dict()
+    if (
+        parent_tmo_av_data
+        and parent_tmo_av_data.data_available
+        and parent_tmo_av_data.available_tprm_data
+    ):
+        rename_parent_tprm_id_tprm_name = {
+            f"__parent__.{k}": f"__parent__.{v.get('name')}"
+            for k, v in parent_tmo_av_data.available_tprm_data.items()
+        }
+
+    rename_data = {
+        **rename_tprm_id_tprm_name,
+        **rename_parent_tprm_id_tprm_name,
+    }
+
+    csv_separator = ";"
+    if params.file_type == "csv" and params.csv_delimiter:
+        csv_separator = params.csv_delimiter
+
+    return ExportPlan(
+        index=mo_index_for_tmo_id,
+        scan_body=scan_body,
+        ordered=bool(sort),
+        is_admin=is_admin,
+        user_permissions=user_permissions,
+        default_dict_of_data=default_dict_of_data,
+        parent_tmo_av_data=parent_tmo_av_data,
+        parent_data_source_includes=parent_data_source_includes,
+        rename_columns=rename_data,
+        file_type=params.file_type,
+        csv_separator=csv_separator,
+    )
+
+
+async def count_export_rows(
+    elastic_client: AsyncElasticsearch, plan: ExportPlan
+) -> int:
+    if not plan.default_dict_of_data:
+        return 0
+    count_res = await elastic_client.count(
+        index=plan.index,
+        query=plan.scan_body["query"],
+        ignore_unavailable=True,
+    )
+    return count_res["count"]
+
+
+async def read_export_pages(
+    elastic_client: AsyncElasticsearch, plan: ExportPlan
+) -> AsyncIterator[list[dict]]:
+    """Yields pages of rows of export with data of parents"""
+    if not plan.default_dict_of_data:
+        return
+
+    async for hits in sliced_pit_scan(
+        elastic_client=elastic_client,
+        index=plan.index,
+        body=plan.scan_body,
+        ordered=plan.ordered,
+        filter_path=["hits.hits._source"],
+    ):
+        rows = dict()
+        parent_id_item_ids = defaultdict(list)
+        for row in hits:
+            row = row["_source"]
+            item_id = row.get("id")
+            item_p_id = row.get("p_id")
+            row_parameters = row.get(INVENTORY_PARAMETERS_FIELD_NAME)
+            if row_parameters:
+                row.update(row_parameters)
+
+            ordered_row_data = {
+                k: row.get(k) for k in plan.default_dict_of_data
+            }
+            rows[item_id] = ordered_row_data
+            if item_p_id:
+                parent_id_item_ids[item_p_id].append(item_id)
+
+        # get data for parents and add to results Start
+        if (
+            plan.parent_tmo_av_data is not None
+            and plan.parent_tmo_av_data.data_available
+        ):
+            if parent_id_item_ids:
+                parent_ids = list(parent_id_item_ids)
+
+                search_conditions = [{"terms": {"id": parent_ids}}]
+                if not plan.is_admin:
+                    search_conditions.append(
+                        await get_mo_permissions_condition(
+                            client_permissions=plan.user_permissions,
+                            elastic_client=elastic_client,
+                        )
+                    )
+
+                body = {
+                    "query": {"bool": {"must": search_conditions}},
+                    "size": len(parent_ids),
+                    "track_total_hits": True,
+                    "_source": {"includes": plan.parent_data_source_includes},
+                }
+
+                parent_data = await elastic_client.search(
+                    index=ALL_MO_OBJ_INDEXES_PATTERN,
+                    body=body,
+                    ignore_unavailable=True,
+                )
+                parent_data = parent_data["hits"]["hits"]
+                if parent_data:
+                    # add data to results
+                    for parent_item in parent_data:
+                        parent_item = parent_item["_source"]
+                        parent_item_parameters = parent_item.get(
+                            INVENTORY_PARAMETERS_FIELD_NAME
+                        )
+                        if parent_item_parameters:
+                            parent_item.update(parent_item_parameters)
+                            del parent_item[INVENTORY_PARAMETERS_FIELD_NAME]
+                        id_of_parent = parent_item.get("id")
+                        parent_item = {
+                            f"__parent__.{k}": v for k, v in parent_item.items()
+                        }
+
+                        list_of_children = parent_id_item_ids.get(id_of_parent)
+                        if list_of_children:
+                            for children_id in list_of_children:
+                                rows[children_id].update(parent_item)
+            # get data for parents and add to results End
+
+        if rows:
+            yield list(rows.values())
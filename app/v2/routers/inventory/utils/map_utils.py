@@ -0,0 +1,62 @@
+from typing import List
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import HTTPException
+
+from services.inventory_services.utils.security.filter_by_realm import (
+    get_only_available_to_read_tmo_ids_for_special_client,
+    raise_forbidden_ex_if_user_has_no_permission,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+)
+
+
+def validate_bounding_box(
+    latitude_min: float,
+    latitude_max: float,
+    longitude_min: float,
+    longitude_max: float,
+):
+    if latitude_max < latitude_min:
+        raise HTTPException(
+            status_code=400,
+            detail="latitude_min can`t be more than latitude_max",
+        )
+
+    if longitude_max < longitude_min:
+        raise HTTPException(
+            status_code=400,
+            detail="longitude_min can`t be more than longitude_max",
+        )
+
+
+async def get_map_objects_conditions(
+    tmo_ids: List[int] | None,
+    is_admin: bool,
+    user_permissions: List[str],
+    elastic_client: AsyncElasticsearch,
+) -> List[dict] | None:
+    """Returns conditions of MOs of tmo_ids readable by user for all MO indexes,
+    None if user can not read any of tmo_ids"""
+    if is_admin:
+        return [{"terms": {"tmo_id": tmo_ids}}] if tmo_ids else []
+
+    raise_forbidden_ex_if_user_has_no_permission(
+        client_permissions=user_permissions
+    )
+    readable_tmo_ids = (
+        await get_only_available_to_read_tmo_ids_for_special_client(
+            client_permissions=user_permissions,
+            elastic_client=elastic_client,
+            tmo_ids=tmo_ids,
+        )
+    )
+    if not readable_tmo_ids:
+        return None
+    return [
+        {"terms": {"tmo_id": list(readable_tmo_ids)}},
+        await get_mo_permissions_condition(
+            client_permissions=user_permissions, elastic_client=elastic_client
+        ),
+    ]
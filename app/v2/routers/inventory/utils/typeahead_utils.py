@@ -0,0 +1,97 @@
+from typing import List
+
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_FUZZY_FIELD_NAME,
+    INVENTORY_FUZZY_SUGGEST_FIELD_NAME,
+)
+from services.group_builder.models import GroupStatisticUniqueFields
+from services.inventory_services.models import (
+    InventoryFuzzySearchFields,
+    InventoryMODefaultFields,
+    InventoryMOProcessedFields,
+)
+
+"""
+Typeahead of MOs. Fuzzy search fields are indexed as search_as_you_type sub fields, so prefixes of
+the entered words are matched by terms of the prepared edge ngrams instead of wildcard or fuzzy
+expansion of terms in all MO indexes. Until documents indexed before the sub fields are indexed again,
+prefixes are matched by wildcard
+"""
+
+# fields of MO returned as suggestions
+TYPEAHEAD_SOURCE_FIELDS = [
+    InventoryMODefaultFields.ID.value,
+    InventoryMODefaultFields.NAME.value,
+    InventoryMODefaultFields.TMO_ID.value,
+    InventoryMODefaultFields.P_ID.value,
+    InventoryMOProcessedFields.PARENT_NAME.value,
+]
+
+
+def get_suggest_fields() -> List[str]:
+    """Returns search_as_you_type sub fields of all fuzzy search fields with their shingle fields"""
+    fields = list()
+    for enum_item in InventoryFuzzySearchFields:
+        suggest_field = f"{INVENTORY_FUZZY_FIELD_NAME}.{enum_item.value}.{INVENTORY_FUZZY_SUGGEST_FIELD_NAME}"
+        fields.extend(
+            [
+                suggest_field,
+                f"{suggest_field}._2gram",
+                f"{suggest_field}._3gram",
+            ]
+        )
+    return fields
+
+
+def get_suggest_condition(search_value: str) -> dict:
+    """Returns condition of MOs whose fuzzy search fields contain the words of search_value,
+    the last word is matched as prefix"""
+    return {
+        "multi_match": {
+            "query": search_value,
+            "type": "bool_prefix",
+            "fields": get_suggest_fields(),
+        }
+    }
+
+
+def get_prefix_condition(search_value: str, suggest_completed: bool) -> dict:
+    """Returns condition of MOs whose fuzzy search fields contain the words of search_value, the last
+    word is matched as prefix. If suggest_completed is False, the prefix is matched by wildcard, because
+    the suggest sub fields of some documents are not indexed yet"""
+    if suggest_completed:
+        return get_suggest_condition(search_value)
+    return {
+        "query_string": {
+            "query": f"{search_value}*",
+            "fields": [
+                f"{INVENTORY_FUZZY_FIELD_NAME}.{enum_item.value}"
+                for enum_item in InventoryFuzzySearchFields
+            ],
+        }
+    }
+
+
+def get_typeahead_query(
+    search_value: str,
+    only_active: bool,
+    conditions: List[dict],
+    suggest_completed: bool = True,
+) -> dict:
+    """Returns query of MOs which are not groups matching search_value and conditions"""
+    return {
+        "bool": {
+            "must": [get_prefix_condition(search_value, suggest_completed)],
+            "filter": [
+                {"term": {InventoryMODefaultFields.ACTIVE.value: only_active}},
+                *conditions,
+            ],
+            "must_not": [
+                {
+                    "exists": {
+                        "field": GroupStatisticUniqueFields.GROUP_NAME.value
+                    }
+                }
+            ],
+        }
+    }
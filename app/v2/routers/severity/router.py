@@ -23,6 +23,7 @@ from elastic.query_builder_service.inventory_index.utils.index_utils import (
 from indexes_mapping.inventory.mapping import (
     INVENTORY_PARAMETERS_FIELD_NAME,
     INVENTORY_PERMISSIONS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
 )
 from indexes_mapping.inventory.zeebe_enums import ZeebeProcessInstanceFields
 from security.security_data_models import UserData
@@ -36,6 +37,10 @@ from services.inventory_services.models import (
     InventoryMOProcessedFields,
     InventoryMOAdditionalFields,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+    get_tprm_permissions_condition,
+)
 from services.inventory_services.utils.security.filter_by_realm import (
     check_permission_is_admin,
     get_permissions_from_client_role,
@@ -48,6 +53,7 @@ from services.inventory_services.utils.security.filter_by_realm import (
     check_availability_of_tmo_data,
 )
 
+from v2.routers.elastic.dependencies import get_coalescing_async_client
 from v2.routers.inventory.utils.search_by_value_utils import (
     get_query_for_search_by_value_in_tmo_scope,
 )
@@ -73,7 +79,7 @@ router = APIRouter(prefix="/severity", tags=["Process Instance indexes"])
 @router.post("/by_filters")
 async def get_severity_by_filters(
     filters: Annotated[list[FilterDataInput], Body()],
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     if not filters:
@@ -232,7 +238,10 @@ async def get_severity_by_filters(
         ]
         if not is_admin:
             must_filter_condition.append(
-                {"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions}}
+                await get_mo_permissions_condition(
+                    client_permissions=user_permissions,
+                    elastic_client=elastic_client,
+                )
             )
 
         must_not_filter_condition = list()
@@ -329,7 +338,7 @@ async def get_severity_by_ranges(
         list[FilterColumn] | None, Body(alias="columnFilters")
     ] = None,
     find_by_value: Annotated[str | None, Body(alias="findByValue")] = None,
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     is_admin = check_permission_is_admin(client_role=user_data.realm_access)
@@ -568,7 +577,7 @@ async def get_processes(
     ranges_object: Annotated[Ranges | None, Body(alias="rangesObject")] = None,
     sort: Annotated[list[SortColumn] | None, Body()] = None,
     limit: Annotated[Limit, Body()] = Limit(),
-    elastic_client: AsyncElasticsearch = Depends(get_async_client),
+    elastic_client: AsyncElasticsearch = Depends(get_coalescing_async_client),
     user_data: UserData = Depends(security),
 ):
     search_args: dict = await get_process_search_args(
@@ -669,11 +678,10 @@ async def export_processes(
             "bool": {
                 "must": [
                     {"match": {"id": severity_id}},
-                    {
-                        "terms": {
-                            INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions
-                        }
-                    },
+                    await get_tprm_permissions_condition(
+                        client_permissions=user_permissions,
+                        elastic_client=elastic_client,
+                    ),
                 ]
             }
         }
@@ -883,7 +891,10 @@ async def export_processes(
         "size": 10000,
         "track_total_hits": True,
         "sort": sort_cond,
-        "_source_excludes": [INVENTORY_PERMISSIONS_FIELD_NAME],
+        "_source_excludes": [
+            INVENTORY_PERMISSIONS_FIELD_NAME,
+            INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+        ],
     }
 
     kwargs_for_clearing_columns = {
@@ -982,11 +993,10 @@ async def export_processes(
                     search_conditions = [{"terms": {"id": parent_ids}}]
                     if not is_admin:
                         search_conditions.append(
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permissions
-                                }
-                            }
+                            await get_mo_permissions_condition(
+                                client_permissions=user_permissions,
+                                elastic_client=elastic_client,
+                            )
                         )
 
                     body = {
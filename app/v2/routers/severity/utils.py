@@ -15,6 +15,7 @@ from elastic.query_builder_service.inventory_index.utils.index_utils import (
 from indexes_mapping.inventory.mapping import (
     INVENTORY_PARAMETERS_FIELD_NAME,
     INVENTORY_PERMISSIONS_FIELD_NAME,
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
 )
 from indexes_mapping.inventory.zeebe_enums import ZeebeProcessInstanceFields
 from security.security_data_models import UserData
@@ -520,7 +521,10 @@ async def get_process_search_args(
         "size": limit.limit,
         "from_": limit.offset,
         "track_total_hits": True,
-        "_source_excludes": [INVENTORY_PERMISSIONS_FIELD_NAME],
+        "_source_excludes": [
+            INVENTORY_PERMISSIONS_FIELD_NAME,
+            INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+        ],
     }
 
     if sort_cond:
@@ -4,7 +4,6 @@ from elasticsearch import AsyncElasticsearch
 
 from elastic.config import INVENTORY_TPRM_INDEX_V2
 from elastic.pydantic_models import HierarchyFilter
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_data_models import UserPermission
 from services.hierarchy_services.features.dependet_level_factory import (
     DependentLevelsChainFactory,
@@ -15,6 +14,9 @@ from services.hierarchy_services.models.dto import HierarchyDTO, NodeDTO
 from services.inventory_services.utils.security.filter_by_realm import (
     get_only_available_to_read_tmo_ids_for_special_client,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    get_tprm_permissions_condition,
+)
 from utils_by_services.hierarchy.level_cond_query_handler import (
     LevelConditionsOrderHandler,
     LevelConditionsOrderResults,
@@ -92,11 +94,10 @@ class FilterHierarchy:
                     "bool": {
                         "must": [
                             {"terms": {"id": list(all_tprms)}},
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permission.user_permissions
-                                }
-                            },
+                            await get_tprm_permissions_condition(
+                                client_permissions=user_permission.user_permissions,
+                                elastic_client=self._elastic_client,
+                            ),
                         ]
                     }
                 },
@@ -7,13 +7,15 @@ from elasticsearch import AsyncElasticsearch
 
 from elastic.config import INVENTORY_TPRM_INDEX_V2
 from elastic.pydantic_models import HierarchyFilter
-from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
 from security.security_data_models import UserPermission
 from services.hierarchy_services.elastic.configs import HIERARCHY_OBJ_INDEX
 from services.hierarchy_services.models.dto import NodeDTO
 from services.inventory_services.utils.security.filter_by_realm import (
     get_only_available_to_read_tmo_ids_for_special_client,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    get_tprm_permissions_condition,
+)
 from v2.tasks.hierarchy.dtos.levels import LevelHierarchyWithTmoTprmsDto
 from v2.tasks.hierarchy.filter_hierarchies_with_value import (
     GetHierarchiesWithValue,
@@ -100,11 +102,10 @@ class FilterHierarchiesCurrentLevel:
                     "bool": {
                         "must": [
                             {"terms": {"id": list(all_tprms)}},
-                            {
-                                "terms": {
-                                    INVENTORY_PERMISSIONS_FIELD_NAME: user_permission.user_permissions
-                                }
-                            },
+                            await get_tprm_permissions_condition(
+                                client_permissions=user_permission.user_permissions,
+                                elastic_client=self._elastic_client,
+                            ),
                         ]
                     }
                 },
@@ -16,10 +16,7 @@ from elastic.query_builder_service.inventory_index.search_query_builder import (
 from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
-from indexes_mapping.inventory.mapping import (
-    INVENTORY_OBJ_INDEX_MAPPING,
-    INVENTORY_PERMISSIONS_FIELD_NAME,
-)
+from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
 from security.security_data_models import UserPermission
 from services.hierarchy_services.elastic.configs import (
     HIERARCHY_OBJ_INDEX,
@@ -29,6 +26,10 @@ from services.hierarchy_services.models.dto import NodeDTO
 from services.inventory_services.converters.val_type_converter import (
     get_corresponding_python_val_type_for_elastic_val_type,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    add_condition_to_query,
+    get_mo_permissions_condition,
+)
 from v2.routers.inventory.utils.helpers import (
     get_operator_for_global_search_by_inventory_val_type,
     get_tprm_val_types_need_to_check_in_global_search_by_inputted_data,
@@ -230,6 +231,7 @@ class GetHierarchiesWithValue:
         self,
         level_filters: list[FilterColumn],
         level: LevelHierarchyWithTmoTprmsDto,
+        permissions_condition: dict | None = None,
     ) -> bool:
         dict_of_types = self.__create_dict_of_types(level=level)
 
@@ -240,6 +242,10 @@ class GetHierarchiesWithValue:
         query = self._add_should_value_condition(
             query=query, dict_of_types=dict_of_types
         )
+        if permissions_condition:
+            query = add_condition_to_query(
+                query=query, condition=permissions_condition
+            )
         body = {
             "query": query,
             "sort": {"id": {"order": "asc"}},
@@ -267,25 +273,14 @@ class GetHierarchiesWithValue:
         )
         return filter_column
 
-    def __filter_add_permissions(
-        self, filters: list[FilterColumn]
-    ) -> list[FilterColumn] | None:
-        filters = filters.copy()
+    async def __get_permissions_condition(self) -> dict | None:
+        """Returns condition of MOs readable by the user, None for admin"""
         if self._user_permission.is_admin:
-            return filters
-        if not self._user_permission.user_permissions:
             return
-        filter_item = FilterItem(
-            operator=SearchOperator.IS_ANY_OF,
-            value=self._user_permission.user_permissions,
-        )
-        filter_column = FilterColumn(
-            columnName=INVENTORY_PERMISSIONS_FIELD_NAME,
-            rule=LogicalOperator.AND.value,
-            filters=[filter_item],
+        return await get_mo_permissions_condition(
+            client_permissions=self._user_permission.user_permissions,
+            elastic_client=self._elastic_client,
         )
-        filters.append(filter_column)
-        return filters
 
     async def _check_current_level(
         self, obj_ids: list[str], level: LevelHierarchyWithTmoTprmsDto
@@ -297,12 +292,16 @@ class GetHierarchiesWithValue:
         filter_by_mo_ids = self.__filter_by_mo_ids(mo_ids=mo_ids)
         if filter_by_mo_ids is None:
             return False
-        filters = [filter_by_mo_ids]
-        filters = self.__filter_add_permissions(filters=filters)
-        if filters is None:
+        if (
+            not self._user_permission.is_admin
+            and not self._user_permission.user_permissions
+        ):
             return False
+        permissions_condition = await self.__get_permissions_condition()
         return await self.__check_existing_data_by_filters(
-            level_filters=filters, level=level
+            level_filters=[filter_by_mo_ids],
+            level=level,
+            permissions_condition=permissions_condition,
         )
 
     def filter_out_top_levels(
@@ -12,10 +12,7 @@ from elastic.query_builder_service.inventory_index.mo_object.utils import (
 from elastic.query_builder_service.inventory_index.utils.index_utils import (
     get_index_name_by_tmo,
 )
-from indexes_mapping.inventory.mapping import (
-    INVENTORY_OBJ_INDEX_MAPPING,
-    INVENTORY_PERMISSIONS_FIELD_NAME,
-)
+from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
 from security.security_data_models import UserPermission
 from services.hierarchy_services.elastic.configs import (
     HIERARCHY_NODE_DATA_INDEX,
@@ -25,6 +22,10 @@ from services.hierarchy_services.models.dto import NodeDTO
 from services.inventory_services.converters.val_type_converter import (
     get_corresponding_python_val_type_for_elastic_val_type,
 )
+from services.inventory_services.utils.security.permission_sets import (
+    add_condition_to_query,
+    get_mo_permissions_condition,
+)
 from v2.tasks.hierarchy.dtos.levels import LevelHierarchyWithTmoTprmsDto
 
 
@@ -176,6 +177,7 @@ class GetFilteredHierarchies:
         mo_ids: list[int],
         level_filters: list[FilterColumn],
         level: LevelHierarchyWithTmoTprmsDto,
+        permissions_condition: dict | None = None,
     ) -> list[int]:
         if not level_filters:
             return mo_ids
@@ -184,6 +186,10 @@ class GetFilteredHierarchies:
         query = get_search_query_for_inventory_obj_index(
             filter_columns=level_filters, dict_of_types=dict_of_types
         )
+        if permissions_condition:
+            query = add_condition_to_query(
+                query=query, condition=permissions_condition
+            )
         body = {
             "query": query,
             "sort": {"id": {"order": "asc"}},
@@ -205,25 +211,14 @@ class GetFilteredHierarchies:
     ) -> set[str]:
         return {obj_id_by_mo_ids[i] for i in mo_ids}
 
-    def __filter_add_permissions(
-        self, filters: list[FilterColumn]
-    ) -> list[FilterColumn] | None:
-        filters = filters.copy()
+    async def __get_permissions_condition(self) -> dict | None:
+        """Returns condition of MOs readable by the user, None for admin"""
         if self._user_permission.is_admin:
-            return filters
-        if not self._user_permission.user_permissions:
             return
-        filter_item = FilterItem(
-            operator=SearchOperator.IS_ANY_OF,
-            value=self._user_permission.user_permissions,
-        )
-        filter_column = FilterColumn(
-            columnName=INVENTORY_PERMISSIONS_FIELD_NAME,
-            rule=LogicalOperator.AND.value,
-            filters=[filter_item],
+        return await get_mo_permissions_condition(
+            client_permissions=self._user_permission.user_permissions,
+            elastic_client=self._elastic_client,
         )
-        filters.append(filter_column)
-        return filters
 
     def is_child_level(self, level: LevelHierarchyWithTmoTprmsDto) -> bool:
         parent_level = level.parent
@@ -309,10 +304,13 @@ class GetFilteredHierarchies:
         if not filtered_tmo_ids:
             filtered_tmo_ids = set()
         if tmo_id not in filtered_tmo_ids:
-            level_filters = self.__filter_add_permissions(filters=level_filters)
-            if level_filters is None:
+            if (
+                not self._user_permission.is_admin
+                and not self._user_permission.user_permissions
+            ):
                 mo_ids = []
-            elif level_filters:
+            elif level_filters or not self._user_permission.is_admin:
+                permissions_condition = await self.__get_permissions_condition()
                 filter_item = FilterItem(
                     operator=SearchOperator.IS_ANY_OF, value=mo_ids
                 )
@@ -321,10 +319,13 @@ class GetFilteredHierarchies:
                     rule=LogicalOperator.AND.value,
                     filters=[filter_item],
                 )
-                level_filters.append(filter_column)
+                level_filters = [*level_filters, filter_column]
                 print(level_filters)
                 mo_ids = await self.__filter_level_data_by_mo_ids(
-                    level=level, level_filters=level_filters, mo_ids=mo_ids
+                    level=level,
+                    level_filters=level_filters,
+                    mo_ids=mo_ids,
+                    permissions_condition=permissions_condition,
                 )
 
             filtered_tmo_ids.add(tmo_id)
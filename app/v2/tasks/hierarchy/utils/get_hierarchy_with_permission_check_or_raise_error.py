@@ -1,11 +1,8 @@
 from elasticsearch import AsyncElasticsearch
 
 from security.security_data_models import UserPermission
-from services.hierarchy_services.elastic.configs import (
-    HIERARCHY_HIERARCHIES_INDEX,
-)
-from services.hierarchy_services.elastic.mapping import (
-    HIERARCHY_PERMISSIONS_FIELD_NAME,
+from services.hierarchy_services.elastic.utils import (
+    get_hierarchy_readable_by_permissions,
 )
 from v2.tasks.utils.exceptions import (
     SearchPermissionException,
@@ -22,35 +19,16 @@ async def get_hierarchy_with_permission_check_or_raise_error(
     if not user_permission.is_admin and not user_permission.user_permissions:
         raise SearchPermissionException("Forbidden. No permissions")
 
-    search_conditions = [{"match": {"id": hierarchy_id}}]
-
-    if not user_permission.is_admin:
-        search_conditions.append(
-            {
-                "terms": {
-                    HIERARCHY_PERMISSIONS_FIELD_NAME: user_permission.user_permissions
-                }
-            }
-        )
-
-    search_body = {
-        "query": {"bool": {"must": search_conditions}},
-        "size": 1,
-        "_source": {"excludes": [HIERARCHY_PERMISSIONS_FIELD_NAME]},
-    }
-
-    search_res = await elastic_client.search(
-        index=HIERARCHY_HIERARCHIES_INDEX,
-        body=search_body,
-        ignore_unavailable=True,
+    hierarchy = await get_hierarchy_readable_by_permissions(
+        hierarchy_id=hierarchy_id,
+        elastic_client=elastic_client,
+        is_admin=user_permission.is_admin,
+        permissions=user_permission.user_permissions,
     )
-    search_res = search_res["hits"]["hits"]
 
-    if not search_res:
+    if hierarchy is None:
         raise SearchNotFoundException(
             f"Hierarchy with id = {hierarchy_id} not found"
         )
 
-    hierarchy = search_res[0]["_source"]
-
     return hierarchy
@@ -1,3 +1,5 @@
+from fastapi.responses import ORJSONResponse
+
 from init_app import create_app
 from settings import config
 from v3.api.fast_api.routers import combine, hierarchy, inventory
@@ -14,6 +16,7 @@ v3_options = dict(
     version=v3_version,
     root_path=v3_prefix,
     debug=config.DEBUG,
+    default_response_class=ORJSONResponse,
 )
 v3_app = create_app(**v3_options)
 
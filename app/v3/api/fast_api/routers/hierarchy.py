@@ -1,7 +1,7 @@
 from typing import Annotated
 
 from elasticsearch import AsyncElasticsearch
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
 from elastic.client import get_async_client
@@ -11,6 +11,7 @@ from services.inventory_services.utils.security.filter_by_realm import (
     check_permission_is_admin,
     get_permissions_from_client_role,
 )
+from v3.api.fast_api.streaming import create_ndjson_response
 from v3.custom_exceptions.not_found import NotFound
 from v3.db.base_db import BaseTable
 from v3.db.implementation.es.es_hierarchy_secured_db import (
@@ -38,6 +39,10 @@ async def hierarchies(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for hierarchy entities
@@ -53,6 +58,10 @@ async def hierarchies(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                hierarchy_table.find_by_query(query=query)
+            )
         response = [i async for i in hierarchy_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -67,6 +76,10 @@ async def levels(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for level entities
@@ -88,6 +101,10 @@ async def levels(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                levels_table.find_by_query(query=query)
+            )
         response = [i async for i in levels_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -103,6 +120,10 @@ async def objects(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for object entities
@@ -131,6 +152,10 @@ async def objects(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                objects_table.find_by_query(query=query)
+            )
         response = [i async for i in objects_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -146,6 +171,10 @@ async def nodes(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for node entities
@@ -168,6 +197,10 @@ async def nodes(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                nodes_table.find_by_query(query=query)
+            )
         response = [i async for i in nodes_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -1,7 +1,7 @@
 from typing import Annotated
 
 from elasticsearch import AsyncElasticsearch
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
 from elastic.client import get_async_client
@@ -11,6 +11,7 @@ from services.inventory_services.utils.security.filter_by_realm import (
     check_permission_is_admin,
     get_permissions_from_client_role,
 )
+from v3.api.fast_api.streaming import create_ndjson_response
 from v3.custom_exceptions.not_found import NotFound
 from v3.db.base_db import BaseTable
 from v3.db.implementation.es.es_inventory_secured_db import (
@@ -32,6 +33,10 @@ async def tmos(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for object type (TMO) entities
@@ -47,6 +52,10 @@ async def tmos(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                tmo_table.find_by_query(query=query)
+            )
         response = [i async for i in tmo_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -61,6 +70,10 @@ async def tprms(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for parameter type (TPRM) entities
@@ -76,6 +89,10 @@ async def tprms(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                tprm_table.find_by_query(query=query)
+            )
         response = [i async for i in tprm_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
@@ -91,6 +108,10 @@ async def mos(
     query: Annotated[base_operators_union, Body(embed=True)],
     es_connection: Annotated[AsyncElasticsearch, Depends(get_async_client)],
     user_data: UserData = Depends(security),
+    stream: Annotated[
+        bool,
+        Query(description="Return rows as NDJSON while they are being read"),
+    ] = False,
 ):
     """
     This endpoint is used to search for object (MO) entities
@@ -107,6 +128,10 @@ async def mos(
     )
 
     try:
+        if stream:
+            return await create_ndjson_response(
+                mo_table.find_by_query(query=query)
+            )
         response = [i async for i in mo_table.find_by_query(query=query)]
     except NotFound as e:
         raise HTTPException(
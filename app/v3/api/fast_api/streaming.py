@@ -0,0 +1,58 @@
+from typing import AsyncIterator
+
+import orjson
+from starlette.responses import StreamingResponse
+
+from elastic.serializer import ORJSON_OPTIONS
+from v3.db.implementation.es.es_secured_db import EsSecuredTable
+
+"""
+Streaming (NDJSON) responses for endpoints that read tables with find_by_query
+"""
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _dump_line(elem: dict) -> bytes:
+    # the same serializer as ORJSONResponse of not streamed responses
+    return orjson.dumps(
+        elem, default=str, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+    )
+
+
+async def _ndjson_chunks(
+    first_elem: dict, items: AsyncIterator[dict], chunk_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Accumulates rows up to the size of one ES page and sends them to the client as one body chunk
+    """
+    buffer = [_dump_line(first_elem)]
+    async for elem in items:
+        buffer.append(_dump_line(elem))
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def create_ndjson_response(
+    items: AsyncIterator[dict],
+    chunk_size: int = EsSecuredTable.CHUNK_SIZE,
+) -> StreamingResponse:
+    """
+    Creates a response that sends rows as they are read from the table, one JSON object per line.
+    The first row is read before the response is created, so query errors (NotFound, etc.)
+    are raised here and can be converted to an HTTP error before the headers are sent.
+    """
+    items = aiter(items)
+    try:
+        first_elem = await anext(items)
+    except StopAsyncIteration:
+        return StreamingResponse(iter(()), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(
+        _ndjson_chunks(
+            first_elem=first_elem, items=items, chunk_size=chunk_size
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import AsyncIterator, TYPE_CHECKING
 
 from elasticsearch import AsyncElasticsearch
@@ -40,7 +39,6 @@ class HierarchiesEsSecuredTable(EsSecuredTable):
         """
         Supplement the query, if necessary, by checking user rights and execute the basic query of the parent class
         """
-        query = deepcopy(query)
         if not self.is_admin:
             if isinstance(query, field):
                 query = And(
@@ -107,7 +105,6 @@ class LevelsEsSecuredTable(EsSecuredTable):
         """
         Do a post-check of user rights by TMO. Check permissions in chunks for more processing speed
         """
-        query = deepcopy(query)
         if self.is_admin:
             async for elem in super().find_by_query(
                 query=query, includes=includes
@@ -178,7 +175,6 @@ class NodesEsSecuredTable(EsSecuredTable):
         """
         Do a post-check of user rights by MO. Check permissions in chunks for more processing speed
         """
-        query = deepcopy(query)
         if self.is_admin:
             async for elem in super().find_by_query(
                 query=query, includes=includes
@@ -246,7 +242,6 @@ class ObjectsEsSecuredTable(EsSecuredTable):
         """
         Do a post-check of user rights by Node. Check permissions in chunks for more processing speed
         """
-        query = deepcopy(query)
         if self.is_admin:
             async for elem in super().find_by_query(
                 query=query, includes=includes
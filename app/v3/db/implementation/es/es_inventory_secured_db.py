@@ -1,8 +1,14 @@
-from copy import deepcopy
 from typing import AsyncIterator
 
 from elasticsearch import AsyncElasticsearch
 
+from services.inventory_services.elastic.security.configs import (
+    INVENTORY_QUERY_TIME_PERMISSIONS,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    get_mo_permissions_condition,
+    get_tprm_permissions_condition,
+)
 from v3.models.input.operators.field import field
 from v3.models.input.operators.field_operators.comparison import In
 from v3.models.input.operators.input_union import base_operators_union
@@ -36,7 +42,6 @@ class TmoEsSecuredTable(EsSecuredTable):
         """
         Supplement the query, if necessary, by checking user rights and execute the basic query of the parent class
         """
-        query = deepcopy(query)
         if not self.is_admin:
             query = And(
                 value=[query, field(permissions=In(value=self.permissions))]
@@ -68,14 +73,24 @@ class MoEsSecuredTable(EsSecuredTable):
         """
         Supplement the query, if necessary, by checking user rights and execute the basic query of the parent class
         """
-        query = deepcopy(query)
-        if not self.is_admin:
+        if not self.is_admin and not INVENTORY_QUERY_TIME_PERMISSIONS:
             query = And(
                 value=[query, field(permissions=In(value=self.permissions))]
             )
         async for elem in super().find_by_query(query=query, includes=includes):
             yield elem
 
+    async def get_filter_conditions(self) -> list[dict]:
+        """Readable ids are checked by the condition of permission sets"""
+        if self.is_admin or not INVENTORY_QUERY_TIME_PERMISSIONS:
+            return []
+        return [
+            await get_mo_permissions_condition(
+                client_permissions=self.permissions,
+                elastic_client=self.connection,
+            )
+        ]
+
 
 class TprmEsSecuredTable(EsSecuredTable):
     TABLE_PREFIX = "inventory_tprm_index"
@@ -98,8 +113,18 @@ class TprmEsSecuredTable(EsSecuredTable):
         """
         Supplement the query, if necessary, by checking user rights and execute the basic query of the parent class
         """
-        query = deepcopy(query)
-        if not self.is_admin:
+        if not self.is_admin and not INVENTORY_QUERY_TIME_PERMISSIONS:
             query = And(value=[query, field(permissions=self.permissions)])
         async for elem in super().find_by_query(query=query, includes=includes):
             yield elem
+
+    async def get_filter_conditions(self) -> list[dict]:
+        """Readable ids are checked by the condition of permission sets"""
+        if self.is_admin or not INVENTORY_QUERY_TIME_PERMISSIONS:
+            return []
+        return [
+            await get_tprm_permissions_condition(
+                client_permissions=self.permissions,
+                elastic_client=self.connection,
+            )
+        ]
@@ -37,6 +37,13 @@ class EsSecuredTable(BaseTable, ABC):
         mapping = await self.connection.indices.get_mapping(self.table_name)
         return mapping
 
+    async def get_filter_conditions(self) -> list[dict]:
+        """
+        Conditions which are added to every query of the table as filter context,
+        e.g. access conditions which can't be expressed by the input operators.
+        """
+        return []
+
     async def find_by_query(
         self,
         query: base_operators_union,
@@ -51,9 +58,15 @@ class EsSecuredTable(BaseTable, ABC):
         if not isinstance(query, BaseLogical):
             query = And(value=[query])
         parsed_query = self.parser.parse(in_query=query)
+        es_query = {"bool": parsed_query.create_query()}
+        filter_conditions = await self.get_filter_conditions()
+        if filter_conditions:
+            es_query = {
+                "bool": {"must": [es_query], "filter": filter_conditions}
+            }
         stmt = dict(
             index=self.table_name,
-            query={"bool": parsed_query.create_query()},
+            query=es_query,
             sort={self.DEFAULT_ORDER_BY: "ASC"},
             source_includes=includes,
             size=self.CHUNK_SIZE,
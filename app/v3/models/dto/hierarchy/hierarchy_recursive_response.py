@@ -9,5 +9,5 @@ class HierarchyRecursiveResponse(BaseModel):
 
 class HierarchyRecursiveFilterDto(BaseModel):
     mo_ids_by_node_id: dict[str, set[int]]
-    hier_response: dict[str, str]
+    hier_response: dict[str, str | None]
     hier_without_children: list[str]
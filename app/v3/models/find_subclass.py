@@ -3,6 +3,12 @@ import os
 import re
 from importlib import import_module
 
+# root of packages of the application, directories of operators are relative to it,
+# so operators are found when the application or tests do not run from it
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
 
 def is_not_abstract(cls):
     return not bool(getattr(cls, "__abstractmethods__", False))
@@ -38,7 +44,8 @@ def find_subclasses_in_directory(directory, base_class):
     """
     subclasses = []
 
-    project_root = os.getcwd()
+    project_root = PROJECT_ROOT
+    directory = os.path.join(project_root, directory)
     package = get_package_name(directory, project_root)
 
     for filename in os.listdir(directory):
@@ -1,6 +1,5 @@
 from asyncio import TaskGroup
 from collections import defaultdict
-from copy import deepcopy
 from typing import TYPE_CHECKING, Type, get_origin
 
 from elasticsearch import AsyncElasticsearch
@@ -24,6 +23,18 @@ if TYPE_CHECKING:
 field_origin = get_origin(field)
 
 
+def and_with_parts(query: "base_operators_union", *parts: field) -> And:
+    """
+    Returns a new And of the query and field parts.
+    Nodes of the query are shared with the result, not copied, so the filter nodes must not be mutated
+    """
+    if isinstance(query, And):
+        return And(value=[*query.value, *parts])
+    if isinstance(query, field_origin):
+        return And(value=[query, *parts])
+    return And(value=[And(value=list(parts)), query])
+
+
 class InvByHierarchyTask:
     """
     Traverses a route of layers, performs data filtering at each layer, passes the parents to the layer below.
@@ -78,7 +89,7 @@ class InvByHierarchyTask:
         )
 
         for level in self.query.filters.level_filters:  # type: LevelFilter
-            level_and_filter = deepcopy(base_and_filter)
+            level_and_filter = list(base_and_filter)
             if level.path:
                 level_and_filter.append(field(path=level.path))
             if level.id:
@@ -127,24 +138,12 @@ class InvByHierarchyTask:
         # filter hierarchy obj
         hier_level_filt = hierarchy_filters_by_level_ids.get(level_id, None)
         if not hier_level_filt:
-            # default filter
-            hier_level_filt = deepcopy(
-                hierarchy_filters_by_level_ids.get(None, None)
-            )
-
-            # appending filter by level_id
+            # default filter with filter by level_id
+            hier_level_filt = hierarchy_filters_by_level_ids.get(None, None)
             if hier_level_filt:
-                level_filter_part = field(level_id=Eq(value=level_id))
-                if isinstance(hier_level_filt, And):
-                    hier_level_filt.value.append(level_filter_part)
-                elif isinstance(hier_level_filt, field_origin):
-                    hier_level_filt = And(
-                        value=[hier_level_filt, level_filter_part]
-                    )
-                else:
-                    hier_level_filt = And(
-                        value=[And(value=level_filter_part), hier_level_filt]
-                    )
+                hier_level_filt = and_with_parts(
+                    hier_level_filt, field(level_id=Eq(value=level_id))
+                )
 
         if isinstance(parent_ids, list):
             if len(parent_ids) == 0:
@@ -155,16 +154,9 @@ class InvByHierarchyTask:
                     hier_response=[],
                     hier_without_children=[],
                 )
-            if isinstance(hier_level_filt, And):
-                query = deepcopy(hier_level_filt)
-                query.value.append(field(parent_id=In(value=parent_ids)))
-            else:
-                query = And(
-                    value=[
-                        And(value=[field(parent_id=In(value=parent_ids))]),
-                        hier_level_filt,
-                    ]
-                )
+            query = and_with_parts(
+                hier_level_filt, field(parent_id=In(value=parent_ids))
+            )
         else:
             query = hier_level_filt
         hier_without_children = []
@@ -203,13 +195,15 @@ class InvByHierarchyTask:
         node_ids: set[str],
     ):
         children_tasks = []
+        # the same list is shared by the queries of all children
+        parent_ids = list(node_ids)
         async with TaskGroup() as tg:
             for child_level in level_way.children:
                 task = tg.create_task(
                     self._recursive_find(
                         hierarchy_filters_by_level_ids=hierarchy_filters_by_level_ids,
                         inventory_filters_by_level_ids=inventory_filters_by_level_ids,
-                        parent_ids=list(node_ids),
+                        parent_ids=parent_ids,
                         level_way=child_level,
                     )
                 )
@@ -489,9 +483,9 @@ class InvByHierarchyTask:
 
         # same level recursion
         if level_way.level_data.attr_as_parent:
-            same_level_way_children = deepcopy(level_way)
-            same_level_way_children.children = []
-            same_level_way_children.is_target = False
+            same_level_way_children = level_way.model_copy(
+                update={"children": [], "is_target": False}
+            )
 
             same_level_parent_ids = (
                 set(mo_ids_by_node_id.keys()) if mo_ids_by_node_id else None
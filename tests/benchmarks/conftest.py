@@ -0,0 +1,101 @@
+import time
+
+import httpx
+import pytest
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+from pytest_asyncio import fixture
+
+from elastic.client import ElasticsearchManager, get_async_client
+from elastic.utils import init_all_necessary_indexes
+from security.implementation.disabled import default_user
+from security.security_factory import security
+from services.inventory_services.kafka.consumers.inventory_changes.utils import (
+    InventoryChangesHandler,
+)
+from settings.config import BENCHMARKS_REPORT_PATH
+from tests.benchmarks.report import BenchmarkReport
+from tests.benchmarks.synthetic_data import SyntheticInventory, SyntheticScale
+from v2.routers.elastic.dependencies import get_coalescing_async_client
+
+
+@fixture(scope="session")
+def benchmark_report():
+    report = BenchmarkReport(scale=SyntheticScale())
+    yield report
+    report.write(BENCHMARKS_REPORT_PATH)
+    print(f"Benchmark report: {BENCHMARKS_REPORT_PATH}")
+
+
+@fixture(scope="session")
+async def benchmark_elastic_client(elastic_instance, benchmark_report):
+    es_url = elastic_instance.get_url()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("elastic.client.ES_URL", es_url)
+        monkeypatch.setattr("elastic.client.ES_PROTOCOL", "http")
+        async with AsyncElasticsearch(es_url, request_timeout=600) as client:
+            info = await client.info()
+            benchmark_report.environment["elasticsearch"] = info["version"][
+                "number"
+            ]
+            yield client
+        await ElasticsearchManager().close()
+
+
+@fixture(scope="session")
+async def benchmark_data(
+    benchmark_elastic_client: AsyncElasticsearch, benchmark_report
+) -> SyntheticInventory:
+    """Loads synthetic data once per session. Inventory data is loaded through InventoryChangesHandler,
+    the same way as the consumer does it, hierarchy data is loaded with bulk"""
+    await init_all_necessary_indexes(async_client=benchmark_elastic_client)
+    inventory = SyntheticInventory(scale=benchmark_report.scale)
+
+    start = time.perf_counter()
+    for kafka_msg in inventory.inventory_changes_messages():
+        handler = InventoryChangesHandler(kafka_msg=kafka_msg)
+        await handler.process_the_message()
+    benchmark_report.add_case(
+        "load.inventory_changes", [time.perf_counter() - start]
+    )
+
+    start = time.perf_counter()
+    _, errors = await async_bulk(
+        client=benchmark_elastic_client,
+        actions=inventory.hierarchy_actions(),
+        refresh="true",
+    )
+    assert not errors
+    benchmark_report.add_case("load.hierarchy", [time.perf_counter() - start])
+
+    await benchmark_elastic_client.indices.refresh(index="*")
+    counts = await benchmark_elastic_client.cat.count(
+        index="*", format="json", h="index,count"
+    )
+    benchmark_report.dataset = {
+        "tmo": len(inventory.tmo_ids),
+        "mo": inventory.mo_count,
+        "docs_in_elastic": sum(int(item["count"]) for item in counts),
+    }
+    return inventory
+
+
+@fixture(scope="session")
+async def benchmark_http_client(benchmark_elastic_client, benchmark_data):
+    """Client of the v2 application that uses the benchmark elastic session on behalf of the admin"""
+    from v2.main import v2_app, v2_prefix
+
+    async def get_benchmark_client():
+        yield benchmark_elastic_client
+
+    v2_app.dependency_overrides[get_async_client] = get_benchmark_client
+    v2_app.dependency_overrides[get_coalescing_async_client] = (
+        get_benchmark_client
+    )
+    v2_app.dependency_overrides[security] = lambda: default_user
+    transport = httpx.ASGITransport(app=v2_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=f"http://benchmark{v2_prefix}"
+    ) as client:
+        yield client
+    v2_app.dependency_overrides.clear()
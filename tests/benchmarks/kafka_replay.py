@@ -0,0 +1,123 @@
+import base64
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator
+
+from kafka_config.msg_protocol import KafkaMSGProtocol
+from metrics.collectors import ES_REQUEST_DURATION
+from services.inventory_services.kafka.consumers.inventory_changes.configs import (
+    INVENTORY_CHANGES_PROTOBUF_DESERIALIZERS,
+)
+from services.inventory_services.kafka.consumers.inventory_changes.utils import (
+    InventoryChangesHandler,
+)
+from tests.benchmarks.report import BenchmarkReport
+from tests.kafka.utils import KafkaMSGMock
+
+"""
+Replay of inventory changes messages directly into InventoryChangesHandler, without the broker.
+Messages can be generated (SyntheticInventory.replay_messages) or recorded into a json lines file
+with dump_kafka_messages, e.g. from the messages polled by a confluent_kafka Consumer.
+"""
+
+
+def dump_kafka_messages(messages: Iterable[KafkaMSGProtocol], path: str):
+    """Writes messages as json lines: topic, key and base64 encoded protobuf value"""
+    with open(path, "w") as file:
+        for msg in messages:
+            line = {
+                "topic": msg.topic(),
+                "key": msg.key().decode("utf-8"),
+                "value": base64.b64encode(msg.value()).decode("ascii"),
+            }
+            file.write(json.dumps(line) + "\n")
+
+
+def load_kafka_messages(path: str) -> Iterator[KafkaMSGMock]:
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            line = json.loads(line)
+            yield KafkaMSGMock(
+                msg_key=line["key"],
+                msg_topic=line["topic"],
+                msg_value=base64.b64decode(line["value"]),
+            )
+
+
+def count_es_requests() -> Counter:
+    """Returns the number of requests sent by the instrumented elastic clients by endpoint"""
+    counts = Counter()
+    for metric in ES_REQUEST_DURATION.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count"):
+                counts[sample.labels["endpoint"]] += int(sample.value)
+    return counts
+
+
+def count_msg_objects(msg: KafkaMSGProtocol) -> int:
+    msg_class_name = msg.key().decode("utf-8").split(":")[0]
+    deserializer_model = INVENTORY_CHANGES_PROTOBUF_DESERIALIZERS.get(
+        msg_class_name
+    )
+    if not deserializer_model:
+        return 0
+    deserializer_instance = deserializer_model()
+    deserializer_instance.ParseFromString(msg.value())
+    return len(deserializer_instance.objects)
+
+
+class KafkaReplay:
+    """Processes messages one by one, as the consumer does, and collects per event type statistics"""
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.objects = Counter()
+        self.es_requests = defaultdict(Counter)
+        self.total_duration = 0.0
+
+    async def replay(self, messages: Iterable[KafkaMSGProtocol]):
+        for msg in messages:
+            event_type = msg.key().decode("utf-8")
+            self.objects[event_type] += count_msg_objects(msg)
+
+            es_requests_before = count_es_requests()
+            start = time.perf_counter()
+            handler = InventoryChangesHandler(kafka_msg=msg)
+            await handler.process_the_message()
+            duration = time.perf_counter() - start
+
+            es_requests = count_es_requests()
+            es_requests.subtract(es_requests_before)
+            self.es_requests[event_type].update(+es_requests)
+            self.durations[event_type].append(duration)
+            self.total_duration += duration
+
+    def add_to_report(self, report: BenchmarkReport, prefix: str):
+        messages = sum(len(items) for items in self.durations.values())
+        all_es_requests = sum(
+            sum(counter.values()) for counter in self.es_requests.values()
+        )
+        report.cases[f"{prefix}.total"] = {
+            "messages": messages,
+            "objects": sum(self.objects.values()),
+            "seconds": round(self.total_duration, 3),
+            "messages_per_second": round(messages / self.total_duration, 3),
+            "objects_per_second": round(
+                sum(self.objects.values()) / self.total_duration, 3
+            ),
+            "es_requests_per_message": round(all_es_requests / messages, 3),
+        }
+        for event_type, durations in self.durations.items():
+            es_requests = self.es_requests[event_type]
+            report.add_case(
+                f"{prefix}.{event_type}",
+                durations,
+                objects=self.objects[event_type],
+                es_requests_per_message=round(
+                    sum(es_requests.values()) / len(durations), 3
+                ),
+                es_requests_by_endpoint=dict(es_requests),
+            )
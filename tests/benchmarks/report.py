@@ -0,0 +1,80 @@
+import json
+import platform
+import statistics
+import time
+from dataclasses import asdict
+from typing import Awaitable, Callable
+
+from tests.benchmarks.synthetic_data import SyntheticScale
+
+"""
+Machine-readable benchmark report. Keys are sorted and values are rounded,
+so reports of two versions can be compared with any json diff tool.
+"""
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def summarize_durations(durations: list[float]) -> dict:
+    """Returns latency statistics in milliseconds"""
+    ordered = sorted(durations)
+    p95_index = max(0, round(len(ordered) * 0.95) - 1)
+    return {
+        "iterations": len(ordered),
+        "min_ms": _ms(ordered[0]),
+        "mean_ms": _ms(statistics.fmean(ordered)),
+        "median_ms": _ms(statistics.median(ordered)),
+        "p95_ms": _ms(ordered[p95_index]),
+        "max_ms": _ms(ordered[-1]),
+    }
+
+
+class BenchmarkReport:
+    def __init__(self, scale: SyntheticScale):
+        self.scale = scale
+        self.environment = {
+            "python": platform.python_version(),
+            "elasticsearch": None,
+        }
+        self.dataset = {}
+        self.cases = {}
+
+    def add_case(self, name: str, durations: list[float], **extra):
+        case = summarize_durations(durations)
+        case.update(extra)
+        self.cases[name] = case
+
+    async def measure(
+        self,
+        name: str,
+        call: Callable[[], Awaitable],
+        iterations: int,
+        warmup: int = 1,
+        **extra,
+    ):
+        """Runs call warmup + iterations times and adds the timings of the last iterations as a case"""
+        for _ in range(warmup):
+            await call()
+
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await call()
+            durations.append(time.perf_counter() - start)
+
+        self.add_case(name, durations, **extra)
+
+    def as_dict(self) -> dict:
+        return {
+            "environment": self.environment,
+            "scale": asdict(self.scale),
+            "dataset": self.dataset,
+            "cases": self.cases,
+        }
+
+    def write(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=2, sort_keys=True)
+            file.write("\n")
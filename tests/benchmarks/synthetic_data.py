@@ -0,0 +1,322 @@
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List
+
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from elastic.enum_models import InventoryFieldValType
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_HIERARCHIES_INDEX,
+    HIERARCHY_LEVELS_INDEX,
+    HIERARCHY_OBJ_INDEX,
+)
+from services.hierarchy_services.elastic.mapping import (
+    HIERARCHY_PERMISSIONS_FIELD_NAME,
+)
+from settings.config import (
+    BENCHMARKS_BATCH_SIZE,
+    BENCHMARKS_HIERARCHY_CHILDREN,
+    BENCHMARKS_HIERARCHY_DEPTH,
+    BENCHMARKS_MO_PER_TMO,
+    BENCHMARKS_SEED,
+    BENCHMARKS_TMO_COUNT,
+)
+from tests.kafka.consumers.topics.inventory_changes.utils import (
+    create_cleared_kafka_mo_msg,
+    create_cleared_kafka_prm_msg,
+    create_cleared_kafka_tmo_msg,
+    create_cleared_kafka_tprm_msg,
+)
+from tests.kafka.utils import KafkaMSGMock
+
+"""
+Deterministic synthetic inventory (TMO, TPRM, MO, PRM with mo_link values) and hierarchy data
+for the benchmarks. The same seed and scale always give the same data, so reports can be compared
+between versions.
+"""
+
+# one TPRM of every type per TMO, the INT one is used as the TMO severity
+TPRM_VAL_TYPES = (
+    InventoryFieldValType.STR.value,
+    InventoryFieldValType.INT.value,
+    InventoryFieldValType.FLOAT.value,
+    InventoryFieldValType.BOOL.value,
+    InventoryFieldValType.DATE.value,
+    InventoryFieldValType.MO_LINK.value,
+)
+TPRM_ID_MULTIPLIER = 100
+SEVERITY_MAX_VALUE = 5
+HIERARCHY_ID = 1
+
+STR_VALUES = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf")
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    tmo_count: int = BENCHMARKS_TMO_COUNT
+    mo_per_tmo: int = BENCHMARKS_MO_PER_TMO
+    hierarchy_depth: int = BENCHMARKS_HIERARCHY_DEPTH
+    hierarchy_children: int = BENCHMARKS_HIERARCHY_CHILDREN
+    batch_size: int = BENCHMARKS_BATCH_SIZE
+    seed: int = BENCHMARKS_SEED
+
+
+class SyntheticInventory:
+    """Generates inventory data in kafka format and hierarchy data in elastic format"""
+
+    def __init__(self, scale: SyntheticScale):
+        self.scale = scale
+        self._timestamp = Timestamp()
+        self._timestamp.FromDatetime(datetime(2024, 1, 1))
+
+        self.tmo_ids = list(range(1, scale.tmo_count + 1))
+
+    @staticmethod
+    def tprm_id(tmo_id: int, val_type: str) -> int:
+        return tmo_id * TPRM_ID_MULTIPLIER + TPRM_VAL_TYPES.index(val_type)
+
+    def severity_tprm_id(self, tmo_id: int) -> int:
+        return self.tprm_id(tmo_id, InventoryFieldValType.INT.value)
+
+    def mo_ids_of_tmo(self, tmo_id: int) -> range:
+        start = (tmo_id - 1) * self.scale.mo_per_tmo + 1
+        return range(start, start + self.scale.mo_per_tmo)
+
+    @property
+    def mo_count(self) -> int:
+        return self.scale.tmo_count * self.scale.mo_per_tmo
+
+    def tmo_data(self) -> List[dict]:
+        return [
+            {
+                "id": tmo_id,
+                "name": f"Benchmark TMO {tmo_id}",
+                "p_id": tmo_id - 1,
+                "severity_id": self.severity_tprm_id(tmo_id),
+                "version": 1,
+                "status": 1,
+                "created_by": "benchmark",
+                "modified_by": "benchmark",
+                "creation_date": self._timestamp,
+                "modification_date": self._timestamp,
+            }
+            for tmo_id in self.tmo_ids
+        ]
+
+    def tprm_data(self) -> List[dict]:
+        tprms = []
+        for tmo_id in self.tmo_ids:
+            for val_type in TPRM_VAL_TYPES:
+                tprms.append(
+                    {
+                        "id": self.tprm_id(tmo_id, val_type),
+                        "name": f"Benchmark {val_type} {tmo_id}",
+                        "val_type": val_type,
+                        "required": False,
+                        "returnable": True,
+                        "multiple": False,
+                        "tmo_id": tmo_id,
+                        "creation_date": self._timestamp,
+                        "modification_date": self._timestamp,
+                        "version": 1,
+                    }
+                )
+        return tprms
+
+    def mo_data(self) -> Iterator[dict]:
+        """MOs of the first TMO are roots, MOs of the next TMOs have parents in the previous one"""
+        rnd = random.Random(self.scale.seed)
+        for tmo_id in self.tmo_ids:
+            parent_ids = self.mo_ids_of_tmo(tmo_id - 1) if tmo_id > 1 else None
+            for mo_id in self.mo_ids_of_tmo(tmo_id):
+                yield {
+                    "id": mo_id,
+                    "name": f"{STR_VALUES[mo_id % len(STR_VALUES)]}-{tmo_id}-{mo_id}",
+                    "active": True,
+                    "tmo_id": tmo_id,
+                    "p_id": rnd.choice(parent_ids) if parent_ids else 0,
+                    "latitude": rnd.uniform(-60.0, 60.0),
+                    "longitude": rnd.uniform(-180.0, 180.0),
+                    "version": 1,
+                    "creation_date": self._timestamp,
+                    "modification_date": self._timestamp,
+                }
+
+    def prm_data(self, version: int = 1) -> Iterator[dict]:
+        """One PRM per MO for every TPRM of its TMO. mo_link values point to MOs of the same TMO.
+        Every version has its own values"""
+        rnd = random.Random(self.scale.seed + version)
+        prm_id = 1
+        for tmo_id in self.tmo_ids:
+            mo_ids = self.mo_ids_of_tmo(tmo_id)
+            for mo_id in mo_ids:
+                for val_type in TPRM_VAL_TYPES:
+                    yield {
+                        "id": prm_id,
+                        "value": self._prm_value(rnd, val_type, mo_ids),
+                        "tprm_id": self.tprm_id(tmo_id, val_type),
+                        "mo_id": mo_id,
+                        "version": version,
+                    }
+                    prm_id += 1
+
+    @staticmethod
+    def _prm_value(rnd: random.Random, val_type: str, mo_ids: range) -> str:
+        match val_type:
+            case InventoryFieldValType.STR.value:
+                return f"{rnd.choice(STR_VALUES)} {rnd.randint(0, 10_000)}"
+            case InventoryFieldValType.INT.value:
+                return str(rnd.randint(0, SEVERITY_MAX_VALUE))
+            case InventoryFieldValType.FLOAT.value:
+                return str(round(rnd.uniform(0, 1000), 3))
+            case InventoryFieldValType.BOOL.value:
+                return str(rnd.random() < 0.5)
+            case InventoryFieldValType.DATE.value:
+                return f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+            case InventoryFieldValType.MO_LINK.value:
+                return str(rnd.choice(mo_ids))
+
+    def inventory_changes_messages(self) -> Iterator[KafkaMSGMock]:
+        """Messages of the inventory changes topic in the order they must be processed"""
+        yield create_cleared_kafka_tmo_msg(
+            list_of_tmo_data=self.tmo_data(), msg_event="created"
+        )
+        yield create_cleared_kafka_tprm_msg(
+            list_of_tprm_data=self.tprm_data(), msg_event="created"
+        )
+        for batch in self._batches(self.mo_data()):
+            yield create_cleared_kafka_mo_msg(
+                list_of_mo_data=batch, msg_event="created"
+            )
+        for batch in self._batches(self.prm_data()):
+            yield create_cleared_kafka_prm_msg(
+                list_of_prm_data=batch, msg_event="created"
+            )
+
+    def replay_messages(self) -> Iterator[KafkaMSGMock]:
+        """Messages of the inventory changes topic with all event types: creation of the data,
+        update of all MOs and PRMs, deletion of one batch of MOs of the last TMO with their PRMs"""
+        yield from self.inventory_changes_messages()
+
+        for batch in self._batches(self.mo_data()):
+            for mo in batch:
+                mo["name"] = f"{mo['name']} updated"
+                mo["version"] = 2
+            yield create_cleared_kafka_mo_msg(
+                list_of_mo_data=batch, msg_event="updated"
+            )
+        for batch in self._batches(self.prm_data(version=2)):
+            yield create_cleared_kafka_prm_msg(
+                list_of_prm_data=batch, msg_event="updated"
+            )
+
+        last_mo_ids = self.mo_ids_of_tmo(self.tmo_ids[-1])
+        deleted_mo_ids = last_mo_ids[: self.scale.batch_size]
+        deleted_prms = [
+            prm
+            for prm in self.prm_data(version=2)
+            if prm["mo_id"] in deleted_mo_ids
+        ]
+        for batch in self._batches(iter(deleted_prms)):
+            yield create_cleared_kafka_prm_msg(
+                list_of_prm_data=batch, msg_event="deleted"
+            )
+        deleted_mos = [
+            mo for mo in self.mo_data() if mo["id"] in deleted_mo_ids
+        ]
+        yield create_cleared_kafka_mo_msg(
+            list_of_mo_data=deleted_mos, msg_event="deleted"
+        )
+
+    def _batches(self, items: Iterator[dict]) -> Iterator[List[dict]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.scale.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def hierarchy_actions(self) -> Iterator[dict]:
+        """Bulk actions for one hierarchy with a level per depth and hierarchy_children nodes per parent"""
+        yield dict(
+            _index=HIERARCHY_HIERARCHIES_INDEX,
+            _id=HIERARCHY_ID,
+            _source={
+                "id": HIERARCHY_ID,
+                "name": "Benchmark hierarchy",
+                "description": "Benchmark hierarchy",
+                HIERARCHY_PERMISSIONS_FIELD_NAME: [],
+                "author": "benchmark",
+                "change_author": "benchmark",
+                "status": "created",
+                "create_empty_nodes": True,
+                "created": datetime(2024, 1, 1),
+                "modified": datetime(2024, 1, 1),
+            },
+        )
+
+        levels = []
+        for depth in range(self.scale.hierarchy_depth):
+            level = {
+                "id": depth + 1,
+                "parent_id": depth if depth else None,
+                "hierarchy_id": HIERARCHY_ID,
+                "level": depth,
+                "name": f"Benchmark level {depth}",
+                "object_type_id": self.tmo_ids[depth % len(self.tmo_ids)],
+                "is_virtual": False,
+                "author": "benchmark",
+                "created": datetime(2024, 1, 1),
+                "show_without_children": True,
+                "key_attrs": ["name"],
+            }
+            levels.append(level)
+            yield dict(
+                _index=HIERARCHY_LEVELS_INDEX, _id=level["id"], _source=level
+            )
+
+        node_counter = 0
+        parents = [None]
+        for level in levels:
+            mo_ids = self.mo_ids_of_tmo(level["object_type_id"])
+            is_last_level = level["level"] == self.scale.hierarchy_depth - 1
+            level_nodes = []
+            for parent in parents:
+                for _ in range(self.scale.hierarchy_children):
+                    node_counter += 1
+                    object_id = mo_ids[node_counter % len(mo_ids)]
+                    node = {
+                        "id": str(uuid.UUID(int=node_counter)),
+                        "hierarchy_id": HIERARCHY_ID,
+                        "parent_id": parent["id"] if parent else None,
+                        "key": f"node {object_id}",
+                        "object_id": object_id,
+                        "level": level["level"],
+                        "object_type_id": level["object_type_id"],
+                        "level_id": level["id"],
+                        "active": True,
+                        "path": f"{parent['path'] or ''}{parent['id']}/"
+                        if parent
+                        else None,
+                        "latitude": 0,
+                        "longitude": 0,
+                        "child_count": 0
+                        if is_last_level
+                        else self.scale.hierarchy_children,
+                        "key_is_empty": False,
+                    }
+                    level_nodes.append(node)
+                    yield dict(
+                        _index=HIERARCHY_OBJ_INDEX, _id=node["id"], _source=node
+                    )
+            parents = level_nodes
+
+    def first_node_id_of_level(self, level: int) -> str:
+        """Nodes are numbered breadth-first, so the first node of a level follows all nodes of previous levels"""
+        children = self.scale.hierarchy_children
+        nodes_before = sum(children ** (depth + 1) for depth in range(level))
+        return str(uuid.UUID(int=nodes_before + 1))
@@ -0,0 +1,167 @@
+import httpx
+import pytest
+
+from settings.config import BENCHMARKS_ITERATIONS, BENCHMARKS_RUN
+from tests.benchmarks.report import BenchmarkReport
+from tests.benchmarks.synthetic_data import (
+    HIERARCHY_ID,
+    SEVERITY_MAX_VALUE,
+    SyntheticInventory,
+)
+
+pytestmark = [
+    pytest.mark.skipif(
+        not BENCHMARKS_RUN, reason="Benchmarks run only with BENCHMARKS_RUN"
+    ),
+    pytest.mark.asyncio(loop_scope="session"),
+]
+
+PAGE_SIZE = 100
+
+
+async def post_ok(client: httpx.AsyncClient, url: str, **kwargs):
+    response = await client.post(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+async def get_ok(client: httpx.AsyncClient, url: str, **kwargs):
+    response = await client.get(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+async def test_get_inventory_objects_by_filters(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+):
+    tmo_id = benchmark_data.tmo_ids[-1]
+    body = {
+        "tmo_id": tmo_id,
+        "filter_columns": [
+            {
+                "columnName": str(benchmark_data.severity_tprm_id(tmo_id)),
+                "rule": "and",
+                "filters": [{"operator": "moreOrEq", "value": 2}],
+            }
+        ],
+        "sort_by": [{"columnName": "name", "ascending": True}],
+        "limit": PAGE_SIZE,
+    }
+    await benchmark_report.measure(
+        "inventory.get_inventory_objects_by_filters",
+        lambda: post_ok(
+            benchmark_http_client,
+            "/inventory/get_inventory_objects_by_filters",
+            json=body,
+        ),
+        iterations=BENCHMARKS_ITERATIONS,
+    )
+
+
+async def test_get_inventory_objects_by_filters_with_search_by_value(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+):
+    body = {
+        "tmo_id": benchmark_data.tmo_ids[0],
+        "search_by_value": "bravo",
+        "limit": PAGE_SIZE,
+    }
+    await benchmark_report.measure(
+        "inventory.get_inventory_objects_by_filters.search_by_value",
+        lambda: post_ok(
+            benchmark_http_client,
+            "/inventory/get_inventory_objects_by_filters",
+            json=body,
+        ),
+        iterations=BENCHMARKS_ITERATIONS,
+    )
+
+
+async def test_get_inventory_objects_by_value(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+):
+    params = {"search_value": "charlie", "limit": PAGE_SIZE}
+    await benchmark_report.measure(
+        "inventory.get_inventory_objects_by_value",
+        lambda: get_ok(
+            benchmark_http_client,
+            "/inventory/get_inventory_objects_by_value",
+            params=params,
+        ),
+        iterations=BENCHMARKS_ITERATIONS,
+    )
+
+
+async def test_severity_by_filters(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+):
+    body = [
+        {
+            "filterName": f"tmo {tmo_id} severity {severity}",
+            "tmoId": tmo_id,
+            "columnFilters": [
+                {
+                    "columnName": str(benchmark_data.severity_tprm_id(tmo_id)),
+                    "rule": "and",
+                    "filters": [{"operator": "equals", "value": severity}],
+                }
+            ],
+        }
+        for tmo_id in benchmark_data.tmo_ids
+        for severity in range(SEVERITY_MAX_VALUE + 1)
+    ]
+    await benchmark_report.measure(
+        "severity.by_filters",
+        lambda: post_ok(
+            benchmark_http_client, "/severity/by_filters", json=body
+        ),
+        iterations=BENCHMARKS_ITERATIONS,
+        groups=len(body),
+    )
+
+
+@pytest.mark.parametrize("level", [0, 1])
+async def test_hierarchy_level_children(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+    level: int,
+):
+    if level >= benchmark_data.scale.hierarchy_depth:
+        pytest.skip("Hierarchy is not deep enough")
+
+    parent_id = (
+        "root"
+        if level == 0
+        else benchmark_data.first_node_id_of_level(level - 1)
+    )
+    url = f"/ms_hierarchy/hierarchy/{HIERARCHY_ID}/parent/{parent_id}/with_conditions"
+    await benchmark_report.measure(
+        f"hierarchy.children.level_{level}",
+        lambda: post_ok(benchmark_http_client, url, json={}),
+        iterations=BENCHMARKS_ITERATIONS,
+    )
+
+
+@pytest.mark.parametrize("file_type", ["csv", "xlsx"])
+async def test_export(
+    benchmark_http_client: httpx.AsyncClient,
+    benchmark_data: SyntheticInventory,
+    benchmark_report: BenchmarkReport,
+    file_type: str,
+):
+    body = {"tmo_id": benchmark_data.tmo_ids[0], "file_type": file_type}
+    await benchmark_report.measure(
+        f"inventory.export.{file_type}",
+        lambda: post_ok(benchmark_http_client, "/inventory/export", json=body),
+        iterations=max(1, BENCHMARKS_ITERATIONS // 5),
+        rows=benchmark_data.scale.mo_per_tmo,
+    )
@@ -0,0 +1,183 @@
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+
+from settings.config import BENCHMARKS_ITERATIONS, BENCHMARKS_RUN
+from tests.benchmarks.report import BenchmarkReport
+from v3.db.implementation.es.es_hierarchy_secured_db import (
+    NodesEsSecuredTable,
+    ObjectsEsSecuredTable,
+)
+from v3.db.implementation.es.es_inventory_secured_db import MoEsSecuredTable
+from v3.models.dto.hierarchy.level_way import LevelDto, LevelWay
+from v3.models.input.hierarchy.hierarchy_filter import HierarchyFilterModel
+from v3.tasks.hierarchy_task import InvByHierarchyTask
+
+"""
+Micro-benchmark of the v3 hierarchy task on a synthetic 10-level hierarchy.
+Elasticsearch is replaced by an in-memory connection, so only the task layer is measured:
+composition of filters, parsing of queries and processing of responses
+"""
+
+pytestmark = [
+    pytest.mark.skipif(
+        not BENCHMARKS_RUN, reason="Benchmarks run only with BENCHMARKS_RUN"
+    ),
+    pytest.mark.asyncio(loop_scope="session"),
+]
+
+HIERARCHY_ID = 1
+LEVELS_COUNT = 10
+ROOT_NODES_COUNT = 10
+# every node has CHILDREN_COUNT children, the lowest level has 5120 nodes
+CHILDREN_COUNT = 2
+# the same large filter is set for each level, as users do with lists of keys
+KEY_FILTER_SIZE = 10_000
+
+
+def collect_terms(query: dict, terms: dict[str, set]):
+    """Collects the values of term and terms clauses of the bool query"""
+    for key, value in query.items():
+        if key == "term":
+            for field_name, field_value in value.items():
+                terms[field_name] = {field_value}
+        elif key == "terms":
+            for field_name, field_values in value.items():
+                terms[field_name] = set(field_values)
+        elif isinstance(value, dict):
+            collect_terms(value, terms)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    collect_terms(item, terms)
+
+
+class InMemoryHierarchyConnection:
+    """Answers the searches of the hierarchy task from the synthetic hierarchy"""
+
+    def __init__(self):
+        self.searches = 0
+        self.nodes_by_level: dict[int, list[dict]] = defaultdict(list)
+        self.nodes_by_parent_id: dict[str, list[dict]] = defaultdict(list)
+        parent_ids = [None]
+        counter = 0
+        for level in range(LEVELS_COUNT):
+            level_parent_ids = []
+            children_count = ROOT_NODES_COUNT if level == 0 else CHILDREN_COUNT
+            for parent_id in parent_ids:
+                for _ in range(children_count):
+                    counter += 1
+                    node_id = f"node-{counter}"
+                    node = {
+                        "id": node_id,
+                        "parent_id": parent_id,
+                        "level_id": level,
+                        "child_count": 0
+                        if level == LEVELS_COUNT - 1
+                        else CHILDREN_COUNT,
+                    }
+                    self.nodes_by_level[level].append(node)
+                    self.nodes_by_parent_id[parent_id].append(node)
+                    level_parent_ids.append(node_id)
+            parent_ids = level_parent_ids
+
+    @property
+    def nodes_count(self) -> int:
+        return sum(len(nodes) for nodes in self.nodes_by_level.values())
+
+    def _find(self, index: str, terms: dict[str, set]) -> list[dict]:
+        if index == ObjectsEsSecuredTable.TABLE_PREFIX:
+            # level filters of the query replace the filter by level_id
+            if "parent_id" not in terms:
+                return self.nodes_by_level[next(iter(terms["level_id"]))]
+            nodes = []
+            for parent_id in sorted(terms["parent_id"]):
+                nodes.extend(self.nodes_by_parent_id[parent_id])
+            return nodes
+        if index == NodesEsSecuredTable.TABLE_PREFIX:
+            return [
+                {"node_id": node_id, "mo_id": int(node_id.split("-")[1])}
+                for node_id in sorted(terms["node_id"])
+            ]
+        return [{"id": mo_id} for mo_id in sorted(terms["id"])]
+
+    async def search(self, index: str, query: dict, **kwargs) -> dict:
+        self.searches += 1
+        terms = dict()
+        collect_terms(query, terms)
+        hits = [{"_source": doc} for doc in self._find(index, terms)]
+        return {"hits": {"hits": hits}}
+
+
+def get_level_way() -> LevelWay:
+    level_way = None
+    for level in reversed(range(LEVELS_COUNT)):
+        level_data = LevelDto(
+            id=level,
+            hierarchy_id=HIERARCHY_ID,
+            level=level,
+            name=f"Level {level}",
+            object_type_id=level + 1,
+            param_type_id=1,
+            author="benchmark",
+            created=datetime(2024, 1, 1),
+            show_without_children=True,
+            parent_id=level - 1 if level else None,
+            description=None,
+            is_virtual=False,
+            change_author="benchmark",
+        )
+        level_way = LevelWay(
+            level_data=level_data,
+            children=[level_way] if level_way else [],
+            is_target=level == 0,
+        )
+    return level_way
+
+
+def get_query() -> HierarchyFilterModel:
+    absent_keys = [f"absent-{i}" for i in range(KEY_FILTER_SIZE)]
+    return HierarchyFilterModel.model_validate(
+        {
+            "filters": {
+                "hierarchy_id": HIERARCHY_ID,
+                "active": True,
+                "level_filters": [
+                    {"level_id": level, "key": {"@nin": absent_keys}}
+                    for level in range(1, LEVELS_COUNT)
+                ],
+            },
+            "show_data_from_level_id": 0,
+        }
+    )
+
+
+async def test_hierarchy_task_on_10_levels(benchmark_report: BenchmarkReport):
+    connection = InMemoryHierarchyConnection()
+    level_way = get_level_way()
+    query = get_query()
+
+    def get_task() -> InvByHierarchyTask:
+        return InvByHierarchyTask(
+            query=query,
+            level_way=level_way,
+            hierarchy_obj_table_class=ObjectsEsSecuredTable,
+            node_table_class=NodesEsSecuredTable,
+            mo_table=MoEsSecuredTable,
+            connection=connection,
+        )
+
+    response = await get_task().execute()
+    assert len(response) == ROOT_NODES_COUNT
+    searches_per_run = connection.searches
+
+    await benchmark_report.measure(
+        "v3.hierarchy_task.10_levels",
+        lambda: get_task().execute(),
+        iterations=BENCHMARKS_ITERATIONS,
+        levels=LEVELS_COUNT,
+        nodes=connection.nodes_count,
+        key_filter_size=KEY_FILTER_SIZE,
+        searches_per_run=searches_per_run,
+    )
@@ -0,0 +1,61 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from elastic.config import (
+    INVENTORY_MO_LINK_INDEX,
+    INVENTORY_OBJ_INDEX_PREFIX,
+    INVENTORY_PRM_INDEX,
+    INVENTORY_PRM_LINK_INDEX,
+    INVENTORY_TMO_INDEX_V2,
+    INVENTORY_TPRM_INDEX_V2,
+)
+from elastic.utils import init_all_necessary_indexes
+from settings.config import BENCHMARKS_REPLAY_PATH, BENCHMARKS_RUN
+from tests.benchmarks.kafka_replay import KafkaReplay, load_kafka_messages
+from tests.benchmarks.report import BenchmarkReport
+from tests.benchmarks.synthetic_data import SyntheticInventory
+
+pytestmark = [
+    pytest.mark.skipif(
+        not BENCHMARKS_RUN, reason="Benchmarks run only with BENCHMARKS_RUN"
+    ),
+    pytest.mark.asyncio(loop_scope="session"),
+]
+
+
+@fixture(scope="function")
+async def empty_inventory_indexes(benchmark_elastic_client: AsyncElasticsearch):
+    """Replay starts from empty inventory indexes, the data of other benchmarks is removed"""
+    mo_indexes = await benchmark_elastic_client.indices.get_alias(
+        index=f"{INVENTORY_OBJ_INDEX_PREFIX}*"
+    )
+    await benchmark_elastic_client.indices.delete(
+        index=[
+            *mo_indexes,
+            INVENTORY_TMO_INDEX_V2,
+            INVENTORY_TPRM_INDEX_V2,
+            INVENTORY_PRM_INDEX,
+            INVENTORY_MO_LINK_INDEX,
+            INVENTORY_PRM_LINK_INDEX,
+        ],
+        ignore_unavailable=True,
+    )
+    await init_all_necessary_indexes(async_client=benchmark_elastic_client)
+    yield benchmark_elastic_client
+
+
+async def test_inventory_changes_replay(
+    empty_inventory_indexes: AsyncElasticsearch,
+    benchmark_report: BenchmarkReport,
+):
+    if BENCHMARKS_REPLAY_PATH:
+        messages = load_kafka_messages(BENCHMARKS_REPLAY_PATH)
+    else:
+        messages = SyntheticInventory(
+            scale=benchmark_report.scale
+        ).replay_messages()
+
+    kafka_replay = KafkaReplay()
+    await kafka_replay.replay(messages)
+    kafka_replay.add_to_report(benchmark_report, prefix="kafka_replay")
@@ -0,0 +1,233 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_NODE_DATA_INDEX,
+    HIERARCHY_OBJ_INDEX,
+)
+from services.hierarchy_services.models.dto import LevelDTO
+from settings.config import BENCHMARKS_ITERATIONS, BENCHMARKS_RUN
+from tests.benchmarks.report import BenchmarkReport
+from utils_by_services.hierarchy import level_cond_query_handler
+from utils_by_services.hierarchy.level_cond_query_handler import (
+    LevelConditionsOrderHandler,
+)
+from utils_by_services.hierarchy.level_condition_grouper import LevelConditions
+
+"""
+Benchmark of hierarchy level conditions on a synthetic 3-depth hierarchy with several levels on each depth.
+Elasticsearch is replaced by an in-memory client which waits ROUND_TRIP seconds per request,
+so the wall-clock time shows the number of sequential round trips: searches sent one by one
+are compared with searches batched by _msearch and sent concurrently
+"""
+
+pytestmark = [
+    pytest.mark.skipif(
+        not BENCHMARKS_RUN, reason="Benchmarks run only with BENCHMARKS_RUN"
+    ),
+    pytest.mark.asyncio(loop_scope="session"),
+]
+
+HIERARCHY_ID = 1
+# levels of each depth: 1 root level, every level of depth has LEVEL_CHILDREN child levels
+DEPTHS_COUNT = 3
+LEVEL_CHILDREN = 4
+NODES_PER_LEVEL = 20
+ROUND_TRIP = 0.005
+
+
+def collect_conditions(query: dict, conditions: dict[str, set]):
+    """Collects the values of match, term and terms clauses of the bool query"""
+    for key, value in query.items():
+        if key in {"match", "term"}:
+            for field_name, field_value in value.items():
+                conditions[field_name] = {field_value}
+        elif key == "terms":
+            for field_name, field_values in value.items():
+                conditions[field_name] = set(field_values)
+        elif isinstance(value, dict):
+            collect_conditions(value, conditions)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    collect_conditions(item, conditions)
+
+
+def get_levels() -> list[LevelDTO]:
+    levels = []
+    parent_ids = [None]
+    for depth in range(1, DEPTHS_COUNT + 1):
+        depth_level_ids = []
+        for parent_id in parent_ids:
+            for _ in range(1 if parent_id is None else LEVEL_CHILDREN):
+                level_id = len(levels) + 1
+                levels.append(
+                    LevelDTO(
+                        id=level_id,
+                        parent_id=parent_id,
+                        hierarchy_id=HIERARCHY_ID,
+                        level=depth,
+                        name=f"Level {level_id}",
+                        object_type_id=level_id,
+                        created=datetime(2024, 1, 1),
+                        show_without_children=True,
+                        key_attrs=[],
+                    )
+                )
+                depth_level_ids.append(level_id)
+        parent_ids = depth_level_ids
+    return levels
+
+
+class InMemoryLevelsElastic:
+    """Answers the searches of level conditions from the synthetic hierarchy,
+    each request waits round_trip seconds"""
+
+    def __init__(self, levels: list[LevelDTO], round_trip: float):
+        self.round_trip = round_trip
+        self.requests = 0
+        self.documents: dict[str, list[dict]] = {
+            HIERARCHY_OBJ_INDEX: [],
+            HIERARCHY_NODE_DATA_INDEX: [],
+        }
+        for level in levels:
+            inventory_index = get_index_name_by_tmo(level.object_type_id)
+            self.documents[inventory_index] = []
+            for position in range(NODES_PER_LEVEL):
+                node_id = f"{level.id}-{position}"
+                mo_id = level.id * 100_000 + position
+                self.documents[HIERARCHY_OBJ_INDEX].append(
+                    {
+                        "id": node_id,
+                        "parent_id": f"{level.parent_id}-{position}"
+                        if level.parent_id
+                        else None,
+                        "level_id": level.id,
+                        "level": level.level,
+                        "object_id": mo_id,
+                    }
+                )
+                self.documents[HIERARCHY_NODE_DATA_INDEX].append(
+                    {"node_id": node_id, "mo_id": mo_id, "level_id": level.id}
+                )
+                self.documents[inventory_index].append({"id": mo_id})
+
+    def _find_hits(self, index: str, body: dict) -> list[dict]:
+        conditions = dict()
+        collect_conditions(body.get("query", {}), conditions)
+        hits = []
+        for position, document in enumerate(self.documents.get(index, [])):
+            if all(
+                document.get(field_name) in values
+                for field_name, values in conditions.items()
+                if field_name in document
+            ):
+                hits.append({"_source": document, "sort": [position]})
+
+        if "search_after" in body:
+            hits = [hit for hit in hits if hit["sort"] > body["search_after"]]
+        return hits[: body.get("size", 10)]
+
+    async def search(self, index: str, body: dict, **kwargs) -> dict:
+        self.requests += 1
+        await asyncio.sleep(self.round_trip)
+        if "aggs" not in body:
+            return {"hits": {"hits": self._find_hits(index, body)}}
+
+        # terms aggregations of child counts
+        documents = [
+            hit["_source"]
+            for hit in self._find_hits(index, {**body, "size": None})
+        ]
+        aggregations = dict()
+        for name, aggregation in body["aggs"].items():
+            field_name = aggregation["terms"]["field"]
+            counts = Counter(document.get(field_name) for document in documents)
+            aggregations[name] = {
+                "buckets": [
+                    {"key": key, "doc_count": count}
+                    for key, count in counts.items()
+                ]
+            }
+        return {"hits": {"hits": []}, "aggregations": aggregations}
+
+    async def msearch(self, body: list[dict], **kwargs) -> dict:
+        self.requests += 1
+        await asyncio.sleep(self.round_trip)
+        return {
+            "responses": [
+                {"hits": {"hits": self._find_hits(header["index"], search)}}
+                for header, search in zip(body[::2], body[1::2])
+            ]
+        }
+
+
+def get_level_cond_order(
+    levels: list[LevelDTO],
+) -> dict[int, list[LevelConditions]]:
+    order = dict()
+    for level in sorted(levels, key=lambda item: -item.level):
+        order.setdefault(level.level, []).append(
+            LevelConditions(
+                level=level,
+                hierarchy_create_empty_nodes=True,
+                level_show_without_children=True,
+                return_mo_ids_for_this_level=level.level == 1,
+            )
+        )
+    return order
+
+
+async def test_level_conditions_on_3_depths(
+    benchmark_report: BenchmarkReport, monkeypatch
+):
+    levels = get_levels()
+    elastic_client = InMemoryLevelsElastic(levels, round_trip=ROUND_TRIP)
+
+    async def process() -> list[str]:
+        handler = LevelConditionsOrderHandler(
+            level_cond_order=get_level_cond_order(levels),
+            elastic_client=elastic_client,
+        )
+        result = await handler.process()
+        return sorted(node["id"] for node in result.nodes)
+
+    cases = {
+        "hierarchy.level_conditions.sequential": (1, 1),
+        "hierarchy.level_conditions.msearch": (
+            level_cond_query_handler.ES_MSEARCH_MAX_SEARCHES,
+            level_cond_query_handler.ES_MSEARCH_CONCURRENCY,
+        ),
+    }
+    node_ids_of_cases = []
+    for case_name, (max_searches, concurrency) in cases.items():
+        monkeypatch.setattr(
+            level_cond_query_handler, "ES_MSEARCH_MAX_SEARCHES", max_searches
+        )
+        monkeypatch.setattr(
+            level_cond_query_handler, "ES_MSEARCH_CONCURRENCY", concurrency
+        )
+        elastic_client.requests = 0
+        node_ids_of_cases.append(await process())
+        requests_per_run = elastic_client.requests
+
+        await benchmark_report.measure(
+            case_name,
+            process,
+            iterations=BENCHMARKS_ITERATIONS,
+            levels=len(levels),
+            nodes=len(levels) * NODES_PER_LEVEL,
+            round_trip_ms=ROUND_TRIP * 1000,
+            max_searches_per_request=max_searches,
+            concurrency=concurrency,
+            requests_per_run=requests_per_run,
+        )
+
+    assert len(node_ids_of_cases[0]) == NODES_PER_LEVEL
+    assert node_ids_of_cases[0] == node_ids_of_cases[1]
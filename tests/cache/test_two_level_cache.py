@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from services.cache_services.utils import InMemoryCacheBackend, TwoLevelCache
+
+
+def create_worker_cache(backend: InMemoryCacheBackend) -> TwoLevelCache:
+    return TwoLevelCache(
+        namespace="tmo",
+        backend=backend,
+        local_maxsize=10,
+        local_ttl=60,
+        remote_ttl=60,
+        key_prefix="test",
+    )
+
+
+async def wait_for_listeners():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_value_loaded_by_one_worker_is_read_by_another():
+    backend = InMemoryCacheBackend()
+    worker_1 = create_worker_cache(backend)
+    worker_2 = create_worker_cache(backend)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"id": 1, "name": "TMO"}
+
+    assert await worker_1.get_or_load("1", load) == {"id": 1, "name": "TMO"}
+    assert await worker_2.get_or_load("1", load) == {"id": 1, "name": "TMO"}
+    assert len(loads) == 1
+
+    await worker_1.close()
+    await worker_2.close()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_calls_wait_for_one_load():
+    cache = TwoLevelCache(
+        namespace="tmo",
+        backend=None,
+        local_maxsize=10,
+        local_ttl=60,
+        remote_ttl=60,
+        key_prefix="test",
+    )
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    results = await asyncio.gather(
+        *[cache.get_or_load("1", load) for _ in range(5)]
+    )
+
+    assert results == [{"id": 1}] * 5
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalidation_removes_key_from_local_caches_of_workers():
+    backend = InMemoryCacheBackend()
+    worker_1 = create_worker_cache(backend)
+    worker_2 = create_worker_cache(backend)
+    await worker_1.set_many({"1": {"name": "old"}, "2": {"name": "other"}})
+    assert await worker_2.get("1") == {"name": "old"}
+    await wait_for_listeners()
+
+    # the change is written by another process, e.g. a consumer
+    await backend.set_many({"test:tmo:v0:1": b'{"name":"new"}'}, ttl=60)
+    assert await worker_2.get("1") == {"name": "old"}
+
+    await worker_1.invalidate(["1"])
+    await wait_for_listeners()
+
+    assert await worker_2.get("1") is None
+    assert await worker_2.get("2") == {"name": "other"}
+
+    await worker_1.close()
+    await worker_2.close()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_version_bump_invalidates_all_keys_of_namespace():
+    backend = InMemoryCacheBackend()
+    worker_1 = create_worker_cache(backend)
+    worker_2 = create_worker_cache(backend)
+    await worker_1.set_many({"1": {"name": "a"}, "2": {"name": "b"}})
+    assert await worker_2.get_many(["1", "2"]) == {
+        "1": {"name": "a"},
+        "2": {"name": "b"},
+    }
+    await wait_for_listeners()
+
+    await worker_2.invalidate_all()
+    await wait_for_listeners()
+
+    assert await worker_1.get_many(["1", "2"]) == {}
+    assert await worker_2.get_many(["1", "2"]) == {}
+    await worker_1.set("1", {"name": "c"})
+    assert await worker_2.get("1") == {"name": "c"}
+    assert set(backend.values) >= {"test:tmo:v1:1"}
+
+    await worker_1.close()
+    await worker_2.close()
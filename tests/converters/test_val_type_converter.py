@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+from elastic.enum_models import InventoryFieldValType
+from services.inventory_services.converters.val_type_converter import (
+    get_column_convert_function_by_val_type,
+    get_column_convert_function_for_multiple_pickled_values,
+    get_convert_function_by_val_type,
+    to_date,
+    to_datetime,
+)
+
+COLUMNS = {
+    InventoryFieldValType.STR.value: [1, "a", None],
+    InventoryFieldValType.INT.value: ["1", " 2", 3.9, True],
+    InventoryFieldValType.FLOAT.value: ["1.5", 2, "1e3"],
+    InventoryFieldValType.BOOL.value: ["True", "yes", "0", 1, None, "YES"],
+    InventoryFieldValType.DATE.value: [
+        "2024-01-02",
+        "2024-01-02T03:04:05+03:00",
+        "Jan 5 2020",
+        "2024-01-02",
+    ],
+    InventoryFieldValType.DATETIME.value: [
+        "2024-01-02",
+        "2024-01-02T03:04:05.123+03:00",
+        "2024-01-02 03:04:05Z",
+        "Jan 5 2020 10:00",
+    ],
+}
+
+
+@pytest.mark.parametrize("val_type", list(COLUMNS))
+def test_column_conversion_equals_value_conversion(val_type: str):
+    values = COLUMNS[val_type]
+    converter = get_convert_function_by_val_type(val_type)
+    column_converter = get_column_convert_function_by_val_type(val_type)
+    assert column_converter(values) == [converter(item) for item in values]
+
+
+def test_column_conversion_of_multiple_pickled_values():
+    values = [
+        pickle.dumps(["2024-01-02", "2024-01-03"]).hex(),
+        pickle.dumps([]).hex(),
+        pickle.dumps(["2024-01-02"]).hex(),
+    ]
+    column_converter = get_column_convert_function_for_multiple_pickled_values(
+        InventoryFieldValType.DATE.value
+    )
+    assert column_converter(values) == [
+        ["2024-01-02", "2024-01-03"],
+        [],
+        ["2024-01-02"],
+    ]
+
+
+def test_iso_and_not_iso_dates():
+    assert to_date("2024-01-02T23:59:59+05:00") == "2024-01-02"
+    assert to_date("Jan 5 2020") == "2020-01-05"
+    assert to_datetime("2024-01-02T03:04:05Z") == "2024-01-02T03:04:05.000000Z"
+    assert to_datetime("5 Jan 2020 10:00") == "2020-01-05T10:00:00.000000Z"
+
+
+def test_column_conversion_raises_errors_of_value_conversion():
+    column_converter = get_column_convert_function_by_val_type(
+        InventoryFieldValType.INT.value
+    )
+    with pytest.raises(ValueError):
+        column_converter(["1", "not int"])
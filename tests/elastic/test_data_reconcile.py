@@ -0,0 +1,86 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
+from services.inventory_services.reload.inventory_data_reconcile import (
+    InventoryDataReconciler,
+)
+
+TMO_ID = 987_654
+RANGE_SIZE = 100
+
+
+def get_mo(mo_id: int, version: int):
+    return {"id": mo_id, "version": version, "tmo_id": TMO_ID}
+
+
+# MOs of inventory in ranges [0, 100), [100, 200), [200, 300) and [300, 400)
+INVENTORY_MOS = [get_mo(mo_id, version=2) for mo_id in range(1, 400, 7)]
+
+
+@fixture(scope="function")
+async def mo_index(async_elastic_session: AsyncElasticsearch):
+    index_name = get_index_name_by_tmo(TMO_ID)
+    await async_elastic_session.indices.create(
+        index=index_name, mappings=INVENTORY_OBJ_INDEX_MAPPING
+    )
+    for mo in INVENTORY_MOS:
+        await async_elastic_session.index(
+            index=index_name, id=str(mo["id"]), document=mo
+        )
+    await async_elastic_session.indices.refresh(index=index_name)
+
+    yield index_name
+
+    await async_elastic_session.indices.delete(
+        index=index_name, ignore_unavailable=True
+    )
+
+
+async def get_mo_chunks(mos: list[dict]):
+    for start in range(0, len(mos), 10):
+        yield mos[start : start + 10]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_same_data_has_no_drift(
+    async_elastic_session: AsyncElasticsearch, mo_index: str
+):
+    reconciler = InventoryDataReconciler(
+        async_elastic_session, session=None, range_size=RANGE_SIZE
+    )
+
+    drift = await reconciler.get_drift(
+        tmo_id=TMO_ID, mo_chunks=get_mo_chunks(INVENTORY_MOS)
+    )
+
+    assert drift == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_drift_contains_only_ranges_with_changed_mos(
+    async_elastic_session: AsyncElasticsearch, mo_index: str
+):
+    # MO 106 is updated, MO 211 is deleted and MO 402 is created in inventory
+    inventory_mos = [
+        get_mo(mo["id"], version=3 if mo["id"] == 106 else 2)
+        for mo in INVENTORY_MOS
+        if mo["id"] != 211
+    ] + [get_mo(402, version=1)]
+    reconciler = InventoryDataReconciler(
+        async_elastic_session, session=None, range_size=RANGE_SIZE
+    )
+
+    drift = await reconciler.get_drift(
+        tmo_id=TMO_ID, mo_chunks=get_mo_chunks(inventory_mos)
+    )
+
+    assert drift == [
+        {"start": 100, "end": 200, "inventory_mos": 14, "index_mos": 14},
+        {"start": 200, "end": 300, "inventory_mos": 13, "index_mos": 14},
+        {"start": 400, "end": 500, "inventory_mos": 1, "index_mos": 0},
+    ]
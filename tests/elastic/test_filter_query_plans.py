@@ -0,0 +1,92 @@
+import pytest
+from fastapi import HTTPException
+
+from elastic.pydantic_models import FilterColumn
+from elastic.query_builder_service.inventory_index.mo_object.query_plan import (
+    FilterQueryPlans,
+)
+
+DICT_OF_TYPES = {
+    "name": {"val_type": "str", "multiple": False},
+    "101": {"val_type": "int", "multiple": False},
+}
+
+
+def get_filter_columns(name: str, values: list[int]) -> list[FilterColumn]:
+    return [
+        FilterColumn(
+            columnName="name",
+            rule="and",
+            filters=[{"operator": "startsWith", "value": name}],
+        ),
+        FilterColumn(
+            columnName="101",
+            rule="or",
+            filters=[{"operator": "isAnyOf", "value": values}],
+        ),
+    ]
+
+
+def test_plan_is_reused_for_other_values():
+    plans = FilterQueryPlans(maxsize=10)
+
+    first_plan = plans.get_plan(
+        get_filter_columns("ab", [1, 2]), dict_of_types=DICT_OF_TYPES
+    )
+    filter_columns = get_filter_columns("cd", [3])
+    second_plan = plans.get_plan(filter_columns, dict_of_types=DICT_OF_TYPES)
+
+    assert first_plan is second_plan
+    assert second_plan.bind(filter_columns) == {
+        "bool": {
+            "must": [
+                {"exists": {"field": "name"}},
+                {
+                    "wildcard": {
+                        "name": {"value": "cd*", "case_insensitive": True}
+                    }
+                },
+                {"exists": {"field": "parameters.101"}},
+                {"terms": {"parameters.101": [3]}},
+            ]
+        }
+    }
+
+
+def test_plans_of_changed_tprm_are_removed():
+    plans = FilterQueryPlans(maxsize=10)
+    filter_columns = get_filter_columns("ab", [1])
+    plan = plans.get_plan(filter_columns, dict_of_types=DICT_OF_TYPES)
+
+    plans.invalidate(tprm_ids=[101])
+
+    assert (
+        plans.get_plan(filter_columns, dict_of_types=DICT_OF_TYPES) is not plan
+    )
+
+
+def test_plan_of_changed_types_is_not_reused():
+    plans = FilterQueryPlans(maxsize=10)
+    filter_columns = get_filter_columns("ab", [1])
+    plan = plans.get_plan(filter_columns, dict_of_types=DICT_OF_TYPES)
+
+    changed_types = {
+        **DICT_OF_TYPES,
+        "101": {"val_type": "str", "multiple": False},
+    }
+
+    assert (
+        plans.get_plan(filter_columns, dict_of_types=changed_types) is not plan
+    )
+
+
+def test_plan_of_unknown_column_raises_error():
+    plans = FilterQueryPlans(maxsize=10)
+
+    with pytest.raises(HTTPException) as ex:
+        plans.get_plan(
+            get_filter_columns("ab", [1]),
+            dict_of_types={"name": DICT_OF_TYPES["name"]},
+        )
+
+    assert ex.value.status_code == 400
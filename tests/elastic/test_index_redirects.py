@@ -0,0 +1,67 @@
+import asyncio
+
+import orjson
+
+from elastic.index_redirects import (
+    get_index_redirects,
+    redirect_indexes,
+    redirect_request,
+)
+
+INDEX_BY_ALIAS = {"hierarchy_obj_index": "hierarchy_obj_index_v2"}
+
+
+def test_path_and_path_parts_are_redirected():
+    path, body, path_parts = redirect_request(
+        path="/hierarchy_obj_index,other_index/_search",
+        body={"query": {"match_all": {}}},
+        path_parts={"index": "hierarchy_obj_index,other_index"},
+        index_by_alias=INDEX_BY_ALIAS,
+    )
+
+    assert path == "/hierarchy_obj_index_v2,other_index/_search"
+    assert path_parts == {"index": "hierarchy_obj_index_v2,other_index"}
+    assert body == {"query": {"match_all": {}}}
+
+
+def test_requests_without_index_are_not_changed():
+    assert redirect_request(
+        path="/_search/scroll",
+        body={"scroll_id": "id"},
+        path_parts={},
+        index_by_alias=INDEX_BY_ALIAS,
+    ) == ("/_search/scroll", {"scroll_id": "id"}, {})
+
+
+def test_actions_of_bulk_are_redirected():
+    source = {"_index": "hierarchy_obj_index", "id": 1}
+    body = [
+        orjson.dumps({"index": {"_index": "hierarchy_obj_index", "_id": 1}}),
+        orjson.dumps(source),
+        orjson.dumps({"delete": {"_index": "hierarchy_obj_index", "_id": 2}}),
+        {"update": {"_index": "other_index", "_id": 3}},
+        {"doc": {"id": 3}},
+    ]
+
+    _, redirected_body, _ = redirect_request(
+        path="/_bulk", body=body, path_parts={}, index_by_alias=INDEX_BY_ALIAS
+    )
+
+    assert redirected_body == [
+        {"index": {"_index": "hierarchy_obj_index_v2", "_id": 1}},
+        orjson.dumps(source),
+        {"delete": {"_index": "hierarchy_obj_index_v2", "_id": 2}},
+        {"update": {"_index": "other_index", "_id": 3}},
+        {"doc": {"id": 3}},
+    ]
+
+
+async def test_redirects_are_set_only_in_context():
+    async def get_redirects_of_task():
+        return get_index_redirects()
+
+    with redirect_indexes(INDEX_BY_ALIAS):
+        assert await asyncio.create_task(get_redirects_of_task()) == (
+            INDEX_BY_ALIAS
+        )
+    assert get_index_redirects() == {}
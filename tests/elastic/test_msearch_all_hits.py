@@ -0,0 +1,98 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+from pytest_asyncio import fixture
+
+from utils_by_services.inventory.common import (
+    MultiSearchError,
+    msearch_all_hits,
+)
+
+INDEX = "test_msearch_all_hits_index"
+DOCUMENTS_COUNT = 25
+
+
+@fixture(scope="function")
+async def msearch_index(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=INDEX, mappings={"properties": {"id": {"type": "long"}}}
+    )
+    await async_bulk(
+        client=async_elastic_session,
+        actions=[
+            {"_index": INDEX, "_id": str(doc_id), "_source": {"id": doc_id}}
+            for doc_id in range(DOCUMENTS_COUNT)
+        ],
+        refresh="true",
+    )
+
+    yield INDEX
+
+    await async_elastic_session.indices.delete(
+        index=INDEX, ignore_unavailable=True
+    )
+
+
+def get_search(gte: int) -> tuple[str, dict]:
+    return INDEX, {
+        "query": {"range": {"id": {"gte": gte}}},
+        "sort": {"id": {"order": "asc"}},
+        "size": 10,
+    }
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_msearch_pages_all_searches(
+    async_elastic_session: AsyncElasticsearch, msearch_index: str
+):
+    # searches without hits are between searches with hits, so a shift of responses changes results
+    searches = [
+        get_search(100),
+        get_search(0),
+        ("test_msearch_absent_index", get_search(0)[1]),
+        get_search(100),
+        get_search(20),
+    ]
+
+    for max_searches_per_request in (1, 8):
+        results = await msearch_all_hits(
+            elastic_client=async_elastic_session,
+            searches=searches,
+            max_searches_per_request=max_searches_per_request,
+            concurrency=2,
+        )
+        ids = [[hit["_source"]["id"] for hit in hits] for hits in results]
+        assert ids == [
+            [],
+            list(range(DOCUMENTS_COUNT)),
+            [],
+            [],
+            list(range(20, 25)),
+        ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_msearch_raises_error_of_search(
+    async_elastic_session: AsyncElasticsearch, msearch_index: str
+):
+    with pytest.raises(MultiSearchError):
+        await msearch_all_hits(
+            elastic_client=async_elastic_session,
+            searches=[get_search(0), (INDEX, {"query": {"unknown_query": {}}})],
+        )
+
+
+class MissingResponsesElasticsearch:
+    """Connection which returns responses only for the first search"""
+
+    async def msearch(self, body: list, **kwargs):
+        return {"responses": [{"status": 200, "hits": {"hits": []}}]}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_msearch_raises_error_if_responses_are_missing():
+    with pytest.raises(MultiSearchError):
+        await msearch_all_hits(
+            elastic_client=MissingResponsesElasticsearch(),
+            searches=[get_search(0), get_search(20)],
+        )
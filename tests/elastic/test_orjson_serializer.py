@@ -0,0 +1,39 @@
+import json
+from datetime import date, datetime, timezone
+
+from elastic.serializer import OrjsonNdjsonSerializer, OrjsonSerializer
+from utils_by_services.inventory.common import get_filter_path
+
+
+def test_orjson_serializer_is_compatible_with_json():
+    document = {
+        "id": 1,
+        "name": "ёж",
+        "parameters": {10: "value", 11: [1.5, None, True]},
+        "creation_date": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "date": date(2024, 1, 2),
+    }
+    serialized = OrjsonSerializer().dumps(document)
+    assert json.loads(serialized) == {
+        "id": 1,
+        "name": "ёж",
+        "parameters": {"10": "value", "11": [1.5, None, True]},
+        "creation_date": "2024-01-02T03:04:05+00:00",
+        "date": "2024-01-02",
+    }
+    assert OrjsonSerializer().loads(serialized)["parameters"]["10"] == "value"
+
+
+def test_orjson_ndjson_serializer():
+    serializer = OrjsonNdjsonSerializer()
+    lines = [{"index": "index_1"}, {"query": {"terms": {"id": [1, 2]}}}]
+    serialized = serializer.dumps(lines)
+    assert serialized.endswith(b"\n")
+    assert serializer.loads(serialized) == lines
+
+
+def test_filter_path_contains_required_paths():
+    assert get_filter_path(None, "hits.total") is None
+    assert get_filter_path(
+        ["hits.hits._source", "hits.total"], "hits.total", "hits.hits.sort"
+    ) == ["hits.hits._source", "hits.hits.sort", "hits.total"]
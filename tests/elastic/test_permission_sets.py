@@ -0,0 +1,269 @@
+import asyncio
+
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from services.cache_services.utils import InMemoryCacheBackend, TwoLevelCache
+from services.inventory_services.elastic.security.mapping import (
+    INVENTORY_SECURITY_INDEXES_MAPPING,
+    INVENTORY_SECURITY_PERMISSION_SETS_MAPPING,
+)
+from services.inventory_services.utils.security.permission_sets import (
+    PermissionSets,
+)
+
+SECURITY_INDEX = "test_permission_sets_security_index"
+LOOKUP_INDEX = "test_permission_sets_lookup_index"
+OBJ_INDEX = "test_permission_sets_obj_index"
+
+
+class CountingPermissionSets(PermissionSets):
+    """Permission sets of worker, sets contain the number of loads of the set by the worker"""
+
+    def __init__(self, backend: InMemoryCacheBackend):
+        super().__init__(
+            ttl=60,
+            stamps=TwoLevelCache(
+                namespace="permission_set_stamps",
+                backend=backend,
+                local_maxsize=10,
+                local_ttl=60,
+                remote_ttl=60,
+                key_prefix="test",
+            ),
+        )
+        self.loads = 0
+
+    async def _load_permission_set(self, **kwargs) -> frozenset[int]:
+        self.loads += 1
+        return frozenset([self.loads])
+
+
+@fixture(scope="function")
+async def security_index(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=SECURITY_INDEX, mappings=INVENTORY_SECURITY_INDEXES_MAPPING
+    )
+    grants = [
+        {"id": 1, "parent_id": 10, "permission": "realm_a", "read": True},
+        {"id": 2, "parent_id": 11, "permission": "realm_a", "read": True},
+        {"id": 3, "parent_id": 12, "permission": "realm_a", "read": False},
+        {"id": 4, "parent_id": 12, "permission": "realm_b", "read": True},
+    ]
+    for grant in grants:
+        await async_elastic_session.index(
+            index=SECURITY_INDEX,
+            id=str(grant["id"]),
+            document=grant,
+            refresh="true",
+        )
+
+    yield SECURITY_INDEX
+
+    await async_elastic_session.indices.delete(
+        index=SECURITY_INDEX, ignore_unavailable=True
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_allowed_ids_are_union_of_readable_grants(
+    async_elastic_session: AsyncElasticsearch, security_index: str
+):
+    sets = PermissionSets(ttl=60)
+    allowed_ids = await sets.get_allowed_ids(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_a"],
+    )
+    assert allowed_ids == {10, 11}
+
+    allowed_ids = await sets.get_allowed_ids(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_a", "realm_b", "realm_c"],
+    )
+    assert allowed_ids == {10, 11, 12}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalidated_set_is_reloaded(
+    async_elastic_session: AsyncElasticsearch, security_index: str
+):
+    sets = PermissionSets(ttl=60)
+    await sets.get_allowed_ids(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_b"],
+    )
+    await async_elastic_session.index(
+        index=security_index,
+        id="5",
+        document={
+            "id": 5,
+            "parent_id": 13,
+            "permission": "realm_b",
+            "read": True,
+        },
+        refresh="true",
+    )
+
+    # cached set is used until invalidation
+    allowed_ids = await sets.get_allowed_ids(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_b"],
+    )
+    assert allowed_ids == {12}
+
+    await sets.invalidate(
+        security_index=security_index, permissions=["realm_b"]
+    )
+    allowed_ids = await sets.get_allowed_ids(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_b"],
+    )
+    assert allowed_ids == {12, 13}
+
+
+@fixture(scope="function")
+async def lookup_indexes(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=LOOKUP_INDEX, mappings=INVENTORY_SECURITY_PERMISSION_SETS_MAPPING
+    )
+    await async_elastic_session.indices.create(
+        index=OBJ_INDEX, mappings={"properties": {"id": {"type": "long"}}}
+    )
+    for obj_id in range(10, 15):
+        await async_elastic_session.index(
+            index=OBJ_INDEX,
+            id=str(obj_id),
+            document={"id": obj_id},
+            refresh="true",
+        )
+
+    yield LOOKUP_INDEX
+
+    for index in (LOOKUP_INDEX, OBJ_INDEX):
+        await async_elastic_session.indices.delete(
+            index=index, ignore_unavailable=True
+        )
+
+
+async def search_ids(
+    async_elastic_session: AsyncElasticsearch, condition: dict
+) -> set[int]:
+    response = await async_elastic_session.search(
+        index=OBJ_INDEX, query={"bool": {"filter": [condition]}}, size=100
+    )
+    return {hit["_source"]["id"] for hit in response["hits"]["hits"]}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_small_set_is_sent_as_terms(
+    async_elastic_session: AsyncElasticsearch,
+    security_index: str,
+    lookup_indexes: str,
+):
+    sets = PermissionSets(ttl=60, max_terms=2, lookup_index=lookup_indexes)
+    condition = await sets.get_ids_condition(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_a"],
+    )
+
+    assert condition == {"terms": {"id": [10, 11]}}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_large_set_is_referred_to_by_terms_lookup(
+    async_elastic_session: AsyncElasticsearch,
+    security_index: str,
+    lookup_indexes: str,
+):
+    sets = PermissionSets(ttl=60, max_terms=2, lookup_index=lookup_indexes)
+    condition = await sets.get_ids_condition(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_a", "realm_b"],
+    )
+
+    lookups = condition["bool"]["should"]
+    assert len(lookups) == 2
+    assert all(
+        lookup["terms"]["id"]["index"] == lookup_indexes for lookup in lookups
+    )
+    assert await search_ids(async_elastic_session, condition) == {10, 11, 12}
+
+    # new version of the set replaces the saved one
+    await async_elastic_session.index(
+        index=security_index,
+        id="5",
+        document={
+            "id": 5,
+            "parent_id": 13,
+            "permission": "realm_b",
+            "read": True,
+        },
+        refresh="true",
+    )
+    await sets.invalidate(
+        security_index=security_index, permissions=["realm_b"]
+    )
+    condition = await sets.get_ids_condition(
+        elastic_client=async_elastic_session,
+        security_index=security_index,
+        permissions=["realm_a", "realm_b"],
+    )
+    assert await search_ids(async_elastic_session, condition) == {
+        10,
+        11,
+        12,
+        13,
+    }
+
+    await async_elastic_session.indices.refresh(index=lookup_indexes)
+    response = await async_elastic_session.search(
+        index=lookup_indexes,
+        query={"term": {"permission": "realm_b"}},
+        source_excludes=["ids"],
+    )
+    superseded = [
+        hit["_source"].get("superseded_at") is not None
+        for hit in response["hits"]["hits"]
+    ]
+    assert sorted(superseded) == [False, True]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalidation_reloads_set_in_other_processes():
+    backend = InMemoryCacheBackend()
+    consumer = CountingPermissionSets(backend)
+    worker = CountingPermissionSets(backend)
+
+    async def get_ids(sets: PermissionSets) -> set[int]:
+        return await sets.get_allowed_ids(
+            elastic_client=None,
+            security_index=SECURITY_INDEX,
+            permissions=["a"],
+        )
+
+    assert await get_ids(worker) == {1}
+    assert await get_ids(worker) == {1}
+    # let the listener of invalidations of worker subscribe
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    await consumer.invalidate(security_index=SECURITY_INDEX, permissions=["a"])
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert await get_ids(worker) == {2}
+
+    await consumer.clear()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert await get_ids(worker) == {3}
+
+    await consumer.stamps.close()
+    await worker.stamps.close()
@@ -0,0 +1,178 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from indexes_mapping.inventory.mapping import INVENTORY_PERMISSIONS_FIELD_NAME
+from services.inventory_services.elastic.security.configs import (
+    INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+)
+from services.inventory_services.elastic.security.mapping import (
+    INVENTORY_SECURITY_INDEXES_MAPPING,
+)
+from services.inventory_services.reload.inventory_security_reconcile import (
+    InventorySecurityReconciler,
+)
+
+SECURITY_INDEX = "test_reconcile_security_index"
+DOCUMENT_INDEX = "test_reconcile_document_index"
+
+
+def get_grant(grant_id: int, parent_id: int, permission: str, read: bool):
+    return {
+        "id": grant_id,
+        "parent_id": parent_id,
+        "permission": permission,
+        "read": read,
+    }
+
+
+@fixture(scope="function")
+async def security_data(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=SECURITY_INDEX, mappings=INVENTORY_SECURITY_INDEXES_MAPPING
+    )
+    await async_elastic_session.indices.create(index=DOCUMENT_INDEX)
+    grants = [
+        get_grant(1, parent_id=10, permission="realm_a", read=True),
+        get_grant(2, parent_id=11, permission="realm_a", read=True),
+        get_grant(3, parent_id=12, permission="realm_b", read=True),
+    ]
+    for grant in grants:
+        await async_elastic_session.index(
+            index=SECURITY_INDEX, id=str(grant["id"]), document=grant
+        )
+    documents = {
+        10: ["realm_a"],
+        11: ["realm_a"],
+        12: ["realm_b"],
+    }
+    for doc_id, permissions in documents.items():
+        await async_elastic_session.index(
+            index=DOCUMENT_INDEX,
+            id=str(doc_id),
+            document={
+                "id": doc_id,
+                INVENTORY_PERMISSIONS_FIELD_NAME: permissions,
+            },
+        )
+    await async_elastic_session.indices.refresh(
+        index=[SECURITY_INDEX, DOCUMENT_INDEX]
+    )
+
+    yield
+
+    await async_elastic_session.indices.delete(
+        index=[SECURITY_INDEX, DOCUMENT_INDEX], ignore_unavailable=True
+    )
+
+
+async def get_permission_chunks(chunks: list[list[dict]]):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reconcile_applies_only_difference(
+    async_elastic_session: AsyncElasticsearch, security_data
+):
+    inventory_grants = [
+        # unchanged
+        [get_grant(1, parent_id=10, permission="realm_a", read=True)],
+        # read revoked, grant 3 is removed, grant 4 is added
+        [
+            get_grant(2, parent_id=11, permission="realm_a", read=False),
+            get_grant(4, parent_id=10, permission="realm_c", read=True),
+        ],
+    ]
+    reconciler = InventorySecurityReconciler(async_elastic_session)
+    stats = await reconciler.reconcile_security_index(
+        security_index=SECURITY_INDEX,
+        settings=INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+        permission_chunks=get_permission_chunks(inventory_grants),
+        document_index=DOCUMENT_INDEX,
+    )
+    assert stats == {"added": 1, "updated": 1, "deleted": 1, "documents": 3}
+
+    grants = await async_elastic_session.search(
+        index=SECURITY_INDEX, sort=[{"id": "asc"}]
+    )
+    assert [item["_source"] for item in grants["hits"]["hits"]] == [
+        get_grant(1, parent_id=10, permission="realm_a", read=True),
+        get_grant(2, parent_id=11, permission="realm_a", read=False),
+        get_grant(4, parent_id=10, permission="realm_c", read=True),
+    ]
+
+    documents = await async_elastic_session.search(
+        index=DOCUMENT_INDEX, sort=[{"id": "asc"}]
+    )
+    assert {
+        item["_source"]["id"]: item["_source"][INVENTORY_PERMISSIONS_FIELD_NAME]
+        for item in documents["hits"]["hits"]
+    } == {10: ["realm_a", "realm_c"], 11: [], 12: []}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reconcile_keeps_grants_if_stream_fails(
+    async_elastic_session: AsyncElasticsearch, security_data
+):
+    async def failed_permission_chunks():
+        yield [get_grant(1, parent_id=10, permission="realm_a", read=True)]
+        raise ConnectionError
+
+    reconciler = InventorySecurityReconciler(async_elastic_session)
+    with pytest.raises(ConnectionError):
+        await reconciler.reconcile_security_index(
+            security_index=SECURITY_INDEX,
+            settings=INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+            permission_chunks=failed_permission_chunks(),
+            document_index=DOCUMENT_INDEX,
+        )
+
+    await async_elastic_session.indices.refresh(index=SECURITY_INDEX)
+    grants = await async_elastic_session.count(index=SECURITY_INDEX)
+    assert grants["count"] == 3
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reconcile_does_not_write_unchanged_grants(
+    async_elastic_session: AsyncElasticsearch, security_data
+):
+    # grants of gRPC have all fields with default values and may have ids as str
+    inventory_grants = [
+        [
+            {
+                **get_grant(grant_id, parent_id, permission, read=True),
+                "id": str(grant_id),
+                "create": False,
+                "admin": False,
+                "root_permission_id": 0,
+                "permission_name": "",
+                "object_type_id": None,
+                "not_indexed_field": "value",
+            }
+            for grant_id, parent_id, permission in [
+                (1, 10, "realm_a"),
+                (2, 11, "realm_a"),
+                (3, 12, "realm_b"),
+            ]
+        ]
+    ]
+    before = await async_elastic_session.mget(
+        index=SECURITY_INDEX, ids=["1", "2", "3"]
+    )
+
+    reconciler = InventorySecurityReconciler(async_elastic_session)
+    stats = await reconciler.reconcile_security_index(
+        security_index=SECURITY_INDEX,
+        settings=INVENTORY_SECURITY_TMO_PERMISSION_SETTINGS,
+        permission_chunks=get_permission_chunks(inventory_grants),
+        document_index=DOCUMENT_INDEX,
+    )
+    assert stats == {"added": 0, "updated": 0, "deleted": 0, "documents": 0}
+
+    after = await async_elastic_session.mget(
+        index=SECURITY_INDEX, ids=["1", "2", "3"]
+    )
+    assert [item["_seq_no"] for item in after["docs"]] == [
+        item["_seq_no"] for item in before["docs"]
+    ]
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+from elastic_transport import (
+    ApiResponseMeta,
+    ConnectionError,
+    HttpHeaders,
+    ObjectApiResponse,
+)
+from elasticsearch import NotFoundError
+
+from elastic.single_flight import SingleFlight, get_request_key
+from metrics.collectors import ES_COALESCED_REQUESTS
+
+META = ApiResponseMeta(
+    status=200,
+    http_version="1.1",
+    headers=HttpHeaders(),
+    duration=0.0,
+    node=None,
+)
+
+
+def get_key(scope, body: dict):
+    return get_request_key(
+        scope=scope,
+        method="POST",
+        path="/index/_search",
+        params=None,
+        headers=None,
+        body=body,
+    )
+
+
+def get_request(calls: list):
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ObjectApiResponse(body={"hits": {"hits": []}}, meta=META)
+
+    return request
+
+
+async def test_identical_concurrent_requests_share_one_request():
+    single_flight = SingleFlight()
+    calls = list()
+    coalesced = ES_COALESCED_REQUESTS.labels(endpoint="search")
+    coalesced_before = coalesced._value.get()
+    key = get_key(scope="realm_a", body={"query": {"match_all": {}}})
+
+    responses = await asyncio.gather(
+        *[
+            single_flight.do(
+                key=key, endpoint_id="search", request=get_request(calls)
+            )
+            for _ in range(3)
+        ]
+    )
+
+    assert len(calls) == 1
+    assert coalesced._value.get() - coalesced_before == 2
+    assert single_flight.in_flight() == 0
+    responses[0].body["hits"]["hits"].append({"_id": "1"})
+    assert responses[1].body == {"hits": {"hits": []}}
+
+
+async def test_requests_of_other_scopes_are_not_shared():
+    single_flight = SingleFlight()
+    calls = list()
+    body = {"query": {"match_all": {}}}
+
+    await asyncio.gather(
+        single_flight.do(
+            key=get_key(scope="realm_a", body=body),
+            endpoint_id="search",
+            request=get_request(calls),
+        ),
+        single_flight.do(
+            key=get_key(scope="realm_b", body=body),
+            endpoint_id="search",
+            request=get_request(calls),
+        ),
+    )
+
+    assert len(calls) == 2
+
+
+async def test_response_of_one_caller_is_not_copied():
+    single_flight = SingleFlight()
+    response = ObjectApiResponse(body={"hits": {"hits": []}}, meta=META)
+
+    async def request():
+        return response
+
+    assert (
+        await single_flight.do(key="key", endpoint_id="search", request=request)
+        is response
+    )
+
+
+async def test_error_of_elasticsearch_is_raised_to_all_callers():
+    single_flight = SingleFlight()
+    calls = list()
+
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise NotFoundError("not found", meta=META, body={})
+
+    results = await asyncio.gather(
+        *[
+            single_flight.do(key="key", endpoint_id="search", request=request)
+            for _ in range(2)
+        ],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, NotFoundError) for result in results)
+    assert len(calls) == 1
+    assert single_flight.in_flight() == 0
+
+
+async def test_callers_repeat_request_which_failed_on_client_of_first_caller():
+    single_flight = SingleFlight()
+    calls = list()
+
+    async def failed_request():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("client is closed")
+
+    results = await asyncio.gather(
+        single_flight.do(
+            key="key", endpoint_id="search", request=failed_request
+        ),
+        *[
+            single_flight.do(
+                key="key", endpoint_id="search", request=get_request(calls)
+            )
+            for _ in range(2)
+        ],
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ConnectionError)
+    assert [result.body for result in results[1:]] == [
+        {"hits": {"hits": []}}
+    ] * 2
+    assert len(calls) == 2
+    assert single_flight.in_flight() == 0
+
+
+async def test_cancelled_first_caller_does_not_cancel_request():
+    single_flight = SingleFlight()
+    calls = list()
+    first_caller = asyncio.create_task(
+        single_flight.do(
+            key="key", endpoint_id="search", request=get_request(calls)
+        )
+    )
+    await asyncio.sleep(0)
+    second_caller = asyncio.create_task(
+        single_flight.do(
+            key="key", endpoint_id="search", request=get_request(calls)
+        )
+    )
+    await asyncio.sleep(0)
+
+    first_caller.cancel()
+
+    assert (await second_caller).body == {"hits": {"hits": []}}
+    assert first_caller.cancelled()
+    assert len(calls) == 1
+
+
+def test_key_does_not_depend_on_order_of_keys():
+    first_key = get_key(scope="realm_a", body={"size": 1, "from": 0})
+    second_key = get_key(scope="realm_a", body={"from": 0, "size": 1})
+
+    assert first_key == second_key
+    assert hash(first_key) == hash(second_key)
+
+
+@pytest.mark.parametrize("body", [{"size": 2}, {"size": 1, "from": 10}])
+def test_key_depends_on_body(body: dict):
+    assert get_key(scope="realm_a", body={"size": 1}) != get_key(
+        scope="realm_a", body=body
+    )
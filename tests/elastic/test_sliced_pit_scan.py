@@ -0,0 +1,123 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+from pytest_asyncio import fixture
+
+from utils_by_services.inventory.common import (
+    read_page_by_sliced_scan,
+    sliced_pit_scan,
+)
+
+INDEX = "test_sliced_pit_scan_index"
+DOCUMENTS_COUNT = 95
+
+
+@fixture(scope="function")
+async def scan_index(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=INDEX,
+        settings={"index.number_of_shards": 2},
+        mappings={
+            "properties": {
+                "id": {"type": "long"},
+                "name": {"type": "keyword"},
+            }
+        },
+    )
+    await async_bulk(
+        client=async_elastic_session,
+        actions=[
+            {
+                "_index": INDEX,
+                "_id": str(doc_id),
+                "_source": {
+                    "id": doc_id,
+                    # every third document has no name
+                    "name": f"name_{doc_id % 7}" if doc_id % 3 else None,
+                },
+            }
+            for doc_id in range(DOCUMENTS_COUNT)
+        ],
+        refresh="true",
+    )
+
+    yield INDEX
+
+    await async_elastic_session.indices.delete(
+        index=INDEX, ignore_unavailable=True
+    )
+
+
+async def read_ids(elastic_client: AsyncElasticsearch, **kwargs) -> list[int]:
+    ids = []
+    async for hits in sliced_pit_scan(
+        elastic_client=elastic_client, index=INDEX, page_size=10, **kwargs
+    ):
+        assert len(hits) <= 10
+        ids.extend(hit["_source"]["id"] for hit in hits)
+    return ids
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unordered_scan_reads_all_documents(
+    async_elastic_session: AsyncElasticsearch, scan_index: str
+):
+    ids = await read_ids(
+        async_elastic_session,
+        body={"query": {"match_all": {}}, "size": 5},
+        slices=3,
+        max_pages_in_flight=2,
+    )
+    assert sorted(ids) == list(range(DOCUMENTS_COUNT))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ordered_scan_merges_slices_by_sort(
+    async_elastic_session: AsyncElasticsearch, scan_index: str
+):
+    sort = [{"name": {"order": "desc"}}, {"id": {"order": "asc"}}]
+    expected = await async_elastic_session.search(
+        index=INDEX, sort=sort, size=DOCUMENTS_COUNT
+    )
+    expected = [hit["_source"]["id"] for hit in expected["hits"]["hits"]]
+
+    ids = await read_ids(
+        async_elastic_session,
+        body={"query": {"range": {"id": {"gte": 0}}}, "sort": sort},
+        ordered=True,
+        slices=4,
+        max_pages_in_flight=4,
+    )
+    assert ids == expected
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_scan_raises_error_of_slice(
+    async_elastic_session: AsyncElasticsearch, scan_index: str
+):
+    with pytest.raises(Exception):
+        await read_ids(
+            async_elastic_session,
+            body={"query": {"unknown_query": {}}},
+            slices=2,
+        )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_consecutive_unsorted_pages_do_not_overlap(
+    async_elastic_session: AsyncElasticsearch, scan_index: str
+):
+    pages = [
+        await read_page_by_sliced_scan(
+            elastic_client=async_elastic_session,
+            index=INDEX,
+            body={"query": {"match_all": {}}},
+            offset=offset,
+            limit=40,
+        )
+        for offset in (0, 40, 80)
+    ]
+
+    ids = [source["id"] for page in pages for source in page]
+    assert [len(page) for page in pages] == [40, 40, DOCUMENTS_COUNT - 80]
+    assert sorted(ids) == list(range(DOCUMENTS_COUNT))
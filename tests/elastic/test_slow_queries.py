@@ -0,0 +1,94 @@
+from elastic.client import InstrumentedAsyncElasticsearch
+from elastic.slow_queries import (
+    SlowQueryLog,
+    get_query_fingerprint,
+    get_query_shape,
+    slow_query_log,
+)
+
+
+def test_query_shape_does_not_depend_on_literals():
+    query_1 = {
+        "query": {
+            "bool": {
+                "must": [
+                    {"match": {"name": "first"}},
+                    {"terms": {"parameters.12": [1, 2, 3]}},
+                ]
+            }
+        },
+        "size": 10,
+    }
+    query_2 = {
+        "size": 1000,
+        "query": {
+            "bool": {
+                "must": [
+                    {"match": {"name": "second"}},
+                    {"terms": {"parameters.345": [4]}},
+                ]
+            }
+        },
+    }
+    assert get_query_shape(query_1) == {
+        "query": {
+            "bool": {
+                "must": [
+                    {"match": {"name": "?"}},
+                    {"terms": {"parameters.?": ["?"]}},
+                ]
+            }
+        },
+        "size": "?",
+    }
+    assert get_query_fingerprint(
+        get_query_shape(query_1)
+    ) == get_query_fingerprint(get_query_shape(query_2))
+
+
+def test_query_shape_depends_on_structure():
+    query_1 = {"query": {"match": {"name": "value"}}}
+    query_2 = {"query": {"term": {"name": "value"}}}
+    assert get_query_fingerprint(
+        get_query_shape(query_1)
+    ) != get_query_fingerprint(get_query_shape(query_2))
+
+
+def test_slow_query_log_keeps_slowest_fingerprints():
+    log = SlowQueryLog(size=2, min_ms=10)
+    assert not log.is_slow(5)
+
+    log.record(endpoint="search", index="a", body={"a": 1}, duration_ms=20)
+    log.record(endpoint="search", index="a", body={"a": 2}, duration_ms=40)
+    log.record(endpoint="search", index="b", body={"b": 1}, duration_ms=30)
+    log.record(endpoint="search", index="c", body={"c": 1}, duration_ms=15)
+
+    slowest = log.get_slowest()
+    assert [item["index"] for item in slowest] == ["a", "b"]
+    assert slowest[0]["count"] == 2
+    assert slowest[0]["max_ms"] == 40
+    assert slowest[0]["mean_ms"] == 30
+    assert "profile" not in slowest[0]
+
+
+async def test_instrumented_client_records_slow_queries(
+    elastic_instance, mocker
+):
+    mocker.patch.object(slow_query_log, "min_ms", new=0)
+    slow_query_log.clear()
+
+    async with InstrumentedAsyncElasticsearch(
+        elastic_instance.get_url()
+    ) as client:
+        await client.search(
+            index="*", query={"match": {"name": "value"}}, size=0
+        )
+
+    slowest = slow_query_log.get_slowest()
+    assert len(slowest) == 1
+    assert slowest[0]["endpoint"] == "search"
+    assert slowest[0]["shape"] == {
+        "query": {"match": {"name": "?"}},
+        "size": "?",
+    }
+    assert slowest[0]["max_took_ms"] is not None
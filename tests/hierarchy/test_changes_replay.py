@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+from confluent_kafka import TopicPartition
+
+from elastic.index_redirects import get_index_redirects
+from services.hierarchy_services.reload.changes_replay import ChangesReplay
+
+TOPIC = "hierarchy.changes"
+INDEX_BY_ALIAS = {"hierarchy_obj_index": "hierarchy_obj_index_v2"}
+
+
+class MessageMock:
+    def __init__(self, partition: int, offset: int):
+        self._partition = partition
+        self._offset = offset
+
+    def topic(self):
+        return TOPIC
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def error(self):
+        return None
+
+
+class ConsumerMock:
+    """Topic with 2 partitions, the group committed offset 1 of partition 0 only"""
+
+    def __init__(self):
+        self.messages = {0: [], 1: []}
+        self.assigned = []
+        self.committed_offsets = {0: 1}
+
+    def produce(self, partition: int, count: int):
+        for _ in range(count):
+            offset = len(self.messages[partition])
+            self.messages[partition].append(MessageMock(partition, offset))
+
+    def list_topics(self, topic, timeout):
+        partitions = {p: None for p in self.messages}
+        return SimpleNamespace(
+            topics={topic: SimpleNamespace(partitions=partitions)}
+        )
+
+    def get_watermark_offsets(self, partition, timeout, cached):
+        return 0, len(self.messages[partition.partition])
+
+    def committed(self, partitions, timeout):
+        return [
+            TopicPartition(
+                p.topic,
+                p.partition,
+                self.committed_offsets.get(p.partition, -1001),
+            )
+            for p in partitions
+        ]
+
+    def assign(self, partitions):
+        self.assigned = [(p.partition, p.offset) for p in partitions]
+
+    def poll(self, timeout):
+        for i, (partition, offset) in enumerate(self.assigned):
+            if offset < len(self.messages[partition]):
+                self.assigned[i] = (partition, offset + 1)
+                return self.messages[partition][offset]
+        return None
+
+    def unassign(self):
+        self.assigned = []
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_messages_after_committed_offsets_are_replayed_into_new_indexes(
+    monkeypatch,
+):
+    consumer = ConsumerMock()
+    consumer.produce(partition=0, count=2)
+    consumer.produce(partition=1, count=1)
+    replayed = []
+
+    async def process(msg):
+        replayed.append((msg.partition(), msg.offset(), get_index_redirects()))
+
+    monkeypatch.setattr(
+        ChangesReplay,
+        "_ChangesReplay__create_consumer",
+        staticmethod(lambda: consumer),
+    )
+    changes_replay = ChangesReplay(processors_by_topic={TOPIC: process})
+    await changes_replay.start()
+    # messages consumed during the load
+    consumer.produce(partition=0, count=1)
+    consumer.produce(partition=1, count=2)
+
+    await changes_replay.replay_until_caught_up(index_by_alias=INDEX_BY_ALIAS)
+    await changes_replay.close()
+
+    assert sorted(replayed) == [
+        (0, 1, INDEX_BY_ALIAS),
+        (0, 2, INDEX_BY_ALIAS),
+        (1, 1, INDEX_BY_ALIAS),
+        (1, 2, INDEX_BY_ALIAS),
+    ]
+    assert changes_replay.replayed_messages == 4
+    assert get_index_redirects() == {}
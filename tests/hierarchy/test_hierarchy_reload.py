@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_HIERARCHIES_INDEX,
+    HIERARCHY_OBJ_INDEX,
+)
+from services.hierarchy_services.reload import hierarchy_data
+from services.hierarchy_services.reload.hierarchy_data import (
+    HIERARCHY_INDEXES_CONFIGS,
+    HierarchyIndexesReloader,
+)
+from services.hierarchy_services.reload.models import HierarchyReloadState
+
+HIERARCHY_IDS = [1, 2, 3, 4, 5, 6]
+
+
+class FakeIndices:
+    def __init__(self):
+        # aliases by index, hierarchies index exists without alias
+        self.indexes = {HIERARCHY_HIERARCHIES_INDEX: set()}
+        for alias in HIERARCHY_INDEXES_CONFIGS:
+            if alias != HIERARCHY_HIERARCHIES_INDEX:
+                self.indexes[f"{alias}_v1"] = {alias}
+        self.alias_actions = []
+
+    async def create(self, index, mappings, settings):
+        self.indexes[index] = set()
+
+    async def delete(self, index, ignore_unavailable):
+        for name in index.split(","):
+            self.indexes.pop(name, None)
+
+    async def exists_alias(self, name):
+        return any(name in aliases for aliases in self.indexes.values())
+
+    async def get_alias(self, name):
+        return {
+            index: {"aliases": {alias: {} for alias in aliases}}
+            for index, aliases in self.indexes.items()
+            if name in aliases
+        }
+
+    async def exists(self, index):
+        return index in self.indexes
+
+    async def update_aliases(self, actions):
+        self.alias_actions.append(actions)
+        for action in actions:
+            (action_type, params) = next(iter(action.items()))
+            if action_type == "remove":
+                self.indexes[params["index"]].discard(params["alias"])
+            elif action_type == "remove_index":
+                del self.indexes[params["index"]]
+            else:
+                self.indexes[params["index"]].add(params["alias"])
+
+
+class FakeElasticClient:
+    def __init__(self):
+        self.indices = FakeIndices()
+
+    async def search(self, **kwargs):
+        # there are no TMOs with lifecycle, rollups of TMOs are empty
+        return {"hits": {"hits": []}}
+
+
+class FakeChangesReplay:
+    """Records the indexes of the replay and the alias moves made before it"""
+
+    def __init__(self, elastic_client: FakeElasticClient):
+        self.elastic_client = elastic_client
+        self.started = False
+        self.closed = False
+        self.replays = []
+        self.replayed_messages = 0
+
+    async def start(self):
+        self.started = True
+
+    async def replay_until_caught_up(self, index_by_alias):
+        self.replays.append(
+            (
+                dict(index_by_alias),
+                len(self.elastic_client.indices.alias_actions),
+            )
+        )
+        self.replayed_messages = 3
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def hierarchy_service(monkeypatch):
+    loads = {"running": 0, "max_running": 0, "indexes": []}
+
+    async def get_all_hierarchies_as_dicts_by_grpc(channel):
+        yield [{"id": hierarchy_id} for hierarchy_id in HIERARCHY_IDS[:3]]
+        yield [{"id": hierarchy_id} for hierarchy_id in HIERARCHY_IDS[3:]]
+
+    async def load_hierarchy(self, hierarchy_id, async_channel):
+        loads["running"] += 1
+        loads["max_running"] = max(loads["max_running"], loads["running"])
+        loads["indexes"].append(
+            self._HierarchyIndexesReloader__indexes[HIERARCHY_OBJ_INDEX]
+        )
+        await asyncio.sleep(0.01)
+        loads["running"] -= 1
+        if hierarchy_id in loads.get("failed", []):
+            raise ValueError("level is not found")
+
+    monkeypatch.setattr(
+        hierarchy_data,
+        "get_all_hierarchies_as_dicts_by_grpc",
+        get_all_hierarchies_as_dicts_by_grpc,
+    )
+    monkeypatch.setattr(
+        HierarchyIndexesReloader,
+        "_load_and_save_data_for_special_hierarchy",
+        load_hierarchy,
+    )
+    return loads
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_hierarchies_are_loaded_concurrently_and_aliases_are_swapped(
+    hierarchy_service,
+):
+    elastic_client = FakeElasticClient()
+    changes_replay = FakeChangesReplay(elastic_client)
+    reloader = HierarchyIndexesReloader(
+        elastic_client,
+        session=None,
+        concurrency=2,
+        changes_replay=changes_replay,
+    )
+
+    progress = await reloader.refresh_all_hierarchies_indexes()
+
+    assert progress.state == HierarchyReloadState.COMPLETED
+    assert progress.swapped
+    assert (progress.total_hierarchies, progress.loaded_hierarchies) == (6, 6)
+    assert hierarchy_service["max_running"] == 2
+    assert set(hierarchy_service["indexes"]) == {
+        progress.indexes[HIERARCHY_OBJ_INDEX]
+    }
+    # all aliases are moved by one request, previous indexes are deleted
+    assert len(elastic_client.indices.alias_actions) == 1
+    assert elastic_client.indices.indexes == {
+        index: {alias} for alias, index in progress.indexes.items()
+    }
+    assert HierarchyIndexesReloader.last_full_reload is progress
+    # changes consumed during the load are replayed into the new indexes before the swap
+    assert changes_replay.started and changes_replay.closed
+    assert changes_replay.replays == [(progress.indexes, 0)]
+    assert progress.replayed_messages == 3
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_failed_hierarchy_keeps_previous_indexes(hierarchy_service):
+    hierarchy_service["failed"] = [4]
+    elastic_client = FakeElasticClient()
+    previous_indexes = dict(elastic_client.indices.indexes)
+    changes_replay = FakeChangesReplay(elastic_client)
+    reloader = HierarchyIndexesReloader(
+        elastic_client, session=None, changes_replay=changes_replay
+    )
+
+    progress = await reloader.refresh_all_hierarchies_indexes()
+
+    assert progress.state == HierarchyReloadState.FAILED
+    assert not progress.swapped
+    assert progress.loaded_hierarchies == 5
+    assert [
+        (failure.hierarchy_id, failure.error)
+        for failure in progress.failed_hierarchies
+    ] == [(4, "level is not found")]
+    assert elastic_client.indices.indexes == previous_indexes
+    assert elastic_client.indices.alias_actions == []
+    assert changes_replay.replays == []
+    assert changes_replay.closed
@@ -0,0 +1,163 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from elastic.config import DEFAULT_SETTING_FOR_MO_INDEXES
+from indexes_mapping.inventory.mapping import INVENTORY_OBJ_INDEX_MAPPING
+from services.group_builder.models import GroupStatisticUniqueFields
+from services.inventory_services.coord_features.map_clusters.impl import (
+    get_clusters,
+    get_map_objects_query,
+    get_tile_bounding_box,
+    get_vector_tile,
+    parse_clusters,
+)
+
+MO_INDEX = "test_map_clusters_mo_index"
+# tile of zoom 10 which contains Kyiv (50.45, 30.52)
+TILE = (10, 598, 345)
+
+
+def test_points_query_filters_coordinates_by_bounding_box():
+    query = get_map_objects_query(
+        geometry="points",
+        only_active=True,
+        bounding_box=(50.0, 51.0, 30.0, 31.0),
+        conditions=[{"terms": {"tmo_id": [1]}}],
+    )
+
+    assert query["bool"]["filter"] == [
+        {"range": {"latitude": {"gte": 50.0, "lte": 51.0}}},
+        {"range": {"longitude": {"gte": 30.0, "lte": 31.0}}},
+        {"term": {"active": True}},
+        {"terms": {"tmo_id": [1]}},
+    ]
+    assert query["bool"]["must_not"] == [
+        {"exists": {"field": GroupStatisticUniqueFields.GROUP_NAME.value}}
+    ]
+
+
+def test_lines_query_without_bounding_box_requires_geometry():
+    query = get_map_objects_query(geometry="lines", only_active=False)
+
+    assert query["bool"]["filter"] == [
+        {"exists": {"field": "geometry.path"}},
+        {"term": {"active": False}},
+    ]
+
+
+def test_clusters_contain_count_centroid_and_sample_id():
+    aggregation = {
+        "buckets": [
+            {
+                "key": "7/74/41",
+                "doc_count": 12,
+                "centroid": {
+                    "location": {"lat": 50.45, "lon": 30.52},
+                    "count": 12,
+                },
+                "sample_id": {"value": 1001.0},
+            }
+        ]
+    }
+
+    assert parse_clusters(aggregation) == [
+        {
+            "key": "7/74/41",
+            "count": 12,
+            "centroid": {"lat": 50.45, "lon": 30.52},
+            "sample_id": 1001,
+        }
+    ]
+
+
+def test_tile_bounding_box_contains_tile_with_buffer():
+    latitude_min, latitude_max, longitude_min, longitude_max = (
+        get_tile_bounding_box(*TILE)
+    )
+
+    assert latitude_min < 50.45 < latitude_max
+    assert longitude_min < 30.52 < longitude_max
+    assert latitude_max - latitude_min < 0.3
+    assert longitude_max - longitude_min < 0.36
+
+    assert get_tile_bounding_box(0, 0, 0) == pytest.approx(
+        (-85.0511, 85.0511, -180.0, 180.0), abs=1e-4
+    )
+
+
+@fixture(scope="function")
+async def map_objects(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=MO_INDEX,
+        mappings=INVENTORY_OBJ_INDEX_MAPPING,
+        settings=DEFAULT_SETTING_FOR_MO_INDEXES,
+    )
+    objects = [
+        {"id": 1, "name": "Kyiv 1", "latitude": 50.45, "longitude": 30.52},
+        {"id": 2, "name": "Kyiv 2", "latitude": 50.4501, "longitude": 30.5201},
+        {"id": 3, "name": "Lviv", "latitude": 49.84, "longitude": 24.03},
+        {"id": 4, "name": "Without coordinates"},
+    ]
+    for item in objects:
+        await async_elastic_session.index(
+            index=MO_INDEX,
+            id=str(item["id"]),
+            document={**item, "tmo_id": 1, "active": True},
+        )
+    await async_elastic_session.indices.refresh(index=MO_INDEX)
+
+    yield objects
+
+    await async_elastic_session.indices.delete(
+        index=MO_INDEX, ignore_unavailable=True
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_clusters_are_aggregated_by_runtime_location(
+    async_elastic_session: AsyncElasticsearch, map_objects: list[dict]
+):
+    result = await get_clusters(
+        elastic_client=async_elastic_session,
+        index=MO_INDEX,
+        query=get_map_objects_query(geometry="points", only_active=True),
+        grid="geotile",
+        precision=10,
+        size=100,
+    )
+
+    assert result["total_hits"] == 3
+    clusters = sorted(result["clusters"], key=lambda cluster: cluster["count"])
+    assert [cluster["count"] for cluster in clusters] == [1, 2]
+    assert clusters[0]["sample_id"] == 3
+    assert clusters[1]["sample_id"] == 1
+    assert clusters[1]["key"] == "/".join(str(i) for i in TILE)
+    assert clusters[1]["centroid"]["lat"] == pytest.approx(50.45, abs=1e-3)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_vector_tile_contains_only_objects_of_tile(
+    async_elastic_session: AsyncElasticsearch, map_objects: list[dict]
+):
+    zoom, x, y = TILE
+    tile = await get_vector_tile(
+        elastic_client=async_elastic_session,
+        index=MO_INDEX,
+        query=get_map_objects_query(
+            geometry="points",
+            only_active=True,
+            bounding_box=get_tile_bounding_box(zoom=zoom, x=x, y=y),
+        ),
+        geometry="points",
+        zoom=zoom,
+        x=x,
+        y=y,
+        size=100,
+        grid_precision=0,
+    )
+
+    # names of features are stored in the tile as strings
+    assert b"Kyiv 1" in tile
+    assert b"Kyiv 2" in tile
+    assert b"Lviv" not in tile
@@ -0,0 +1,110 @@
+import pytest
+
+from services.inventory_services.mo_link import mo_link_info_finder
+from services.inventory_services.mo_link.mo_link_info_finder import (
+    MOLinkInfoFinder,
+)
+
+TMO_ID = 10
+# PRMs of MOs of TMO_ID which link to root MOs 1 and 2
+MO_LINKS = [
+    {"mo_id": 102, "tprm_id": 1000, "value": [1, 2]},
+    {"mo_id": 100, "tprm_id": 1000, "value": [1]},
+    {"mo_id": 101, "tprm_id": 1001, "value": 2},
+    {"mo_id": 100, "tprm_id": 1001, "value": 1},
+]
+
+
+@pytest.fixture
+def inventory(monkeypatch):
+    async def get_mo_link_data_by_value(mo_ids, **kwargs):
+        return [
+            {"_source": mo_link}
+            for mo_link in MO_LINKS
+            if set(mo_ids).intersection(
+                mo_link["value"]
+                if isinstance(mo_link["value"], list)
+                else [mo_link["value"]]
+            )
+        ]
+
+    async def get_info_mos(mo_ids, **kwargs):
+        return [
+            {
+                "_source": {
+                    "id": mo_id,
+                    "name": f"MO {mo_id}",
+                    "parent_name": None,
+                    "p_id": None,
+                    "tmo_id": TMO_ID,
+                }
+            }
+            for mo_id in sorted(set(mo_ids))
+        ]
+
+    async def get_info_about_tmos(tmo_ids, **kwargs):
+        return [
+            {"_source": {"id": tmo_id, "name": "TMO"}} for tmo_id in tmo_ids
+        ]
+
+    async def get_list_of_mo_link_tprm(tmo_ids, **kwargs):
+        return [
+            {
+                "_source": {
+                    "id": tprm_id,
+                    "name": f"TPRM {tprm_id}",
+                    "tmo_id": TMO_ID,
+                    "multiple": tprm_id == 1000,
+                }
+            }
+            for tprm_id in (1000, 1001)
+        ]
+
+    for function in (
+        get_mo_link_data_by_value,
+        get_info_mos,
+        get_info_about_tmos,
+        get_list_of_mo_link_tprm,
+    ):
+        monkeypatch.setattr(mo_link_info_finder, function.__name__, function)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_in_links_are_joined_by_tprm_and_mo(inventory):
+    finder = MOLinkInfoFinder(elastic_client=None)
+
+    result = await finder.get_in_mo_link(
+        mo_id=1, is_admin=True, user_permissions=[]
+    )
+
+    assert [
+        (item.tprm_id, item.mo_id, item.value) for item in result.mo_link_info
+    ] == [(1000, 100, [1]), (1000, 102, [1, 2]), (1001, 100, [1])]
+    assert result.total == 3
+    assert result.additional_info[0].tprm_id == [1000, 1001]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_in_links_of_list_are_joined_for_each_root_mo(inventory):
+    finder = MOLinkInfoFinder(elastic_client=None)
+
+    result = await finder.get_in_list_mo_link(
+        mo_ids=[1, 2], is_admin=True, user_permissions=[]
+    )
+
+    links_by_root_mo = {
+        item.mo_id: [
+            (link.tprm_id, link.mo_id, link.multiple)
+            for link in item.mo_link_info_response.mo_link_info
+        ]
+        for item in result.list_info
+    }
+    assert sorted(links_by_root_mo[1]) == [
+        (1000, 100, True),
+        (1000, 102, True),
+        (1001, 100, False),
+    ]
+    assert sorted(links_by_root_mo[2]) == [
+        (1000, 102, True),
+        (1001, 101, False),
+    ]
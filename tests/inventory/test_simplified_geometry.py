@@ -0,0 +1,63 @@
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME,
+)
+from services.inventory_services.coord_features.simplified_geometry.impl import (
+    get_level_key_by_zoom,
+    set_simplified_geometry,
+    simplify_line,
+)
+from settings.config import INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS
+
+# zigzag smaller than a pixel of the stored zooms with one significant turn at the end
+LINE = [[30.0 + 0.01 * i, 50.0 + 0.00001 * (i % 2)] for i in range(20)] + [
+    [30.3, 51.0]
+]
+
+
+def test_simplify_line_keeps_ends_and_significant_vertices():
+    line = [[0.0, 0.0], [1.0, 0.0001], [2.0, 0.0], [3.0, 5.0], [4.0, 0.0]]
+
+    assert simplify_line(line, tolerance=0.01) == [
+        [0.0, 0.0],
+        [2.0, 0.0],
+        [3.0, 5.0],
+        [4.0, 0.0],
+    ]
+
+
+def test_level_is_the_nearest_stored_zoom_which_is_not_lower():
+    lowest, highest = (
+        INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS[0],
+        INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS[-1],
+    )
+
+    assert get_level_key_by_zoom(0) == f"z{lowest}"
+    assert get_level_key_by_zoom(lowest) == f"z{lowest}"
+    assert get_level_key_by_zoom(highest + 1) is None
+    assert get_level_key_by_zoom(None) is None
+
+
+def test_simplified_geometries_are_set_only_for_lines():
+    line_mo = {
+        "geometry": {"path": {"type": "LineString", "coordinates": LINE}}
+    }
+    point_mo = {
+        "geometry": {"path": {"type": "Point", "coordinates": [30.0, 50.0]}}
+    }
+    mo_without_geometry = {INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME: {}}
+
+    set_simplified_geometry(line_mo)
+    set_simplified_geometry(point_mo)
+    set_simplified_geometry(mo_without_geometry)
+
+    levels = line_mo[INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME]
+    assert list(levels) == [
+        f"z{zoom}" for zoom in INVENTORY_SIMPLIFIED_GEOMETRY_ZOOMS
+    ]
+    for level in levels.values():
+        assert level["type"] == "LineString"
+        assert level["coordinates"][0] == LINE[0]
+        assert level["coordinates"][-1] == LINE[-1]
+        assert len(level["coordinates"]) < len(LINE)
+    assert point_mo[INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME] is None
+    assert INVENTORY_SIMPLIFIED_GEOMETRY_FIELD_NAME not in mo_without_geometry
@@ -0,0 +1,220 @@
+import asyncio
+
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from elastic.config import DEFAULT_SETTING_FOR_MO_INDEXES
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_FUZZY_FIELD_NAME,
+    INVENTORY_OBJ_INDEX_MAPPING,
+    INVENTORY_PERMISSIONS_FIELD_NAME,
+)
+from services.group_builder.models import GroupStatisticUniqueFields
+from services.inventory_services.utils.suggest_backfill import SuggestBackfill
+from v2.routers.inventory.utils.typeahead_utils import (
+    get_prefix_condition,
+    get_suggest_fields,
+    get_typeahead_query,
+)
+
+MO_INDEX = "test_typeahead_mo_index"
+OLD_MO_INDEX = "test_typeahead_mo_old_index"
+
+
+def test_suggest_fields_contain_shingles_of_name():
+    assert get_suggest_fields() == [
+        "fuzzy_search_fields.name.suggest",
+        "fuzzy_search_fields.name.suggest._2gram",
+        "fuzzy_search_fields.name.suggest._3gram",
+    ]
+
+
+def test_typeahead_query_matches_prefix_and_filters_readable_mos():
+    permissions_condition = {"terms": {"permissions": ["realm_1"]}}
+
+    query = get_typeahead_query(
+        search_value="router 12",
+        only_active=True,
+        conditions=[permissions_condition],
+    )
+
+    assert query["bool"]["must"] == [
+        {
+            "multi_match": {
+                "query": "router 12",
+                "type": "bool_prefix",
+                "fields": get_suggest_fields(),
+            }
+        }
+    ]
+    assert query["bool"]["filter"] == [
+        {"term": {"active": True}},
+        permissions_condition,
+    ]
+    assert query["bool"]["must_not"] == [
+        {"exists": {"field": GroupStatisticUniqueFields.GROUP_NAME.value}}
+    ]
+
+
+def test_prefix_is_matched_by_wildcard_until_backfill_is_completed():
+    assert get_prefix_condition("router 12", suggest_completed=False) == {
+        "query_string": {
+            "query": "router 12*",
+            "fields": [f"{INVENTORY_FUZZY_FIELD_NAME}.name"],
+        }
+    }
+    assert get_prefix_condition("router 12", suggest_completed=True) == {
+        "multi_match": {
+            "query": "router 12",
+            "type": "bool_prefix",
+            "fields": get_suggest_fields(),
+        }
+    }
+
+
+def get_mo(mo_id: int, name: str, permissions: list[str]) -> dict:
+    return {
+        "id": mo_id,
+        "name": name,
+        "active": True,
+        INVENTORY_FUZZY_FIELD_NAME: {"name": name},
+        INVENTORY_PERMISSIONS_FIELD_NAME: permissions,
+    }
+
+
+async def index_mos(
+    async_elastic_session: AsyncElasticsearch, index: str, mos: list[dict]
+):
+    for mo in mos:
+        await async_elastic_session.index(
+            index=index, id=str(mo["id"]), document=mo
+        )
+    await async_elastic_session.indices.refresh(index=index)
+
+
+async def search_names(
+    async_elastic_session: AsyncElasticsearch, index: str, query: dict
+) -> list[str]:
+    response = await async_elastic_session.search(
+        index=index, query=query, sort=[{"id": "asc"}]
+    )
+    return [item["_source"]["name"] for item in response["hits"]["hits"]]
+
+
+@fixture(scope="function")
+async def typeahead_mos(async_elastic_session: AsyncElasticsearch):
+    await async_elastic_session.indices.create(
+        index=MO_INDEX,
+        mappings=INVENTORY_OBJ_INDEX_MAPPING,
+        settings=DEFAULT_SETTING_FOR_MO_INDEXES,
+    )
+    await index_mos(
+        async_elastic_session,
+        MO_INDEX,
+        [
+            get_mo(1, "Router Kyiv 12", ["realm_a"]),
+            get_mo(2, "Router Kyiv 13", ["realm_b"]),
+            get_mo(3, "Switch Kyiv 14", ["realm_a"]),
+        ],
+    )
+
+    yield MO_INDEX
+
+    await async_elastic_session.indices.delete(
+        index=MO_INDEX, ignore_unavailable=True
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_typeahead_finds_mos_by_prefix_and_filters_by_permissions(
+    async_elastic_session: AsyncElasticsearch, typeahead_mos: str
+):
+    query = get_typeahead_query(
+        search_value="rout kyi", only_active=True, conditions=[]
+    )
+    assert await search_names(async_elastic_session, typeahead_mos, query) == [
+        "Router Kyiv 12",
+        "Router Kyiv 13",
+    ]
+
+    query = get_typeahead_query(
+        search_value="rout kyi",
+        only_active=True,
+        conditions=[{"terms": {INVENTORY_PERMISSIONS_FIELD_NAME: ["realm_a"]}}],
+    )
+    assert await search_names(async_elastic_session, typeahead_mos, query) == [
+        "Router Kyiv 12"
+    ]
+
+
+@fixture(scope="function")
+async def old_mo_index(async_elastic_session: AsyncElasticsearch):
+    """MO index created before the suggest sub field was added to the mapping"""
+    mappings = {
+        "properties": {
+            **INVENTORY_OBJ_INDEX_MAPPING["properties"],
+            INVENTORY_FUZZY_FIELD_NAME: {
+                "type": "object",
+                "properties": {"name": {"type": "text"}},
+            },
+        }
+    }
+    await async_elastic_session.indices.create(
+        index=OLD_MO_INDEX,
+        mappings=mappings,
+        settings=DEFAULT_SETTING_FOR_MO_INDEXES,
+    )
+    await index_mos(
+        async_elastic_session,
+        OLD_MO_INDEX,
+        [get_mo(1, "Router Kyiv 12", ["realm_a"])],
+    )
+    await async_elastic_session.indices.put_mapping(
+        index=OLD_MO_INDEX,
+        properties={
+            INVENTORY_FUZZY_FIELD_NAME: INVENTORY_OBJ_INDEX_MAPPING[
+                "properties"
+            ][INVENTORY_FUZZY_FIELD_NAME]
+        },
+    )
+
+    yield OLD_MO_INDEX
+
+    await async_elastic_session.indices.delete(
+        index=OLD_MO_INDEX, ignore_unavailable=True
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_backfill_runs_once_and_is_completed_after_task(
+    async_elastic_session: AsyncElasticsearch, old_mo_index: str
+):
+    backfill = SuggestBackfill(check_interval=0, index_pattern=old_mo_index)
+    query = get_typeahead_query(
+        search_value="rout", only_active=True, conditions=[]
+    )
+    assert await search_names(async_elastic_session, old_mo_index, query) == []
+    assert not await backfill.is_completed(async_elastic_session)
+
+    await backfill.start(async_elastic_session)
+    states = await backfill._get_states(async_elastic_session)
+    task_id = states[old_mo_index]
+    await async_elastic_session.tasks.get(
+        task_id=task_id, wait_for_completion=True
+    )
+    # the running or finished task is not started again
+    await backfill.start(async_elastic_session)
+    states = await backfill._get_states(async_elastic_session)
+    assert states[old_mo_index] in (task_id, "completed")
+
+    for _ in range(10):
+        if await backfill.is_completed(async_elastic_session):
+            break
+        await asyncio.sleep(0.1)
+    assert await backfill.is_completed(async_elastic_session)
+
+    await async_elastic_session.indices.refresh(index=old_mo_index)
+    assert await search_names(async_elastic_session, old_mo_index, query) == [
+        "Router Kyiv 12"
+    ]
@@ -31,12 +31,15 @@ from services.hierarchy_services.elastic.configs import (
     HIERARCHY_OBJ_INDEX_SETTINGS,
     HIERARCHY_NODE_DATA_INDEX,
     HIERARCHY_NODE_DATA_INDEX_SETTINGS,
+    HIERARCHY_ROLLUPS_INDEX,
+    HIERARCHY_ROLLUPS_INDEX_SETTINGS,
 )
 from services.hierarchy_services.elastic.mapping import (
     HIERARCHY_HIERARCHIES_INDEX_MAPPING,
     HIERARCHY_LEVEL_INDEX_MAPPING,
     HIERARCHY_OBJ_INDEX_MAPPING,
     HIERARCHY_NODE_DATA_INDEX_MAPPING,
+    HIERARCHY_ROLLUPS_INDEX_MAPPING,
 )
 from services.hierarchy_services.kafka.consumers.changes_topic.protobuf.hierarchy_producer_msg_pb2 import (
     HierarchyMessageSchema,
@@ -70,6 +73,10 @@ async def init_hierarchy_indexes(async_elastic_session: AsyncElasticsearch):
             "settings": HIERARCHY_NODE_DATA_INDEX_SETTINGS,
             "mappings": HIERARCHY_NODE_DATA_INDEX_MAPPING,
         },
+        HIERARCHY_ROLLUPS_INDEX: {
+            "settings": HIERARCHY_ROLLUPS_INDEX_SETTINGS,
+            "mappings": HIERARCHY_ROLLUPS_INDEX_MAPPING,
+        },
     }
 
     for index_name, conf_data in main_indexes_and_configs.items():
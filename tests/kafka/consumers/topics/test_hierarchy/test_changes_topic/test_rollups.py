@@ -0,0 +1,337 @@
+import pytest
+from elasticsearch import AsyncElasticsearch
+from pytest_asyncio import fixture
+
+from elastic.config import (
+    DEFAULT_SETTING_FOR_MO_INDEXES,
+    DEFAULT_SETTING_FOR_TMO_INDEX,
+    DEFAULT_SETTING_FOR_TPRM_INDEX,
+    INVENTORY_TMO_INDEX_V2,
+    INVENTORY_TPRM_INDEX_V2,
+)
+from elastic.enum_models import InventoryFieldValType
+from elastic.query_builder_service.inventory_index.utils.index_utils import (
+    get_index_name_by_tmo,
+)
+from indexes_mapping.inventory.mapping import (
+    INVENTORY_OBJ_INDEX_MAPPING,
+    INVENTORY_TMO_INDEX_MAPPING,
+    INVENTORY_TPRM_INDEX_MAPPING,
+)
+from kafka.utils import KafkaMSGMock
+from kafka_config.config import KAFKA_HIERARCHY_CHANGES_TOPIC
+from services.hierarchy_services.elastic.configs import (
+    HIERARCHY_LEVELS_INDEX,
+    HIERARCHY_ROLLUPS_INDEX,
+)
+from services.hierarchy_services.kafka.consumers.changes_topic.configs import (
+    HierarchyMessageType,
+    ObjEventStatus,
+)
+from services.hierarchy_services.kafka.consumers.changes_topic.protobuf.hierarchy_producer_msg_pb2 import (
+    ListNode,
+    ListNodeData,
+    NodeDataMessageSchema,
+    NodeMessageSchema,
+)
+from services.hierarchy_services.kafka.consumers.changes_topic.utils import (
+    HierarchyChangesTopicHandler,
+)
+from services.hierarchy_services.rollups.store import (
+    HierarchyRollupStore,
+    get_tmo_rollup_id,
+)
+
+HIERARCHY_ID = 1
+TMO_ID = 500
+SEVERITY_TPRM_ID = 600
+PARENT_NODE_ID = "rollup_parent"
+CHILD_NODE_ID = "rollup_child"
+
+
+@fixture(scope="function")
+async def lifecycle_mos(async_elastic_session: AsyncElasticsearch):
+    """TMO with lifecycle and severity TPRM and two its MOs: with active process and without process"""
+    mo_index = get_index_name_by_tmo(TMO_ID)
+    indexes = {
+        INVENTORY_TMO_INDEX_V2: (
+            INVENTORY_TMO_INDEX_MAPPING,
+            DEFAULT_SETTING_FOR_TMO_INDEX,
+        ),
+        INVENTORY_TPRM_INDEX_V2: (
+            INVENTORY_TPRM_INDEX_MAPPING,
+            DEFAULT_SETTING_FOR_TPRM_INDEX,
+        ),
+        mo_index: (INVENTORY_OBJ_INDEX_MAPPING, DEFAULT_SETTING_FOR_MO_INDEXES),
+    }
+    for index_name, (mappings, settings) in indexes.items():
+        if not await async_elastic_session.indices.exists(index=index_name):
+            await async_elastic_session.indices.create(
+                index=index_name, mappings=mappings, settings=settings
+            )
+
+    await async_elastic_session.index(
+        index=INVENTORY_TMO_INDEX_V2,
+        id=str(TMO_ID),
+        document={"id": TMO_ID, "lifecycle_process_definition": "lifecycle"},
+        refresh="true",
+    )
+    await async_elastic_session.index(
+        index=INVENTORY_TPRM_INDEX_V2,
+        id=str(SEVERITY_TPRM_ID),
+        document={
+            "id": SEVERITY_TPRM_ID,
+            "tmo_id": TMO_ID,
+            "name": "Severity",
+            "val_type": InventoryFieldValType.INT.value,
+        },
+        refresh="true",
+    )
+    mos = [
+        {
+            "id": 700,
+            "tmo_id": TMO_ID,
+            "state": "ACTIVE",
+            "parameters": {str(SEVERITY_TPRM_ID): 3},
+        },
+        {
+            "id": 701,
+            "tmo_id": TMO_ID,
+            "parameters": {str(SEVERITY_TPRM_ID): 5},
+        },
+    ]
+    for mo in mos:
+        await async_elastic_session.index(
+            index=mo_index, id=str(mo["id"]), document=mo, refresh="true"
+        )
+
+    yield mos
+
+    await async_elastic_session.indices.delete(
+        index=mo_index, ignore_unavailable=True
+    )
+    for index_name, doc_id in [
+        (INVENTORY_TMO_INDEX_V2, TMO_ID),
+        (INVENTORY_TPRM_INDEX_V2, SEVERITY_TPRM_ID),
+    ]:
+        await async_elastic_session.delete(
+            index=index_name, id=str(doc_id), refresh="true"
+        )
+
+
+def get_node_msg(node_id: str, parent_id: str) -> NodeMessageSchema:
+    return NodeMessageSchema(
+        id=node_id,
+        hierarchy_id=HIERARCHY_ID,
+        parent_id=parent_id,
+        key=node_id,
+        object_id=1,
+        level=1,
+        object_type_id=TMO_ID,
+        level_id=1,
+        active=True,
+        path="",
+        latitude=0,
+        longitude=0,
+        child_count=0,
+        key_is_empty=False,
+    )
+
+
+def get_node_data_msg(node_data_id: int, mo_id: int) -> NodeDataMessageSchema:
+    return NodeDataMessageSchema(
+        id=node_data_id,
+        level_id=1,
+        node_id=CHILD_NODE_ID,
+        mo_id=mo_id,
+        mo_name=str(mo_id),
+        mo_status="",
+        mo_tmo_id=TMO_ID,
+        mo_active=True,
+        unfolded_key={},
+        mo_latitude=0,
+        mo_longitude=0,
+        mo_p_id=0,
+    )
+
+
+async def process_msg(msg_class_name: str, msg_event: str, msg):
+    kfk_msg = KafkaMSGMock(
+        msg_key=f"{msg_class_name}:{msg_event}",
+        msg_value=msg.SerializeToString(),
+        msg_topic=KAFKA_HIERARCHY_CHANGES_TOPIC,
+    )
+    await HierarchyChangesTopicHandler(kafka_msg=kfk_msg).process_the_message()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rollups_follow_hierarchy_changes(
+    async_elastic_session: AsyncElasticsearch, lifecycle_mos: list[dict]
+):
+    await process_msg(
+        HierarchyMessageType.OBJ.value,
+        ObjEventStatus.CREATED.value,
+        ListNode(
+            objects=[
+                get_node_msg(PARENT_NODE_ID, parent_id=""),
+                get_node_msg(CHILD_NODE_ID, parent_id=PARENT_NODE_ID),
+            ]
+        ),
+    )
+    await process_msg(
+        HierarchyMessageType.NODE_DATA.value,
+        ObjEventStatus.CREATED.value,
+        ListNodeData(
+            objects=[
+                get_node_data_msg(9000 + i, mo["id"])
+                for i, mo in enumerate(lifecycle_mos)
+            ]
+        ),
+    )
+
+    store = HierarchyRollupStore(elastic_client=async_elastic_session)
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups[HIERARCHY_ID]["count"] == 2
+    assert rollups[HIERARCHY_ID]["count_by_state"] == {"ACTIVE": 1, "NONE": 1}
+    assert rollups[HIERARCHY_ID]["max_severity"] == 5
+
+    await process_msg(
+        HierarchyMessageType.NODE_DATA.value,
+        ObjEventStatus.DELETED.value,
+        ListNodeData(objects=[get_node_data_msg(9001, lifecycle_mos[1]["id"])]),
+    )
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups[HIERARCHY_ID]["count"] == 1
+    assert rollups[HIERARCHY_ID]["count_by_state"] == {"ACTIVE": 1}
+    assert rollups[HIERARCHY_ID]["max_severity"] == 3
+
+    await process_msg(
+        HierarchyMessageType.OBJ.value,
+        ObjEventStatus.DELETED.value,
+        ListNode(objects=[get_node_msg(CHILD_NODE_ID, PARENT_NODE_ID)]),
+    )
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert HIERARCHY_ID not in rollups
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rollups_follow_severity_and_mo_changes(
+    async_elastic_session: AsyncElasticsearch, lifecycle_mos: list[dict]
+):
+    await process_msg(
+        HierarchyMessageType.OBJ.value,
+        ObjEventStatus.CREATED.value,
+        ListNode(
+            objects=[
+                get_node_msg(PARENT_NODE_ID, parent_id=""),
+                get_node_msg(CHILD_NODE_ID, parent_id=PARENT_NODE_ID),
+            ]
+        ),
+    )
+    await process_msg(
+        HierarchyMessageType.NODE_DATA.value,
+        ObjEventStatus.CREATED.value,
+        ListNodeData(
+            objects=[
+                get_node_data_msg(9100 + i, mo["id"])
+                for i, mo in enumerate(lifecycle_mos)
+            ]
+        ),
+    )
+    store = HierarchyRollupStore(elastic_client=async_elastic_session)
+    mo_index = get_index_name_by_tmo(TMO_ID)
+    changed_mo_id = lifecycle_mos[1]["id"]
+
+    await async_elastic_session.update(
+        index=mo_index,
+        id=str(changed_mo_id),
+        doc={"parameters": {str(SEVERITY_TPRM_ID): 9}},
+    )
+    # values of not severity TPRMs do not change rollups
+    await store.refresh_by_prms(prms=[(changed_mo_id, SEVERITY_TPRM_ID + 1)])
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups[HIERARCHY_ID]["max_severity"] == 5
+
+    await store.refresh_by_prms(prms=[(changed_mo_id, SEVERITY_TPRM_ID)])
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups[HIERARCHY_ID]["max_severity"] == 9
+
+    await async_elastic_session.delete(
+        index=mo_index, id=str(changed_mo_id), refresh="true"
+    )
+    await store.refresh_by_mos(mos=[(changed_mo_id, TMO_ID)])
+    rollups = await store.get_hierarchy_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups[HIERARCHY_ID]["count"] == 1
+    assert rollups[HIERARCHY_ID]["max_severity"] == 3
+
+    await process_msg(
+        HierarchyMessageType.OBJ.value,
+        ObjEventStatus.DELETED.value,
+        ListNode(objects=[get_node_msg(CHILD_NODE_ID, PARENT_NODE_ID)]),
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_level_tmo_rollups_follow_mo_changes(
+    async_elastic_session: AsyncElasticsearch, lifecycle_mos: list[dict]
+):
+    await async_elastic_session.index(
+        index=HIERARCHY_LEVELS_INDEX,
+        id="rollup_level",
+        document={
+            "id": 900,
+            "hierarchy_id": HIERARCHY_ID,
+            "object_type_id": TMO_ID,
+            "is_virtual": False,
+        },
+        refresh="true",
+    )
+    store = HierarchyRollupStore(elastic_client=async_elastic_session)
+    await store.refresh_levels(hierarchy_ids=[HIERARCHY_ID])
+    await store.refresh_tmos(tmo_ids=[TMO_ID])
+
+    rollups = await store.get_level_tmo_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups == {HIERARCHY_ID: {"count": 2, "max_severity": 5}}
+
+    deleted_mo_id = lifecycle_mos[1]["id"]
+    await async_elastic_session.delete(
+        index=get_index_name_by_tmo(TMO_ID),
+        id=str(deleted_mo_id),
+        refresh="true",
+    )
+    await store.refresh_by_mos(mos=[(deleted_mo_id, TMO_ID)])
+    rollups = await store.get_level_tmo_rollups(hierarchy_ids=[HIERARCHY_ID])
+    assert rollups == {HIERARCHY_ID: {"count": 1, "max_severity": 3}}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rollups_are_calculated_again_after_concurrent_save(
+    async_elastic_session: AsyncElasticsearch,
+):
+    store = HierarchyRollupStore(elastic_client=async_elastic_session)
+    rollup_id = get_tmo_rollup_id(TMO_ID)
+    await async_elastic_session.index(
+        index=HIERARCHY_ROLLUPS_INDEX, id=rollup_id, document={"count": 1}
+    )
+    calculated_from = list()
+
+    async def calculate(rollup_ids: set[str], stored: dict[str, dict]) -> dict:
+        stored_count = stored[rollup_id]["_source"]["count"]
+        calculated_from.append(stored_count)
+        if len(calculated_from) == 1:
+            # other process saves the rollup after it was read
+            await async_elastic_session.index(
+                index=HIERARCHY_ROLLUPS_INDEX,
+                id=rollup_id,
+                document={"count": 2},
+            )
+        return {rollup_id: {"count": stored_count + 10}}
+
+    saved = await store._save_versioned({rollup_id}, calculate)
+
+    assert calculated_from == [1, 2]
+    assert saved == {rollup_id: ({"count": 2}, {"count": 12})}
+    rollup = await async_elastic_session.get(
+        index=HIERARCHY_ROLLUPS_INDEX, id=rollup_id
+    )
+    assert rollup["_source"] == {"count": 12}
@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from elastic.client import ElasticsearchManager
+from services.inventory_services.kafka.consumers.inventory_changes.utils import (
+    InventoryChangesHandler,
+)
+from services.kafka_services.keyed_lanes.utils import (
+    KeyedLanes,
+    KeyedLanesConsumer,
+    PartitionOffsets,
+)
+from tests.kafka.consumers.topics.inventory_changes.utils import (
+    create_cleared_kafka_mo_msg,
+    create_cleared_kafka_prm_msg,
+    create_cleared_kafka_tmo_msg,
+)
+
+TOPIC = "inventory.changes"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_lanes_keep_order_of_key_and_run_keys_concurrently():
+    lanes = KeyedLanes(max_in_flight=10)
+    events = []
+    running = 0
+    max_running = 0
+
+    async def work(name: str, delay: float):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        events.append(f"start {name}")
+        await asyncio.sleep(delay)
+        events.append(f"end {name}")
+        running -= 1
+
+    await lanes.submit(work("a1", 0.03), keys={"a"})
+    await lanes.submit(work("b1", 0.01), keys={"b"})
+    await lanes.submit(work("a2", 0), keys={"a"})
+    await lanes.submit(work("ab", 0), keys={"a", "b"})
+    await lanes.wait_all()
+
+    assert max_running == 2
+    assert events.index("end a1") < events.index("start a2")
+    assert events.index("end a2") < events.index("start ab")
+    assert events.index("end b1") < events.index("start ab")
+    assert lanes.in_flight == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_barrier_runs_between_previous_and_next_coroutines():
+    lanes = KeyedLanes(max_in_flight=10)
+    events = []
+
+    async def work(name: str, delay: float):
+        await asyncio.sleep(delay)
+        events.append(name)
+
+    await lanes.submit(work("a", 0.02), keys={"a"})
+    await lanes.submit(work("b", 0.01), keys={"b"})
+    await lanes.submit(work("barrier", 0), keys=None)
+    await lanes.submit(work("c", 0), keys={"c"})
+    await lanes.wait_all()
+
+    assert events == ["b", "a", "barrier", "c"]
+
+
+def test_offsets_are_committed_up_to_lowest_unprocessed_offset():
+    offsets = PartitionOffsets()
+    for offset in (10, 11, 12):
+        offsets.add(TOPIC, 0, offset)
+    offsets.add(TOPIC, 1, 5)
+
+    offsets.done(TOPIC, 0, 11)
+    assert offsets.pop_committable() == []
+
+    offsets.done(TOPIC, 0, 10)
+    offsets.done(TOPIC, 1, 5)
+    committed = {
+        (item.partition, item.offset) for item in offsets.pop_committable()
+    }
+    assert committed == {(0, 12), (1, 6)}
+
+    offsets.done(TOPIC, 0, 12)
+    assert [item.offset for item in offsets.pop_committable()] == [13]
+    assert offsets.pop_committable() == []
+
+
+class MessageMock:
+    def __init__(self, partition: int, offset: int, key: int | None):
+        self._partition = partition
+        self._offset = offset
+        self.lane_key = key
+
+    def topic(self):
+        return TOPIC
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def error(self):
+        return None
+
+
+class ConsumerMock:
+    def __init__(self, messages: list[MessageMock], shutdown_event):
+        self.messages = messages
+        self.shutdown_event = shutdown_event
+        self.committed = {}
+
+    def poll(self, timeout: float):
+        if self.messages:
+            return self.messages.pop(0)
+        self.shutdown_event.set()
+        return None
+
+    def commit(self, offsets, asynchronous: bool):
+        for item in offsets:
+            self.committed[item.partition] = item.offset
+
+
+class HandlerMock:
+    processed = []
+    failing_offsets = set()
+
+    def __init__(self, kafka_msg: MessageMock):
+        self.msg = kafka_msg
+
+    def get_lane_keys(self):
+        if self.msg.lane_key is None:
+            return None
+        return {("MO", self.msg.lane_key)}
+
+    async def process_the_message(self):
+        # earlier messages are slower, so keys are processed out of offset order
+        await asyncio.sleep(0.001 * (10 - self.msg.offset()))
+        if self.msg.offset() in self.failing_offsets:
+            raise ValueError(f"offset {self.msg.offset()}")
+        self.processed.append((self.msg.lane_key, self.msg.offset()))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_consumer_keeps_order_of_mo_and_commits_processed_offsets():
+    HandlerMock.processed = []
+    HandlerMock.failing_offsets = set()
+    shutdown_event = asyncio.Event()
+    messages = [
+        MessageMock(partition=offset % 2, offset=offset, key=offset % 3)
+        for offset in range(9)
+    ]
+    consumer = ConsumerMock(messages=messages, shutdown_event=shutdown_event)
+    lanes_consumer = KeyedLanesConsumer(
+        consumer=consumer, handler_class=HandlerMock, max_in_flight=4
+    )
+
+    await lanes_consumer.run(shutdown_event=shutdown_event)
+
+    for key in range(3):
+        offsets_of_key = [o for k, o in HandlerMock.processed if k == key]
+        assert offsets_of_key == sorted(offsets_of_key)
+    assert len(HandlerMock.processed) == 9
+    assert consumer.committed == {0: 9, 1: 8}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_consumer_does_not_commit_failed_message():
+    HandlerMock.processed = []
+    HandlerMock.failing_offsets = {2}
+    shutdown_event = asyncio.Event()
+    messages = [
+        MessageMock(partition=0, offset=offset, key=offset)
+        for offset in range(5)
+    ]
+    consumer = ConsumerMock(messages=messages, shutdown_event=shutdown_event)
+    lanes_consumer = KeyedLanesConsumer(
+        consumer=consumer, handler_class=HandlerMock, max_in_flight=2
+    )
+
+    with pytest.raises(ValueError):
+        await lanes_consumer.run(shutdown_event=shutdown_event)
+    assert consumer.committed == {0: 2}
+
+
+def test_inventory_changes_are_keyed_by_mo(monkeypatch):
+    # lane keys are read from the message, so the handler does not need a connection
+    monkeypatch.setattr(ElasticsearchManager, "get_client", lambda self: None)
+    mo_msg = create_cleared_kafka_mo_msg(
+        list_of_mo_data=[{"id": 1, "tmo_id": 5}, {"id": 2, "tmo_id": 5}],
+        msg_event="updated",
+    )
+    prm_msg = create_cleared_kafka_prm_msg(
+        list_of_prm_data=[{"id": 10, "mo_id": 2, "tprm_id": 7, "value": "a"}],
+        msg_event="created",
+    )
+    tmo_msg = create_cleared_kafka_tmo_msg(
+        list_of_tmo_data=[{"id": 5, "name": "TMO"}], msg_event="updated"
+    )
+
+    assert InventoryChangesHandler(mo_msg).get_lane_keys() == {
+        ("MO", 1),
+        ("MO", 2),
+    }
+    assert InventoryChangesHandler(prm_msg).get_lane_keys() == {("MO", 2)}
+    assert InventoryChangesHandler(tmo_msg).get_lane_keys() is None
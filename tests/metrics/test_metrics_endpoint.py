@@ -0,0 +1,94 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from elastic.client import InstrumentedAsyncElasticsearch
+from metrics.config import METRICS_PATH
+from metrics.kafka import observe_kafka_handler, update_consumer_lag_from_stats
+from metrics.middleware import MetricsMiddleware, metrics_endpoint
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.add_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
+
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int):
+    return {"id": item_id}
+
+
+def scrape_metrics() -> str:
+    client = TestClient(app)
+    response = client.get(METRICS_PATH)
+    assert response.status_code == 200
+    return response.text
+
+
+def test_metrics_endpoint_contains_http_request_duration():
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/not_existing_route")
+
+    metrics = scrape_metrics()
+    assert (
+        "search_http_request_duration_seconds_count{"
+        'method="GET",route="/items/{item_id}",status_code="200"} 2.0'
+    ) in metrics
+    assert (
+        "search_http_request_duration_seconds_count{"
+        'method="GET",route="<unmatched>",status_code="404"} 1.0'
+    ) in metrics
+
+
+def test_metrics_endpoint_contains_kafka_handler_duration():
+    with observe_kafka_handler(
+        topic="inventory.changes", msg_class_name="MO", msg_event="created"
+    ):
+        pass
+
+    metrics = scrape_metrics()
+    assert (
+        "search_kafka_handler_duration_seconds_count{"
+        'msg_class_name="MO",msg_event="created",status="success",'
+        'topic="inventory.changes"} 1.0'
+    ) in metrics
+
+
+def test_metrics_endpoint_contains_consumer_lag():
+    stats = {
+        "topics": {
+            "inventory.changes": {
+                "partitions": {
+                    "-1": {"consumer_lag": -1},
+                    "0": {"consumer_lag": 15},
+                    "1": {"consumer_lag": -1},
+                }
+            }
+        }
+    }
+    update_consumer_lag_from_stats(json.dumps(stats))
+
+    metrics = scrape_metrics()
+    assert (
+        'search_kafka_consumer_lag{partition="0",topic="inventory.changes"} 15.0'
+        in metrics
+    )
+    assert 'partition="-1"' not in metrics
+    assert 'partition="1",topic="inventory.changes"' not in metrics
+
+
+async def test_metrics_endpoint_contains_es_request_duration(
+    elastic_instance,
+):
+    async with InstrumentedAsyncElasticsearch(
+        elastic_instance.get_url()
+    ) as client:
+        await client.info()
+
+    metrics = scrape_metrics()
+    assert (
+        'search_es_request_duration_seconds_count{endpoint="info",status="success"}'
+        in metrics
+    )
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from security.security_data_models import ClientRoles, UserData
+from services.rendering_services.renderers import write_table_file
+from v2.routers.inventory.utils import export_jobs as export_jobs_module
+from v2.routers.inventory.utils.export_jobs import (
+    ExportJobs,
+    ExportJobState,
+    get_export_job_id,
+)
+from v2.routers.inventory.utils.export_utils import ExportParams
+
+
+def get_user(user_id: str, roles: list[str]) -> UserData:
+    return UserData(
+        id=user_id,
+        audience=None,
+        name=user_id,
+        preferred_name=user_id,
+        realm_access=ClientRoles(name="realm_access", roles=roles),
+        resource_access=None,
+        groups=None,
+    )
+
+
+def get_params(filter_values: list[str]) -> ExportParams:
+    return ExportParams(
+        tmo_id=1,
+        filters_list=[
+            {
+                "columnName": "name",
+                "rule": "or",
+                "filters": [
+                    {"operator": "equals", "value": value}
+                    for value in filter_values
+                ],
+            }
+        ],
+    )
+
+
+def test_export_job_id_depends_on_user_and_not_on_order_of_filters():
+    user = get_user("user_1", ["role_b", "role_a"])
+    job_id = get_export_job_id(user, get_params(["a", "b", "c"]))
+
+    assert job_id == get_export_job_id(
+        get_user("user_1", ["role_a", "role_b"]), get_params(["c", "a", "b"])
+    )
+    assert job_id != get_export_job_id(
+        get_user("user_2", ["role_a", "role_b"]), get_params(["a", "b", "c"])
+    )
+    assert job_id != get_export_job_id(user, get_params(["a", "b"]))
+
+
+def test_table_file_appears_when_it_is_written(tmp_path):
+    path = tmp_path / "pm_data.csv"
+    size = write_table_file(
+        path=str(path),
+        pages=[[{"id": 1, "10": "a"}], [{"id": 2, "10": "b"}]],
+        rename_columns={"10": "Name"},
+        file_type="csv",
+        csv_separator=",",
+    )
+    assert size == path.stat().st_size
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "id,Name",
+        "1,a",
+        "2,b",
+    ]
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["pm_data.csv"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_same_export_is_submitted_once(tmp_path, monkeypatch):
+    runs = []
+
+    async def run(self, job, user_data, params, elastic_client):
+        runs.append(job.job_id)
+
+    monkeypatch.setattr(ExportJobs, "_ExportJobs__run", run)
+    monkeypatch.setattr(
+        export_jobs_module.ElasticsearchManager, "get_client", lambda self: None
+    )
+    jobs = ExportJobs(directory=str(tmp_path), ttl=60, stale_after=60)
+    user = get_user("user_1", ["role_a"])
+
+    job = await jobs.submit(user, get_params(["a"]))
+    same_job = await jobs.submit(user, get_params(["a"]))
+    await asyncio.sleep(0)
+
+    assert same_job.job_id == job.job_id
+    assert runs == [job.job_id]
+    assert jobs.get_user_job(job.job_id, user).state == ExportJobState.QUEUED
+    with pytest.raises(HTTPException) as exc_info:
+        jobs.get_user_job(job.job_id, get_user("user_2", ["role_a"]))
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,75 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from grpc_server.group_router.aggregation import convert_aggregation_to_json
+from services.rendering_services.pool import (
+    RenderingPool,
+    RenderingPoolOverloadedError,
+)
+from services.rendering_services.renderers import render_table_file
+
+PAGES = [
+    [{"id": 1, "10": "a"}, {"id": 2, "10": "b"}],
+    [{"id": 3, "10": None, "__parent__.11": 5}],
+]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_table_is_rendered_in_process():
+    pool = RenderingPool(workers=1, queue_size=1, queue_timeout=30)
+    try:
+        content = await pool.run(
+            render_table_file,
+            pages=PAGES,
+            rename_columns={"10": "Name", "__parent__.11": "__parent__.Size"},
+            file_type="csv",
+        )
+    finally:
+        pool.shutdown()
+    assert content.decode("utf-8").splitlines() == [
+        "id;Name;__parent__.Size",
+        "1;a;",
+        "2;b;",
+        "3;;5.0",
+    ]
+
+
+def test_xlsx_rendering():
+    content = render_table_file(
+        pages=PAGES, rename_columns={}, file_type="xlsx"
+    )
+    with zipfile.ZipFile(io.BytesIO(content)) as xlsx_file:
+        assert "xl/worksheets/sheet1.xml" in xlsx_file.namelist()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_render_is_rejected_if_queue_is_full():
+    pool = RenderingPool(workers=1, queue_size=0, queue_timeout=0.1)
+    try:
+        first_render = asyncio.create_task(pool.run(sum, range(10**8)))
+        await asyncio.sleep(0)
+        with pytest.raises(RenderingPoolOverloadedError):
+            await pool.run(sum, [1])
+        assert await first_render == sum(range(10**8))
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_pool_without_workers_renders_inline():
+    pool = RenderingPool(workers=0)
+    aggregations = {
+        "state": {
+            "buckets": [
+                {"key": "ACTIVE", "doc_count": 2},
+                {"key": 1, "doc_count": 3},
+            ]
+        }
+    }
+    assert await pool.run(convert_aggregation_to_json, aggregations) == [
+        '{"group":[{"grouped_by":"state","grouping_value":"ACTIVE"}],"quantity":2}',
+        '{"group":[{"grouped_by":"state","grouping_value":"1"}],"quantity":3}',
+    ]
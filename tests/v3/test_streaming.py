@@ -0,0 +1,80 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from elastic.client import get_async_client
+from security.implementation.disabled import default_user
+from security.security_factory import security
+from v3.api.fast_api.application import v3_app
+from v3.api.fast_api.streaming import NDJSON_MEDIA_TYPE
+from v3.custom_exceptions.not_found import TmoNotFound
+
+QUERY = {"query": {"name": {"@eq": "Site"}}}
+
+
+class FakeElasticsearch:
+    """Connection which returns one page of rows or raises the error"""
+
+    def __init__(self, rows: list[dict], error: Exception | None = None):
+        self.rows = rows
+        self.error = error
+
+    async def search(self, **kwargs):
+        if self.error is not None:
+            raise self.error
+        return {"hits": {"hits": [{"_source": row} for row in self.rows]}}
+
+
+@pytest.fixture
+def get_client():
+    def get_client(connection: FakeElasticsearch) -> TestClient:
+        v3_app.dependency_overrides[get_async_client] = lambda: connection
+        v3_app.dependency_overrides[security] = lambda: default_user
+        return TestClient(v3_app)
+
+    yield get_client
+    v3_app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/inventory/tmos", "/hierarchy/hierarchies"])
+def test_stream_returns_row_per_line(get_client, path: str):
+    rows = [
+        {"id": 1, "name": "Site", "created": "2024-01-01T00:00:00"},
+        {"id": 2, "name": "Site т", "created": None},
+    ]
+    client = get_client(FakeElasticsearch(rows=rows))
+
+    response = client.post(path, params={"stream": True}, json=QUERY)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    assert response.content.endswith(b"\n")
+    lines = response.content.splitlines()
+    assert [orjson.loads(line) for line in lines] == rows
+    assert client.post(path, json=QUERY).json() == rows
+
+
+def test_stream_of_empty_result_is_empty(get_client):
+    client = get_client(FakeElasticsearch(rows=[]))
+
+    response = client.post(
+        "/inventory/tmos", params={"stream": True}, json=QUERY
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_not_found_is_returned_as_422(get_client, stream: bool):
+    client = get_client(
+        FakeElasticsearch(rows=[], error=TmoNotFound("TMO not found"))
+    )
+
+    response = client.post(
+        "/inventory/tmos", params={"stream": stream}, json=QUERY
+    )
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "TMO not found"}